@@ -0,0 +1,80 @@
+"""Catalog generations: publishing, and searching while refreshes publish.
+
+catalog.search_during_refresh is the concurrency hammer: reader threads
+replay the typing traces against CatalogStore.current() while a writer keeps
+publishing generations that alternate between two different catalogs.
+tests/test_catalog.py runs the same hammer with readers that check every
+result against the generation it searched.
+"""
+import threading
+import time
+
+from harness import benchmark, Case
+from bench_search import catalog_and_keystrokes
+import synthetic
+
+from catalog import CatalogStore
+
+READERS = 4
+
+
+@benchmark("catalog.publish")
+def bench_catalog_publish(ctx):
+    catalog, _ = catalog_and_keystrokes(ctx)
+    store = CatalogStore()
+    return Case(lambda: store.publish(catalog), extra={"apps": len(catalog)})
+
+
+def _reader(store, keystrokes):
+    for query in keystrokes:
+        store.current().search(query)
+
+
+def hammer(store, catalogs, keystrokes, reader=_reader):
+    """Run READERS reader(store, keystrokes) threads while a writer publishes catalogs in turn.
+
+    Returns (generations published, seconds until the readers finished).
+    """
+    stop = threading.Event()
+    published = []
+
+    def writer():
+        n = 0
+        while not stop.is_set():
+            store.publish(catalogs[n % 2])
+            n += 1
+        published.append(n)
+
+    readers = [threading.Thread(target=reader, args=(store, keystrokes)) for _ in range(READERS)]
+    writer_thread = threading.Thread(target=writer)
+    start = time.perf_counter()
+    writer_thread.start()
+    for thread in readers:
+        thread.start()
+    for thread in readers:
+        thread.join()
+    elapsed = time.perf_counter() - start
+    stop.set()
+    writer_thread.join()
+    return published[0], elapsed
+
+
+@benchmark("catalog.search_during_refresh")
+def bench_search_during_refresh(ctx):
+    catalog, keystrokes = catalog_and_keystrokes(ctx)
+    other = ctx.cached("catalog_other", lambda: synthetic.make_catalog(ctx.size, ctx.seed + 1))
+    store = CatalogStore(catalog)
+    totals = {"generations": 0, "searches": 0, "seconds": 0.0}
+
+    def run():
+        generations, elapsed = hammer(store, (catalog, other), keystrokes)
+        totals["generations"] += generations
+        totals["searches"] += READERS * len(keystrokes)
+        totals["seconds"] += elapsed
+
+    def extra():
+        return {
+            "searches_per_sec": totals["searches"] / totals["seconds"],
+            "generations_published": totals["generations"],
+        }
+    return Case(run, calls=3, warmup=0, extra=extra)
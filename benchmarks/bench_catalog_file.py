@@ -0,0 +1,167 @@
+"""The memory-mapped catalog file against JSON and pickle.
+
+Load benchmarks time everything needed before the first search: for JSON
+and pickle that includes building the PrefixIndex, for the mapped file only
+opening and checking it. catalog_file.rss loads each format in a fresh
+interpreter and reports how much private memory it costs. catalog_file.fuzz
+times checking randomly damaged copies of a valid file; tests/test_catalog_file.py
+requires every one of them to be rejected with CatalogFileError.
+"""
+import json
+import os
+import pickle
+import random
+import subprocess
+import sys
+import tempfile
+
+from harness import benchmark, Case, SkipBenchmark
+from bench_search import catalog_and_keystrokes, cycle
+
+import catalog_file
+from search import PrefixIndex
+
+FUZZ_CASES = 200
+
+
+def catalog_files(ctx):
+    """Write the shared catalog as .olc, .json and .pickle once per run."""
+    def write():
+        catalog, _ = catalog_and_keystrokes(ctx)
+        directory = tempfile.mkdtemp(prefix="launcher-catalog-", dir=ctx.workdir)
+        paths = {"mmap": catalog_file.write_catalog(os.path.join(directory, "catalog.olc"), catalog)}
+        paths["json"] = os.path.join(directory, "catalog.json")
+        with open(paths["json"], "w", encoding="utf-8") as f:
+            json.dump(list(catalog), f)
+        paths["pickle"] = os.path.join(directory, "catalog.pickle")
+        with open(paths["pickle"], "wb") as f:
+            pickle.dump(list(catalog), f, protocol=pickle.HIGHEST_PROTOCOL)
+        return paths
+    return ctx.cached("catalog_files", write)
+
+
+def load_json(path):
+    with open(path, encoding="utf-8") as f:
+        return PrefixIndex(json.load(f))
+
+
+def load_pickle(path):
+    with open(path, "rb") as f:
+        return PrefixIndex(pickle.load(f))
+
+
+LOADERS = {
+    "mmap": catalog_file.MappedCatalog,
+    "json": load_json,
+    "pickle": load_pickle,
+}
+
+
+@benchmark("catalog_file.write")
+def bench_write(ctx):
+    catalog, _ = catalog_and_keystrokes(ctx)
+    directory = tempfile.mkdtemp(prefix="launcher-catalog-", dir=ctx.workdir)
+    path = os.path.join(directory, "catalog.olc")
+    return Case(lambda: catalog_file.write_catalog(path, catalog),
+                extra=lambda: {"file_bytes": os.path.getsize(path)})
+
+
+def _load_benchmark(kind):
+    def setup(ctx):
+        path = catalog_files(ctx)[kind]
+        return Case(lambda: LOADERS[kind](path), calls=max(20, ctx.repeat),
+                    extra={"file_bytes": os.path.getsize(path)})
+    return setup
+
+for _kind in LOADERS:
+    benchmark(f"catalog_file.load_{_kind}")(_load_benchmark(_kind))
+
+
+@benchmark("catalog_file.keystroke")
+def bench_keystroke(ctx):
+    catalog, keystrokes = catalog_and_keystrokes(ctx)
+    mapped = catalog_file.MappedCatalog(catalog_files(ctx)["mmap"])
+    next_query = cycle(keystrokes)
+    return Case(lambda: mapped.search(next_query()), calls=len(keystrokes),
+                extra={"apps": len(mapped)})
+
+
+RSS_SCRIPT = """
+import sys
+sys.path[:0] = [{src!r}, {bench!r}]
+def rss():
+    fields = dict(line.split(":", 1) for line in open("/proc/self/status"))
+    return int(fields["RssAnon"].split()[0]), int(fields["RssFile"].split()[0])
+import bench_catalog_file
+anon, file = rss()
+index = bench_catalog_file.LOADERS[{kind!r}]({path!r})
+index.search("a")
+anon_after, file_after = rss()
+print(anon_after - anon, file_after - file)
+"""
+
+
+@benchmark("catalog_file.rss")
+def bench_rss(ctx):
+    if not os.path.exists("/proc/self/status"):
+        raise SkipBenchmark("needs /proc/self/status")
+    paths = catalog_files(ctx)
+    src = os.path.dirname(catalog_file.__file__)
+    bench = os.path.dirname(os.path.abspath(__file__))
+    usage = {}
+    def measure():
+        for kind, path in paths.items():
+            script = RSS_SCRIPT.format(src=src, bench=bench, kind=kind, path=path)
+            output = subprocess.run([sys.executable, "-c", script], check=True,
+                                    capture_output=True, text=True).stdout.split()
+            usage[f"{kind}_private_kb"] = int(output[0])
+            usage[f"{kind}_shared_kb"] = int(output[1])
+    return Case(measure, calls=1, warmup=0, extra=usage)
+
+
+def corruptions(data, rng):
+    """Yield (description, damaged copy) pairs for a valid file."""
+    for _ in range(FUZZ_CASES):
+        damaged = bytearray(data)
+        kind = rng.choice(("flip", "bytes", "truncate", "extend", "zero"))
+        if kind == "flip":
+            position = rng.randrange(len(damaged))
+            damaged[position] ^= 1 << rng.randrange(8)
+        elif kind == "bytes":
+            position = rng.randrange(len(damaged))
+            for i in range(position, min(len(damaged), position + rng.randint(1, 16))):
+                damaged[i] = rng.randrange(256)
+            if damaged == data:
+                continue
+        elif kind == "truncate":
+            position = rng.randrange(len(damaged))
+            del damaged[position:]
+        elif kind == "extend":
+            damaged += bytes(rng.randint(1, 64))
+        else:
+            position = rng.randrange(len(damaged))
+            damaged[position:position + 8] = bytes(len(damaged[position:position + 8]))
+            if damaged == data:
+                continue
+        yield f"{kind} at {position if kind != 'extend' else len(data)}", bytes(damaged)
+
+
+@benchmark("catalog_file.fuzz")
+def bench_fuzz(ctx):
+    catalog, _ = catalog_and_keystrokes(ctx)
+    data = catalog_file.encode_catalog(catalog[:300])
+    directory = tempfile.mkdtemp(prefix="launcher-fuzz-", dir=ctx.workdir)
+    path = os.path.join(directory, "damaged.olc")
+    rng = random.Random(ctx.seed)
+    counts = {"rejected": 0, "accepted": 0}
+    def fuzz():
+        for _, damaged in corruptions(data, rng):
+            with open(path, "wb") as f:
+                f.write(damaged)
+            try:
+                catalog_file.MappedCatalog(path)
+            except catalog_file.CatalogFileError:
+                counts["rejected"] += 1
+            else:
+                counts["accepted"] += 1
+    return Case(fuzz, extra=counts)
@@ -0,0 +1,187 @@
+"""Latency of the pump between the Tk thread and the asyncio core (src/core.py).
+
+A stand-in UI thread pumps the EventBridge whenever it is woken, like the
+Tk binding does (bench_events.UIThread). A round trip is what a keystroke
+or tray click costs before its answer is on screen: the caller hands a
+coroutine to the core, which posts an event back that the UI thread runs.
+
+core.submit: a coroutine submitted from another thread until its result is back.
+core.ui_roundtrip: the caller to the core and back through the UI thread.
+core.ui_roundtrip_loaded: the same while the core runs SCANS scans of the
+synthetic machine in its thread pool and a task floods the UI thread with
+progress events; setup checks the worst round trip stays under a bound.
+core.shutdown: shutdown() with scans, a waiting blocking call, an IPC server
+and a coroutine running; setup checks that every one was cancelled and that
+the core refuses tasks by a running name and after shutdown.
+"""
+import asyncio
+import os
+import socket
+import tempfile
+import threading
+import time
+
+from harness import benchmark, Case
+from bench_events import UIThread
+from bench_scan import _machine
+
+import ipc
+import scanner
+from core import AsyncCore, TaskRunning, CoreClosed
+from events import EventBridge
+
+ROUNDTRIPS = 2000
+SCANS = 2
+PROGRESS_INTERVAL = 0.001  # Seconds between the flooding task's events
+# Two CPU-bound scans contend for the GIL with all three threads of a round trip
+MAX_LOADED_ROUNDTRIP_MS = 250.0
+AUTHKEY = b"benchmark-key"
+
+
+async def _answer(value):
+    return value
+
+
+class Pump:
+    """A core and a stand-in UI thread wired together through an EventBridge."""
+    def __init__(self):
+        self.answered = threading.Event()
+        self.bridge = EventBridge({"answer": self.answered.set, "progress": lambda n: None})
+        self.ui = UIThread(self.bridge)
+        self.core = AsyncCore(self.bridge).start()
+
+    def roundtrip(self):
+        self.answered.clear()
+        self.core.submit(self._post_answer())
+        if not self.answered.wait(5):
+            raise AssertionError("no answer from the core within 5s")
+
+    async def _post_answer(self):
+        self.core.ui("answer")
+
+    def close(self):
+        if not self.core.shutdown():
+            raise AssertionError("core tasks did not finish at shutdown")
+        self.ui.stop()
+
+
+def _scan_forever(core, providers):
+    async def scans():
+        while True:
+            cancel = threading.Event()
+            await core.blocking(scanner.scan_installed_apps, providers, None, cancel, cancel=cancel)
+    return scans()
+
+
+async def _flood(core):
+    n = 0
+    while True:
+        core.ui("progress", n)
+        n += 1
+        await asyncio.sleep(PROGRESS_INTERVAL)
+
+
+@benchmark("core.submit")
+def bench_core_submit(ctx):
+    core = AsyncCore().start()
+    return Case(lambda: core.submit(_answer(1)).result(5), calls=ROUNDTRIPS, teardown=core.shutdown)
+
+
+@benchmark("core.ui_roundtrip")
+def bench_core_ui_roundtrip(ctx):
+    pump = Pump()
+    return Case(pump.roundtrip, calls=ROUNDTRIPS, teardown=pump.close,
+                extra=lambda: {"wakeups": pump.ui.wakeups})
+
+
+@benchmark("core.ui_roundtrip_loaded")
+def bench_core_ui_roundtrip_loaded(ctx):
+    providers = _machine(ctx)
+    pump = Pump()
+    for i in range(SCANS):
+        pump.core.task(f"scan {i}", _scan_forever(pump.core, providers))
+    pump.core.task("progress", _flood(pump.core))
+    time.sleep(0.1)  # Let the load get going
+
+    worst = [0.0]
+
+    def roundtrip():
+        start = time.perf_counter()
+        pump.roundtrip()
+        worst[0] = max(worst[0], time.perf_counter() - start)
+
+    def check():
+        worst_ms = worst[0] * 1000.0
+        if worst_ms > MAX_LOADED_ROUNDTRIP_MS:
+            raise AssertionError(f"round trip took {worst_ms:.1f}ms under load "
+                                 f"(bound {MAX_LOADED_ROUNDTRIP_MS}ms)")
+        stats = pump.core.stats()
+        return {"scans": SCANS, "blocking_calls": stats['blocking'], "worst_ms": worst_ms,
+                "ui_events": pump.bridge.dispatched, "wakeups": pump.ui.wakeups}
+
+    return Case(roundtrip, calls=ROUNDTRIPS, teardown=pump.close, extra=check)
+
+
+def _busy_core(ctx, observed):
+    """Return a core running scans, a blocking wait, an IPC server and a coroutine."""
+    providers = _machine(ctx)
+    core = AsyncCore().start()
+    for i in range(SCANS):
+        core.task(f"scan {i}", _scan_forever(core, providers))
+
+    waiting = threading.Event()
+    def wait():
+        waiting.wait(30)
+        observed.append("wait")
+    core.task("wait", core.blocking(wait, cancel=waiting))
+
+    if hasattr(socket, "AF_UNIX"):
+        address = os.path.join(tempfile.mkdtemp(prefix="launcher-core-", dir=ctx.workdir), "core.sock")
+        server = ipc.IPCServer({}, address=address, authkey=AUTHKEY)
+        server.bind()
+        def serve():
+            server.serve_forever()
+            observed.append("ipc")
+        core.task("ipc", core.blocking(serve, cancel=server.close))
+
+    async def sleep():
+        try:
+            await asyncio.sleep(30)
+        finally:
+            observed.append("sleep")
+    core.task("sleep", sleep())
+    return core
+
+
+@benchmark("core.shutdown")
+def bench_core_shutdown(ctx):
+    observed = []
+    core = _busy_core(ctx, observed)
+    time.sleep(0.05)
+    try:
+        core.task("sleep", _answer(1)).result(5)
+        raise AssertionError("a second task named 'sleep' was started")
+    except TaskRunning:
+        pass
+    expected = sorted(["wait", "sleep"] + (["ipc"] if core.running("ipc") else []))
+    if not core.shutdown():
+        raise AssertionError("core tasks did not finish at shutdown")
+    if sorted(observed) != expected:
+        raise AssertionError(f"shutdown ended {sorted(observed)}, expected {expected}")
+    try:
+        core.task("late", _answer(1)).result(5)
+        raise AssertionError("the core started a task after shutdown")
+    except CoreClosed:
+        pass
+
+    state = {}
+
+    def busy():
+        state["core"] = _busy_core(ctx, [])
+        time.sleep(0.05)
+
+    def shutdown():
+        if not state["core"].shutdown():
+            raise AssertionError("core tasks did not finish at shutdown")
+
+    return Case(shutdown, before=busy, extra={"tasks": SCANS + 3})
@@ -0,0 +1,97 @@
+"""Stress of the EventBridge between producer threads and the Tk thread.
+
+A stand-in UI thread pumps the bridge whenever it is woken, like the Tk
+binding does, while hotkey and tray threads fire thousands of events.
+tests/test_events.py checks ordering, coalescing and the latency bound on
+the same storm; the benchmark reports events, wakeups and latency.
+"""
+import threading
+import time
+
+from harness import benchmark, Case
+
+from events import EventBridge
+
+EVENTS_PER_PRODUCER = 2000
+PRODUCERS = 4
+DRAIN_SECONDS = 5.0
+
+
+class UIThread:
+    """Pumps a bridge on its own thread each time the bridge wakes it."""
+    def __init__(self, bridge):
+        self.bridge = bridge
+        self.woken = threading.Event()
+        self.stopped = False
+        self.wakeups = 0
+        self.max_latency = 0.0
+        bridge.wake = self.woken.set
+        self.thread = threading.Thread(target=self._run, name="FakeTk", daemon=True)
+        self.thread.start()
+
+    def _run(self):
+        while not self.stopped:
+            self.woken.wait()
+            self.woken.clear()
+            self.wakeups += 1
+            self.bridge.pump()
+            if self.bridge.latencies:
+                self.max_latency = max(self.max_latency, max(self.bridge.latencies))
+
+    def stop(self):
+        self.stopped = True
+        self.woken.set()
+        self.thread.join()
+
+
+def storm():
+    """Fire hotkey, tray and sequence events from several threads until all are delivered.
+
+    Returns the bridge, the UIThread, {producer: [sequence numbers received]}
+    and the number of toggles dispatched.
+    """
+    received = {}
+    toggles = []
+    bridge = EventBridge({
+        "seq": lambda producer, n: received.setdefault(producer, []).append(n),
+        "toggle": lambda: toggles.append(True),
+    })
+    ui = UIThread(bridge)
+
+    def produce(producer):
+        for n in range(EVENTS_PER_PRODUCER):
+            bridge.post("seq", producer, n)
+            if n % 4 == 0:
+                bridge.post("toggle")  # Held-down hotkey: many toggles, few delivered
+
+    threads = [threading.Thread(target=produce, args=(p,)) for p in range(PRODUCERS)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    deadline = time.perf_counter() + DRAIN_SECONDS
+    while bridge.dispatched + bridge.coalesced < bridge.posted and time.perf_counter() < deadline:
+        time.sleep(0.001)
+    ui.stop()
+    return bridge, ui, received, len(toggles)
+
+
+@benchmark("events.hotkey_storm")
+def bench_hotkey_storm(ctx):
+    totals = {"events": 0, "coalesced": 0, "wakeups": 0, "max_latency_ms": 0.0}
+
+    def run():
+        bridge, ui, _, _ = storm()
+        totals["events"] += bridge.posted
+        totals["coalesced"] += bridge.coalesced
+        totals["wakeups"] += ui.wakeups
+        totals["max_latency_ms"] = max(totals["max_latency_ms"], ui.max_latency * 1000.0)
+
+    def extra():
+        return {
+            "events_per_run": totals["events"] // max(1, ctx.repeat + 1),
+            "coalesced_per_run": totals["coalesced"] // max(1, ctx.repeat + 1),
+            "wakeups_per_run": totals["wakeups"] // max(1, ctx.repeat + 1),
+            "max_latency_ms": totals["max_latency_ms"],
+        }
+    return Case(run, extra=extra)
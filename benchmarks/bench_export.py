@@ -0,0 +1,109 @@
+"""Headless export of the synthetic machine as JSON Lines (src/export.py).
+
+export.jsonl: export_apps() over the synthetic machine into memory; reports
+the apps written and how soon the first record was out. Setup checks the
+export lists the same executables as scan_installed_apps(), that --source
+and --limit narrow it, and runs `launcher.py --export` on a recording of
+the machine in a fresh interpreter, checking its output and that Tk,
+pystray and keyboard were never imported.
+"""
+import contextlib
+import io
+import json
+import os
+import subprocess
+import sys
+import tempfile
+import time
+
+from harness import benchmark, Case
+from bench_scan import _machine
+
+import dedup
+import export
+import scanner
+import scan_record
+
+GUI_MODULES = ("tkinter", "pystray", "keyboard")
+LIMIT = 10
+SRC_DIR = os.path.dirname(os.path.abspath(scanner.__file__))
+
+# Runs launcher.py as __main__ and reports the GUI modules it imported on stderr
+_RUN_LAUNCHER = """
+import runpy, sys
+sys.argv = sys.argv[1:]
+sys.path.insert(0, {src!r})
+try:
+    runpy.run_path(sys.argv[0], run_name="__main__")
+finally:
+    print("IMPORTED", [m for m in {modules!r} if m in sys.modules], file=sys.stderr)
+"""
+
+
+class TimedOutput(io.StringIO):
+    """An in-memory stream that notes when the first record was written."""
+    def __init__(self):
+        super().__init__()
+        self.started = time.perf_counter()
+        self.first_write = None
+
+    def write(self, text):
+        if self.first_write is None:
+            self.first_write = time.perf_counter() - self.started
+        return super().write(text)
+
+
+def _export(providers, **options):
+    out = TimedOutput()
+    with contextlib.redirect_stderr(io.StringIO()):  # The scanners' messages
+        stats = export.export_apps(out, providers, **options)
+    return [json.loads(line) for line in out.getvalue().splitlines()], stats, out
+
+
+def _check_export(ctx, providers):
+    with contextlib.redirect_stdout(io.StringIO()):
+        catalog = scanner.scan_installed_apps(providers)
+    records, stats, _ = _export(providers)
+    exported = {dedup.target_identity(record['path'], providers.fs) for record in records}
+    scanned = {dedup.target_identity(app['path'], providers.fs) for app in catalog}
+    if len(records) != len(exported) or exported != scanned:
+        raise AssertionError(f"exported {len(records)} records for {len(exported)} executables, "
+                             f"the scan found {len(scanned)}")
+    records, stats, _ = _export(providers, sources=["path"], limit=LIMIT)
+    if len(records) != LIMIT or not stats['limited'] or [s['source'] for s in stats['sources']] != ["path"]:
+        raise AssertionError(f"--source path --limit {LIMIT} wrote {len(records)} records "
+                             f"from {[s['source'] for s in stats['sources']]}")
+
+    # launcher.py --export in a fresh interpreter, on a recording of the machine
+    recording, recorder = scan_record.record_providers(providers)
+    with contextlib.redirect_stdout(io.StringIO()):
+        scanner.scan_installed_apps(recording)
+    archive = os.path.join(tempfile.mkdtemp(prefix="launcher-export-", dir=ctx.workdir), "machine.scan.gz")
+    recorder.save(archive)
+    script = _RUN_LAUNCHER.format(src=SRC_DIR, modules=GUI_MODULES)
+    result = subprocess.run([sys.executable, "-c", script, os.path.join(SRC_DIR, "launcher.py"),
+                             "--export", "--replay", archive, "--limit", str(LIMIT)],
+                            capture_output=True, text=True, timeout=60)
+    if result.returncode != 0:
+        raise AssertionError(f"launcher.py --export exited with {result.returncode}: {result.stderr[-500:]}")
+    lines = result.stdout.splitlines()
+    if len(lines) != LIMIT or not all(json.loads(line)['path'] for line in lines):
+        raise AssertionError(f"launcher.py --export wrote {lines[:3]}...")
+    imported = result.stderr[result.stderr.rindex("IMPORTED"):].strip()
+    if imported != "IMPORTED []":
+        raise AssertionError(f"launcher.py --export imported GUI modules: {imported}")
+
+
+@benchmark("export.jsonl")
+def bench_export_jsonl(ctx):
+    providers = _machine(ctx)
+    _check_export(ctx, providers)
+    last = {}
+
+    def run():
+        last['records'], last['stats'], last['out'] = _export(providers)
+
+    def extra():
+        return {"apps_written": len(last['records']), "duplicates": last['stats']['duplicates'],
+                "first_record_ms": last['out'].first_write * 1000.0}
+    return Case(run, extra=extra)
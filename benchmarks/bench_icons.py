@@ -0,0 +1,82 @@
+"""Icon pipeline benchmarks: rendering must never wait for extraction."""
+import shutil
+import tempfile
+import time
+from collections import namedtuple
+
+from harness import benchmark, Case, SkipBenchmark
+from fakes import FakeListbox, FakeCanvas
+from bench_search import catalog_and_keystrokes, cycle
+
+from search import search_apps
+from results_view import fill_listbox, NO_MATCHES_TEXT
+
+# Simulated cost of pulling an icon out of an executable
+EXTRACT_SECONDS = 0.002
+
+IconStat = namedtuple("IconStat", "st_size st_mtime_ns")
+
+
+def _require_pillow():
+    try:
+        from PIL import Image
+    except ImportError:
+        raise SkipBenchmark("Pillow is not installed")
+    return Image
+
+
+def _fake_stat(path):
+    return IconStat(len(path), 1)
+
+
+@benchmark("icons.render_page")
+def bench_icons_render_page(ctx):
+    """IconGutter.show() per keystroke with a slow extractor behind it."""
+    Image = _require_pillow()
+    import icons
+
+    extracted = []
+
+    def slow_extract(path):
+        time.sleep(EXTRACT_SECONDS)
+        extracted.append(path)
+        return Image.new("RGBA", (32, 32), (len(path) % 256, 120, 212, 255))
+
+    catalog, keystrokes = catalog_and_keystrokes(ctx)
+    pages = [search_apps(catalog, text.lower().strip()) for text in keystrokes]
+    cache_dir = tempfile.mkdtemp(prefix="launcher-icons-", dir=ctx.workdir)
+    loader = icons.IconLoader(icons.IconCache(cache_dir), extractor=slow_extract, stat=_fake_stat)
+    listbox = FakeListbox()
+    canvas = FakeCanvas()
+    gutter = icons.IconGutter(canvas, listbox, loader, make_photo=lambda image: image)
+    next_page = cycle(pages)
+
+    def render():
+        page = next_page()
+        fill_listbox(listbox, page, NO_MATCHES_TEXT)
+        gutter.show(page)
+        canvas.flush()  # Swap in whatever finished meanwhile
+
+    def stats():
+        return {"icons_extracted": len(extracted), "rows_per_page": listbox.HEIGHT // listbox.ROW_HEIGHT}
+
+    return Case(render, calls=len(pages), extra=stats,
+                teardown=lambda: shutil.rmtree(cache_dir, ignore_errors=True))
+
+
+@benchmark("icons.load_disk_cache")
+def bench_icons_load_disk(ctx):
+    """IconLoader.load() when the icon is already in the on-disk cache."""
+    Image = _require_pillow()
+    import icons
+
+    catalog, _ = catalog_and_keystrokes(ctx)
+    paths = [app['path'] for app in catalog[:200]]
+    cache_dir = tempfile.mkdtemp(prefix="launcher-icons-", dir=ctx.workdir)
+    loader = icons.IconLoader(icons.IconCache(cache_dir), workers=0, stat=_fake_stat,
+                              extractor=lambda path: Image.new("RGBA", (32, 32), (0, 120, 212, 255)))
+    for path in paths:
+        loader.load(path)  # Populate the disk cache
+    next_path = cycle(paths)
+    return Case(lambda: loader.load(next_path()), calls=len(paths) * 2,
+                teardown=lambda: shutil.rmtree(cache_dir, ignore_errors=True))
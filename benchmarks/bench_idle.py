@@ -0,0 +1,167 @@
+"""Cost of the hidden launcher (src/idle.py).
+
+The launcher's background machinery runs as it does while hidden: the
+asyncio core with the prefetcher and IPC server tasks, the EventBridge and a
+stand-in Tk thread pumping it. A stand-in root runs after() jobs on timer
+threads, as Tcl would on the Tk thread. Each timed call is one idle period:
+focus retries, an icon poll and a prefetch read are pending, as right after
+a show, then IdleState.enter(), IDLE_SECONDS of nothing, and leave(). The
+CPU time counts the cancelling and settling after enter() as well.
+
+idle.hidden reports CPU seconds, timer callbacks and Tk thread wakeups per
+idle hour from IdleState.stats(), plus context switches of all threads
+(Linux), and checks that no timer fired and the CPU time stays under
+IDLE_CPU_BUDGET. Setup checks that a timer firing while idle is counted.
+"""
+import os
+import socket
+import tempfile
+import threading
+import time
+
+from harness import benchmark, Case
+from bench_events import UIThread
+
+import ipc
+from core import AsyncCore
+from events import EventBridge
+from idle import IdleState, HOUR
+from prefetch import Prefetcher
+
+IDLE_SECONDS = 1.0
+SETTLE_SECONDS = 0.05  # For the cancelled prefetch read and timer threads to finish
+# CPU seconds per idle hour (0.3% of a core), counting this benchmark's own
+# /proc reads; a 50 ms after() poll alone costs several times that
+IDLE_CPU_BUDGET = 10.0
+AUTHKEY = b"benchmark-key"
+
+
+class TimerRoot:
+    """Stand-in for the Tk root whose after() jobs run on timer threads."""
+    def __init__(self):
+        self.tk = self  # For root.tk.call() and root.tk.splitlist()
+        self._jobs = {}
+        self._count = 0
+        self._lock = threading.Lock()
+
+    def after(self, ms, fn, *args):
+        with self._lock:
+            self._count += 1
+            job = f"after#{self._count}"
+
+            def run():
+                with self._lock:
+                    if self._jobs.pop(job, None) is None:
+                        return
+                fn(*args)
+            timer = self._jobs[job] = threading.Timer(ms / 1000.0, run)
+        timer.start()
+        return job
+
+    def after_cancel(self, job):
+        with self._lock:
+            timer = self._jobs.pop(job, None)
+        if timer is not None:
+            timer.cancel()
+            timer.join()  # Tcl drops a cancelled job at once; no thread wakes later
+
+    def call(self, *args):
+        if args != ("after", "info"):
+            raise ValueError(f"unsupported Tcl command {args!r}")
+        with self._lock:
+            return tuple(self._jobs)
+
+    def splitlist(self, value):
+        return value
+
+
+def context_switches():
+    """Return the voluntary plus involuntary context switches of all threads, or None (not Linux)."""
+    total = 0
+    try:
+        tasks = os.listdir("/proc/self/task")
+    except OSError:
+        return None
+    for task in tasks:
+        try:
+            with open(f"/proc/self/task/{task}/status") as f:
+                for line in f:
+                    if line.startswith(("voluntary_ctxt_switches", "nonvoluntary_ctxt_switches")):
+                        total += int(line.split()[1])
+        except OSError:
+            pass  # The thread has exited
+    return total
+
+
+class HiddenLauncher:
+    """The launcher's background pieces, idle between hotkeys."""
+    def __init__(self, workdir=None):
+        self.bridge = EventBridge({"toggle": lambda: None})
+        self.ui = UIThread(self.bridge)
+        self.core = AsyncCore(self.bridge).start()
+        self.prefetcher = Prefetcher(thread=False)
+        self.core.task("prefetch", self.core.blocking(self.prefetcher.run, cancel=self.prefetcher.stop))
+        if hasattr(socket, "AF_UNIX"):
+            address = os.path.join(tempfile.mkdtemp(prefix="launcher-idle-", dir=workdir), "idle.sock")
+            self.server = ipc.IPCServer({}, address=address, authkey=AUTHKEY)
+            self.server.bind()
+            self.core.task("ipc", self.core.blocking(self.server.serve_forever, cancel=self.server.close))
+        self.root = TimerRoot()
+        self.idle = IdleState(self.root, wakeups=lambda: self.bridge.dispatched)
+        self.idle.add_hook("prefetching", self.prefetcher.cancel)
+        self.switches = 0
+
+    def shown(self):
+        """Leave what a show and a few keystrokes leave pending."""
+        for delay in (10, 50, 100, 150, 300):
+            self.idle.after(self.root, delay, lambda: None)
+        self.root.after(50, lambda: None)  # An icon poll
+        self.prefetcher.request([os.path.abspath(__file__)])
+
+    def idle_period(self):
+        self.idle.enter()
+        self.prefetcher.idle.wait(5)  # The cancelled read stops at its next chunk
+        time.sleep(SETTLE_SECONDS)
+        before = context_switches()
+        time.sleep(IDLE_SECONDS)
+        after = context_switches()
+        self.idle.leave()
+        if before is not None:
+            self.switches += after - before - 1  # This thread's own sleep
+
+    def close(self):
+        self.core.shutdown()
+        self.ui.stop()
+
+
+@benchmark("idle.hidden")
+def bench_idle_hidden(ctx):
+    # A timer that fires while idle must show up in the counts
+    launcher = HiddenLauncher(ctx.workdir)
+    launcher.idle.enter()
+    launcher.idle.after(launcher.root, 1, lambda: None)
+    time.sleep(0.05)
+    launcher.idle.leave()
+    if launcher.idle.stats()['timer_callbacks'] != 1:
+        raise AssertionError("a timer fired while idle was not counted")
+    launcher.close()
+
+    launcher = HiddenLauncher(ctx.workdir)
+
+    def check():
+        stats = launcher.idle.stats()
+        if stats['timer_callbacks']:
+            raise AssertionError(f"{stats['timer_callbacks']} timer callbacks ran while idle")
+        if stats['cpu_seconds_per_hour'] > IDLE_CPU_BUDGET:
+            raise AssertionError(f"idle CPU time {stats['cpu_seconds_per_hour']:.2f}s per hour "
+                                 f"(budget {IDLE_CPU_BUDGET}s)")
+        hours = stats['seconds'] / HOUR
+        extra = {"idle_seconds": stats['seconds'], "jobs_cancelled": stats['jobs_cancelled'],
+                 "timer_callbacks": stats['timer_callbacks'],
+                 "cpu_seconds_per_hour": stats['cpu_seconds_per_hour'],
+                 "wakeups_per_hour": stats['wakeups_per_hour']}
+        if context_switches() is not None:
+            extra["context_switches_per_hour"] = launcher.switches / hours
+        return extra
+
+    return Case(launcher.idle_period, before=launcher.shown, teardown=launcher.close, extra=check)
@@ -0,0 +1,76 @@
+"""Prefix index benchmarks, including the 100k-name case.
+
+tests/test_index.py checks PrefixIndex against search_apps.
+"""
+import random
+
+from harness import benchmark, Case
+from bench_search import catalog_and_keystrokes, cycle
+import synthetic
+
+from search import PrefixIndex
+
+LARGE_CATALOG_SIZE = 100000
+
+
+def large_catalog(ctx):
+    return ctx.cached("catalog_100k", lambda: synthetic.make_catalog(LARGE_CATALOG_SIZE, ctx.seed))
+
+
+def prefixes(catalog, count, seed):
+    """Return count first-word prefixes of 1-4 characters taken from catalog names."""
+    rng = random.Random(seed)
+    result = []
+    for _ in range(count):
+        word = rng.choice(catalog)['name'].lower().split()[0]
+        result.append(word[:rng.randint(1, min(4, len(word)))])
+    return result
+
+
+@benchmark("index.prefix_build")
+def bench_prefix_build(ctx):
+    catalog, _ = catalog_and_keystrokes(ctx)
+    return Case(lambda: PrefixIndex(catalog), extra={"apps": len(catalog)})
+
+
+@benchmark("search.index_keystroke")
+def bench_index_keystroke(ctx):
+    catalog, keystrokes = catalog_and_keystrokes(ctx)
+    index = PrefixIndex(catalog)
+    next_query = cycle(keystrokes)
+    return Case(lambda: index.search(next_query().lower().strip()),
+                calls=len(keystrokes), extra={"apps": len(catalog)})
+
+
+@benchmark("index.prefix_100k")
+def bench_prefix_100k(ctx):
+    """Starts-with lookups by bisection over 100k names."""
+    catalog = large_catalog(ctx)
+    index = ctx.cached("index_100k", lambda: PrefixIndex(catalog))
+    queries = prefixes(catalog, 200, ctx.seed)
+    next_prefix = cycle(queries)
+    return Case(lambda: index.starts_with(next_prefix()), calls=len(queries) * 5,
+                extra={"apps": len(catalog)})
+
+
+@benchmark("index.prefix_100k_linear")
+def bench_prefix_100k_linear(ctx):
+    """The same lookups as the starts-with bucket computes them today."""
+    catalog = large_catalog(ctx)
+    queries = prefixes(catalog, 50, ctx.seed)
+    next_prefix = cycle(queries)
+
+    def scan():
+        prefix = next_prefix()
+        return [app for app in catalog if app['name'].lower().startswith(prefix)]
+
+    return Case(scan, calls=len(queries), extra={"apps": len(catalog)})
+
+
+@benchmark("index.word_prefix_100k")
+def bench_word_prefix_100k(ctx):
+    catalog = large_catalog(ctx)
+    index = ctx.cached("index_100k", lambda: PrefixIndex(catalog))
+    next_prefix = cycle(prefixes(catalog, 200, ctx.seed + 1))
+    return Case(lambda: index.word_starts_with(next_prefix()), calls=200,
+                extra={"apps": len(catalog)})
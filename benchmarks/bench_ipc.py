@@ -0,0 +1,69 @@
+"""Round trips through the single-instance IPC endpoint (src/ipc.py).
+
+The server runs in this process on a Unix socket in a temporary directory,
+with a fixed key, so nothing touches the user's real endpoint.
+"""
+import os
+import socket
+import tempfile
+
+from harness import benchmark, Case, SkipBenchmark
+from bench_search import catalog_and_keystrokes, cycle
+
+import ipc
+from search import PrefixIndex
+
+AUTHKEY = b"benchmark-key"
+
+
+def start_server(handlers):
+    """Return (server, address) for a server on a fresh temporary socket."""
+    if not hasattr(socket, "AF_UNIX"):
+        raise SkipBenchmark("needs Unix domain sockets")
+    workdir = tempfile.mkdtemp(prefix="launcher-ipc-")
+    address = os.path.join(workdir, "launcher.sock")
+    server = ipc.IPCServer(handlers, address=address, authkey=AUTHKEY)
+    server.start()
+    return server, address
+
+
+def _teardown(server, client=None):
+    def teardown():
+        if client is not None:
+            client.close()
+        server.close()
+        try:
+            os.unlink(server.address)
+            os.rmdir(os.path.dirname(server.address))
+        except OSError:
+            pass
+    return teardown
+
+
+@benchmark("ipc.roundtrip")
+def bench_ipc_roundtrip(ctx):
+    server, address = start_server({})
+    client = ipc.IPCClient(address, AUTHKEY)
+    return Case(lambda: client.call("ping"), calls=max(500, ctx.repeat),
+                teardown=_teardown(server, client))
+
+
+@benchmark("ipc.connect")
+def bench_ipc_connect(ctx):
+    server, address = start_server({})
+    return Case(lambda: ipc.call("ping", address=address, authkey=AUTHKEY),
+                calls=max(100, ctx.repeat), teardown=_teardown(server))
+
+
+@benchmark("ipc.search")
+def bench_ipc_search(ctx):
+    catalog, keystrokes = catalog_and_keystrokes(ctx)
+    index = PrefixIndex(catalog)
+    def search(query, limit=20):
+        return [{'name': app['name'], 'path': app['path']}
+                for app in index.search(query.lower().strip())[:limit]]
+    server, address = start_server({"search": search})
+    client = ipc.IPCClient(address, AUTHKEY)
+    next_query = cycle(keystrokes)
+    return Case(lambda: client.call("search", next_query()), calls=len(keystrokes),
+                extra={"apps": len(catalog)}, teardown=_teardown(server, client))
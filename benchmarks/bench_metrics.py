@@ -0,0 +1,51 @@
+"""Cost of recording into the metrics registry on the keystroke path.
+
+metrics.histogram_record times 10,000 Histogram.record() calls and checks
+with tracemalloc that they leave no memory behind, i.e. that recording does
+not keep samples.
+"""
+import random
+import tracemalloc
+
+from harness import benchmark, Case
+
+from metrics import MetricsRegistry
+
+RECORDS = 10000
+
+
+@benchmark("metrics.histogram_record")
+def bench_histogram_record(ctx):
+    rng = random.Random(ctx.seed)
+    samples = [rng.lognormvariate(-7, 1.5) for _ in range(RECORDS)]
+    histogram = MetricsRegistry().histogram("search.keystroke")
+
+    def record_all():
+        for seconds in samples:
+            histogram.record(seconds)
+
+    record_all()
+    tracemalloc.start()
+    try:
+        before = tracemalloc.take_snapshot()
+        record_all()
+        after = tracemalloc.take_snapshot()
+    finally:
+        tracemalloc.stop()
+    growth = sum(stat.size_diff for stat in after.compare_to(before, "filename")
+                 if stat.traceback[0].filename.endswith("metrics.py"))
+    if growth > 0:
+        raise AssertionError(f"Histogram.record() kept {growth} bytes over {RECORDS} calls")
+
+    return Case(record_all, extra=lambda: {"records_per_call": RECORDS,
+                                           "p99_ms": histogram.summary()['p99_ms']})
+
+
+@benchmark("metrics.snapshot")
+def bench_snapshot(ctx):
+    registry = MetricsRegistry()
+    for i in range(40):
+        registry.histogram(f"latency.{i}").record(0.001 * (i + 1))
+        registry.counter(f"count.{i}").add(i)
+        registry.gauge(f"gauge.{i}").set(i)
+    return Case(registry.snapshot, calls=max(50, ctx.repeat))
@@ -0,0 +1,191 @@
+"""Scans of a machine whose apps point at offline network shares (src/guarded_fs.py).
+
+The synthetic machine gains Uninstall entries, shortcuts and a PATH folder
+on two hosts that hang on every probe (a UNC server and a mapped drive),
+as offline shares do for tens of seconds, plus apps on a share that
+answers. SlowFileSystem stands in for the network: probes of a host sleep
+for its latency.
+
+scan.unreachable_hosts: a full scan through a fresh NetworkGuard with a
+PROBE_TIMEOUT probe timeout. Setup checks that each dead host costs exactly
+one timeout before its other paths are skipped, that the scan finds what
+the machine without the dead shares has, including the apps on the live
+share, and that a host is probed again once its cooldown is over.
+"""
+import ntpath
+import threading
+import time
+
+from harness import benchmark, Case
+from fakes import FakeFolders
+
+import scanner
+import synthetic
+from guarded_fs import NetworkGuard, GuardedFileSystem, Unreachable, host_of
+
+PROBE_TIMEOUT = 0.05
+HANG_SECONDS = 30.0  # What each probe of a dead host would cost without the guard
+DEAD_HOSTS = ("\\\\fileserver", "z:")
+LIVE_HOST = "\\\\nas"
+HOST_LABELS = {"\\\\fileserver": "Fileserver", "z:": "Drive Z", "\\\\nas": "NAS"}
+LIVE_LATENCY = 0.001
+ENTRIES_PER_HOST = 20
+REMOTE_DRIVES = {"z:"}
+
+
+class SlowFileSystem:
+    """A filesystem provider whose probes of some hosts take a while, or hang."""
+    def __init__(self, fs, latencies):
+        self.path = fs.path
+        self._fs = fs
+        self.latencies = latencies  # host -> seconds
+        self.released = threading.Event()  # Ends the hangs
+        self.calls = 0
+
+    def _wait(self, path):
+        delay = self.latencies.get(host_of(path, lambda drive: drive in REMOTE_DRIVES))
+        if delay:
+            self.calls += 1
+            self.released.wait(delay)
+
+    def exists(self, path):
+        self._wait(path)
+        return self._fs.exists(path)
+
+    def isdir(self, path):
+        self._wait(path)
+        return self._fs.isdir(path)
+
+    def isfile(self, path):
+        self._wait(path)
+        return self._fs.isfile(path)
+
+    def listdir(self, path):
+        self._wait(path)
+        return self._fs.listdir(path)
+
+    def glob(self, directory, pattern):
+        self._wait(directory)
+        return self._fs.glob(directory, pattern)
+
+    def getsize(self, path):
+        self._wait(path)
+        return self._fs.getsize(path)
+
+    def stat(self, path):
+        self._wait(path)
+        return self._fs.stat(path)
+
+    def realpath(self, path):
+        self._wait(path)
+        return self._fs.realpath(path)
+
+    def expandvars(self, path):
+        return self._fs.expandvars(path)
+
+
+def _share_path(host, *parts):
+    root = host.upper() + "\\" if host.endswith(":") else host + "\\apps\\"
+    return root + "\\".join(parts)
+
+
+def networked_machine(ctx):
+    """Return (the synthetic machine with network apps added, names of the live share's apps)."""
+    providers = synthetic.make_machine(ctx.size, ctx.seed)
+    fs, registry, shortcuts = providers.fs, providers.registry, providers.shortcuts
+    folders = providers.folders
+    start_menu = folders.start_menu_dirs()[0]
+    uninstall = scanner.REGISTRY_PATHS[1][1]  # HKLM Uninstall
+    live_names = []
+    for host in DEAD_HOSTS + (LIVE_HOST,):
+        for i in range(ENTRIES_PER_HOST):
+            name = f"{HOST_LABELS[host]} Tool {i}"
+            exe = _share_path(host, f"Tool{i}", f"tool{i}.exe")
+            registry.add(scanner.HKLM, uninstall, f"{HOST_LABELS[host]}Tool{i}",
+                         {"DisplayName": name, "DisplayIcon": exe + ",0"})
+            shortcut = ntpath.join(start_menu, "Network", f"{name}.lnk")
+            fs.add_file(shortcut)
+            shortcuts.add(shortcut, exe)
+            if host == LIVE_HOST:
+                fs.add_file(exe, 4 * 1024 * 1024)
+                live_names.append(name)
+    # A PATH folder on a dead share too
+    folders = FakeFolders(folders.start_menu_dirs(), folders.program_dirs(), folders.desktop_dirs(),
+                          path_dirs=folders.path_dirs() + [_share_path(DEAD_HOSTS[0], "bin")],
+                          path_extensions=folders.path_extensions())
+    return scanner.ScanProviders(fs, registry, shortcuts, folders), live_names
+
+
+def _guarded(providers, slow, guard):
+    return scanner.ScanProviders(GuardedFileSystem(slow, guard), providers.registry, providers.shortcuts,
+                                 providers.folders)
+
+
+def _check(providers, slow):
+    guard = NetworkGuard(PROBE_TIMEOUT, is_remote_drive=lambda drive: drive in REMOTE_DRIVES)
+    plan = scanner.ScanPlan(_guarded(providers, slow, guard))
+    start = time.perf_counter()
+    apps = plan.run()
+    elapsed = time.perf_counter() - start
+    network = plan.stats['network']
+    if network['timeouts'] != len(DEAD_HOSTS) or sorted(network['hosts_down']) != sorted(DEAD_HOSTS):
+        raise AssertionError(f"expected one timeout per dead host, got {network}")
+    if not network['skipped']:
+        raise AssertionError("no probes of the dead hosts were skipped")
+    bound = len(DEAD_HOSTS) * PROBE_TIMEOUT + 2.0
+    if elapsed > bound:
+        raise AssertionError(f"scan took {elapsed:.2f}s with dead hosts (bound {bound:.2f}s)")
+    expected = scanner.scan_installed_apps(providers)
+    if [app['path'] for app in apps] != [app['path'] for app in expected]:
+        raise AssertionError("the guarded scan found different apps than the machine has")
+
+    # Once the cooldown is over, the host is probed again
+    now = [0.0]
+    guard = NetworkGuard(PROBE_TIMEOUT, cooldown=10.0, clock=lambda: now[0])
+    dead = _share_path(DEAD_HOSTS[0], "Tool0", "tool0.exe")
+    for expected_kind in ("timeouts", "skipped"):
+        try:
+            guard.call(dead, slow.exists, dead)
+            raise AssertionError(f"a probe of {DEAD_HOSTS[0]} returned")
+        except Unreachable:
+            pass
+        if guard.events[-1]['kind'] != expected_kind:
+            raise AssertionError(f"expected {expected_kind}, got {guard.events[-1]}")
+    now[0] = 11.0
+    if guard.hosts_down():
+        raise AssertionError("the host is still skipped after its cooldown")
+    probes = guard.counters['probes']
+    try:
+        guard.call(dead, slow.exists, dead)
+    except Unreachable:
+        pass
+    if guard.counters['probes'] != probes + 1:
+        raise AssertionError("the host was not probed again after its cooldown")
+    return apps
+
+
+@benchmark("scan.unreachable_hosts")
+def bench_scan_unreachable_hosts(ctx):
+    providers, live_names = networked_machine(ctx)
+    latencies = {host: HANG_SECONDS for host in DEAD_HOSTS}
+    latencies[LIVE_HOST] = LIVE_LATENCY
+    slow = SlowFileSystem(providers.fs, latencies)
+    apps = _check(providers, slow)
+    found = {app['name'] for app in apps}
+    if not set(live_names) <= found:
+        raise AssertionError(f"apps on the live share were not found: {sorted(set(live_names) - found)[:3]}")
+
+    plans = []
+
+    def scan():
+        guard = NetworkGuard(PROBE_TIMEOUT, is_remote_drive=lambda drive: drive in REMOTE_DRIVES)
+        plans.append(scanner.ScanPlan(_guarded(providers, slow, guard)))
+        plans[-1].run()
+
+    def extra():
+        network = plans[-1].stats['network']
+        return {"apps_found": len(apps), "timed_out_probes": network['timeouts'],
+                "skipped_probes": network['skipped'],
+                "network_probes": network['probes'], "probe_timeout": PROBE_TIMEOUT,
+                "unguarded_seconds": (network['timeouts'] + network['skipped']) * HANG_SECONDS}
+    return Case(scan, extra=extra, teardown=slow.released.set)
@@ -0,0 +1,258 @@
+"""Throughput of reading executables' PE info (src/pe_info.py).
+
+Fixture executables are written once per run: valid PE32 and PE32+ headers,
+a code section left as a sparse hole and a resource section holding an
+icon and a version resource, as linkers lay them out. Their names,
+subsystems and string tables vary the way they do in Program Files.
+
+pe.read_info: read_pe_info() over FILES executables; reports files per second.
+Setup checks the fixtures parse to what was written (preferred string
+table, console and DLL flags, files without a version resource, damaged and
+non-PE files), and that a program folder scan names apps from their
+version resource and skips console helpers.
+pe.cached: a PEInfoCache answering for the same files, a stat each.
+"""
+import os
+import shutil
+import struct
+import tempfile
+import time
+
+from harness import benchmark, Case
+from fakes import FakeFolders
+
+import pe_info
+import scanner
+from pe_info import PEInfoCache, PEFormatError, read_pe_info
+
+FILES = 300
+CODE_BYTES = 4 * 1024 * 1024  # Sparse: never read by the parser
+FILE_ALIGNMENT = 0x200
+SECTION_ALIGNMENT = 0x1000
+HEADERS_BYTES = 0x400
+
+# (file name, FileDescription, ProductName, CompanyName, subsystem, dll)
+APPS = [
+    ("Code.exe", "Visual Studio Code", "Visual Studio Code", "Microsoft Corporation", 2, False),
+    ("msedge.exe", "Microsoft Edge", "Microsoft Edge", "Microsoft Corporation", 2, False),
+    ("firefox.exe", "Firefox", "Firefox", "Mozilla Corporation", 2, False),
+    ("crashpad_handler.exe", "Crashpad Handler", "Crashpad", "The Crashpad Authors", 3, False),
+    ("elevation_service.exe", "Elevation Service", "Google Chrome", "Google LLC", 3, False),
+    ("resources.exe", "Resource Library", "Resource Library", "Example Software", 2, True),
+]
+
+
+# --- Fixture executables ---
+
+def _pad(data, alignment):
+    data += b"\x00" * (-len(data) % alignment)
+
+
+def version_block(key, value=None, children=()):
+    """One block of a VS_VERSIONINFO resource: str values are text, bytes binary."""
+    data = bytearray(6) + (key + "\x00").encode("utf-16-le")
+    _pad(data, 4)
+    if isinstance(value, str):
+        data += (value + "\x00").encode("utf-16-le")
+        value_length, kind = len(value) + 1, 1
+    else:
+        data += value or b""
+        value_length, kind = len(value or b""), 0
+    for child in children:
+        _pad(data, 4)
+        data += child
+    struct.pack_into("<HHH", data, 0, len(data), value_length, kind)
+    return bytes(data)
+
+
+def version_resource(tables):
+    """Return a VS_VERSIONINFO resource with {language+codepage: {name: value}} string tables."""
+    fixed = struct.pack("<13I", 0xFEEF04BD, 0x10000, *[0] * 11)
+    string_tables = [version_block(language, children=[version_block(name, value)
+                                                       for name, value in strings.items()])
+                     for language, strings in tables.items()]
+    translation = version_block("Translation", struct.pack("<HH", 0x0409, 1200))
+    return version_block("VS_VERSION_INFO", fixed, [
+        version_block("StringFileInfo", children=string_tables),
+        version_block("VarFileInfo", children=[translation])])
+
+
+def resource_section(address, resources):
+    """Return a resource section at RVA address holding [(type id, data)], one language each."""
+    count = len(resources)
+    name_dirs = 16 + 8 * count
+    language_dirs = name_dirs + 24 * count
+    data_entries = language_dirs + 24 * count
+    section = bytearray(struct.pack("<IIHHHH", 0, 0, 0, 0, 0, count))
+    for i, (type_id, _) in enumerate(resources):
+        section += struct.pack("<II", type_id, 0x80000000 | (name_dirs + 24 * i))
+    for i in range(count):
+        section += struct.pack("<IIHHHHII", 0, 0, 0, 0, 0, 1, 1, 0x80000000 | (language_dirs + 24 * i))
+    for i in range(count):
+        section += struct.pack("<IIHHHHII", 0, 0, 0, 0, 0, 1, 0x0409, data_entries + 16 * i)
+    offset = data_entries + 16 * count
+    for _, data in resources:
+        section += struct.pack("<IIII", address + offset, len(data), 0, 0)
+        offset += len(data) + (-len(data) % 4)
+    for _, data in resources:
+        section += data
+        _pad(section, 4)
+    return bytes(section)
+
+
+def write_pe(path, tables=None, subsystem=2, dll=False, pe32_plus=True, code_bytes=CODE_BYTES):
+    """Write an executable with a sparse code section and, if tables, a version resource."""
+    resources = [(3, bytes(1024))]  # An icon, before the version resource as in real files
+    if tables:
+        resources.append((pe_info.RT_VERSION, version_resource(tables)))
+    rsrc_address = SECTION_ALIGNMENT + code_bytes + (-code_bytes % SECTION_ALIGNMENT)
+    rsrc = bytearray(resource_section(rsrc_address, resources))
+    _pad(rsrc, FILE_ALIGNMENT)
+    rsrc_offset = HEADERS_BYTES + code_bytes
+
+    optional = bytearray(240 if pe32_plus else 224)
+    directories = 112 if pe32_plus else 96
+    struct.pack_into("<H", optional, 0, pe_info.PE32_PLUS if pe32_plus else pe_info.PE32)
+    struct.pack_into("<H", optional, 68, subsystem)
+    struct.pack_into("<I", optional, directories - 4, 16)
+    struct.pack_into("<II", optional, directories + 8 * pe_info.RESOURCE_DIRECTORY, rsrc_address, len(rsrc))
+
+    headers = bytearray(b"MZ" + bytes(0x3A) + struct.pack("<I", 0x80) + bytes(0x40))
+    headers += pe_info.PE_MAGIC
+    headers += struct.pack("<HHIIIHH", 0x8664 if pe32_plus else 0x14C, 2, 0, 0, 0, len(optional),
+                           0x0022 | (pe_info.IMAGE_FILE_DLL if dll else 0))
+    headers += optional
+    headers += struct.pack("<8sIIIIIIHHI", b".text", code_bytes, SECTION_ALIGNMENT, code_bytes,
+                           HEADERS_BYTES, 0, 0, 0, 0, 0x60000020)
+    headers += struct.pack("<8sIIIIIIHHI", b".rsrc", len(rsrc), rsrc_address, len(rsrc),
+                           rsrc_offset, 0, 0, 0, 0, 0x40000040)
+    _pad(headers, HEADERS_BYTES)
+    with open(path, "wb") as f:
+        f.write(headers)
+        f.seek(rsrc_offset)  # The code section stays a hole
+        f.write(rsrc)
+
+
+def _strings(description, product, company):
+    return {"CompanyName": company, "FileDescription": description, "ProductName": product,
+            "FileVersion": "1.0.0.0"}
+
+
+def fixtures(ctx):
+    """Write the fixture executables once per run; returns (directory, [paths])."""
+    def write():
+        directory = tempfile.mkdtemp(prefix="launcher-pe-", dir=ctx.workdir)
+        paths = []
+        for i in range(FILES):
+            name, description, product, company, subsystem, dll = APPS[i % len(APPS)]
+            folder = os.path.join(directory, f"app{i:03d}")
+            os.makedirs(folder)
+            paths.append(os.path.join(folder, name))
+            write_pe(paths[-1], {"040904b0": _strings(description, product, company)},
+                     subsystem, dll, pe32_plus=i % 3 != 0)
+        return directory, paths
+    return ctx.cached("pe_fixtures", write)
+
+
+def _expect(path, **expected):
+    info = read_pe_info(path)
+    for field, value in expected.items():
+        if info[field] != value:
+            raise AssertionError(f"{os.path.basename(path)}: {field} is {info[field]!r}, expected {value!r}")
+
+
+def _check_fixtures(directory):
+    """Check read_pe_info on the edge cases and a program folder scan over them."""
+    check = tempfile.mkdtemp(prefix="checks-", dir=directory)
+    path = lambda name: os.path.join(check, name)
+    # A German table first: the US English one wins; PE32 headers
+    write_pe(path("Writer.exe"), {"040704b0": _strings("Textverarbeitung", "Schreiber", "Beispiel GmbH"),
+                                  "040904b0": _strings("Word Processor", "Writer", "Example Inc")},
+             pe32_plus=False)
+    _expect(path("Writer.exe"), subsystem=2, dll=False, description="Word Processor",
+            product="Writer", company="Example Inc")
+    write_pe(path("Helper.exe"), {"000004b0": _strings("Update Helper", "Updater", "Example Inc")},
+             subsystem=3)
+    _expect(path("Helper.exe"), subsystem=3, description="Update Helper")
+    write_pe(path("NoVersion.exe"))
+    _expect(path("NoVersion.exe"), subsystem=2, description=None, product=None, company=None)
+    write_pe(path("Plugin.exe"), {"040904b0": _strings("", "Plugin Host", "")}, dll=True)
+    _expect(path("Plugin.exe"), dll=True, description=None, product="Plugin Host")
+
+    with open(path("Writer.exe"), "rb") as f:
+        head = f.read(0x150)
+    for name, data in (("Truncated.exe", head), ("Script.exe", b"MZ echo" + bytes(200)),
+                       ("Empty.exe", b""), ("Text.exe", b"#!/bin/sh\n" * 20)):
+        with open(path(name), "wb") as f:
+            f.write(data)
+        try:
+            read_pe_info(path(name))
+            raise AssertionError(f"{name} was read as a PE file")
+        except PEFormatError:
+            pass
+
+    # Program folder scan: version names, console helpers and DLLs skipped
+    for name in os.listdir(check):
+        if os.path.getsize(path(name)) < scanner.MIN_EXE_SIZE:
+            os.remove(path(name))
+    cache = PEInfoCache()
+    providers = scanner.ScanProviders(scanner.FileSystem(), None, None, FakeFolders([], [directory], []),
+                                      exe_info=cache)
+    apps = {}
+    scanner._scan_program_dirs(apps, providers)
+    names = {os.path.basename(app['path']): app['name'] for app in apps.values()}
+    expected = {"Writer.exe": "Word Processor", "NoVersion.exe": "Noversion", "Code.exe": "Visual Studio Code",
+                "msedge.exe": "Microsoft Edge", "firefox.exe": "Firefox"}
+    if {name: names.get(name) for name in expected} != expected:
+        raise AssertionError(f"program folder scan named {names}")
+    skipped = {"Helper.exe", "Plugin.exe", "crashpad_handler.exe", "resources.exe"} & set(names)
+    if skipped:
+        raise AssertionError(f"program folder scan listed {sorted(skipped)}")
+    parsed = cache.misses
+    scanner._scan_program_dirs({}, providers)
+    if cache.misses != parsed:
+        raise AssertionError("a rescan parsed unchanged executables again")
+    os.utime(path("Writer.exe"), (time.time() + 10, time.time() + 10))
+    scanner._scan_program_dirs({}, providers)
+    if cache.misses != parsed + 1:
+        raise AssertionError("a rescan did not parse the changed executable")
+    shutil.rmtree(check)
+
+
+def _throughput(read, paths):
+    """Return (fn reading every path, extra reporting files per second)."""
+    elapsed = [0.0, 0]
+
+    def run():
+        start = time.perf_counter()
+        for path in paths:
+            read(path)
+        elapsed[0] += time.perf_counter() - start
+        elapsed[1] += 1
+
+    def extra():
+        return {"files": len(paths), "files_per_second": len(paths) * elapsed[1] / elapsed[0]}
+    return run, extra
+
+
+@benchmark("pe.read_info")
+def bench_pe_read_info(ctx):
+    directory, paths = fixtures(ctx)
+    _check_fixtures(directory)
+    run, extra = _throughput(read_pe_info, paths)
+    return Case(run, extra=extra)
+
+
+@benchmark("pe.cached")
+def bench_pe_cached(ctx):
+    _, paths = fixtures(ctx)
+    cache = PEInfoCache()
+    for path in paths:
+        cache.info(path)
+    run, extra = _throughput(cache.info, paths)
+
+    def check():
+        if cache.misses != len(paths):
+            raise AssertionError(f"{cache.misses - len(paths)} unchanged files parsed again")
+        return extra()
+    return Case(run, extra=check)
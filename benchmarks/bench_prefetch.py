@@ -0,0 +1,147 @@
+"""First-read latency of a launch with and without the prefetcher (Linux).
+
+An app folder with a large executable and a handful of DLLs is written to
+disk once. Before every timed call its pages are dropped from the page
+cache with posix_fadvise(POSIX_FADV_DONTNEED), which works without root,
+unlike writing to /proc/sys/vm/drop_caches. The timed call is the "launch":
+reading the executable and its DLLs from start to end.
+
+prefetch.cold_read launches straight after the eviction.
+prefetch.prefetched_read first lets the Prefetcher read the app while the
+user is "typing" (a request per keystroke, the last one naming the app) and
+reports the prefetcher's hit rate alongside. Setup checks that a request's
+repeats keep the place of their first occurrence, and that an app larger
+than the default byte budget counts as a hit (and as truncated).
+"""
+import os
+import tempfile
+
+from harness import benchmark, Case, SkipBenchmark
+
+from prefetch import Prefetcher, companion_files, BYTE_BUDGET
+
+EXE_BYTES = 48 * 1024 * 1024
+DLL_BYTES = 4 * 1024 * 1024
+DLL_COUNT = 6
+TYPED_QUERIES = 5  # Requests replaced before the final one
+
+
+def _require_fadvise():
+    if not hasattr(os, "posix_fadvise"):
+        raise SkipBenchmark("needs os.posix_fadvise to evict files from the page cache")
+
+
+def _write(path, size):
+    with open(path, "wb") as f:
+        block = os.urandom(1024 * 1024)
+        for _ in range(size // len(block)):
+            f.write(block)
+        f.flush()
+        os.fsync(f.fileno())  # Dirty pages cannot be evicted
+
+
+def app_folder(ctx):
+    """Write the app folder once per run and return its executable's path."""
+    def write():
+        directory = tempfile.mkdtemp(prefix="launcher-prefetch-", dir=ctx.workdir)
+        exe_path = os.path.join(directory, "BigApp.exe")
+        _write(exe_path, EXE_BYTES)
+        for i in range(DLL_COUNT):
+            _write(os.path.join(directory, f"module{i}.dll"), DLL_BYTES)
+        return exe_path
+    return ctx.cached("prefetch_app", write)
+
+
+def app_files(exe_path):
+    return [exe_path] + companion_files(exe_path)
+
+
+def evict(paths):
+    for path in paths:
+        fd = os.open(path, os.O_RDONLY)
+        try:
+            os.posix_fadvise(fd, 0, 0, os.POSIX_FADV_DONTNEED)
+        finally:
+            os.close(fd)
+
+
+def launch_read(paths):
+    """Read every file the way a loader would: all of it, once."""
+    total = 0
+    buffer = bytearray(1024 * 1024)
+    for path in paths:
+        with open(path, "rb", buffering=0) as f:
+            while True:
+                n = f.readinto(buffer)
+                if not n:
+                    break
+                total += n
+    return total
+
+
+@benchmark("prefetch.cold_read")
+def bench_cold_read(ctx):
+    _require_fadvise()
+    paths = app_files(app_folder(ctx))
+    return Case(lambda: launch_read(paths), before=lambda: evict(paths),
+                extra={"bytes": EXE_BYTES + DLL_COUNT * DLL_BYTES})
+
+
+def _check_prefetcher(exe_path):
+    order = []
+    prefetcher = Prefetcher(companions=lambda path: order.append(path) or [])
+    try:
+        # The top result first, even when the launch history names it again
+        prefetcher.request(["C:/A.exe", "C:/B.exe", "c:/a.exe"])
+        if not prefetcher.idle.wait(30) or order != ["C:/A.exe", "C:/B.exe"]:
+            raise AssertionError(f"prefetched {order} for a request with a repeat")
+    finally:
+        prefetcher.stop()
+
+    if EXE_BYTES + DLL_COUNT * DLL_BYTES <= BYTE_BUDGET:
+        raise AssertionError("the app folder must be larger than the default byte budget")
+    prefetcher = Prefetcher(max_rate=float("inf"))
+    try:
+        prefetcher.request([exe_path])
+        if not prefetcher.idle.wait(30):
+            raise AssertionError("prefetch did not finish within 30s")
+        prefetcher.record_launch(exe_path)
+        stats = prefetcher.stats()
+        if stats['hits'] != 1 or stats['truncated'] != 1:
+            raise AssertionError(f"an app over the byte budget was not counted as prefetched: {stats}")
+    finally:
+        prefetcher.stop()
+
+
+@benchmark("prefetch.prefetched_read")
+def bench_prefetched_read(ctx):
+    _require_fadvise()
+    exe_path = app_folder(ctx)
+    paths = app_files(exe_path)
+    directory = os.path.dirname(exe_path)
+    _check_prefetcher(exe_path)
+    # No throttling: the benchmark waits for the prefetch instead of the user typing
+    prefetcher = Prefetcher(byte_budget=2 * EXE_BYTES, max_rate=float("inf"))
+    # Top results of the earlier keystrokes, in folders of their own
+    misses = [os.path.join(directory, f"Other{i}", "Other.exe") for i in range(TYPED_QUERIES)]
+
+    def type_and_prefetch():
+        evict(paths)
+        for path in misses:
+            prefetcher.request([path])
+        prefetcher.request([exe_path])
+        if not prefetcher.idle.wait(30):
+            raise AssertionError("prefetch did not finish within 30s")
+
+    def launch():
+        launch_read(paths)
+        prefetcher.record_launch(exe_path)
+
+    def stats():
+        stats = prefetcher.stats()
+        if stats['hits'] != stats['launches']:
+            raise AssertionError(f"prefetched launch missed: {stats}")
+        return {"hit_rate": stats['hit_rate'], "prefetched_bytes": stats['bytes'],
+                "cancelled": stats['cancelled']}
+
+    return Case(launch, before=type_and_prefetch, extra=stats)
@@ -0,0 +1,171 @@
+"""Scan profiling: time and rejections per source and root (src/scan_profile.py).
+
+The synthetic machine gains one root per source that nothing else uses (a
+Start Menu, a program folder, a PATH folder and the HKCU Wow6432Node
+Uninstall key), each with one candidate that is added and one for each
+rejection rule of its source. StubExeInfo stands in for PE headers.
+
+scan.profiled: profile_scan() over that machine; reports the overhead over
+an unprofiled scan. Setup checks that every planted candidate is counted
+under its root and rule, that each root's seen = added + rejected, that the
+profiled scan finds what an unprofiled one finds, the cProfile stats file,
+and runs `launcher.py --profile-scan --format json` on a recording without
+importing Tk, pystray or keyboard.
+"""
+import contextlib
+import io
+import json
+import ntpath
+import os
+import pstats
+import subprocess
+import sys
+import tempfile
+import time
+
+from harness import benchmark, Case
+from fakes import FakeFolders
+from bench_export import GUI_MODULES, SRC_DIR, _RUN_LAUNCHER
+
+import scanner
+import scan_profile
+import scan_record
+import synthetic
+
+PROFILING_MENU = "C:\\Profiling\\Start Menu"
+PROFILING_PROGRAMS = "C:\\Profiling\\Programs"
+PROFILING_BIN = "C:\\Profiling\\Bin"
+PROFILING_KEY = scanner.REGISTRY_PATHS[4]  # HKCU Wow6432Node Uninstall, empty on the synthetic machine
+BIG = 4 * 1024 * 1024
+TIMINGS = 3  # Scans timed each way for the overhead
+
+
+class StubExeInfo:
+    """PE info by file name: console*.exe are console programs, driver*.exe native, the rest GUI."""
+    def info(self, exe_path):
+        name = ntpath.basename(exe_path).lower()
+        subsystem = 3 if name.startswith("console") else 1 if name.startswith("driver") else 2
+        return {'subsystem': subsystem, 'dll': False, 'description': None, 'product': None,
+                'company': None}
+
+
+def profiling_machine(ctx):
+    """Return (the synthetic machine with the planted roots, {(source, root): expected counts})."""
+    providers = synthetic.make_machine(ctx.size, ctx.seed)
+    fs, registry, shortcuts, folders = providers.fs, providers.registry, providers.shortcuts, providers.folders
+    tool = ntpath.join(PROFILING_PROGRAMS, "Vendor", "Profiler Tool.exe")
+    for name, size in (("Profiler Tool.exe", BIG), ("small.exe", 10 * 1024), ("setup.exe", BIG),
+                       ("console.exe", BIG)):
+        fs.add_file(ntpath.join(PROFILING_PROGRAMS, "Vendor", name), size)
+    for name, size in (("run.cmd", 200), ("tiny.exe", 10 * 1024), ("driver.exe", BIG)):
+        fs.add_file(ntpath.join(PROFILING_BIN, name), size)
+    fs.add_file("C:\\Profiling\\notes.txt", 100)
+
+    hive, key_path = PROFILING_KEY
+    for subkey, values in (("NoName", {"Publisher": "Example"}),
+                           ("Hidden", {"DisplayName": "Hidden Component", "SystemComponent": 1}),
+                           ("KB1", {"DisplayName": "Hotfix for Profiler Tool"}),
+                           ("Orphan", {"DisplayName": "Orphan App",
+                                       "DisplayIcon": "C:\\Profiling\\Orphan\\orphan.exe,0"}),
+                           ("Tool", {"DisplayName": "Profiler Tool", "DisplayIcon": tool + ",0"})):
+        registry.add(hive, key_path, subkey, values)
+    for name, target in (("No Target", ""), ("Notes", "C:\\Profiling\\notes.txt"),
+                         ("Installer", "C:\\Windows\\System32\\msiexec.exe"),
+                         ("Gone", "C:\\Profiling\\Gone\\gone.exe"), ("Profiler Tool", tool)):
+        shortcut = ntpath.join(PROFILING_MENU, name + ".lnk")
+        fs.add_file(shortcut, 2048)
+        shortcuts.add(shortcut, target)
+
+    folders = FakeFolders(folders.start_menu_dirs() + [PROFILING_MENU],
+                          folders.program_dirs() + [PROFILING_PROGRAMS], folders.desktop_dirs(),
+                          path_dirs=folders.path_dirs() + [PROFILING_BIN],
+                          path_extensions=folders.path_extensions())
+    expected = {
+        ("registry", f"{hive}\\{key_path}"): {
+            'seen': 5, 'added': 1, 'rejected': {"no_display_name": 1, "system_component": 1,
+                                                "filter_terms": 1, "no_executable": 1}},
+        ("start_menu", PROFILING_MENU): {
+            'seen': 5, 'added': 1, 'rejected': {"no_target": 1, "not_executable": 1, "system_file": 1,
+                                                "missing_path": 1}},
+        ("program_dirs", PROFILING_PROGRAMS): {
+            'seen': 4, 'added': 1, 'rejected': {"too_small": 1, "excluded_path": 1, "not_gui": 1}},
+        ("path", PROFILING_BIN): {
+            'seen': 3, 'added': 1, 'rejected': {"too_small": 1, "not_program": 1}},
+    }
+    return scanner.ScanProviders(fs, registry, shortcuts, folders, exe_info=StubExeInfo()), expected
+
+
+def _quiet(fn, *args, **kwargs):
+    """Call fn with the scanners' messages (stdout, and stderr while profiling) discarded."""
+    with contextlib.redirect_stdout(io.StringIO()), contextlib.redirect_stderr(io.StringIO()):
+        return fn(*args, **kwargs)
+
+
+def _check_report(ctx, providers, expected):
+    catalog = _quiet(scanner.scan_installed_apps, providers)
+    cprofile = os.path.join(tempfile.mkdtemp(prefix="launcher-profile-", dir=ctx.workdir), "scan.prof")
+    report = _quiet(scan_profile.profile_scan, providers, cprofile=cprofile)
+    if report['apps'] != len(catalog):
+        raise AssertionError(f"the profiled scan found {report['apps']} apps, an unprofiled one {len(catalog)}")
+    roots = {(root['source'], root['root']): root for root in report['roots']}
+    if scan_profile.UNATTRIBUTED in roots:
+        raise AssertionError(f"candidates counted outside any root: {roots[scan_profile.UNATTRIBUTED]}")
+    for key, counts in expected.items():
+        found = {field: roots.get(key, {}).get(field) for field in counts}
+        if found != counts:
+            raise AssertionError(f"{key}: counted {found}, expected {counts}")
+    for root in report['roots']:
+        if root['seen'] != root['added'] + sum(root['rejected'].values()):
+            raise AssertionError(f"seen != added + rejected for {root['source']} {root['root']}")
+    unknown = set(report['rules']) - set(scanner.REJECTION_RULES)
+    if unknown:
+        raise AssertionError(f"rules missing from REJECTION_RULES: {sorted(unknown)}")
+    json.dumps(report)
+    scan_profile.format_report(report)
+
+    functions = {function for (filename, _, function) in pstats.Stats(cprofile).stats
+                 if os.path.basename(filename) == "scanner.py"}
+    if "_add_shortcut" not in functions or not report['cprofile']['functions']:
+        raise AssertionError("the cProfile stats do not cover the scanners")
+
+    # launcher.py --profile-scan in a fresh interpreter, on a recording of the machine
+    recording, recorder = scan_record.record_providers(providers)
+    _quiet(scanner.scan_installed_apps, recording)
+    archive = os.path.join(os.path.dirname(cprofile), "machine.scan.gz")
+    recorder.save(archive)
+    script = _RUN_LAUNCHER.format(src=SRC_DIR, modules=GUI_MODULES)
+    result = subprocess.run([sys.executable, "-c", script, os.path.join(SRC_DIR, "launcher.py"),
+                             "--profile-scan", "--replay", archive, "--format", "json"],
+                            capture_output=True, text=True, timeout=60)
+    if result.returncode != 0:
+        raise AssertionError(f"launcher.py --profile-scan exited with {result.returncode}: "
+                             f"{result.stderr[-500:]}")
+    replayed = json.loads(result.stdout)
+    if replayed['apps'] != len(catalog):
+        raise AssertionError(f"launcher.py --profile-scan reported {replayed['apps']} apps, not {len(catalog)}")
+    imported = result.stderr[result.stderr.rindex("IMPORTED"):].strip()
+    if imported != "IMPORTED []":
+        raise AssertionError(f"launcher.py --profile-scan imported GUI modules: {imported}")
+    return report
+
+
+def _fastest(fn, *args):
+    timings = []
+    for _ in range(TIMINGS):
+        start = time.perf_counter()
+        _quiet(fn, *args)
+        timings.append(time.perf_counter() - start)
+    return min(timings)
+
+
+@benchmark("scan.profiled")
+def bench_scan_profiled(ctx):
+    providers, expected = profiling_machine(ctx)
+    report = _check_report(ctx, providers, expected)
+    overhead = _fastest(scan_profile.profile_scan, providers) / _fastest(scanner.scan_installed_apps, providers)
+
+    def extra():
+        return {"apps_found": report['apps'], "candidates_seen": report['seen'],
+                "candidates_rejected": report['seen'] - report['added'], "roots": len(report['roots']),
+                "overhead_vs_unprofiled": overhead}
+    return Case(lambda: _quiet(scan_profile.profile_scan, providers), extra=extra)
@@ -0,0 +1,73 @@
+"""Result list rendering through a fake Listbox."""
+from harness import benchmark, Case
+from fakes import FakeListbox
+from bench_search import catalog_and_keystrokes, cycle
+
+from search import search_apps
+from results_view import fill_listbox, display_name, ResultsView, NO_MATCHES_TEXT
+
+SELECT_EVERY = 7  # In the check, the user moves the selection every Nth keystroke
+
+
+@benchmark("render.keystroke")
+def bench_render_keystroke(ctx):
+    """Render precomputed results for each keystroke; counts Listbox calls."""
+    catalog, keystrokes = catalog_and_keystrokes(ctx)
+    pages = [search_apps(catalog, text.lower().strip()) for text in keystrokes]
+    listbox = FakeListbox()
+    next_page = cycle(pages)
+
+    def render():
+        fill_listbox(listbox, next_page(), NO_MATCHES_TEXT)
+
+    for page in pages:
+        fill_listbox(listbox, page, NO_MATCHES_TEXT)
+    calls = listbox.total_calls
+    listbox.calls.clear()
+    return Case(render, calls=len(pages),
+                extra={"listbox_calls_per_keystroke": calls / len(pages)})
+
+
+def check_view(view, listbox, page, selected_app):
+    """Raise AssertionError unless the listbox shows page with the expected selection."""
+    expected = [display_name(app) for app in page] or [NO_MATCHES_TEXT]
+    if listbox.items != expected:
+        raise AssertionError("ResultsView rows differ from fill_listbox")
+    if not page:
+        if listbox.selection:
+            raise AssertionError("placeholder row selected")
+        return
+    index = 0
+    if selected_app is not None and selected_app in page:
+        index = page.index(selected_app)
+    if listbox.selection != {index} or view.selected != index:
+        raise AssertionError(f"selection {sorted(listbox.selection)}, expected row {index}")
+
+
+@benchmark("render.keystroke_diff")
+def bench_render_keystroke_diff(ctx):
+    """ResultsView.show per keystroke; setup checks rows and selection after each one."""
+    catalog, keystrokes = catalog_and_keystrokes(ctx)
+    pages = [search_apps(catalog, text.lower().strip()) for text in keystrokes]
+
+    listbox = FakeListbox()
+    view = ResultsView(listbox)
+    selected_app = None
+    for n, page in enumerate(pages):
+        view.show(page, NO_MATCHES_TEXT)
+        check_view(view, listbox, page, selected_app)
+        if selected_app not in page:
+            selected_app = None  # Gone, so the view went back to the first row
+        if n % SELECT_EVERY == 0 and len(page) > 2:
+            view.select(2)
+            selected_app = page[2]
+
+    listbox = FakeListbox()
+    view = ResultsView(listbox)
+    next_page = cycle(pages)
+    for page in pages:
+        view.show(page, NO_MATCHES_TEXT)
+    calls = listbox.total_calls
+    listbox.calls.clear()
+    return Case(lambda: view.show(next_page(), NO_MATCHES_TEXT), calls=len(pages),
+                extra={"listbox_calls_per_keystroke": calls / len(pages)})
@@ -0,0 +1,60 @@
+"""Scans replayed from a recording of the scanners' inputs (src/scan_record.py).
+
+With --scan-archive the recording of a real machine is replayed; otherwise
+the synthetic machine is recorded first, and setup checks that replaying it
+finds exactly what scanning the machine directly finds.
+"""
+import os
+import tempfile
+
+from harness import benchmark, Case
+from bench_scan import _machine
+
+import scanner
+import scan_record
+
+
+def _archive(ctx):
+    def load():
+        if ctx.scan_archive:
+            return scan_record.load_archive(ctx.scan_archive)
+        machine = _machine(ctx)
+        providers, recorder = scan_record.record_providers(machine)
+        recorded = scanner.scan_installed_apps(providers)
+        path = os.path.join(tempfile.mkdtemp(prefix="launcher-replay-", dir=ctx.workdir),
+                            "synthetic.scan.gz")
+        recorder.save(path)
+        archive = scan_record.load_archive(path)
+        replayed = scanner.scan_installed_apps(scan_record.replay_providers(archive)[0])
+        if [(a['name'], a['path']) for a in replayed] != [(a['name'], a['path']) for a in recorded]:
+            raise AssertionError("replaying the recording found different apps")
+        return archive
+    return ctx.cached("scan_archive", load)
+
+
+@benchmark("scan.replay")
+def bench_scan_replay(ctx):
+    archive = _archive(ctx)
+    providers, replay = scan_record.replay_providers(archive)
+    found = len(scanner.scan_installed_apps(providers))
+    return Case(lambda: scanner.scan_installed_apps(providers),
+                extra=lambda: {"apps_found": found, "recorded_calls": len(archive['calls']),
+                               "unrecorded_calls": replay.misses})
+
+
+def _replay_source_case(ctx, source_id):
+    providers, replay = scan_record.replay_providers(_archive(ctx))
+    scan_source = next(fn for sid, _, fn in scanner.SCAN_SOURCES if sid == source_id)
+    apps = {}
+    scan_source(apps, providers)
+    return Case(lambda: scan_source({}, providers), extra={"apps_found": len(apps)})
+
+
+@benchmark("scan.replay.registry")
+def bench_scan_replay_registry(ctx):
+    return _replay_source_case(ctx, "registry")
+
+
+@benchmark("scan.replay.start_menu")
+def bench_scan_replay_start_menu(ctx):
+    return _replay_source_case(ctx, "start_menu")
@@ -0,0 +1,172 @@
+"""Scanning and catalog (index) build benchmarks."""
+import os
+import shutil
+import tempfile
+
+from harness import benchmark, Case
+from fakes import FakeFolders
+import synthetic
+
+import scanner
+import dedup
+
+
+def _machine(ctx):
+    return ctx.cached("machine", lambda: synthetic.make_machine(ctx.size, ctx.seed))
+
+
+@benchmark("scan.full")
+def bench_scan_full(ctx):
+    providers = _machine(ctx)
+    found = len(scanner.scan_installed_apps(providers))
+    return Case(lambda: scanner.scan_installed_apps(providers), extra={"apps_found": found})
+
+
+def _source_case(ctx, source_id):
+    providers = _machine(ctx)
+    scan_source = next(fn for sid, _, fn in scanner.SCAN_SOURCES if sid == source_id)
+    apps = {}
+    scan_source(apps, providers)
+    return Case(lambda: scan_source({}, providers), extra={"apps_found": len(apps)})
+
+
+# Budgets small enough that the fake machine does not fit into them
+TIGHT_BUDGETS = {"start_menu": 0.002, "registry": 0.002, "desktop": 0.001, "path": 0.0005,
+                 "program_dirs": 0.002}
+
+
+@benchmark("scan.first_pass")
+def bench_scan_first_pass(ctx):
+    """ScanPlan.run() with tight budgets: what is searchable before the background pass."""
+    providers = _machine(ctx)
+    plans = []
+    def first_pass():
+        plan = scanner.ScanPlan(providers, TIGHT_BUDGETS)
+        plans.append((plan, len(plan.run())))
+    def extra():
+        plan, found = plans[-1]
+        return {"first_pass_apps": found, "deferred_areas": len(plan.incomplete),
+                "apps_found": len(plan.resume())}
+    return Case(first_pass, extra=extra)
+
+
+@benchmark("scan.registry")
+def bench_scan_registry(ctx):
+    return _source_case(ctx, "registry")
+
+
+@benchmark("scan.start_menu")
+def bench_scan_start_menu(ctx):
+    return _source_case(ctx, "start_menu")
+
+
+@benchmark("scan.program_dirs")
+def bench_scan_program_dirs(ctx):
+    return _source_case(ctx, "program_dirs")
+
+
+@benchmark("scan.desktop")
+def bench_scan_desktop(ctx):
+    return _source_case(ctx, "desktop")
+
+
+@benchmark("scan.program_dirs.disk")
+def bench_scan_program_dirs_disk(ctx):
+    """_scan_program_dirs against a real directory tree on disk."""
+    target = tempfile.mkdtemp(prefix="launcher-bench-", dir=ctx.workdir)
+    roots = synthetic.materialize_program_dirs(_machine(ctx), target)
+    fake = _machine(ctx)
+    providers = scanner.ScanProviders(scanner.FileSystem(), fake.registry, fake.shortcuts,
+                                      FakeFolders([], roots, []))
+    apps = {}
+    scanner._scan_program_dirs(apps, providers)
+    return Case(lambda: scanner._scan_program_dirs({}, providers),
+                extra={"apps_found": len(apps)},
+                teardown=lambda: shutil.rmtree(target, ignore_errors=True))
+
+
+@benchmark("scan.path")
+def bench_scan_path(ctx):
+    return _source_case(ctx, "path")
+
+
+def _path_dirs_on_disk(ctx):
+    """Write the fake machine's PATH folders to disk once per run."""
+    def write():
+        target = tempfile.mkdtemp(prefix="launcher-path-", dir=ctx.workdir)
+        return target, synthetic.materialize_path_dirs(_machine(ctx), target)
+    return ctx.cached("path_dirs_disk", write)
+
+
+def _disk_path_providers(ctx, listings):
+    fake = _machine(ctx)
+    _, dirs = _path_dirs_on_disk(ctx)
+    return scanner.ScanProviders(scanner.FileSystem(), fake.registry, fake.shortcuts,
+                                 FakeFolders([], [], [], path_dirs=dirs), listings)
+
+
+@benchmark("scan.path.disk")
+def bench_scan_path_disk(ctx):
+    """_scan_path over real directories, listing every one of them."""
+    providers = _disk_path_providers(ctx, None)
+    apps = {}
+    scanner._scan_path(apps, providers)
+    return Case(lambda: scanner._scan_path({}, providers), extra={"apps_found": len(apps)})
+
+
+@benchmark("scan.path.disk_cached")
+def bench_scan_path_disk_cached(ctx):
+    """_scan_path over real directories with a warm ListingCache.
+
+    Setup checks that cached scans find what listing finds, and that adding
+    a file to a folder is picked up through its changed mtime.
+    """
+    _, dirs = _path_dirs_on_disk(ctx)
+    listings = scanner.ListingCache()
+    providers = _disk_path_providers(ctx, listings)
+    listed, cached = {}, {}
+    scanner._scan_path(listed, scanner.ScanProviders(providers.fs, None, None, providers.folders))
+    scanner._scan_path({}, providers)
+    scanner._scan_path(cached, providers)
+    if sorted(cached) != sorted(listed):
+        raise AssertionError("cached PATH listings found different apps")
+    new_tool = os.path.join(dirs[0], "newtool.cmd")
+    with open(new_tool, "w") as f:
+        f.write("@echo off\n")
+    try:
+        refreshed = {}
+        scanner._scan_path(refreshed, providers)
+        if new_tool.lower() not in refreshed:
+            raise AssertionError("a file added to a PATH folder was not found after its mtime changed")
+    finally:
+        os.remove(new_tool)
+    scanner._scan_path({}, providers)
+    listings.hits = listings.misses = 0
+    return Case(lambda: scanner._scan_path({}, providers),
+                extra=lambda: {"apps_found": len(cached), "listing_hits": listings.hits,
+                               "listing_misses": listings.misses})
+
+
+@benchmark("scan.merge")
+def bench_scan_merge(ctx):
+    """dedup.merge_apps over the records collected by all sources."""
+    providers = _machine(ctx)
+    apps = {}
+    for _, _, scan_source in scanner.SCAN_SOURCES:
+        scan_source(apps, providers)
+    records = list(apps.values())
+
+    def fresh_records():
+        # merge_apps updates records in place, so every call gets copies
+        return [dict(r, sources=list(r['sources'])) for r in records]
+
+    merged = dedup.merge_apps(fresh_records(), providers.fs)
+    return Case(lambda: dedup.merge_apps(fresh_records(), providers.fs),
+                extra={"records": len(records), "merged": len(merged)})
+
+
+@benchmark("index.build")
+def bench_index_build(ctx):
+    catalog = ctx.cached("catalog", lambda: synthetic.make_catalog(ctx.size, ctx.seed))
+    apps = list(reversed(catalog))
+    return Case(lambda: scanner.build_catalog(apps), extra={"apps": len(apps)})
@@ -0,0 +1,167 @@
+"""Per-keystroke search benchmarks driven by replayed typing traces and query logs."""
+import shutil
+import tempfile
+import time
+
+from harness import benchmark, Case
+import synthetic
+
+import catalog_file
+from catalog import CatalogStore
+from search import search_apps, QueryCache, PrefixIndex
+
+QUERY_LOG_SESSIONS = 500
+# Multi-field search may take at most this much longer per keystroke than name-only search
+FIELDS_BUDGET_RATIO = 1.5
+FIELDS_CHECKED_QUERIES = 300
+
+
+def catalog_and_keystrokes(ctx):
+    """Return the shared catalog and the flattened list of typed queries."""
+    catalog = ctx.cached("catalog", lambda: synthetic.make_catalog(ctx.size, ctx.seed))
+    keystrokes = ctx.cached("keystrokes", lambda: [
+        text for trace in synthetic.make_typing_traces(catalog, ctx.traces, ctx.seed)
+        for text in trace])
+    return catalog, keystrokes
+
+
+def cycle(items):
+    """Return a function that yields the next item on every call, wrapping around."""
+    state = {"i": 0}
+    def next_item():
+        item = items[state["i"] % len(items)]
+        state["i"] += 1
+        return item
+    return next_item
+
+
+@benchmark("search.keystroke")
+def bench_search_keystroke(ctx):
+    catalog, keystrokes = catalog_and_keystrokes(ctx)
+    next_query = cycle(keystrokes)
+    return Case(lambda: search_apps(catalog, next_query().lower().strip()),
+                calls=len(keystrokes), extra={"apps": len(catalog)})
+
+
+@benchmark("search.empty_query")
+def bench_search_empty(ctx):
+    catalog, _ = catalog_and_keystrokes(ctx)
+    return Case(lambda: search_apps(catalog, ""), calls=max(100, ctx.repeat))
+
+
+def query_log(ctx):
+    """Return the catalog and a replayed query log, normalized like the launcher does."""
+    catalog, _ = catalog_and_keystrokes(ctx)
+    log = ctx.cached("query_log", lambda: [
+        text.lower().strip() for text in synthetic.make_query_log(catalog, QUERY_LOG_SESSIONS, ctx.seed)])
+    return catalog, log
+
+
+@benchmark("search.query_log")
+def bench_search_query_log(ctx):
+    catalog, log = query_log(ctx)
+    generation = CatalogStore(catalog).current()
+    next_query = cycle(log)
+    return Case(lambda: generation.search(next_query()), calls=len(log))
+
+
+@benchmark("search.query_log_cached")
+def bench_search_query_log_cached(ctx):
+    """QueryCache.search over the same log; setup checks it against the index."""
+    catalog, log = query_log(ctx)
+    store = CatalogStore(catalog)
+    check = QueryCache()
+    for query in log:
+        if check.search(store.current(), query) != store.current().search(query):
+            raise AssertionError(f"QueryCache.search('{query}') differs from the index")
+    # A new generation must not be answered from the old one's entries
+    generation = store.publish(catalog[:len(catalog) // 2])
+    for query in log[:200]:
+        if check.search(generation, query) != generation.search(query):
+            raise AssertionError(f"QueryCache.search('{query}') served a stale generation")
+
+    generation = store.publish(catalog)
+    cache = QueryCache()
+    next_query = cycle(log)
+    return Case(lambda: cache.search(generation, next_query()), calls=len(log), warmup=0,
+                extra=cache.stats)
+
+
+def field_catalog_and_queries(ctx):
+    """Return the catalog with extra search fields and the keystrokes plus publisher queries."""
+    catalog, keystrokes = catalog_and_keystrokes(ctx)
+    fields = ctx.cached("field_catalog", lambda: synthetic.add_search_fields(catalog, ctx.seed))
+    publishers = sorted({vendor.lower().split()[0] for vendor in synthetic.VENDORS})
+    queries = [text.lower().strip() for text in keystrokes]
+    queries += [publisher[:end] for publisher in publishers for end in range(1, len(publisher) + 1)]
+    return fields, queries
+
+
+def _cost_ratio(index, baseline, queries, rounds=5):
+    """Return index's over baseline's best time to answer every query once.
+
+    The two alternate round by round, so a slow stretch of the machine
+    weighs on both.
+    """
+    best = [float("inf"), float("inf")]
+    for _ in range(rounds):
+        for i, searched in enumerate((index, baseline)):
+            start = time.perf_counter()
+            for query in queries:
+                searched.search(query)
+            best[i] = min(best[i], time.perf_counter() - start)
+    return best[0] / best[1]
+
+
+@benchmark("search.fields_keystroke")
+def bench_search_fields_keystroke(ctx):
+    """PrefixIndex.search over a catalog with publisher, product, exe and alias fields.
+
+    Setup checks the index and the mapped catalog file against search_apps,
+    that a publisher query finds all of its apps after the name matches, and
+    that the keystrokes cost at most FIELDS_BUDGET_RATIO times name-only search.
+    """
+    fields, queries = field_catalog_and_queries(ctx)
+    index = PrefixIndex(fields)
+    directory = tempfile.mkdtemp(prefix="launcher-fields-", dir=ctx.workdir)
+    try:
+        mapped = catalog_file.MappedCatalog(catalog_file.save_catalog(fields, directory))
+        # search_apps scores every record, so check a sample of the keystrokes
+        for query in queries[::max(1, len(queries) // FIELDS_CHECKED_QUERIES)]:
+            expected = search_apps(index.apps, query)
+            if index.search(query) != expected:
+                raise AssertionError(f"PrefixIndex.search({query!r}) differs from search_apps")
+            if [app['path'] for app in mapped.search(query)] != [app['path'] for app in expected]:
+                raise AssertionError(f"MappedCatalog.search({query!r}) differs from search_apps")
+        if mapped[:] != [dict((k, v) for k, v in app.items() if k != 'sources') for app in index.apps]:
+            raise AssertionError("MappedCatalog records lost their fields")
+        del mapped
+    finally:
+        shutil.rmtree(directory, ignore_errors=True)
+
+    publisher = fields[0]['publisher'].split()[0].lower()
+    results = index.search(publisher)
+    published = [app for app in index.apps if app['publisher'].lower().startswith(publisher)]
+    named = [app for app in results if publisher in app['name'].lower()]
+    if sorted(id(app) for app in results[len(named):]) != sorted(
+            id(app) for app in published if publisher not in app['name'].lower()):
+        raise AssertionError(f"{publisher!r} did not find every app it publishes after the name matches")
+
+    name_only = PrefixIndex(fields, weights={'name': 1})
+    ratio = _cost_ratio(index, name_only, queries)
+    if ratio > FIELDS_BUDGET_RATIO:
+        raise AssertionError(f"multi-field search costs {ratio:.2f}x name-only search "
+                             f"(budget {FIELDS_BUDGET_RATIO}x)")
+    next_query = cycle(queries)
+    return Case(lambda: index.search(next_query()), calls=len(queries),
+                extra={"apps": len(fields), "field_keys": len(index.field_keys),
+                       "cost_vs_name_only": ratio})
+
+
+@benchmark("search.fields_keystroke_name_only")
+def bench_search_fields_keystroke_name_only(ctx):
+    """The same keystrokes over the same catalog, indexing names only."""
+    fields, queries = field_catalog_and_queries(ctx)
+    index = PrefixIndex(fields, weights={'name': 1})
+    next_query = cycle(queries)
+    return Case(lambda: index.search(next_query()), calls=len(queries), extra={"apps": len(fields)})
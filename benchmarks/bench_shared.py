@@ -0,0 +1,98 @@
+"""Concurrent session startups on a multi-session host (src/shared_catalog.py).
+
+SESSIONS threads start together on the synthetic machine, like users logging
+on to a terminal server after a reboot.
+
+shared.sessions_independent: every session scans everything itself.
+shared.sessions_shared: every session finds a fresh shared directory empty
+and, like the launcher, rescans the machine scope in the background while it
+scans its own user scope; exactly one of them scans the machine scope while
+the others wait for its file, and each layers its user scope over the file.
+tests/test_shared_catalog.py checks the layered catalog against a full scan.
+"""
+import shutil
+import tempfile
+import threading
+
+from harness import benchmark, Case
+from bench_scan import _machine
+
+import scanner
+from shared_catalog import SharedCatalog, OverlayCatalog, user_only
+
+SESSIONS = 8
+
+
+def run_sessions(session):
+    """Run session(i) on SESSIONS threads released together; return their results."""
+    barrier = threading.Barrier(SESSIONS)
+    results = [None] * SESSIONS
+    errors = []
+
+    def run(i):
+        barrier.wait()
+        try:
+            results[i] = session(i)
+        except Exception as e:
+            errors.append(e)
+
+    threads = [threading.Thread(target=run, args=(i,)) for i in range(SESSIONS)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    if errors:
+        raise errors[0]
+    return results
+
+
+def shared_session(providers, directory, machine_scans):
+    def scan_machine():
+        machine_scans.append(1)
+        return scanner.scan_installed_apps(providers, scope=scanner.MACHINE)
+
+    shared = SharedCatalog(directory)
+    rescanned = []
+    base, how = shared.current()
+    if how != "shared":
+        rescan = threading.Thread(target=lambda: rescanned.append(shared.rescan(scan_machine, wait=60)))
+        rescan.start()
+    apps = scanner.scan_installed_apps(providers, scope=scanner.USER)
+    if how != "shared":
+        rescan.join()
+        base, how = rescanned[0]
+    return OverlayCatalog(base, user_only(base, apps, providers.fs)), how
+
+
+@benchmark("shared.sessions_independent")
+def bench_sessions_independent(ctx):
+    providers = _machine(ctx)
+    return Case(lambda: run_sessions(lambda i: scanner.scan_installed_apps(providers)),
+                extra={"sessions": SESSIONS, "machine_scans": SESSIONS})
+
+
+@benchmark("shared.sessions_shared")
+def bench_sessions_shared(ctx):
+    providers = _machine(ctx)
+    state = {"directory": None, "machine_scans": []}
+
+    def fresh_directory():
+        if state["directory"]:
+            shutil.rmtree(state["directory"], ignore_errors=True)
+        state["directory"] = tempfile.mkdtemp(prefix="launcher-shared-", dir=ctx.workdir)
+        state["machine_scans"] = []
+
+    def sessions():
+        return run_sessions(lambda i: shared_session(providers, state["directory"],
+                                                     state["machine_scans"]))
+
+    fresh_directory()
+    overlay, _ = sessions()[0]
+
+    def cleanup():
+        if state["directory"]:
+            shutil.rmtree(state["directory"], ignore_errors=True)
+
+    return Case(sessions, before=fresh_directory, teardown=cleanup,
+                extra=lambda: {"sessions": SESSIONS, "machine_scans": len(state["machine_scans"]),
+                               "apps": len(overlay)})
@@ -0,0 +1,310 @@
+"""In-memory stand-ins for the scan providers and the results Listbox.
+
+The fakes mimic Windows semantics (backslash paths, case-insensitive names)
+so the scanners in src/scanner.py behave the same as on a real machine.
+"""
+import fnmatch
+import ntpath
+import re
+from collections import Counter, namedtuple
+
+import scanner
+
+FakeStat = namedtuple("FakeStat", "st_size st_mtime st_ino st_dev")
+
+_ENV_VAR_RE = re.compile(r"%([^%]+)%")
+
+
+class FakeFileSystem:
+    """Case-insensitive, Windows-style filesystem held in dictionaries.
+
+    aliases maps a normcased path to the path it stands for, covering 8.3
+    short names and junctions; every lookup resolves them like Windows does.
+    """
+    path = ntpath
+
+    def __init__(self, environ=None):
+        self.dirs = {}     # normcased dir -> {lowered child name: child name}
+        self.files = {}    # normcased file path -> (size in bytes, mtime)
+        self.aliases = {}  # normcased alias path -> target path
+        self._keys = {}    # path -> normcased real path, cleared when aliases change
+        self.environ = {k.upper(): v for k, v in (environ or {}).items()}
+
+    def add_dir(self, path):
+        key = ntpath.normcase(path)
+        if key in self.dirs:
+            return
+        self.dirs[key] = {}
+        parent, name = ntpath.split(path)
+        if name and parent and parent != path:
+            self.add_dir(parent)
+            self.dirs[ntpath.normcase(parent)][name.lower()] = name
+
+    def add_file(self, path, size=0, mtime=0):
+        parent, name = ntpath.split(path)
+        self.add_dir(parent)
+        self.dirs[ntpath.normcase(parent)][name.lower()] = name
+        self.files[ntpath.normcase(path)] = (size, mtime)
+
+    def add_alias(self, alias, target):
+        """Make alias (a short name or junction) resolve to target."""
+        self.aliases[ntpath.normcase(alias)] = target
+        self._keys.clear()
+
+    def _key(self, path):
+        key = self._keys.get(path)
+        if key is None:
+            key = self._keys[path] = ntpath.normcase(self.realpath(path))
+        return key
+
+    def exists(self, path):
+        key = self._key(path)
+        return key in self.files or key in self.dirs
+
+    def isdir(self, path):
+        return self._key(path) in self.dirs
+
+    def isfile(self, path):
+        return self._key(path) in self.files
+
+    def listdir(self, path):
+        try:
+            return list(self.dirs[self._key(path)].values())
+        except KeyError:
+            raise FileNotFoundError(path)
+
+    def glob(self, directory, pattern):
+        children = self.dirs.get(self._key(directory), {})
+        pattern = pattern.lower()
+        return [ntpath.join(directory, name) for lowered, name in children.items()
+                if fnmatch.fnmatchcase(lowered, pattern)]
+
+    def getsize(self, path):
+        return self.stat(path).st_size
+
+    def stat(self, path):
+        key = self._key(path)
+        if key in self.files:
+            size, mtime = self.files[key]
+            return FakeStat(size, mtime, 0, 0)
+        if key in self.dirs:
+            return FakeStat(0, 0, 0, 0)
+        raise FileNotFoundError(path)
+
+    def realpath(self, path):
+        if not self.aliases:
+            return path
+        drive, rest = ntpath.splitdrive(path)
+        current = drive + "\\"
+        for part in rest.replace("/", "\\").split("\\"):
+            if not part:
+                continue
+            current = ntpath.join(current, part)
+            current = self.aliases.get(ntpath.normcase(current), current)
+        return current
+
+    def expandvars(self, path):
+        return _ENV_VAR_RE.sub(lambda m: self.environ.get(m.group(1).upper(), m.group(0)), path)
+
+
+class FakeRegistry:
+    """Registry keys as {(hive, key_path): {subkey_name: {value_name: value}}}."""
+    def __init__(self):
+        self.keys = {}
+
+    def add(self, hive, key_path, subkey_name, values):
+        self.keys.setdefault((hive, key_path), {})[subkey_name] = values
+
+    def iter_subkeys(self, hive, key_path):
+        try:
+            subkeys = self.keys[(hive, key_path)]
+        except KeyError:
+            raise FileNotFoundError(key_path)
+        for subkey_name, values in subkeys.items():
+            yield subkey_name, values
+
+
+class FakeShortcuts:
+    """Shortcut targets looked up by shortcut path."""
+    def __init__(self):
+        self.targets = {}
+
+    def add(self, shortcut_path, target_path):
+        self.targets[ntpath.normcase(shortcut_path)] = target_path
+
+    def target(self, shortcut_path):
+        return self.targets.get(ntpath.normcase(shortcut_path), "")
+
+
+class FakeFolders:
+    """Fixed lists of Start Menu, program, desktop and PATH folders.
+
+    Folders in user_dirs belong to the user scope, all others to the machine.
+    """
+    def __init__(self, start_menu_dirs, program_dirs, desktop_dirs, user_dirs=(),
+                 path_dirs=(), path_extensions=(".com", ".exe", ".bat", ".cmd")):
+        self._start_menu_dirs = start_menu_dirs
+        self._program_dirs = program_dirs
+        self._desktop_dirs = desktop_dirs
+        self._path_dirs = list(path_dirs)
+        self._path_extensions = list(path_extensions)
+        self._user_dirs = set(user_dirs)
+
+    def _scoped(self, dirs, scope):
+        if scope is None:
+            return list(dirs)
+        return [d for d in dirs if (d in self._user_dirs) == (scope == scanner.USER)]
+
+    def start_menu_dirs(self, scope=None):
+        return self._scoped(self._start_menu_dirs, scope)
+
+    def program_dirs(self, scope=None):
+        return self._scoped(self._program_dirs, scope)
+
+    def desktop_dirs(self, scope=None):
+        return self._scoped(self._desktop_dirs, scope)
+
+    def path_dirs(self, scope=None):
+        return self._scoped(self._path_dirs, scope)
+
+    def path_extensions(self):
+        return list(self._path_extensions)
+
+
+class FakeListbox:
+    """Records the Tcl-level calls a tk.Listbox would receive.
+
+    Every method call counts as one Tcl round trip, which is what dominates
+    the cost of updating the real widget.
+    """
+    def __init__(self):
+        self.items = []
+        self.selection = set()
+        self.active = 0
+        self.options = {}
+        self.item_options = {}
+        self.calls = Counter()
+
+    @property
+    def total_calls(self):
+        return sum(self.calls.values())
+
+    def _index(self, index):
+        if index == "end":
+            return len(self.items)
+        return int(index)
+
+    def delete(self, first, last=None):
+        self.calls["delete"] += 1
+        first = self._index(first)
+        last = first if last is None else min(self._index(last), len(self.items) - 1)
+        del self.items[first:last + 1]
+        # Like Tk, the selection stays with the remaining elements
+        removed = last + 1 - first
+        self.selection = {i if i < first else i - removed
+                          for i in self.selection if i < first or i > last}
+
+    def insert(self, index, *elements):
+        self.calls["insert"] += 1
+        index = self._index(index)
+        self.items[index:index] = elements
+        self.selection = {i + len(elements) if i >= index else i for i in self.selection}
+
+    def get(self, first, last=None):
+        self.calls["get"] += 1
+        if last is None:
+            return self.items[self._index(first)]
+        return tuple(self.items[self._index(first):self._index(last) + 1])
+
+    def size(self):
+        self.calls["size"] += 1
+        return len(self.items)
+
+    def config(self, **options):
+        self.calls["config"] += 1
+        self.options.update(options)
+
+    configure = config
+
+    def itemconfig(self, index, **options):
+        self.calls["itemconfig"] += 1
+        self.item_options.setdefault(self._index(index), {}).update(options)
+
+    itemconfigure = itemconfig
+
+    def select_set(self, first, last=None):
+        self.calls["select_set"] += 1
+        last = first if last is None else last
+        self.selection.update(range(self._index(first), self._index(last) + 1))
+
+    selection_set = select_set
+
+    def select_clear(self, first, last=None):
+        self.calls["select_clear"] += 1
+        if last is None:
+            self.selection.discard(self._index(first))
+        else:
+            last = min(self._index(last), len(self.items))
+            self.selection.difference_update(range(self._index(first), last + 1))
+
+    selection_clear = select_clear
+
+    def curselection(self):
+        self.calls["curselection"] += 1
+        return tuple(sorted(self.selection))
+
+    def activate(self, index):
+        self.calls["activate"] += 1
+        self.active = self._index(index)
+
+    def see(self, index):
+        self.calls["see"] += 1
+
+    # Geometry, as if the widget showed ROW_HEIGHT pixel rows from the top
+    ROW_HEIGHT = 22
+    HEIGHT = 10 * ROW_HEIGHT
+
+    def winfo_height(self):
+        return self.HEIGHT
+
+    def nearest(self, y):
+        self.calls["nearest"] += 1
+        if not self.items:
+            return -1
+        return min(len(self.items) - 1, max(0, y // self.ROW_HEIGHT))
+
+    def bbox(self, index):
+        self.calls["bbox"] += 1
+        index = self._index(index)
+        if not 0 <= index < len(self.items) or index * self.ROW_HEIGHT >= self.HEIGHT:
+            return None
+        return (0, index * self.ROW_HEIGHT, 200, self.ROW_HEIGHT)
+
+
+class FakeCanvas:
+    """Canvas stand-in counting drawing calls; after() callbacks run on flush()."""
+    def __init__(self):
+        self.items = []
+        self.calls = Counter()
+        self.scheduled = []
+
+    def delete(self, tag):
+        self.calls["delete"] += 1
+        self.items = [item for item in self.items if tag not in item[2]]
+
+    def create_image(self, x, y, image=None, anchor=None, tags=()):
+        self.calls["create_image"] += 1
+        self.items.append(((x, y), image, (tags,) if isinstance(tags, str) else tags))
+
+    def after(self, ms, callback, *args):
+        self.scheduled.append((callback, args))
+        return len(self.scheduled)
+
+    def after_cancel(self, job):
+        pass
+
+    def flush(self):
+        """Run the callbacks scheduled so far, as the Tk event loop would."""
+        scheduled, self.scheduled = self.scheduled, []
+        for callback, args in scheduled:
+            callback(*args)
@@ -0,0 +1,148 @@
+"""Benchmark registry, timing and baseline comparison.
+
+A benchmark is a setup function decorated with @benchmark(name). It receives
+the run Context and returns a Case: the callable to time, how many times to
+call it, and any extra numbers worth reporting. Each call is timed
+individually so latency percentiles (e.g. per keystroke) come for free.
+"""
+import contextlib
+import io
+import statistics
+import time
+
+BENCHMARKS = {}  # name -> setup function, in registration order
+
+# Median ratio (current / baseline) above which a benchmark counts as regressed
+DEFAULT_THRESHOLD = 1.25
+
+
+class SkipBenchmark(Exception):
+    """Raised by a setup function when the benchmark cannot run here."""
+
+
+class Context:
+    """Settings shared by all benchmarks of a run."""
+    def __init__(self, size=2000, seed=0, repeat=5, traces=200, workdir=None,
+                 scan_archive=None):
+        self.size = size
+        self.seed = seed
+        self.repeat = repeat
+        self.traces = traces
+        self.workdir = workdir
+        self.scan_archive = scan_archive  # Recorded scan to replay instead of the synthetic machine
+        self._cache = {}
+
+    def cached(self, key, factory):
+        """Build shared fixtures (catalogs, fake machines) once per run."""
+        if key not in self._cache:
+            self._cache[key] = factory()
+        return self._cache[key]
+
+
+class Case:
+    """What to time: fn is called calls times (defaults to ctx.repeat).
+
+    extra is a dict of numbers to report, or a function returning one that is
+    called after the timed calls (for counters gathered while running).
+    before, if given, runs untimed ahead of every call (e.g. to drop caches).
+    """
+    def __init__(self, fn, calls=None, warmup=1, extra=None, teardown=None, before=None):
+        self.fn = fn
+        self.calls = calls
+        self.warmup = warmup
+        self.extra = extra if extra is not None else {}
+        self.teardown = teardown
+        self.before = before
+
+
+def benchmark(name):
+    """Register a setup function under name."""
+    def register(setup):
+        BENCHMARKS[name] = setup
+        return setup
+    return register
+
+
+def percentile(sorted_values, fraction):
+    """Nearest-rank percentile of an already sorted list."""
+    if not sorted_values:
+        return 0.0
+    index = min(len(sorted_values) - 1, max(0, int(round(fraction * len(sorted_values))) - 1))
+    return sorted_values[index]
+
+
+def summarize(samples):
+    """Return latency statistics in milliseconds for a list of seconds."""
+    ordered = sorted(samples)
+    ms = 1000.0
+    return {
+        "calls": len(ordered),
+        "min_ms": ordered[0] * ms,
+        "median_ms": statistics.median(ordered) * ms,
+        "mean_ms": statistics.fmean(ordered) * ms,
+        "p95_ms": percentile(ordered, 0.95) * ms,
+        "max_ms": ordered[-1] * ms,
+        "total_ms": sum(ordered) * ms,
+    }
+
+
+def run_benchmark(name, ctx):
+    """Set up, time and summarize one benchmark."""
+    # The scanners report progress with print(); keep it out of the report
+    with contextlib.redirect_stdout(io.StringIO()):
+        try:
+            case = BENCHMARKS[name](ctx)
+        except SkipBenchmark as e:
+            return {"skipped": str(e)}
+        try:
+            for _ in range(case.warmup):
+                if case.before:
+                    case.before()
+                case.fn()
+            calls = case.calls or ctx.repeat
+            samples = []
+            clock = time.perf_counter
+            for _ in range(calls):
+                if case.before:
+                    case.before()
+                start = clock()
+                case.fn()
+                samples.append(clock() - start)
+            extra = case.extra() if callable(case.extra) else case.extra
+        finally:
+            if case.teardown:
+                case.teardown()
+    result = summarize(samples)
+    result.update(extra)
+    return result
+
+
+def compare(results, baseline, thresholds=None, default_threshold=DEFAULT_THRESHOLD,
+            metric="median_ms"):
+    """Compare results against a baseline report.
+
+    thresholds maps a benchmark name or a dotted group prefix ("scan") to the
+    allowed ratio; the most specific entry wins. Returns a list of
+    (name, baseline_value, current_value, ratio, limit, regressed) for every
+    benchmark present in both.
+    """
+    thresholds = thresholds or {}
+    rows = []
+    for name, current in results.items():
+        previous = baseline.get(name)
+        if not previous or metric not in previous or metric not in current:
+            continue
+        limit = _threshold_for(name, thresholds, default_threshold)
+        base_value = previous[metric]
+        ratio = current[metric] / base_value if base_value > 0 else 1.0
+        rows.append((name, base_value, current[metric], ratio, limit, ratio > limit))
+    return rows
+
+
+def _threshold_for(name, thresholds, default_threshold):
+    key = name
+    while key:
+        if key in thresholds:
+            return thresholds[key]
+        key = key.rpartition(".")[0]
+    return default_threshold
@@ -0,0 +1,140 @@
+"""Run the OfflineLauncher benchmark suite.
+
+Examples:
+    python benchmarks/run.py --size 5000 --output results.json
+    python benchmarks/run.py --compare baseline.json --threshold scan=1.5
+    python benchmarks/run.py --list
+    python benchmarks/run.py --filter "scan.replay*" --scan-archive customer.scan.gz
+
+With --compare the exit status is 1 if any benchmark's median exceeds its
+allowed ratio to the baseline, so the suite can gate a release.
+"""
+import argparse
+import fnmatch
+import json
+import os
+import platform
+import sys
+import time
+
+BENCH_DIR = os.path.dirname(os.path.abspath(__file__))
+ROOT_DIR = os.path.dirname(BENCH_DIR)
+SRC_DIR = os.path.join(ROOT_DIR, "src")
+sys.path.insert(0, SRC_DIR)
+
+import harness
+# Importing the modules registers their benchmarks
+import bench_scan
+import bench_search
+import bench_index
+import bench_render
+import bench_icons
+import bench_ipc
+import bench_events
+import bench_core
+import bench_idle
+import bench_catalog
+import bench_catalog_file
+import bench_replay
+import bench_export
+import bench_network
+import bench_profile
+import bench_pe
+import bench_prefetch
+import bench_metrics
+import bench_shared
+
+
+def parse_threshold(text):
+    name, sep, ratio = text.partition("=")
+    if not sep:
+        raise argparse.ArgumentTypeError("expected NAME=RATIO, e.g. search=1.5")
+    return name, float(ratio)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="OfflineLauncher benchmarks")
+    parser.add_argument("--size", type=int, default=2000, help="number of synthetic apps")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--repeat", type=int, default=5, help="timed calls for whole-scan benchmarks")
+    parser.add_argument("--traces", type=int, default=200, help="typing traces to replay")
+    parser.add_argument("--scan-archive",
+                        help="scan recording (src/scan_record.py) replayed by the scan.replay benchmarks")
+    parser.add_argument("--filter", action="append", default=[],
+                        help="only run benchmarks matching this glob (repeatable)")
+    parser.add_argument("--list", action="store_true", help="list benchmarks and exit")
+    parser.add_argument("--output", "-o", help="write the JSON report to this file")
+    parser.add_argument("--compare", help="baseline JSON report to compare against")
+    parser.add_argument("--metric", default="median_ms", help="statistic compared with --compare")
+    parser.add_argument("--max-regression", type=float, default=harness.DEFAULT_THRESHOLD,
+                        help="allowed current/baseline ratio (default %(default)s)")
+    parser.add_argument("--threshold", type=parse_threshold, action="append", default=[],
+                        help="per-benchmark or per-group ratio, NAME=RATIO (repeatable)")
+    parser.add_argument("--thresholds-file", help="JSON object of NAME: RATIO thresholds")
+    args = parser.parse_args(argv)
+
+    names = [name for name in harness.BENCHMARKS
+             if not args.filter or any(fnmatch.fnmatch(name, f) for f in args.filter)]
+    if args.list:
+        print("\n".join(names))
+        return 0
+
+    ctx = harness.Context(size=args.size, seed=args.seed, repeat=args.repeat, traces=args.traces,
+                          scan_archive=args.scan_archive)
+    results = {}
+    for name in names:
+        results[name] = harness.run_benchmark(name, ctx)
+        r = results[name]
+        if "skipped" in r:
+            print(f"{name:<28} skipped: {r['skipped']}", file=sys.stderr)
+            continue
+        print(f"{name:<28} median {r['median_ms']:9.3f} ms  p95 {r['p95_ms']:9.3f} ms  "
+              f"({r['calls']} calls)", file=sys.stderr)
+
+    report = {
+        "meta": {
+            "created": time.strftime("%Y-%m-%dT%H:%M:%S"),
+            "python": platform.python_version(),
+            "platform": platform.platform(),
+            "size": args.size,
+            "seed": args.seed,
+            "repeat": args.repeat,
+            "traces": args.traces,
+            "scan_archive": args.scan_archive,
+        },
+        "results": results,
+    }
+    if args.output:
+        with open(args.output, "w") as f:
+            json.dump(report, f, indent=2)
+    else:
+        json.dump(report, sys.stdout, indent=2)
+        print()
+
+    if not args.compare:
+        return 0
+
+    with open(args.compare) as f:
+        baseline = json.load(f)
+    thresholds = {}
+    if args.thresholds_file:
+        with open(args.thresholds_file) as f:
+            thresholds.update(json.load(f))
+    thresholds.update(dict(args.threshold))
+
+    rows = harness.compare(results, baseline.get("results", {}), thresholds,
+                           args.max_regression, args.metric)
+    regressed = [row for row in rows if row[5]]
+    print(f"\nComparison against {args.compare} ({args.metric}):", file=sys.stderr)
+    for name, base, current, ratio, limit, is_regressed in rows:
+        flag = "REGRESSED" if is_regressed else "ok"
+        print(f"  {name:<28} {base:9.3f} -> {current:9.3f}  x{ratio:5.2f} (limit x{limit:.2f})  {flag}",
+              file=sys.stderr)
+    if regressed:
+        print(f"{len(regressed)} benchmark(s) regressed.", file=sys.stderr)
+        return 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
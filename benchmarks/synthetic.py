@@ -0,0 +1,324 @@
+"""Synthetic catalogs, machines and typing traces for the benchmarks.
+
+Everything is generated from a seed so runs are comparable. A "machine" is a
+set of fake providers populated the way a real Windows install looks to the
+scanners: Uninstall and App Paths registry entries, Start Menu and desktop
+shortcuts, and vendor folders under Program Files, plus the noise the
+filters are there to reject (updates, uninstallers, small helper exes).
+"""
+import ntpath
+import os
+import random
+
+from fakes import FakeFileSystem, FakeRegistry, FakeShortcuts, FakeFolders
+
+import scanner
+
+WORDS = [
+    "Visual", "Studio", "Code", "Chrome", "Firefox", "Office", "Word", "Excel",
+    "Power", "Point", "Outlook", "Teams", "Photo", "Shop", "Acrobat", "Reader",
+    "Media", "Player", "Audio", "Video", "Editor", "Manager", "Terminal",
+    "Console", "Studio", "Designer", "Paint", "Notes", "Calendar", "Mail",
+    "Sync", "Cloud", "Drive", "Backup", "Game", "Launcher", "Viewer", "Tools",
+    "Converter", "Recorder", "Browser", "Explorer", "Server", "Client", "Git",
+    "Python", "Java", "Node", "Docker", "Zip", "Archive", "Remote", "Desktop",
+    "Network", "Monitor", "Analyzer", "Builder", "Maker", "Pro", "Lite",
+]
+VENDORS = [
+    "Adobe", "Microsoft", "Google", "Mozilla", "JetBrains", "Oracle", "Valve",
+    "Autodesk", "Corel", "Nvidia", "Intel", "Logitech", "Zoom", "Slack",
+    "Spotify", "VideoLAN", "Notepad++", "7-Zip", "Blender", "Canonical",
+]
+
+PROGRAM_FILES = "C:\\Program Files"
+PROGRAM_FILES_X86 = "C:\\Program Files (x86)"
+LOCAL_PROGRAMS = "C:\\Users\\bench\\AppData\\Local\\Programs"
+COMMON_START_MENU = "C:\\ProgramData\\Microsoft\\Windows\\Start Menu\\Programs"
+USER_START_MENU = "C:\\Users\\bench\\AppData\\Roaming\\Microsoft\\Windows\\Start Menu\\Programs"
+USER_DESKTOP = "C:\\Users\\bench\\Desktop"
+COMMON_DESKTOP = "C:\\Users\\Public\\Desktop"
+
+LOCAL_APPDATA = "C:\\Users\\bench\\AppData\\Local"
+# PATH: a tools folder, a per-user one, the App Execution Alias stubs and
+# System32, plus a leftover entry of an uninstalled program
+TOOLS_DIR = "C:\\Tools\\bin"
+USER_TOOLS_DIR = "C:\\Users\\bench\\.cargo\\bin"
+WINDOWS_APPS = LOCAL_APPDATA + "\\Microsoft\\WindowsApps"
+WINDOWS_APPS_ENTRY = "%LocalAppData%\\Microsoft\\WindowsApps"  # As PATH spells it
+SYSTEM32 = "C:\\Windows\\System32"
+REMOVED_PATH_DIR = "C:\\Program Files\\Removed\\bin"
+APP_ALIASES = ["wt.exe", "winget.exe", "python.exe", "python3.exe"]
+ENVIRON = {
+    "ProgramFiles": PROGRAM_FILES,
+    "ProgramFiles(x86)": PROGRAM_FILES_X86,
+    "LocalAppData": LOCAL_APPDATA,
+}
+# 8.3 short names of the program folders
+SHORT_NAMES = {
+    "C:\\PROGRA~1": PROGRAM_FILES,
+    "C:\\PROGRA~2": PROGRAM_FILES_X86,
+}
+
+UNINSTALL_KEY = r"SOFTWARE\Microsoft\Windows\CurrentVersion\Uninstall"
+APP_PATHS_KEY = r"SOFTWARE\Microsoft\Windows\CurrentVersion\App Paths"
+
+
+def make_names(count, seed=0):
+    """Return count unique application names built from WORDS."""
+    rng = random.Random(seed)
+    names = set()
+    while len(names) < count:
+        words = rng.sample(WORDS, rng.choice((1, 2, 2, 3)))
+        name = " ".join(words)
+        if name in names:
+            name = f"{name} {len(names)}"
+        names.add(name)
+    return sorted(names)
+
+
+def make_catalog(count, seed=0):
+    """Return a catalog shaped like scanner.scan_installed_apps() output."""
+    rng = random.Random(seed)
+    apps = {}
+    for name in make_names(count, seed):
+        vendor = rng.choice(VENDORS)
+        path = ntpath.join(PROGRAM_FILES, vendor, name, name.replace(" ", "") + ".exe")
+        apps[path.lower()] = {'name': name, 'path': path}
+    return scanner.build_catalog(apps.values())
+
+
+PUBLISHER_SUFFIXES = ["", " Inc.", " Corporation", " Software", " Ltd", " GmbH"]
+
+
+def add_search_fields(catalog, seed=0):
+    """Return copies of catalog's records with the extra search fields filled in.
+
+    Every app gets its vendor as publisher, half get an Uninstall-style
+    product name, a third an executable named differently from the app and
+    a few a user alias (the name's initials).
+    """
+    rng = random.Random(seed + 2)
+    result = []
+    for app in catalog:
+        vendor = ntpath.basename(ntpath.dirname(ntpath.dirname(app['path'])))
+        record = dict(app, publisher=vendor + rng.choice(PUBLISHER_SUFFIXES))
+        initials = "".join(word[0] for word in app['name'].lower().split())
+        if rng.random() < 0.5:
+            record['product'] = f"{vendor} {app['name']} {rng.randint(1, 30)}.{rng.randint(0, 9)}"
+        if rng.random() < 0.3:
+            record['path'] = ntpath.join(ntpath.dirname(app['path']), f"{initials}{rng.randint(0, 99)}.exe")
+        if rng.random() < 0.05:
+            record['aliases'] = [initials]
+        result.append(record)
+    return result
+
+
+def _respell(path, rng):
+    """Return path as a shortcut or registry entry might spell it instead."""
+    roll = rng.random()
+    for short, long in SHORT_NAMES.items():
+        if path.startswith(long + "\\"):
+            if roll < 0.3:
+                return short + path[len(long):]
+            if roll < 0.6:
+                var = next(k for k, v in ENVIRON.items() if v == long)
+                return f"%{var}%" + path[len(long):]
+    if roll > 0.9:
+        return path.upper()
+    return path
+
+
+def make_machine(count, seed=0):
+    """Return ScanProviders for a fake machine with about count installed apps.
+
+    About a third of the shortcut and registry paths are spelled differently
+    from the on-disk path (short names, environment variables, case), and a
+    few apps are installed behind a Squirrel-style Update.exe stub, so the
+    same app is reported by several sources under different paths. PATH
+    holds command-line tools and a few app install folders, which the
+    program folder walk finds as well.
+    """
+    rng = random.Random(seed)
+    fs = FakeFileSystem(ENVIRON)
+    for short, long in SHORT_NAMES.items():
+        fs.add_alias(short, long)
+    registry = FakeRegistry()
+    shortcuts = FakeShortcuts()
+
+    for root in (PROGRAM_FILES, PROGRAM_FILES_X86, LOCAL_PROGRAMS, COMMON_START_MENU,
+                 USER_START_MENU, USER_DESKTOP, COMMON_DESKTOP):
+        fs.add_dir(root)
+
+    install_dirs = []
+    for i, name in enumerate(make_names(count, seed)):
+        vendor = rng.choice(VENDORS)
+        exe_name = name.replace(" ", "") + ".exe"
+        roll = rng.random()
+        launch_path = None
+        if roll < 0.6:
+            install_dir = ntpath.join(PROGRAM_FILES, vendor, name)
+        elif roll < 0.85:
+            install_dir = ntpath.join(PROGRAM_FILES_X86, vendor, name)
+        elif roll < 0.95:
+            install_dir = ntpath.join(LOCAL_PROGRAMS, name)
+        else:
+            stub_dir = ntpath.join(LOCAL_APPDATA, name.replace(" ", ""))
+            launch_path = ntpath.join(stub_dir, "Update.exe")
+            fs.add_file(launch_path, 1500 * 1024, rng.randint(1, 10 ** 9))
+            install_dir = ntpath.join(stub_dir, f"app-1.{rng.randint(0, 9)}.{rng.randint(0, 99)}")
+        install_dirs.append(install_dir)
+        exe_path = ntpath.join(install_dir, exe_name)
+        fs.add_file(exe_path, rng.randint(200 * 1024, 80 * 1024 * 1024), rng.randint(1, 10 ** 9))
+        launch_path = launch_path or exe_path
+
+        # Noise the filters are expected to reject
+        fs.add_file(ntpath.join(install_dir, "helper.exe"), rng.randint(10 * 1024, 90 * 1024))
+        fs.add_file(ntpath.join(install_dir, "uninstall.exe"), 300 * 1024)
+        fs.add_file(ntpath.join(install_dir, "readme.txt"), 4096)
+
+        subkey = f"{{{i:08X}-BENCH}}"
+        hive = scanner.HKLM if rng.random() < 0.8 else scanner.HKCU
+        roll = rng.random()
+        if roll < 0.35:
+            registry.add(hive, UNINSTALL_KEY, subkey, {
+                "DisplayName": f"{name} {rng.randint(1, 30)}.{rng.randint(0, 9)} (x64)",
+                "DisplayIcon": f'"{_respell(exe_path, rng)}",0',
+                "UninstallString": f'"{ntpath.join(install_dir, "uninstall.exe")}"',
+                "Publisher": vendor})
+        elif roll < 0.55:
+            registry.add(hive, UNINSTALL_KEY, subkey, {
+                "DisplayName": name, "InstallLocation": install_dir, "Publisher": vendor})
+        if rng.random() < 0.1:
+            registry.add(scanner.HKLM, APP_PATHS_KEY, exe_name, {"": exe_path})
+        if rng.random() < 0.15:
+            registry.add(hive, UNINSTALL_KEY, subkey + "-KB",
+                         {"DisplayName": f"Security Update for {name}", "Publisher": vendor})
+
+        if rng.random() < 0.6:
+            menu = COMMON_START_MENU if rng.random() < 0.7 else USER_START_MENU
+            folder = ntpath.join(menu, vendor) if rng.random() < 0.7 else menu
+            if rng.random() < 0.2:
+                folder = ntpath.join(folder, name)
+            shortcut = ntpath.join(folder, name + ".lnk")
+            fs.add_file(shortcut, 2048)
+            shortcuts.add(shortcut, _respell(launch_path, rng))
+        if rng.random() < 0.15:
+            desktop = USER_DESKTOP if rng.random() < 0.5 else COMMON_DESKTOP
+            shortcut = ntpath.join(desktop, name + ".lnk")
+            fs.add_file(shortcut, 2048)
+            shortcuts.add(shortcut, _respell(launch_path, rng))
+
+    path_dirs = _add_path_tools(fs, install_dirs, count, random.Random(seed + 1))
+    folders = FakeFolders([COMMON_START_MENU, USER_START_MENU],
+                          [PROGRAM_FILES, PROGRAM_FILES_X86, LOCAL_PROGRAMS],
+                          [USER_DESKTOP, COMMON_DESKTOP],
+                          user_dirs=[USER_START_MENU, LOCAL_PROGRAMS, USER_DESKTOP,
+                                     USER_TOOLS_DIR, WINDOWS_APPS_ENTRY],
+                          path_dirs=path_dirs)
+    return scanner.ScanProviders(fs, registry, shortcuts, folders)
+
+
+def _add_path_tools(fs, install_dirs, count, rng):
+    """Fill the PATH folders and return the PATH entries."""
+    for i in range(max(10, count // 40)):
+        tool = f"{rng.choice(WORDS).lower()}{i}"
+        directory = TOOLS_DIR if rng.random() < 0.8 else USER_TOOLS_DIR
+        if rng.random() < 0.3:
+            fs.add_file(ntpath.join(directory, tool + ".cmd"), rng.randint(200, 4096))
+        else:
+            fs.add_file(ntpath.join(directory, tool + ".exe"), rng.randint(150 * 1024, 40 * 1024 * 1024))
+        # Noise: small shims, DLLs and docs next to the tools
+        fs.add_file(ntpath.join(directory, f"{tool}-shim.exe"), rng.randint(10 * 1024, 60 * 1024))
+        fs.add_file(ntpath.join(directory, f"{tool}.dll"), 500 * 1024)
+    for alias in APP_ALIASES:
+        fs.add_file(ntpath.join(WINDOWS_APPS, alias), 0)
+    fs.add_file(ntpath.join(SYSTEM32, "cmd.exe"), 300 * 1024)
+    return ([SYSTEM32, TOOLS_DIR, REMOVED_PATH_DIR, WINDOWS_APPS_ENTRY, USER_TOOLS_DIR] + install_dirs[:3])
+
+
+def materialize_program_dirs(providers, target_dir):
+    """Write the fake machine's program folders to a real directory tree.
+
+    Files are created sparse (truncated to size) so large trees stay cheap.
+    Returns the list of created program roots, in providers.folders order.
+    """
+    fs = providers.fs
+    roots = []
+    for program_dir in providers.folders.program_dirs():
+        root = os.path.join(target_dir, ntpath.basename(program_dir))
+        roots.append(root)
+        _copy_tree(fs, program_dir, root)
+    return roots
+
+
+def materialize_path_dirs(providers, target_dir):
+    """Write the fake machine's existing PATH folders to real directories.
+
+    Returns the created folders, in providers.folders order.
+    """
+    fs = providers.fs
+    dirs = []
+    for i, entry in enumerate(providers.folders.path_dirs()):
+        directory = fs.expandvars(entry)
+        if fs.isdir(directory):
+            dirs.append(os.path.join(target_dir, str(i), ntpath.basename(directory)))
+            _copy_tree(fs, directory, dirs[-1])
+    return dirs
+
+
+def _copy_tree(fs, source, target):
+    os.makedirs(target, exist_ok=True)
+    for name in fs.listdir(source):
+        child = ntpath.join(source, name)
+        if fs.isdir(child):
+            _copy_tree(fs, child, os.path.join(target, name))
+        else:
+            with open(os.path.join(target, name), "wb") as f:
+                f.truncate(fs.getsize(child))
+
+
+def make_typing_traces(catalog, count, seed=0):
+    """Return count traces, each the successive search box contents while typing.
+
+    Targets are picked from the catalog; users type a prefix of the first word
+    or jump to a later word, sometimes mistype and backspace.
+    """
+    rng = random.Random(seed)
+    traces = []
+    for _ in range(count):
+        words = rng.choice(catalog)['name'].lower().split()
+        start = rng.randrange(len(words)) if rng.random() < 0.3 else 0
+        text = " ".join(words[start:start + 2])
+        text = text[:rng.randint(2, max(2, len(text)))]
+
+        typed = ""
+        trace = []
+        for ch in text:
+            if rng.random() < 0.05:
+                trace.append(typed + rng.choice("qxz"))  # Typo, then backspace
+            typed += ch
+            trace.append(typed)
+        traces.append(trace)
+    return traces
+
+
+def make_query_log(catalog, sessions, seed=0, favorites=12):
+    """Return the search box contents of sessions launcher sessions, in order.
+
+    Each session opens the launcher (an empty query) and types towards one
+    target. Most sessions go to a small set of favourite apps, picked with
+    Zipf-like weights, so the same few queries come back again and again.
+    """
+    rng = random.Random(seed)
+    targets = [app['name'].lower() for app in rng.sample(catalog, min(favorites, len(catalog)))]
+    weights = [1.0 / (rank + 1) for rank in range(len(targets))]
+    log = []
+    for _ in range(sessions):
+        if rng.random() < 0.8:
+            name = rng.choices(targets, weights)[0]
+        else:
+            name = rng.choice(catalog)['name'].lower()
+        text = name[:rng.randint(2, max(2, min(len(name), 6)))].strip()
+        log.append("")
+        log.extend(text[:end] for end in range(1, len(text) + 1))
+    return log
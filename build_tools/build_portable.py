@@ -1,9 +1,12 @@
+import argparse
+import json
 import os
+import statistics
 import subprocess
 import sys
 import shutil
-import winshell
-from win32com.client import Dispatch
+import tempfile
+import time
 
 # Define project paths
 ROOT_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
@@ -13,30 +16,35 @@ DOCS_DIR = os.path.join(ROOT_DIR, "docs")
 PORTABLE_DIR = os.path.join(ROOT_DIR, "portable")
 BUILD_DIR = os.path.join(ROOT_DIR, "build")
 DIST_DIR = os.path.join(ROOT_DIR, "dist")
+STARTUP_PROBE_HOOK = os.path.join(ROOT_DIR, "build_tools", "startup_probe.py")
 
-def build_portable_exe():
-    """
-    Builds a portable executable of the launcher application using PyInstaller.
-    Makes sure the executable runs without showing a console window and includes the app icon.
-    """
-    print("Building portable executable...")
-    
-    # Check if PyInstaller is installed
+# --- Fast-start build ---
+# "onefile" unpacks the whole bundle to a temp directory on every launch;
+# "onedir" ships the unpacked folder, so a launch only starts Python.
+BUILD_MODES = ("onefile", "onedir")
+ONEDIR_DIST_DIR = os.path.join(DIST_DIR, "onedir")
+# Standard library modules the launcher never imports. urllib itself stays:
+# pathlib needs urllib.parse. tkinter.ttk stays too, for the scan progress bar.
+EXCLUDED_MODULES = ["urllib.request", "http", "email", "xmlrpc", "unittest",
+                    "pydoc", "doctest", "tkinter.tix", "lib2to3", "ensurepip"]
+# Image formats the launcher reads or writes (Ico needs Bmp and Png)
+KEPT_PIL_PLUGINS = {"BmpImagePlugin", "IcoImagePlugin", "PngImagePlugin"}
+STARTUP_RUNS = 3
+STARTUP_TIMEOUT = 20.0  # Seconds a probed launch may take to go quiet
+STARTUP_SETTLE = 2.0    # Seconds without a new import after which startup counts as done
+
+def unused_pil_plugins():
+    """Return the installed Pillow plugin modules the launcher has no use for."""
     try:
-        import PyInstaller
+        import PIL
     except ImportError:
-        print("PyInstaller not found. Installing...")
-        subprocess.run([sys.executable, "-m", "pip", "install", "pyinstaller"], check=True)
-    
-    # Ensure all dependencies are installed
-    requirements_path = os.path.join(SRC_DIR, "requirements.txt")
-    subprocess.run([sys.executable, "-m", "pip", "install", "-r", requirements_path], check=True)
-    
-    # Create a directory for the build if it doesn't exist
-    if not os.path.exists(BUILD_DIR):
-        os.makedirs(BUILD_DIR)
-    
-    # Build with PyInstaller
+        return []
+    names = [name[:-3] for name in os.listdir(os.path.dirname(PIL.__file__))
+             if name.endswith("ImagePlugin.py")]
+    return sorted(f"PIL.{name}" for name in names if name not in KEPT_PIL_PLUGINS)
+
+def pyinstaller_command(mode):
+    """Return the PyInstaller command line for a build mode."""
     icon_path = os.path.join(ASSETS_DIR, "app_icon.png")
     launcher_path = os.path.join(SRC_DIR, "launcher.py")
     
@@ -45,25 +53,67 @@ def build_portable_exe():
     # Use --icon to set the application icon
     # Use --add-data to include data files
     # Use --windowed to ensure it runs in window mode
-    pyinstaller_command = [
+    command = [
         "pyinstaller",
+        "--noconfirm",
         "--noconsole",      # No console window
-        "--onefile",        # Single file executable
+        f"--{mode}",        # Single file executable, or a folder for fast start
         "--windowed",       # Ensures it runs in windowed mode, no console
         f"--icon={icon_path}",  # Application icon
         "--name=OfflineLauncher", # Name of the output exe
-        "--add-data", f"{icon_path};.", # Include icon file
+        "--add-data", f"{icon_path}{os.pathsep}.", # Include icon file
+        "--paths", SRC_DIR,
         # Add additional configuration options
         "--hiddenimport=PIL._tkinter_finder", # Ensure PIL Tkinter support works
-        launcher_path  # Main script
+        # Times startup when OFFLINELAUNCHER_STARTUP_PROBE is set, idle otherwise
+        "--runtime-hook", STARTUP_PROBE_HOOK,
     ]
+    if mode == "onedir":
+        # Optimized bytecode without docstrings or asserts, and a smaller bundle
+        command += ["--optimize", "2", "--distpath", ONEDIR_DIST_DIR]
+        for module in EXCLUDED_MODULES + unused_pil_plugins():
+            command += ["--exclude-module", module]
+    command.append(launcher_path)  # Main script
+    return command
+
+def built_executable(mode):
+    """Return the path of the executable a build mode produces."""
+    name = "OfflineLauncher.exe" if sys.platform == "win32" else "OfflineLauncher"
+    if mode == "onedir":
+        return os.path.join(ONEDIR_DIST_DIR, "OfflineLauncher", name)
+    return os.path.join(DIST_DIR, name)
+
+def build_portable_exe(mode="onefile"):
+    """
+    Builds a portable executable of the launcher application using PyInstaller.
+    Makes sure the executable runs without showing a console window and includes the app icon.
+    mode is "onefile" (a single exe) or "onedir" (a folder that starts faster).
+    """
+    print(f"Building portable executable ({mode})...")
+    
+    # Check if PyInstaller is installed
+    try:
+        import PyInstaller
+    except ImportError:
+        print("PyInstaller not found. Installing...")
+        subprocess.run([sys.executable, "-m", "pip", "install", "pyinstaller"], check=True)
+    
+    # Ensure all dependencies are installed (pywin32 and winshell only exist for Windows)
+    if sys.platform == "win32":
+        requirements_path = os.path.join(SRC_DIR, "requirements.txt")
+        subprocess.run([sys.executable, "-m", "pip", "install", "-r", requirements_path], check=True)
+    
+    # Create a directory for the build if it doesn't exist
+    if not os.path.exists(BUILD_DIR):
+        os.makedirs(BUILD_DIR)
     
     # Change to the project root directory before running PyInstaller
     os.chdir(ROOT_DIR)
-    subprocess.run(pyinstaller_command, check=True)
+    subprocess.run(pyinstaller_command(mode), check=True)
     
+    exe_path = built_executable(mode)
     print("\nPortable executable built successfully!")
-    print(f"You can find it in the 'dist' folder as 'OfflineLauncher.exe'")
+    print(f"You can find it at {exe_path}")
     
     # Create portable directory if it doesn't exist
     if not os.path.exists(PORTABLE_DIR):
@@ -74,7 +124,14 @@ def build_portable_exe():
     try:
         import zipfile
         with zipfile.ZipFile(portable_zip_path, 'w') as zipf:
-            zipf.write(os.path.join(DIST_DIR, 'OfflineLauncher.exe'), 'OfflineLauncher.exe')
+            if mode == "onedir":
+                bundle_dir = os.path.dirname(exe_path)
+                for folder, _, files in os.walk(bundle_dir):
+                    for name in files:
+                        path = os.path.join(folder, name)
+                        zipf.write(path, os.path.relpath(path, os.path.dirname(bundle_dir)))
+            else:
+                zipf.write(exe_path, os.path.basename(exe_path))
             zipf.write(os.path.join(DOCS_DIR, 'README.md'), 'README.md')
             zipf.write(os.path.join(ASSETS_DIR, 'app_icon.png'), 'app_icon.png')
             portable_instructions = os.path.join(DOCS_DIR, 'PORTABLE_INSTRUCTIONS.md')
@@ -84,21 +141,29 @@ def build_portable_exe():
     except Exception as e:
         print(f"Error creating zip file: {e}")
     
+    if sys.platform != "win32":
+        return
+    
     # Create startup shortcut
-    create_startup_option()
+    create_startup_option(exe_path)
     
     print("\nInstallation Instructions:")
     print("1. Extract OfflineLauncher_portable.zip to any location")
-    print("2. Double-click OfflineLauncher.exe to run")
+    if mode == "onedir":
+        print("2. Double-click OfflineLauncher.exe in the OfflineLauncher folder to run")
+    else:
+        print("2. Double-click OfflineLauncher.exe to run")
     print("3. The application will run in the system tray")
     print("4. Press the configured hotkey (default: shift+f) to show the launcher")
     print("5. The search box should immediately be focused and ready for typing")
     print("6. To run at startup: Choose option 1 or 2 when prompted")
 
-def create_startup_option():
+def create_startup_option(exe_path=None):
     """
     Offers to create a startup shortcut for the portable application.
     """
+    import winshell
+    from win32com.client import Dispatch
     try:
         choice = input("\nDo you want to add the application to Windows startup?\n"
                       "1) Yes - for current user only\n"
@@ -111,7 +176,7 @@ def create_startup_option():
             return
             
         # Get path to the executable
-        exe_path = os.path.join(DIST_DIR, "OfflineLauncher.exe")
+        exe_path = exe_path or os.path.join(DIST_DIR, "OfflineLauncher.exe")
         if not os.path.exists(exe_path):
             print(f"Error: Could not find executable at {exe_path}")
             return
@@ -154,5 +219,143 @@ def create_startup_option():
         print("3. Right-click in the folder and choose 'Paste shortcut'")
         print("4. Right-click the shortcut, choose Properties, and set it to run minimized")
 
+# --- Startup report ---
+
+def bundle_size(exe_path, mode):
+    """Return (total bytes, file count, largest entries) of a build's bundle."""
+    if mode == "onefile":
+        size = os.path.getsize(exe_path)
+        return size, 1, [(os.path.basename(exe_path), size)]
+    bundle_dir = os.path.dirname(exe_path)
+    entries = {}  # Top-level file or folder -> bytes
+    total = count = 0
+    for folder, _, files in os.walk(bundle_dir):
+        for name in files:
+            path = os.path.join(folder, name)
+            size = os.path.getsize(path)
+            top = os.path.relpath(path, bundle_dir).split(os.sep)[0]
+            entries[top] = entries.get(top, 0) + size
+            total += size
+            count += 1
+    largest = sorted(entries.items(), key=lambda item: -item[1])[:10]
+    return total, count, largest
+
+def probe_startup(exe_path, timeout=STARTUP_TIMEOUT, settle=STARTUP_SETTLE):
+    """Launch the frozen app once with the startup probe and return its timings.
+
+    The runtime hook appends JSON lines to the probe file as the app starts.
+    The app is stopped once it exits or no import has happened for settle
+    seconds (it is then idle in its main loop).
+    """
+    fd, probe_path = tempfile.mkstemp(prefix="startup-probe-", suffix=".jsonl")
+    os.close(fd)
+    env = dict(os.environ, OFFLINELAUNCHER_STARTUP_PROBE=probe_path)
+    started = time.time()
+    process = subprocess.Popen([exe_path], env=env, cwd=os.path.dirname(exe_path),
+                               stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+    last_size, last_change = -1, time.monotonic()
+    try:
+        while process.poll() is None and time.time() - started < timeout:
+            size = os.path.getsize(probe_path)
+            if size != last_size:
+                last_size, last_change = size, time.monotonic()
+            elif size and time.monotonic() - last_change >= settle:
+                break
+            time.sleep(0.05)
+    finally:
+        still_running = process.poll() is None
+        if still_running:
+            process.kill()
+        process.wait()
+    exit_code = None if still_running else process.returncode  # None: reached its main loop
+    with open(probe_path, encoding="utf-8") as f:
+        events = [json.loads(line) for line in f if line.strip()]
+    os.remove(probe_path)
+    
+    hook = next((e for e in events if e["event"] == "hook"), None)
+    imports = [e for e in events if e["event"] == "import"]
+    if hook is None:
+        return {"error": "startup probe never ran", "exit_code": exit_code}
+    return {
+        # Bootloader (and for onefile, unpacking) up to the first Python code
+        "bootstrap_ms": (hook["time"] - started) * 1000,
+        "imports_ms": (max(e["end"] for e in imports) - hook["time"]) * 1000 if imports else 0.0,
+        "exit_code": exit_code,
+        "imports": imports,
+    }
+
+def startup_report(mode, runs=STARTUP_RUNS):
+    """Measure bundle size and startup of an existing build; return the report."""
+    exe_path = built_executable(mode)
+    if not os.path.exists(exe_path):
+        raise FileNotFoundError(f"No {mode} build at {exe_path}")
+    total, count, largest = bundle_size(exe_path, mode)
+    probes = [probe_startup(exe_path) for _ in range(runs)]
+    timed = [p for p in probes if "error" not in p]
+    report = {
+        "mode": mode,
+        "platform": sys.platform,
+        "executable": exe_path,
+        "bundle_bytes": total,
+        "bundle_files": count,
+        "largest": [{"name": name, "bytes": size} for name, size in largest],
+        "runs": [{k: v for k, v in p.items() if k != "imports"} for p in probes],
+    }
+    if timed:
+        report["bootstrap_ms"] = statistics.median(p["bootstrap_ms"] for p in timed)
+        report["imports_ms"] = statistics.median(p["imports_ms"] for p in timed)
+        # Breakdown of the last (warmest) run: what launcher.py imports directly...
+        imports = timed[-1]["imports"]
+        report["top_level_imports"] = [{"module": e["module"], "ms": e["ms"]}
+                                       for e in imports if e["depth"] == 0]
+        # ...and the slowest modules at any depth (times include their own imports)
+        report["slowest_imports"] = [{"module": e["module"], "ms": e["ms"]}
+                                     for e in sorted(imports, key=lambda e: -e["ms"])[:15]]
+    return report
+
+def print_startup_report(report):
+    print(f"\nStartup report ({report['mode']}, {report['platform']}):")
+    print(f"  Bundle: {report['bundle_bytes'] / 1048576:.1f} MB in {report['bundle_files']} files")
+    for entry in report["largest"][:5]:
+        print(f"    {entry['name']:<40} {entry['bytes'] / 1048576:8.1f} MB")
+    if "bootstrap_ms" not in report:
+        print("  Startup: not measured (the startup probe did not run)")
+        return
+    print(f"  Bootstrap: {report['bootstrap_ms']:.0f} ms, imports: {report['imports_ms']:.0f} ms "
+          f"(median of {len(report['runs'])} launches)")
+    for entry in report["top_level_imports"]:
+        print(f"    {entry['module']:<40} {entry['ms']:8.1f} ms")
+    exit_codes = {run.get("exit_code") for run in report["runs"]}
+    if exit_codes - {None}:
+        print(f"  Note: the app exited during startup (exit codes {sorted(exit_codes - {None})}); "
+              "imports after the failure are not included")
+
+def write_startup_report(mode, runs=STARTUP_RUNS):
+    report = startup_report(mode, runs)
+    os.makedirs(BUILD_DIR, exist_ok=True)
+    report_path = os.path.join(BUILD_DIR, f"startup-{mode}-{sys.platform}.json")
+    with open(report_path, "w", encoding="utf-8") as f:
+        json.dump(report, f, indent=2)
+    print_startup_report(report)
+    print(f"  Written to {report_path}")
+    return report
+
+def main():
+    parser = argparse.ArgumentParser(description="Build the portable OfflineLauncher.")
+    parser.add_argument("--mode", choices=BUILD_MODES, default="onefile",
+                        help="onefile: a single exe; onedir: a folder that starts faster")
+    parser.add_argument("--startup-report", action="store_true",
+                        help="after building, measure bundle size and startup time")
+    parser.add_argument("--report-only", action="store_true",
+                        help="only write the startup report for an existing build")
+    parser.add_argument("--runs", type=int, default=STARTUP_RUNS,
+                        help="launches measured for the startup report")
+    args = parser.parse_args()
+    
+    if not args.report_only:
+        build_portable_exe(args.mode)
+    if args.startup_report or args.report_only or args.mode == "onedir":
+        write_startup_report(args.mode, args.runs)
+
 if __name__ == "__main__":
-    build_portable_exe() 
\ No newline at end of file
+    main()
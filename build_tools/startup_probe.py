@@ -0,0 +1,41 @@
+"""PyInstaller runtime hook that times the frozen launcher's startup.
+
+Runs inside the frozen app before launcher.py. Does nothing unless
+OFFLINELAUNCHER_STARTUP_PROBE names a file; then it appends one JSON line
+when the hook starts (the bootloader has unpacked the bundle and started
+Python) and one per module imported for the first time, with how long the
+import took including the modules it imported in turn. Lines are flushed
+as they are written, so the report survives the app being killed.
+"""
+import builtins
+import json
+import os
+import sys
+import time
+
+
+def _install(path):
+    out = open(path, "a", encoding="utf-8", buffering=1)
+    out.write(json.dumps({"event": "hook", "time": time.time(),
+                          "frozen": bool(getattr(sys, "frozen", False))}) + "\n")
+    original_import = builtins.__import__
+    depth = [0]
+
+    def timed_import(name, globals=None, locals=None, fromlist=(), level=0):
+        if level or name in sys.modules:
+            return original_import(name, globals, locals, fromlist, level)
+        start = time.perf_counter()
+        depth[0] += 1
+        try:
+            return original_import(name, globals, locals, fromlist, level)
+        finally:
+            depth[0] -= 1
+            out.write(json.dumps({"event": "import", "module": name, "depth": depth[0],
+                                  "ms": (time.perf_counter() - start) * 1000,
+                                  "end": time.time()}) + "\n")
+
+    builtins.__import__ = timed_import
+
+
+if os.environ.get("OFFLINELAUNCHER_STARTUP_PROBE"):
+    _install(os.environ["OFFLINELAUNCHER_STARTUP_PROBE"])
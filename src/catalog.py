@@ -0,0 +1,64 @@
+"""Published catalog generations shared by the scanner threads and the UI.
+
+A Generation bundles one scan's records with their search index and never
+changes after it is built. Scans and refreshes build the next generation on
+their own thread and publish() it by swapping a single reference; readers
+call current() once per query and keep using that generation, so a search
+never sees half of an old catalog and half of a new one and nobody waits on
+a lock. Generation ids increase with every publish and can be used as cache
+keys.
+
+A generation's records either live in memory (a tuple of dicts indexed by
+PrefixIndex) or in a memory-mapped catalog file, in which case the
+catalog_file.MappedCatalog is both the record sequence and the index.
+"""
+import itertools
+import threading
+import time
+
+from search import PrefixIndex
+
+
+class Generation:
+    """An immutable catalog: apps (a sequence of records), their index and an id.
+
+    The records are shared with the index and must not be modified once the
+    generation is published. index defaults to a PrefixIndex over apps.
+    """
+    __slots__ = ('id', 'apps', 'index', 'complete', 'created')
+
+    def __init__(self, id, apps, complete=True, index=None):
+        self.id = id
+        if index is None:
+            self.apps = tuple(apps)
+            self.index = PrefixIndex(self.apps)
+        else:
+            self.apps = apps
+            self.index = index
+        self.complete = complete  # False for partial catalogs shown while scanning
+        self.created = time.time()
+
+    def __len__(self):
+        return len(self.apps)
+
+    def search(self, query):
+        return self.index.search(query)
+
+
+class CatalogStore:
+    """Holds the current Generation; publish() from any thread, current() without locks."""
+    def __init__(self, apps=()):
+        self._ids = itertools.count()
+        self._publish_lock = threading.Lock()  # Orders publishers; readers never take it
+        self._current = Generation(next(self._ids), apps)
+
+    def current(self):
+        """Return the generation to use for one query (a plain attribute read)."""
+        return self._current
+
+    def publish(self, apps, complete=True, index=None):
+        """Build a generation for apps on the calling thread and make it current."""
+        with self._publish_lock:
+            generation = Generation(next(self._ids), apps, complete, index)
+            self._current = generation
+        return generation
@@ -0,0 +1,388 @@
+"""Memory-mapped catalog file: names, lowered names, paths, word index and fields.
+
+The catalog is written once per scan to a single binary file (see
+docs/CATALOG_FORMAT.md) and opened with mmap. MappedCatalog answers the same
+queries as search.PrefixIndex directly on the mapped bytes: prefix lookups
+bisect the sorted lowered-name table, substring lookups run bytes.find over
+the lowered-name pool, the extra search fields (publisher, product, aliases,
+exe name) are looked up in a sorted table of their word-start suffixes, and
+only the records that end up in a result are decoded into dicts. Processes mapping the same file share
+its pages.
+
+Every catalog file gets a new name, so a file stays valid for as long as any
+process has it mapped; save_catalog() removes older files it is allowed to.
+"""
+import mmap
+import os
+import struct
+import sys
+import time
+import zlib
+from array import array
+from bisect import bisect_left, bisect_right
+
+from search import (SAMPLE_SIZE, FIELD_WEIGHTS, EXTRA_FIELDS, field_values, field_keys,
+                    _rank_field_matches)
+
+MAGIC = b"OLCATLG\x00"
+VERSION = 2
+HEADER = struct.Struct("<8sHHIIIQ")  # magic, version, header size, count, word count, body crc, file size
+SECTION = struct.Struct("<QQ")       # offset from start of file, length in bytes
+SECTION_NAMES = ("name_offsets", "name_pool", "lower_offsets", "lower_pool",
+                 "path_offsets", "path_pool", "word_offsets", "word_pool", "word_ids",
+                 "field_offsets", "field_pool", "field_lower_offsets", "field_lower_pool",
+                 "field_ids", "field_kinds", "field_key_starts", "field_key_entries")
+HEADER_CRC = struct.Struct("<II")  # crc of the header before it, reserved (zero)
+HEADER_SIZE = HEADER.size + SECTION.size * len(SECTION_NAMES) + HEADER_CRC.size
+FILE_PREFIX = "catalog-"
+FILE_SUFFIX = ".olc"
+
+
+class CatalogFileError(ValueError):
+    """The file is not a catalog this version can read, or it is damaged."""
+
+
+def default_catalog_dir():
+    """Return the per-user directory for catalog files."""
+    base = os.environ.get("LOCALAPPDATA") or os.path.expanduser("~")
+    return os.path.join(base, "OfflineLauncher", "catalog")
+
+
+def _string_table(strings):
+    """Return (offsets, pool) for NUL-terminated UTF-8 strings."""
+    offsets = array("I", [0])
+    pool = bytearray()
+    for text in strings:
+        pool += text.encode("utf-8")
+        pool += b"\x00"
+        offsets.append(len(pool))
+    return offsets, bytes(pool)
+
+
+def _u32_bytes(values):
+    values = values if isinstance(values, array) else array("I", values)
+    if sys.byteorder != "little":
+        values = array("I", values)
+        values.byteswap()
+    return values.tobytes()
+
+
+def encode_catalog(apps):
+    """Return the catalog file contents for apps, sorted by lowered name."""
+    apps = sorted(apps, key=lambda app: app['name'].lower())
+    lowered = [app['name'].lower() for app in apps]
+    words = sorted((word, i) for i, name in enumerate(lowered) for word in set(name.split()))
+    # Field entries in record order; kinds index EXTRA_FIELDS
+    fields = [(i, EXTRA_FIELDS.index(field), value)
+              for i, app in enumerate(apps) for field, value in field_values(app)]
+    entries = {(i, EXTRA_FIELDS[kind], value.lower()): entry
+               for entry, (i, kind, value) in reversed(list(enumerate(fields)))}
+    # Field keys (search.field_keys) as (suffix, entry, byte offset of the suffix in the value)
+    keys = sorted((text[start:], entries[i, field, text], len(text[:start].encode("utf-8")))
+                  for i, app in enumerate(apps)
+                  for field, text, start, _ in field_keys(app, FIELD_WEIGHTS, lowered[i]))
+
+    name_offsets, name_pool = _string_table(app['name'] for app in apps)
+    lower_offsets, lower_pool = _string_table(lowered)
+    path_offsets, path_pool = _string_table(app['path'] for app in apps)
+    word_offsets, word_pool = _string_table(word for word, _ in words)
+    field_offsets, field_pool = _string_table(value for _, _, value in fields)
+    field_lower_offsets, field_lower_pool = _string_table(value.lower() for _, _, value in fields)
+    sections = [_u32_bytes(name_offsets), name_pool, _u32_bytes(lower_offsets), lower_pool,
+                _u32_bytes(path_offsets), path_pool, _u32_bytes(word_offsets), word_pool,
+                _u32_bytes(i for _, i in words),
+                _u32_bytes(field_offsets), field_pool, _u32_bytes(field_lower_offsets), field_lower_pool,
+                _u32_bytes(i for i, _, _ in fields), _u32_bytes(kind for _, kind, _ in fields),
+                _u32_bytes(field_lower_offsets[entry] + offset for _, entry, offset in keys),
+                _u32_bytes(entry for _, entry, _ in keys)]
+
+    body = bytearray()
+    table = []
+    for data in sections:
+        table.append((HEADER_SIZE + len(body), len(data)))
+        body += data
+        body += b"\x00" * (-len(body) % 8)  # Keep every section 8-byte aligned
+    header = HEADER.pack(MAGIC, VERSION, HEADER_SIZE, len(apps), len(words),
+                         zlib.crc32(body), HEADER_SIZE + len(body))
+    header += b"".join(SECTION.pack(offset, length) for offset, length in table)
+    header += HEADER_CRC.pack(zlib.crc32(header), 0)
+    return header + bytes(body)
+
+
+def write_catalog(path, apps):
+    """Write apps to path atomically (through a temporary file)."""
+    data = encode_catalog(apps)
+    temp_path = f"{path}.{os.getpid()}.tmp"
+    with open(temp_path, "wb") as f:
+        f.write(data)
+    os.replace(temp_path, path)
+    return path
+
+
+class _Strings:
+    """Sequence view of a string table; items are the raw UTF-8 bytes."""
+    def __init__(self, buf, offsets, pool_start):
+        self.buf = buf
+        self.offsets = offsets
+        self.pool_start = pool_start
+
+    def __len__(self):
+        return len(self.offsets) - 1
+
+    def __getitem__(self, i):
+        start = self.pool_start + self.offsets[i]
+        return self.buf[start:self.pool_start + self.offsets[i + 1] - 1]
+
+
+class _Suffixes:
+    """Sequence view of suffixes of a string table's strings, given as pool positions."""
+    def __init__(self, strings, starts, entries):
+        self.strings = strings
+        self.starts = starts
+        self.entries = entries
+
+    def __len__(self):
+        return len(self.starts)
+
+    def __getitem__(self, k):
+        strings = self.strings
+        end = strings.pool_start + strings.offsets[self.entries[k] + 1] - 1
+        return strings.buf[strings.pool_start + self.starts[k]:end]
+
+
+def _prefix_range(strings, prefix):
+    """Return the [lo, hi) run of a sorted string table whose items start with prefix."""
+    lo = bisect_left(strings, prefix)
+    if not prefix:
+        return lo, len(strings)
+    # UTF-8 never contains 0xff, so incrementing the last byte cannot overflow
+    return lo, bisect_left(strings, prefix[:-1] + bytes([prefix[-1] + 1]), lo)
+
+
+class MappedCatalog:
+    """A catalog file opened with mmap, searchable without loading it.
+
+    Behaves as a read-only sequence of {'name', 'path'} records, plus their
+    extra fields (decoded on first access and then reused), and offers the
+    PrefixIndex query methods with the default FIELD_WEIGHTS, which the
+    file's field keys were written for. verify=False skips the body
+    checksum, e.g. for files this process wrote.
+    """
+    def __init__(self, path, verify=True):
+        self.path = path
+        with open(path, "rb") as f:
+            try:
+                self._map = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+            except ValueError:  # Empty file
+                raise CatalogFileError(f"{path}: empty file")
+        try:
+            self._open(verify)
+        except CatalogFileError:
+            try:
+                self._map.close()
+            except BufferError:
+                pass  # Views of it are still alive; closed when they are collected
+            raise
+        self._records = {}
+
+    def _open(self, verify):
+        buf = self._map
+        size = len(buf)
+        if size < HEADER_SIZE:
+            raise CatalogFileError(f"{self.path}: truncated header")
+        magic, version, header_size, count, word_count, body_crc, file_size = HEADER.unpack_from(buf)
+        if magic != MAGIC:
+            raise CatalogFileError(f"{self.path}: not a catalog file")
+        if version != VERSION or header_size != HEADER_SIZE:
+            raise CatalogFileError(f"{self.path}: unsupported version {version}")
+        header_crc, reserved = HEADER_CRC.unpack_from(buf, HEADER_SIZE - HEADER_CRC.size)
+        if zlib.crc32(buf[:HEADER_SIZE - HEADER_CRC.size]) != header_crc or reserved:
+            raise CatalogFileError(f"{self.path}: header checksum mismatch")
+        if file_size != size:
+            raise CatalogFileError(f"{self.path}: expected {file_size} bytes, found {size}")
+        if verify and zlib.crc32(memoryview(buf)[HEADER_SIZE:]) != body_crc:
+            raise CatalogFileError(f"{self.path}: body checksum mismatch")
+
+        sections = {}
+        for i, name in enumerate(SECTION_NAMES):
+            offset, length = SECTION.unpack_from(buf, HEADER.size + i * SECTION.size)
+            if offset < HEADER_SIZE or offset % 4 or offset + length > size:
+                raise CatalogFileError(f"{self.path}: section {name} out of bounds")
+            sections[name] = (offset, length)
+
+        def u32(name, expected=None):
+            offset, length = sections[name]
+            if length != 4 * (length // 4 if expected is None else expected):
+                raise CatalogFileError(f"{self.path}: section {name} has the wrong size")
+            values = memoryview(buf)[offset:offset + length].cast("I")
+            if sys.byteorder != "little":
+                values = array("I", values)
+                values.byteswap()
+            return values
+
+        def strings(table, pool, expected):
+            offsets = u32(table, expected + 1)
+            pool_start, pool_length = sections[pool]
+            if offsets[0] != 0 or offsets[-1] != pool_length:
+                raise CatalogFileError(f"{self.path}: section {pool} does not match its offsets")
+            return _Strings(buf, offsets, pool_start)
+
+        self.names = strings("name_offsets", "name_pool", count)
+        self.lowered = strings("lower_offsets", "lower_pool", count)
+        self.paths = strings("path_offsets", "path_pool", count)
+        self.words = strings("word_offsets", "word_pool", word_count)
+        self.word_ids = u32("word_ids", word_count)
+        self._lower_start, self._lower_length = sections["lower_pool"]
+
+        # The field count is implied by the length of the ids section
+        self.field_ids = u32("field_ids")
+        field_count = len(self.field_ids)
+        self.field_kinds = u32("field_kinds", field_count)
+        self.fields = strings("field_offsets", "field_pool", field_count)
+        self.fields_lowered = strings("field_lower_offsets", "field_lower_pool", field_count)
+        self.field_key_entries = u32("field_key_entries")
+        self.field_keys = _Suffixes(self.fields_lowered,
+                                    u32("field_key_starts", len(self.field_key_entries)),
+                                    self.field_key_entries)
+        self._kind_weights = [FIELD_WEIGHTS.get(field, 0) for field in EXTRA_FIELDS]
+
+    def __len__(self):
+        return len(self.names)
+
+    def record(self, i):
+        """Return record i as a dict; the same dict on every call."""
+        record = self._records.get(i)
+        if record is None:
+            try:
+                record = {'name': self.names[i].decode("utf-8"),
+                          'path': self.paths[i].decode("utf-8")}
+                ids = self.field_ids
+                for entry in range(bisect_left(ids, i), bisect_right(ids, i)):
+                    field = EXTRA_FIELDS[self.field_kinds[entry]]
+                    value = self.fields[entry].decode("utf-8")
+                    if field == 'aliases':
+                        record.setdefault('aliases', []).append(value)
+                    elif field != 'exe':  # Derived from the path
+                        record[field] = value
+            except UnicodeDecodeError as e:
+                raise CatalogFileError(f"{self.path}: record {i} is not valid UTF-8: {e}")
+            self._records[i] = record
+        return record
+
+    def __getitem__(self, index):
+        if isinstance(index, slice):
+            return [self.record(i) for i in range(*index.indices(len(self)))]
+        if index < 0:
+            index += len(self)
+        if not 0 <= index < len(self):
+            raise IndexError(index)
+        return self.record(index)
+
+    def __iter__(self):
+        return (self.record(i) for i in range(len(self)))
+
+    def starts_with(self, prefix):
+        """Return the apps whose lowered name starts with prefix, in catalog order."""
+        lo, hi = _prefix_range(self.lowered, prefix.encode("utf-8"))
+        return [self.record(i) for i in range(lo, hi)]
+
+    def word_starts_with(self, prefix):
+        """Return the apps with a word starting with prefix, in catalog order."""
+        lo, hi = _prefix_range(self.words, prefix.encode("utf-8"))
+        return [self.record(i) for i in sorted(set(self.word_ids[lo:hi]))]
+
+    def _containing(self, term):
+        """Return the positions of the lowered names containing term, ascending."""
+        buf = self._map
+        offsets = self.lowered.offsets
+        start = self._lower_start
+        end = start + self._lower_length
+        found = []
+        position = buf.find(term, start, end)
+        while position != -1:
+            # Names are NUL-terminated, so a match never spans two names
+            i = bisect_right(offsets, position - start) - 1
+            found.append(i)
+            position = buf.find(term, start + offsets[i + 1], end)
+        return found
+
+    def search(self, query):
+        """Rank apps for query exactly like search.search_apps()."""
+        if not query:
+            return self[:SAMPLE_SIZE]
+
+        query_terms = [term.encode("utf-8") for term in query.split()]
+        other_terms = query_terms[1:]
+        query_bytes = query.encode("utf-8")
+        lowered = self.lowered
+
+        lo, hi = _prefix_range(lowered, query_terms[0])
+        exact_matches = []
+        starts_with = []
+        for i in range(lo, hi):
+            name_lower = lowered[i]
+            if name_lower == query_bytes:
+                exact_matches.append(i)
+            elif all(term in name_lower for term in other_terms):
+                starts_with.append(i)
+
+        candidates = [i for i in self._containing(query_terms[0]) if i < lo or i >= hi]
+        for term in other_terms:
+            candidates = [i for i in candidates if term in lowered[i]]
+
+        field_matches = _rank_field_matches(query_terms, [self._field_hits(term) for term in query_terms],
+                                            lowered.__getitem__, FIELD_WEIGHTS.get('name', 0),
+                                            self.record)
+        return [self.record(i) for i in exact_matches + starts_with + candidates] + field_matches
+
+    def _field_hits(self, term):
+        """Return {record number: best weight} of the field values with a word starting with term."""
+        lo, hi = _prefix_range(self.field_keys, term)
+        ids = self.field_ids
+        kinds = self.field_kinds
+        weights = self._kind_weights
+        hits = {}
+        for entry in self.field_key_entries[lo:hi]:
+            weight = weights[kinds[entry]]
+            if weight and weight > hits.get(ids[entry], 0):
+                hits[ids[entry]] = weight
+        return hits
+
+
+def catalog_files(directory):
+    """Return the catalog files in directory, newest first."""
+    try:
+        names = [name for name in os.listdir(directory)
+                 if name.startswith(FILE_PREFIX) and name.endswith(FILE_SUFFIX)]
+    except OSError:
+        return []
+    return [os.path.join(directory, name) for name in sorted(names, reverse=True)]
+
+
+def save_catalog(apps, directory=None):
+    """Write apps as a new catalog file and remove older ones; returns its path.
+
+    Files still mapped by another process cannot be removed on Windows and
+    are left for a later save.
+    """
+    directory = directory or default_catalog_dir()
+    os.makedirs(directory, exist_ok=True)
+    path = os.path.join(directory, f"{FILE_PREFIX}{time.time_ns():020d}{FILE_SUFFIX}")
+    write_catalog(path, apps)
+    for old_path in catalog_files(directory):
+        if old_path != path:
+            try:
+                os.remove(old_path)
+            except OSError:
+                pass
+    return path
+
+
+def load_latest(directory=None):
+    """Return a MappedCatalog of the newest readable catalog file, or None."""
+    for path in catalog_files(directory or default_catalog_dir()):
+        try:
+            return MappedCatalog(path)
+        except (OSError, CatalogFileError) as e:
+            print(f"Warning: Ignoring catalog file {path}: {e}")
+    return None
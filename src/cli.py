@@ -0,0 +1,64 @@
+"""Command line client for a running OfflineLauncher.
+
+Usage:
+    python cli.py search <query> [--limit N] [--json]
+    python cli.py launch <name>
+    python cli.py metrics [--output FILE]
+    python cli.py show | refresh | ping
+
+Talks to the launcher over the local IPC endpoint, so searches use the
+index that is already in memory instead of scanning again.
+"""
+import argparse
+import json
+import sys
+
+import ipc
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(prog="cli.py", description="Control a running OfflineLauncher")
+    commands = parser.add_subparsers(dest="command", required=True)
+    search = commands.add_parser("search", help="search the launcher's application index")
+    search.add_argument("query", nargs="+")
+    search.add_argument("--limit", type=int, default=20)
+    search.add_argument("--json", action="store_true", help="print results as JSON")
+    launch = commands.add_parser("launch", help="launch the best match for a name")
+    launch.add_argument("name", nargs="+")
+    metrics = commands.add_parser("metrics", help="print the launcher's performance metrics as JSON")
+    metrics.add_argument("--output", help="write them to a file instead")
+    for command in ("show", "refresh", "ping"):
+        commands.add_parser(command)
+    args = parser.parse_args(argv)
+
+    try:
+        if args.command == "search":
+            results = ipc.call("search", " ".join(args.query), args.limit)
+            if args.json:
+                print(json.dumps(results, indent=2))
+            else:
+                for app in results:
+                    print(f"{app['name']}\t{app['path']}")
+        elif args.command == "launch":
+            app = ipc.call("launch", " ".join(args.name))
+            print(f"Launched {app['name']} ({app['path']})")
+        elif args.command == "metrics":
+            snapshot = json.dumps(ipc.call("metrics"), indent=2)
+            if args.output:
+                with open(args.output, "w", encoding="utf-8") as f:
+                    f.write(snapshot)
+            else:
+                print(snapshot)
+        else:
+            print(ipc.call(args.command))
+    except ipc.NotRunning:
+        print("OfflineLauncher is not running.", file=sys.stderr)
+        return 2
+    except (RuntimeError, TimeoutError) as e:
+        print(f"Error: {e}", file=sys.stderr)
+        return 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,209 @@
+"""asyncio core that owns the launcher's background work.
+
+Tk has to run mainloop() on the main thread, so the core runs its event
+loop on a thread of its own and the two meet at one pump in each direction:
+
+- Any thread to the core: task() and submit() hand a coroutine to the loop
+  (call_soon_threadsafe) and return a concurrent.futures.Future.
+- The core to the Tk thread: ui() posts a named event to the EventBridge,
+  which wakes Tk with a virtual event and runs the handler there.
+
+Scanning, the IPC server, prefetching and launches are named tasks of the
+core. Blocking calls go through blocking(), which runs them in the core's
+thread pool; when the awaiting task is cancelled, blocking() sets the
+call's cancel Event (or calls its cancel function) and waits for the call
+to return, so no work outlives its task. shutdown() cancels every task and
+waits for them before it stops the loop.
+"""
+import asyncio
+import threading
+import time
+from collections import deque
+from concurrent.futures import Future, ThreadPoolExecutor, TimeoutError as FutureTimeout
+
+MAX_WORKERS = 8
+SHUTDOWN_TIMEOUT = 5.0  # Seconds shutdown() waits for cancelled tasks
+LATENCY_SAMPLES = 256   # Recent submit-to-start latencies kept for stats()
+
+
+class TaskRunning(Exception):
+    """A task with that name is already running."""
+
+
+class CoreClosed(Exception):
+    """The core is shutting down and starts no more tasks."""
+
+
+class AsyncCore:
+    """An asyncio loop on its own thread, running named tasks.
+
+    ui_events is the EventBridge that ui() posts to; benchmarks pass a
+    bridge pumped by a stand-in UI thread.
+    """
+    def __init__(self, ui_events=None, max_workers=MAX_WORKERS, clock=time.perf_counter):
+        self.ui_events = ui_events
+        self.clock = clock
+        self.loop = asyncio.new_event_loop()
+        self._executor = ThreadPoolExecutor(max_workers, thread_name_prefix="CoreWorker")
+        self.loop.set_default_executor(self._executor)
+        self._tasks = {}  # name -> asyncio.Task (loop thread only)
+        self._thread = None
+        self._closing = False
+        self.counters = {'started': 0, 'refused': 0, 'cancelled': 0, 'failed': 0, 'blocking': 0}
+        self.latencies = deque(maxlen=LATENCY_SAMPLES)
+
+    def start(self):
+        """Start the loop thread; returns self once the loop is running."""
+        ready = threading.Event()
+
+        def run():
+            asyncio.set_event_loop(self.loop)
+            self.loop.call_soon(ready.set)
+            self.loop.run_forever()
+            self.loop.close()
+
+        self._thread = threading.Thread(target=run, name="LauncherCore", daemon=True)
+        self._thread.start()
+        ready.wait()
+        return self
+
+    # --- Any thread to the core ---
+
+    def task(self, name, coro, replace=False):
+        """Run coro as the task called name; safe to call from any thread.
+
+        Returns a concurrent Future of its result. If a task of that name is
+        running, the future fails with TaskRunning, unless replace is set:
+        then the running one is cancelled and coro starts once it has ended.
+        """
+        future = Future()
+        if self._closing:
+            coro.close()
+            future.set_exception(CoreClosed(name))
+        else:
+            self.loop.call_soon_threadsafe(self._start_task, name, coro, replace, future, self.clock())
+        return future
+
+    def submit(self, coro):
+        """Run coro on the loop without a name (e.g. a quick query); safe from any thread."""
+        return asyncio.run_coroutine_threadsafe(coro, self.loop)
+
+    def running(self, name):
+        return name in self._tasks
+
+    def cancel(self, name):
+        """Cancel the task called name, if it is running; safe from any thread."""
+        def cancel():
+            task = self._tasks.get(name)
+            if task is not None:
+                task.cancel()
+        self.loop.call_soon_threadsafe(cancel)
+
+    def _start_task(self, name, coro, replace, future, submitted_at):
+        self.latencies.append(self.clock() - submitted_at)
+        previous = self._tasks.get(name)
+        if self._closing or (previous is not None and not replace):
+            coro.close()
+            self.counters['refused'] += 1
+            future.set_exception(CoreClosed(name) if self._closing else TaskRunning(name))
+            return
+        if previous is not None:
+            previous.cancel()
+        task = self.loop.create_task(self._run(name, coro, previous), name=name)
+        self._tasks[name] = task
+        self.counters['started'] += 1
+        task.add_done_callback(lambda task: _copy_outcome(task, future))
+
+    async def _run(self, name, coro, previous):
+        try:
+            if previous is not None:
+                await asyncio.wait([previous])
+            return await coro
+        except asyncio.CancelledError:
+            self.counters['cancelled'] += 1
+            raise
+        except Exception as e:
+            self.counters['failed'] += 1
+            print(f"Error in task '{name}': {type(e).__name__}: {e}")
+            raise
+        finally:
+            coro.close()  # In case it never started
+            if self._tasks.get(name) is asyncio.current_task():
+                del self._tasks[name]
+
+    # --- Inside tasks ---
+
+    async def blocking(self, fn, *args, cancel=None):
+        """Run fn(*args) in the core's thread pool and return its result.
+
+        If the awaiting task is cancelled, cancel (a threading.Event, or a
+        function) tells fn to stop, and the task waits for fn to return
+        before the cancellation goes on.
+        """
+        self.counters['blocking'] += 1
+        future = self.loop.run_in_executor(self._executor, fn, *args)
+        try:
+            return await asyncio.shield(future)
+        except asyncio.CancelledError:
+            if cancel is not None:
+                cancel.set() if isinstance(cancel, threading.Event) else cancel()
+            while not future.done():
+                try:
+                    await asyncio.wait([future])
+                except asyncio.CancelledError:
+                    pass  # Cancelled again (e.g. by shutdown); still wait for fn
+            if not future.cancelled():
+                future.exception()  # Retrieved, so it is not reported as unhandled
+            raise
+
+    def ui(self, name, *args):
+        """Post an event to the Tk thread; safe to call from any thread."""
+        if self.ui_events is not None:
+            self.ui_events.post(name, *args)
+
+    # --- Shutdown ---
+
+    def shutdown(self, timeout=SHUTDOWN_TIMEOUT):
+        """Cancel every task, wait up to timeout for them and stop the loop.
+
+        Returns True if all tasks ended in time. Call it from outside the
+        loop thread, e.g. after mainloop() has returned.
+        """
+        if self._thread is None:
+            return True
+        finished = True
+        try:
+            asyncio.run_coroutine_threadsafe(self._cancel_all(), self.loop).result(timeout)
+        except FutureTimeout:
+            finished = False
+            print(f"Warning: Tasks still running at shutdown: {', '.join(sorted(self._tasks))}")
+        self.loop.call_soon_threadsafe(self.loop.stop)
+        self._thread.join(timeout)
+        self._executor.shutdown(wait=False, cancel_futures=True)
+        self._thread = None
+        return finished
+
+    async def _cancel_all(self):
+        self._closing = True
+        tasks = list(self._tasks.values())
+        for task in tasks:
+            task.cancel()
+        await asyncio.gather(*tasks, return_exceptions=True)
+
+    def stats(self):
+        """Return task counters and the worst recent submit-to-start latency in ms."""
+        latencies = list(self.latencies)
+        stats = dict(self.counters)
+        stats['running'] = len(self._tasks)
+        stats['max_latency_ms'] = max(latencies) * 1000.0 if latencies else 0.0
+        return stats
+
+
+def _copy_outcome(task, future):
+    """Settle a concurrent Future from a finished asyncio task."""
+    if task.cancelled():
+        future.cancel()
+    elif task.exception() is not None:
+        future.set_exception(task.exception())
+    else:
+        future.set_result(task.result())
@@ -0,0 +1,133 @@
+"""Canonicalization and merging of app records found by different sources.
+
+Scanners emit records of the form {'name', 'path', 'sources'}. add_record()
+folds records with the same literal path together as they are found;
+merge_apps() then collapses records whose paths are spelled differently but
+point at the same executable (8.3 short names, junctions/symlinks, launcher
+stubs, hard links), keyed by target identity. Both stages are O(n) dict
+lookups on hashed keys.
+"""
+import re
+
+# Lower rank wins when records disagree on the display name. Start Menu
+# shortcut names are what users already know the app by; Uninstall
+# DisplayNames often carry versions and architectures; names derived from
+# exe basenames are the last resort.
+NAME_PRIORITY = {
+    "start_menu": 0,
+    "registry": 1,
+    "desktop": 2,
+    "app_paths": 3,
+    "program_dirs": 4,
+    "path": 5,
+}
+
+_SHORT_NAME_RE = re.compile(r"~\d")
+_VERSION_RE = re.compile(r"\d+")
+
+
+def name_rank(source):
+    """Return the display-name priority of a source id."""
+    return NAME_PRIORITY.get(source, len(NAME_PRIORITY))
+
+
+def add_record(apps_dict, record):
+    """Add a scan record to apps_dict, merging it with a record for the same path."""
+    app_key = record['path'].lower()
+    existing = apps_dict.get(app_key)
+    if existing is None:
+        apps_dict[app_key] = record
+    else:
+        _merge_record(existing, record)
+
+
+def _merge_record(existing, record):
+    """Fold record into existing: union of sources, best name, cleanest path.
+
+    The kept path is the most readable spelling seen; extra search fields
+    missing from existing are taken from record. Invariant: a record's
+    name always comes from its best-ranked source, so comparing against the
+    best rank among existing['sources'] is enough.
+    """
+    best_existing = min(name_rank(s) for s in existing['sources'])
+    best_new = min(name_rank(s) for s in record['sources'])
+    if best_new < best_existing:
+        existing['name'] = record['name']
+    if _path_quality(record['path']) < _path_quality(existing['path']):
+        existing['path'] = record['path']
+    for source in record['sources']:
+        if source not in existing['sources']:
+            existing['sources'].append(source)
+    for field in ('publisher', 'product'):
+        if record.get(field) and not existing.get(field):
+            existing[field] = record[field]
+
+
+def _path_quality(path):
+    """Lower is better: prefer long names over 8.3 names, and real case over all caps."""
+    if _SHORT_NAME_RE.search(path):
+        return 2
+    if path == path.upper():
+        return 1
+    return 0
+
+
+def resolve_stub(path, name, fs):
+    """Return the real executable behind a known launcher stub, or None.
+
+    Handles Squirrel installers (Discord, Slack, Teams classic...), whose
+    shortcuts target <dir>\\Update.exe while the app lives in the newest
+    <dir>\\app-<version>\\<Name>.exe.
+    """
+    if fs.path.basename(path).lower() != "update.exe":
+        return None
+    stub_dir = fs.path.dirname(path)
+    try:
+        app_dirs = [d for d in fs.listdir(stub_dir)
+                    if d.lower().startswith("app-") and fs.isdir(fs.path.join(stub_dir, d))]
+    except OSError:
+        return None
+    if not app_dirs:
+        return None
+    newest = max(app_dirs, key=lambda d: [int(n) for n in _VERSION_RE.findall(d)])
+    wanted = _alnum(name)
+    for exe in fs.glob(fs.path.join(stub_dir, newest), "*.exe"):
+        if _alnum(fs.path.splitext(fs.path.basename(exe))[0]) == wanted:
+            return exe
+    return None
+
+
+def _alnum(text):
+    return "".join(c for c in text.lower() if c.isalnum())
+
+
+def target_identity(path, fs):
+    """Return a hashable key identifying the file path refers to.
+
+    Uses the volume/file ID when the filesystem reports one, else size and
+    mtime plus the basename, else the normalized real path.
+    """
+    real = fs.realpath(path)
+    try:
+        st = fs.stat(real)
+    except OSError:
+        return ("path", fs.path.normcase(real))
+    if st.st_ino:
+        return ("file", st.st_dev, st.st_ino)
+    return ("stat", st.st_size, st.st_mtime, fs.path.basename(real).lower())
+
+
+def merge_apps(records, fs):
+    """Collapse records that point at the same executable and return the merged list."""
+    merged = {}
+    for record in records:
+        stub_target = resolve_stub(record['path'], record['name'], fs)
+        if stub_target:
+            record['path'] = stub_target
+        key = target_identity(record['path'], fs)
+        existing = merged.get(key)
+        if existing is None:
+            merged[key] = record
+        else:
+            _merge_record(existing, record)
+    return list(merged.values())
@@ -0,0 +1,104 @@
+"""Hand-off of events from other threads to the Tk thread.
+
+The keyboard hook, the tray icon, the IPC server and the core's event loop
+(core.py) all run on their own threads, and Tk may only be touched from the
+thread running mainloop().
+Those threads post() named events to an EventBridge instead; the bridge
+wakes the Tk thread once per batch with a virtual event and pump() then runs
+the handlers there, in the order the events were posted.
+
+Coalescing events (hotkey toggles, "show") are dropped while an identical
+one is still waiting, so a burst of key repeats while the UI is busy turns
+into a single toggle instead of an unpredictable number of them.
+"""
+import threading
+import time
+from collections import deque
+
+WAKE_EVENT = "<<LauncherEvent>>"
+LATENCY_SAMPLES = 256  # Recent post-to-dispatch latencies kept for stats()
+
+
+class EventBridge:
+    """Queue of (name, args) events from any thread, dispatched on the Tk thread.
+
+    handlers maps an event name to the function run for it. wake is called
+    (from the posting thread) when the queue goes from empty to non-empty;
+    attach() sets it up for a Tk root, tests and benchmarks pass their own.
+    """
+    def __init__(self, handlers=None, wake=None, coalesce=("toggle", "show"),
+                 clock=time.perf_counter):
+        self.handlers = dict(handlers or {})
+        self.wake = wake
+        self.coalesce = set(coalesce)
+        self.clock = clock
+        self._events = deque()
+        self._waiting = set()  # Coalescing events currently queued
+        self._wake_pending = False
+        self._lock = threading.Lock()
+        self.posted = 0
+        self.coalesced = 0
+        self.dispatched = 0
+        self.latencies = deque(maxlen=LATENCY_SAMPLES)
+
+    def attach(self, root):
+        """Pump on the Tk thread whenever a producer wakes root.
+
+        Call on the Tk thread. Waking fails until mainloop() runs, so the
+        events posted before then are pumped once it starts.
+        """
+        root.bind(WAKE_EVENT, lambda event: self.pump())
+        self.wake = lambda: root.event_generate(WAKE_EVENT, when="tail")
+        root.after_idle(self.pump)
+
+    def post(self, name, *args):
+        """Queue an event; safe to call from any thread."""
+        with self._lock:
+            self.posted += 1
+            if name in self.coalesce:
+                key = (name, args)
+                if key in self._waiting:
+                    self.coalesced += 1
+                    return
+                self._waiting.add(key)
+            self._events.append((name, args, self.clock()))
+            wake = not self._wake_pending
+            self._wake_pending = True
+        if wake and self.wake is not None:
+            try:
+                self.wake()
+            except Exception as e:
+                # mainloop() is not running yet, or Tk is shutting down. The
+                # events stay queued; let the next post() try to wake it again.
+                with self._lock:
+                    self._wake_pending = False
+                print(f"Warning: Could not wake the UI thread for '{name}': {e}")
+
+    def pump(self):
+        """Run the handlers of all queued events (Tk thread only)."""
+        with self._lock:
+            self._wake_pending = False
+            events, self._events = self._events, deque()
+            self._waiting.clear()
+        for name, args, posted_at in events:
+            self.latencies.append(self.clock() - posted_at)
+            self.dispatched += 1
+            handler = self.handlers.get(name)
+            if handler is None:
+                print(f"Warning: No handler for event '{name}'")
+                continue
+            try:
+                handler(*args)
+            except Exception as e:
+                print(f"Error handling event '{name}': {e}")
+        return len(events)
+
+    def stats(self):
+        """Return counters and the worst recent post-to-dispatch latency in ms."""
+        latencies = list(self.latencies)
+        return {
+            'posted': self.posted,
+            'coalesced': self.coalesced,
+            'dispatched': self.dispatched,
+            'max_latency_ms': max(latencies) * 1000.0 if latencies else 0.0,
+        }
@@ -0,0 +1,178 @@
+"""Headless export of the discovered applications as JSON Lines.
+
+Usage:
+    launcher.py --export [--source ID ...] [--scope machine|user] [--limit N]
+                         [--budget SOURCE=SECONDS ...] [--first-pass]
+                         [--output FILE] [--stats FILE] [--replay ARCHIVE]
+
+Runs the launcher's discovery for inventory scripts without its GUI:
+launcher.py hands --export over before it imports Tk, pystray or keyboard,
+and this module imports none of them either. Each app is written as one
+JSON object per line ({'name', 'path', 'sources', and 'publisher' and
+'product' where known}) as soon as the source that found it has finished,
+so a consumer sees results while the slower sources still run. Apps that
+turn out to be the same executable as one already written (8.3 names,
+junctions, launcher stubs) are left out, like the launcher's merge does.
+
+The scanners' progress messages go to stderr, which ends with the timing
+of each source. --replay exports from a scan recording (scan_record.py)
+instead of this machine, e.g. on Linux; a recording only answers for the
+paths the launcher's own merge looked up, so an app first found under a
+path spelling it did not keep (e.g. an 8.3 name) may be listed twice.
+"""
+import argparse
+import contextlib
+import json
+import os
+import sys
+import threading
+import time
+
+import dedup
+import scanner
+
+SCOPES = {"machine": scanner.MACHINE, "user": scanner.USER}
+
+
+class JsonLinesExporter:
+    """Writes the records a ScanPlan has found and not yet written, up to limit.
+
+    flush() is the ScanPlan's progress callback; once limit records are
+    written, done is set, which the plan checks as its cancel Event.
+    """
+    def __init__(self, out, fs, limit=None):
+        self.out = out
+        self.fs = fs
+        self.limit = limit
+        self.done = threading.Event()
+        self.apps = None  # The plan's records, by lowered path
+        self.written = 0
+        self.duplicates = 0
+        self._seen = set()        # Lowered paths already looked at
+        self._identities = set()  # Target identities already written
+
+    def flush(self, event=None):
+        if event is not None and event['type'] != 'progress':
+            return
+        for path_key, app in list(self.apps.items()):
+            if self.done.is_set():
+                break
+            if path_key in self._seen:
+                continue
+            self._seen.add(path_key)
+            record = dict(app, sources=list(app['sources']))
+            stub_target = dedup.resolve_stub(record['path'], record['name'], self.fs)
+            if stub_target:
+                record['path'] = stub_target
+            identity = dedup.target_identity(record['path'], self.fs)
+            if identity in self._identities:
+                self.duplicates += 1
+                continue
+            self._identities.add(identity)
+            self.out.write(json.dumps(record) + "\n")
+            self.written += 1
+            if self.limit is not None and self.written >= self.limit:
+                self.done.set()
+        self.out.flush()
+
+
+def export_apps(out, providers=None, sources=None, scope=None, budgets=None, limit=None,
+                resume=True):
+    """Scan and write each app found to out as a JSON line; returns the scan stats.
+
+    sources, scope and budgets are as for scanner.ScanPlan; limit stops the
+    scan once that many apps are written. Unless resume is False, the areas
+    a budget deferred are scanned once all sources have run.
+    """
+    start = time.perf_counter()
+    providers = providers or scanner.default_providers()
+    exporter = JsonLinesExporter(out, providers.fs, limit)
+    plan = scanner.ScanPlan(providers, budgets, exporter.flush, exporter.done, scope, sources)
+    exporter.apps = plan.apps
+    # Keep the scanners' messages out of the records
+    with contextlib.redirect_stdout(sys.stderr):
+        plan.run()
+        if plan.incomplete and resume and not exporter.done.is_set():
+            plan.resume()
+            exporter.flush()
+    stats = dict(plan.stats)
+    stats.update({'written': exporter.written, 'duplicates': exporter.duplicates,
+                  'deferred': len(plan.incomplete), 'limited': exporter.done.is_set(),
+                  'seconds': time.perf_counter() - start})
+    return stats
+
+
+def format_stats(stats):
+    """Return the stats of export_apps() as lines of text."""
+    lines = [f"Exported {stats['written']} apps in {stats['seconds']:.3f}s "
+             f"({stats['duplicates']} duplicates left out"
+             + (", stopped at the limit" if stats['limited'] else "")
+             + (f", {stats['deferred']} areas not scanned" if stats['deferred'] else "") + ")"]
+    for source in stats['sources']:
+        lines.append(f"  {source['source']:<14} {source['seconds']:.3f}s (budget {source['budget']}), "
+                     f"{source['found']} found, {source['deferred']} deferred")
+    if stats['resumed']:
+        resumed = stats['resumed']
+        lines.append(f"  {'resumed':<14} {resumed['seconds']:.3f}s, {resumed['areas']} areas, "
+                     f"{resumed['found']} found, {resumed['left']} left")
+    return lines
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(prog="launcher.py --export",
+                                     description="Write the installed applications as JSON Lines")
+    parser.add_argument("--source", action="append", metavar="ID",
+                        choices=[source_id for source_id, _, _ in scanner.SCAN_SOURCES],
+                        help="scan only this source (repeatable): %(choices)s")
+    parser.add_argument("--scope", choices=sorted(SCOPES), help="scan only machine-wide or per-user sources")
+    parser.add_argument("--limit", type=int, help="stop after writing this many apps")
+    parser.add_argument("--budget", action="append", default=[], metavar="SOURCE=SECONDS",
+                        help="time budget for a source (repeatable)")
+    parser.add_argument("--first-pass", action="store_true",
+                        help="skip what the budgets deferred instead of scanning it at the end")
+    parser.add_argument("--output", "-o", help="write the records to this file instead of stdout")
+    parser.add_argument("--stats", help="also write the timing stats to this file as JSON")
+    parser.add_argument("--replay", metavar="ARCHIVE", help="export from a scan recording")
+    args = parser.parse_args(argv)
+
+    budgets = {}
+    for budget in args.budget:
+        source, _, seconds = budget.partition("=")
+        try:
+            budgets[source] = float(seconds)
+        except ValueError:
+            parser.error(f"invalid budget '{budget}', expected SOURCE=SECONDS")
+
+    try:
+        if args.replay:
+            import scan_record
+            providers = scan_record.replay_providers(args.replay)[0]
+        else:
+            providers = scanner.default_providers()
+    except (ImportError, OSError, ValueError) as e:
+        print(f"Error: Cannot read applications: {e}", file=sys.stderr)
+        return 1
+
+    out = open(args.output, "w", encoding="utf-8") if args.output else sys.stdout
+    if out is None:  # A windowed build has no console to write to
+        return 2
+    try:
+        stats = export_apps(out, providers, args.source, SCOPES.get(args.scope), budgets, args.limit,
+                            resume=not args.first_pass)
+    except BrokenPipeError:
+        # The reader has stopped (e.g. piped into head); exit without a traceback
+        os.dup2(os.open(os.devnull, os.O_WRONLY), sys.stdout.fileno())
+        return 1
+    finally:
+        if args.output:
+            out.close()
+    for line in format_stats(stats):
+        print(line, file=sys.stderr)
+    if args.stats:
+        with open(args.stats, "w", encoding="utf-8") as f:
+            json.dump(stats, f, indent=2)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
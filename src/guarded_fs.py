@@ -0,0 +1,255 @@
+"""Probes of network paths that time out instead of hanging.
+
+Uninstall entries and shortcuts often point at UNC shares and mapped drives
+that are offline, and a single exists() on such a path can block for tens
+of seconds. NetworkGuard runs calls on network paths in a pool of daemon
+worker threads and gives up on them PROBE_TIMEOUT after they start. A host
+that did not answer is then marked unreachable for COOLDOWN seconds (a
+circuit breaker), so further paths on it fail at once instead of each
+waiting out the timeout. Local paths are not affected; they are probed
+directly. Time a probe spends queued behind others is not held against
+its host, and workers stuck on a dead host are replaced, so probes of
+working hosts do not queue behind them.
+
+GuardedFileSystem wraps a filesystem provider with a NetworkGuard: probes
+of an unreachable host answer as if the path did not exist. The default
+scan providers use one, and launches check network paths through the same
+guard, so a share the scan found dead is not waited for again.
+"""
+import queue
+import threading
+import time
+from collections import deque
+from concurrent.futures import Future, TimeoutError as FutureTimeout
+
+PROBE_TIMEOUT = 2.0  # Seconds a probe of a network path may take
+COOLDOWN = 60.0      # Seconds a host that timed out is skipped
+MAX_WORKERS = 8      # Probe threads, not counting ones abandoned on a dead host
+EVENT_SAMPLES = 100  # Recent timeouts and skips kept for stats()
+DRIVE_REMOTE = 4     # GetDriveTypeW result for mapped network drives
+
+
+class Unreachable(OSError):
+    """The path's host did not answer in time, or is marked unreachable."""
+
+
+def remote_drive(drive):
+    """True if drive (e.g. "Z:") is a mapped network drive; False off Windows."""
+    try:
+        import ctypes
+        return ctypes.windll.kernel32.GetDriveTypeW(drive + "\\") == DRIVE_REMOTE
+    except (ImportError, AttributeError, OSError):
+        return False
+
+
+def host_of(path, is_remote_drive=remote_drive):
+    """Return the host a network path lives on ("\\\\server" or "z:"), or None if it is local."""
+    path = path.replace("/", "\\")
+    if path.startswith(("\\\\?\\", "\\\\.\\")):  # Extended-length and device paths
+        rest = path[4:]
+        if rest[:4].lower() != "unc\\":
+            return host_of(rest, is_remote_drive)
+        path = "\\\\" + rest[4:]
+    if path.startswith("\\\\"):
+        server = path[2:].split("\\", 1)[0]
+        return "\\\\" + server.lower() if server else None
+    if len(path) >= 2 and path[1] == ":" and path[0].isalpha():
+        drive = path[:2].lower()
+        return drive if is_remote_drive(drive) else None
+    return None
+
+
+class Probe(Future):
+    """The Future of a pooled probe; started is set once a worker runs it."""
+    def __init__(self):
+        super().__init__()
+        self.started = threading.Event()
+
+
+class ProbePool:
+    """Daemon threads running probes; a probe that hangs only ties up its own thread.
+
+    A worker is started whenever none is idle, up to max_workers. Unlike a
+    ThreadPoolExecutor, the workers are daemon threads that are not joined
+    at exit, so a probe stuck on a dead share cannot hold up the process.
+    A worker whose probe is abandoned (it timed out) stops counting towards
+    max_workers, and exits once the probe returns.
+    """
+    def __init__(self, max_workers=MAX_WORKERS):
+        self.max_workers = max_workers
+        self._tasks = queue.SimpleQueue()
+        self._lock = threading.Lock()
+        self._workers = 0
+        self._idle = 0
+        self._abandoned = set()  # Running probes whose worker no longer counts
+
+    def submit(self, fn, *args):
+        future = Probe()
+        with self._lock:
+            self._add_worker()
+        self._tasks.put((future, fn, args))
+        return future
+
+    def _add_worker(self):
+        if self._idle == 0 and self._workers < self.max_workers:
+            self._workers += 1
+            threading.Thread(target=self._work, name="Probe", daemon=True).start()
+
+    def _work(self):
+        while True:
+            with self._lock:
+                self._idle += 1
+            future, fn, args = self._tasks.get()
+            with self._lock:
+                self._idle -= 1
+            if not future.set_running_or_notify_cancel():
+                continue
+            future.started.set()
+            try:
+                future.set_result(fn(*args))
+            except BaseException as e:
+                future.set_exception(e)
+            with self._lock:
+                if future in self._abandoned:
+                    # A replacement has taken this worker's place
+                    self._abandoned.discard(future)
+                    return
+
+    def abandon(self, future):
+        """Stop waiting for a running probe; its worker is replaced if more work comes."""
+        with self._lock:
+            if not future.done() and future not in self._abandoned:
+                self._abandoned.add(future)
+                self._workers -= 1
+                # Probes already queued must not wait for the stuck one
+                self._add_worker()
+
+
+class NetworkGuard:
+    """Runs calls on network paths with a timeout, skipping hosts that timed out.
+
+    is_remote_drive decides whether a drive letter is a mapped network
+    drive (remote_drive() asks Windows; the answer is cached per drive).
+    Counters and recent events are safe to read from any thread.
+    """
+    def __init__(self, timeout=PROBE_TIMEOUT, cooldown=COOLDOWN, pool=None,
+                 is_remote_drive=remote_drive, clock=time.monotonic):
+        self.timeout = timeout
+        self.cooldown = cooldown
+        self.pool = pool or ProbePool()
+        self.clock = clock
+        self._is_remote_drive = is_remote_drive
+        self._remote_drives = {}  # lowered drive -> bool
+        self._down = {}           # host -> time it may be probed again
+        self._lock = threading.Lock()
+        self.counters = {'probes': 0, 'timeouts': 0, 'skipped': 0}
+        self.events = deque(maxlen=EVENT_SAMPLES)
+
+    def host(self, path):
+        """Return the network host of path, or None if it is local."""
+        return host_of(path, self._remote_drive)
+
+    def _remote_drive(self, drive):
+        remote = self._remote_drives.get(drive)
+        if remote is None:
+            remote = self._remote_drives[drive] = bool(self._is_remote_drive(drive))
+        return remote
+
+    def call(self, path, fn, *args):
+        """Return fn(*args), a probe of path; raises Unreachable if path's host does not answer.
+
+        Calls on local paths run directly. Errors raised by fn propagate.
+        """
+        host = self.host(path)
+        if host is None:
+            return fn(*args)
+        until = self._down.get(host)
+        if until is not None and self.clock() < until:
+            self._event('skipped', host, path, fn)
+            raise Unreachable(f"{host} is not answering")
+        with self._lock:
+            self.counters['probes'] += 1
+        future = self.pool.submit(fn, *args)
+        # The timeout starts with the probe: waiting for a free worker says nothing about the host
+        future.started.wait()
+        try:
+            return future.result(self.timeout)
+        except FutureTimeout:
+            self.pool.abandon(future)
+            self._trip(host)
+            self._event('timeouts', host, path, fn)
+            raise Unreachable(f"{host} did not answer within {self.timeout}s")
+
+    def _trip(self, host):
+        with self._lock:
+            already_down = self._down.get(host, 0) > self.clock()
+            self._down[host] = self.clock() + self.cooldown
+        if not already_down:
+            print(f"Warning: {host} did not answer within {self.timeout}s; "
+                  f"skipping its paths for {self.cooldown:.0f}s")
+
+    def _event(self, kind, host, path, fn):
+        with self._lock:
+            self.counters[kind] += 1
+        self.events.append({'kind': kind, 'host': host, 'path': path,
+                            'call': getattr(fn, '__name__', str(fn)), 'at': self.clock()})
+
+    def hosts_down(self):
+        """Return the hosts currently skipped."""
+        now = self.clock()
+        return sorted(host for host, until in list(self._down.items()) if until > now)
+
+    def stats(self):
+        """Return the counters, the hosts currently skipped and the recent events."""
+        stats = dict(self.counters)
+        stats['hosts_down'] = self.hosts_down()
+        stats['events'] = list(self.events)
+        return stats
+
+
+class GuardedFileSystem:
+    """A filesystem provider whose probes of network paths go through a NetworkGuard.
+
+    Probes of an unreachable host answer like a missing path: False for
+    exists/isdir/isfile, nothing for listdir/glob, the path itself for
+    realpath, and Unreachable (an OSError) from stat/getsize.
+    """
+    def __init__(self, fs, guard):
+        self.path = fs.path
+        self.guard = guard
+        self._fs = fs
+
+    def _probe(self, fn, path, *args, missing=None):
+        try:
+            return self.guard.call(path, fn, path, *args)
+        except Unreachable:
+            if missing is Unreachable:
+                raise
+            return missing
+
+    def exists(self, path):
+        return self._probe(self._fs.exists, path, missing=False)
+
+    def isdir(self, path):
+        return self._probe(self._fs.isdir, path, missing=False)
+
+    def isfile(self, path):
+        return self._probe(self._fs.isfile, path, missing=False)
+
+    def listdir(self, path):
+        return self._probe(self._fs.listdir, path, missing=[])
+
+    def glob(self, directory, pattern):
+        return self._probe(self._fs.glob, directory, pattern, missing=[])
+
+    def getsize(self, path):
+        return self._probe(self._fs.getsize, path, missing=Unreachable)
+
+    def stat(self, path):
+        return self._probe(self._fs.stat, path, missing=Unreachable)
+
+    def realpath(self, path):
+        return self._probe(self._fs.realpath, path, missing=path)
+
+    def expandvars(self, path):
+        return self._fs.expandvars(path)
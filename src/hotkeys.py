@@ -0,0 +1,118 @@
+"""Global hotkeys through RegisterHotKey.
+
+The keyboard library hooks every key press on the machine, so its hook
+thread wakes for each keystroke the user types anywhere, launcher shown or
+not. RegisterHotKey asks Windows to post WM_HOTKEY for the launcher's own
+combinations only; the listener thread sleeps in GetMessage until then and
+costs nothing in between. The launcher falls back to the keyboard library
+where registration fails (another program owns the combination, or not
+Windows).
+"""
+import threading
+
+# Modifier names to RegisterHotKey flags (win32con.MOD_*)
+MODIFIERS = {"alt": 0x0001, "ctrl": 0x0002, "control": 0x0002, "shift": 0x0004, "win": 0x0008}
+MOD_NOREPEAT = 0x4000  # A held-down combination fires once
+WM_HOTKEY = 0x0312
+WM_QUIT = 0x0012
+HOTKEY_ID_BASE = 1000
+# Virtual-key codes of the named keys a hotkey may use besides letters and digits
+VIRTUAL_KEYS = {"space": 0x20, "enter": 0x0D, "tab": 0x09, "esc": 0x1B, "escape": 0x1B,
+                **{f"f{n}": 0x6F + n for n in range(1, 13)}}
+
+
+class HotkeyError(Exception):
+    """The hotkey cannot be parsed or registered."""
+
+
+def parse_hotkey(text):
+    """Return (modifier flags, virtual-key code) for a hotkey such as "shift+f"."""
+    *modifiers, key = [part.strip().lower() for part in text.split("+")]
+    flags = 0
+    for name in modifiers:
+        if name not in MODIFIERS:
+            raise HotkeyError(f"Unknown modifier '{name}' in hotkey '{text}'")
+        flags |= MODIFIERS[name]
+    if len(key) == 1 and key.isalnum() and key.isascii():
+        return flags, ord(key.upper())
+    if key in VIRTUAL_KEYS:
+        return flags, VIRTUAL_KEYS[key]
+    raise HotkeyError(f"Unknown key '{key}' in hotkey '{text}'")
+
+
+class HotkeyListener:
+    """Calls callback(hotkey) on its own thread whenever a registered hotkey is pressed.
+
+    Hotkeys are registered by the listener thread, which must also be the
+    one receiving their messages. start() raises HotkeyError if any of
+    them cannot be registered.
+    """
+    def __init__(self, hotkeys, callback):
+        self.hotkeys = list(hotkeys)
+        self.callback = callback
+        self.pressed = 0
+        self._thread = None
+        self._thread_id = None
+        self._started = threading.Event()
+        self._error = None
+
+    def start(self):
+        self._thread = threading.Thread(target=self._run, name="Hotkeys", daemon=True)
+        self._thread.start()
+        self._started.wait()
+        if self._error is not None:
+            raise self._error
+        return self
+
+    def stop(self):
+        if self._thread_id is not None:
+            import win32api
+            win32api.PostThreadMessage(self._thread_id, WM_QUIT, 0, 0)
+            self._thread.join(2.0)
+            self._thread_id = None
+
+    def _run(self):
+        try:
+            import win32api
+            import win32gui
+        except ImportError as e:
+            self._error = HotkeyError(f"RegisterHotKey needs pywin32: {e}")
+            self._started.set()
+            return
+        registered = []
+        try:
+            for i, hotkey in enumerate(self.hotkeys):
+                flags, vk = parse_hotkey(hotkey)
+                try:
+                    win32gui.RegisterHotKey(None, HOTKEY_ID_BASE + i, flags | MOD_NOREPEAT, vk)
+                except Exception as e:
+                    raise HotkeyError(f"Could not register hotkey '{hotkey}': {e}")
+                registered.append(HOTKEY_ID_BASE + i)
+        except HotkeyError as e:
+            self._error = e
+        else:
+            self._thread_id = win32api.GetCurrentThreadId()
+        self._started.set()
+        try:
+            if self._error is None:
+                self._loop(win32gui)
+        finally:
+            for hotkey_id in registered:
+                try:
+                    win32gui.UnregisterHotKey(None, hotkey_id)
+                except Exception:
+                    pass
+
+    def _loop(self, win32gui):
+        while True:
+            result, message = win32gui.GetMessage(None, 0, 0)
+            if result <= 0:  # WM_QUIT or an error
+                return
+            if message[1] == WM_HOTKEY:
+                self.pressed += 1
+                index = message[2] - HOTKEY_ID_BASE
+                if 0 <= index < len(self.hotkeys):
+                    try:
+                        self.callback(self.hotkeys[index])
+                    except Exception as e:
+                        print(f"Error handling hotkey '{self.hotkeys[index]}': {e}")
@@ -0,0 +1,296 @@
+"""Application icons for the result rows.
+
+Icons are never extracted on the Tk thread. IconGutter asks the IconLoader
+for the icons of the rows currently visible; anything not already in memory
+is queued for the loader's worker threads and drawn as a placeholder until
+the worker has extracted, resized and cached it. Decoded icons live in a
+bounded LRU in memory and as PNG files in an on-disk cache whose file names
+are derived from path, size and mtime, so a changed executable gets a new
+entry and stale ones age out.
+"""
+import hashlib
+import os
+import queue
+import threading
+from collections import OrderedDict
+
+ICON_SIZE = 16
+MEMORY_CACHE_SIZE = 512
+DISK_CACHE_MAX_FILES = 4000
+ICON_POLL_MS = 30
+
+
+def default_cache_dir():
+    """Return the per-user directory for cached icons."""
+    base = os.environ.get("LOCALAPPDATA") or os.path.expanduser("~")
+    return os.path.join(base, "OfflineLauncher", "icon_cache")
+
+
+def extract_icon(path):
+    """Extract the first icon of an executable as a PIL image (Windows only)."""
+    import win32con
+    import win32gui
+    import win32ui
+    from PIL import Image
+
+    large, small = win32gui.ExtractIconEx(path, 0)
+    try:
+        handles = small or large
+        if not handles:
+            return None
+        size = win32gui.GetSystemMetrics(win32con.SM_CXICON)
+        screen_dc = win32gui.GetDC(0)
+        try:
+            dc = win32ui.CreateDCFromHandle(screen_dc)
+            bitmap = win32ui.CreateBitmap()
+            bitmap.CreateCompatibleBitmap(dc, size, size)
+            mem_dc = dc.CreateCompatibleDC()
+            mem_dc.SelectObject(bitmap)
+            mem_dc.DrawIcon((0, 0), handles[0])
+            bits = bitmap.GetBitmapBits(True)
+            mem_dc.DeleteDC()
+            win32gui.DeleteObject(bitmap.GetHandle())
+        finally:
+            win32gui.ReleaseDC(0, screen_dc)
+        image = Image.frombuffer("RGBA", (size, size), bits, "raw", "BGRA", 0, 1)
+        if image.getextrema()[3][1] == 0:
+            # Icons without an alpha channel come back fully transparent
+            image.putalpha(255)
+        return image
+    finally:
+        for handle in large + small:
+            win32gui.DestroyIcon(handle)
+
+
+def placeholder_icon():
+    """Return the neutral icon shown until the real one is loaded."""
+    from PIL import Image, ImageDraw
+    image = Image.new("RGBA", (ICON_SIZE, ICON_SIZE), (0, 0, 0, 0))
+    ImageDraw.Draw(image).rounded_rectangle((2, 2, ICON_SIZE - 3, ICON_SIZE - 3),
+                                            radius=3, fill=(110, 110, 110, 255))
+    return image
+
+
+class IconCache:
+    """Bounded LRU of decoded icons in memory, backed by PNG files on disk."""
+    def __init__(self, cache_dir=None, max_items=MEMORY_CACHE_SIZE,
+                 max_files=DISK_CACHE_MAX_FILES):
+        self.cache_dir = cache_dir or default_cache_dir()
+        self.max_items = max_items
+        self.max_files = max_files
+        self._memory = OrderedDict()  # path.lower() -> PIL image
+        self._lock = threading.Lock()
+
+    def get(self, path):
+        """Return the icon for path from memory, or None. Never touches the disk."""
+        key = path.lower()
+        with self._lock:
+            image = self._memory.get(key)
+            if image is not None:
+                self._memory.move_to_end(key)
+            return image
+
+    def put(self, path, image):
+        with self._lock:
+            self._memory[path.lower()] = image
+            self._memory.move_to_end(path.lower())
+            while len(self._memory) > self.max_items:
+                self._memory.popitem(last=False)
+
+    def disk_path(self, path, st):
+        """Return the cache file for path as it is now (size and mtime from st)."""
+        key = f"{path.lower()}|{st.st_size}|{st.st_mtime_ns}".encode("utf-8")
+        return os.path.join(self.cache_dir, hashlib.sha1(key).hexdigest() + ".png")
+
+    def load_disk(self, cache_file):
+        from PIL import Image
+        try:
+            with Image.open(cache_file) as image:
+                image.load()
+                return image
+        except OSError:
+            return None
+
+    def store_disk(self, cache_file, image):
+        os.makedirs(self.cache_dir, exist_ok=True)
+        temp_file = f"{cache_file}.{threading.get_ident()}.tmp"
+        image.save(temp_file, format="PNG")
+        os.replace(temp_file, cache_file)
+
+    def prune(self):
+        """Delete the least recently written files beyond max_files."""
+        try:
+            entries = [e for e in os.scandir(self.cache_dir) if e.name.endswith(".png")]
+        except OSError:
+            return
+        if len(entries) <= self.max_files:
+            return
+        entries.sort(key=lambda e: e.stat().st_mtime)
+        for entry in entries[:len(entries) - self.max_files]:
+            try:
+                os.remove(entry.path)
+            except OSError:
+                pass
+
+
+class IconLoader:
+    """Loads icons on worker threads; results are picked up with take_ready()."""
+    def __init__(self, cache, extractor=extract_icon, workers=2, stat=os.stat):
+        self.cache = cache
+        self.extractor = extractor
+        self.stat = stat
+        self._requests = queue.LifoQueue()  # Most recently shown rows first
+        self._pending = set()
+        self._failed = set()  # Paths without an extractable icon
+        self._ready = queue.Queue()
+        self._lock = threading.Lock()
+        # The first worker also trims the disk cache before taking requests
+        self._threads = [threading.Thread(target=self._work, args=(i == 0,),
+                                          name=f"IconLoader-{i}", daemon=True)
+                         for i in range(workers)]
+        for thread in self._threads:
+            thread.start()
+
+    def request(self, path):
+        """Return the cached icon for path, or queue it and return None."""
+        image = self.cache.get(path)
+        if image is not None:
+            return image
+        key = path.lower()
+        with self._lock:
+            if key not in self._pending and key not in self._failed:
+                self._pending.add(key)
+                self._requests.put(path)
+        return None
+
+    def has_pending(self):
+        with self._lock:
+            return bool(self._pending)
+
+    def discard_pending(self):
+        """Forget queued requests, e.g. when the visible rows change completely."""
+        with self._lock:
+            self._pending.clear()
+            while True:
+                try:
+                    self._requests.get_nowait()
+                except queue.Empty:
+                    break
+
+    def take_ready(self):
+        """Return the paths whose icons finished loading since the last call."""
+        paths = []
+        while True:
+            try:
+                paths.append(self._ready.get_nowait())
+            except queue.Empty:
+                return paths
+
+    def _work(self, prune):
+        if prune:
+            self.cache.prune()
+        while True:
+            path = self._requests.get()
+            with self._lock:
+                if path.lower() not in self._pending:
+                    continue  # Discarded while queued
+            try:
+                image = self.load(path)
+            except Exception as e:
+                print(f"Error loading icon for {path}: {e}")
+                image = None
+            with self._lock:
+                self._pending.discard(path.lower())
+                if image is None:
+                    self._failed.add(path.lower())
+            if image is not None:
+                self.cache.put(path, image)
+                self._ready.put(path)
+
+    def load(self, path):
+        """Return the icon for path from the disk cache, extracting it if needed."""
+        st = self.stat(path)
+        cache_file = self.cache.disk_path(path, st)
+        image = self.cache.load_disk(cache_file)
+        if image is not None:
+            return image
+        image = self.extractor(path)
+        if image is None:
+            return None
+        if image.size != (ICON_SIZE, ICON_SIZE):
+            from PIL import Image
+            image = image.resize((ICON_SIZE, ICON_SIZE), Image.LANCZOS)
+        self.cache.store_disk(cache_file, image)
+        return image
+
+
+class IconGutter:
+    """Draws icons beside the visible rows of a Listbox on a narrow Canvas.
+
+    show() and redraw() only read the memory cache; missing icons are queued
+    and drawn as placeholders, and a short after() poll swaps them in while
+    requests are outstanding.
+    """
+    def __init__(self, canvas, listbox, loader, make_photo=None):
+        self.canvas = canvas
+        self.listbox = listbox
+        self.loader = loader
+        if make_photo is None:
+            from PIL import ImageTk
+            make_photo = ImageTk.PhotoImage
+        self.make_photo = make_photo
+        self.placeholder = make_photo(placeholder_icon())
+        self._photos = OrderedDict()  # path.lower() -> PhotoImage, bounded like the cache
+        self._results = []
+        self._poll_job = None
+
+    def show(self, results):
+        """Show icons for a new result list."""
+        self._results = results
+        self.loader.discard_pending()
+        self.redraw()
+
+    def redraw(self, *args):
+        """Redraw the icons of the rows currently visible in the listbox."""
+        self.canvas.delete("icon")
+        if not self._results:
+            return
+        first = self.listbox.nearest(0)
+        last = min(self.listbox.nearest(self.listbox.winfo_height()), len(self._results) - 1)
+        for index in range(first, last + 1):
+            bbox = self.listbox.bbox(index)
+            if not bbox:
+                continue
+            photo = self._photo(self._results[index]['path'])
+            y = bbox[1] + bbox[3] // 2
+            self.canvas.create_image(2, y, image=photo, anchor="w", tags="icon")
+        if self.loader.has_pending() and self._poll_job is None:
+            self._poll_job = self.canvas.after(ICON_POLL_MS, self._poll)
+
+    def _photo(self, path):
+        key = path.lower()
+        photo = self._photos.get(key)
+        if photo is not None:
+            self._photos.move_to_end(key)
+            return photo
+        image = self.loader.request(path)
+        if image is None:
+            return self.placeholder
+        photo = self._photos[key] = self.make_photo(image)
+        while len(self._photos) > self.loader.cache.max_items:
+            self._photos.popitem(last=False)
+        return photo
+
+    def _poll(self):
+        self._poll_job = None
+        if self.loader.take_ready():
+            self.redraw()
+        elif self.loader.has_pending():
+            self._poll_job = self.canvas.after(ICON_POLL_MS, self._poll)
+
+    def cancel(self):
+        """Stop polling, e.g. when the launcher is hidden."""
+        if self._poll_job is not None:
+            self.canvas.after_cancel(self._poll_job)
+            self._poll_job = None
+        self.loader.discard_pending()
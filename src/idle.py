@@ -0,0 +1,113 @@
+"""Idle state of the hidden launcher: nothing scheduled, nothing woken.
+
+While the launcher is hidden the process should not run at all until the
+next hotkey. IdleState.enter() cancels every pending Tk after() job (the
+focus retries of a show, the FocusOut confirmation, icon polls) and runs
+the suspend hooks (focus tracking, icon loading, prefetching); leave()
+runs their resume hooks when the launcher is shown again.
+
+While idle it measures what battery life depends on: CPU time of the whole
+process, timer callbacks that still fired and events that woke the Tk
+thread (including the hotkey that ends the idle period), all reported per
+hour of idle time by stats().
+"""
+import time
+
+HOUR = 3600.0
+
+
+def cancel_after_jobs(root):
+    """Cancel every pending after() job of root's Tk interpreter; returns how many."""
+    jobs = root.tk.splitlist(root.tk.call("after", "info"))
+    for job in jobs:
+        try:
+            root.after_cancel(job)
+        except Exception:
+            pass  # Fired or cancelled meanwhile
+    return len(jobs)
+
+
+class IdleState:
+    """Enters and leaves the idle state and measures the cost of being idle.
+
+    root is the Tk root whose after() jobs are cancelled (set it once Tk
+    exists). wakeups, if given, returns a running count of Tk thread
+    wakeups, e.g. the EventBridge's dispatched events.
+    """
+    def __init__(self, root=None, wakeups=None, clock=time.monotonic, cpu_clock=time.process_time):
+        self.root = root
+        self.wakeups = wakeups
+        self.clock = clock
+        self.cpu_clock = cpu_clock
+        self.idle = False
+        self._hooks = []  # (name, suspend, resume)
+        self._entered = None  # (time, cpu time, wakeups) at enter()
+        self.counters = {'entered': 0, 'jobs_cancelled': 0, 'timer_callbacks': 0, 'wakeups': 0,
+                         'seconds': 0.0, 'cpu_seconds': 0.0}
+
+    def add_hook(self, name, suspend, resume=None):
+        """Run suspend() on entering the idle state and resume() on leaving it."""
+        self._hooks.append((name, suspend, resume))
+
+    def after(self, widget, ms, fn, *args):
+        """widget.after(ms, fn, *args), counted if it fires while idle (it should not)."""
+        def run():
+            if self.idle:
+                self.counters['timer_callbacks'] += 1
+            fn(*args)
+        return widget.after(ms, run)
+
+    def enter(self):
+        """Go idle (Tk thread only); does nothing if already idle."""
+        if self.idle:
+            return
+        if self.root is not None:
+            self.counters['jobs_cancelled'] += cancel_after_jobs(self.root)
+        for name, suspend, _ in self._hooks:
+            try:
+                suspend()
+            except Exception as e:
+                print(f"Warning: Could not suspend {name}: {e}")
+        self.idle = True
+        self.counters['entered'] += 1
+        self._entered = (self.clock(), self.cpu_clock(), self.wakeups() if self.wakeups else 0)
+
+    def leave(self):
+        """Stop being idle (Tk thread only); does nothing if not idle."""
+        if not self.idle:
+            return
+        for name, value in self._since_enter().items():
+            self.counters[name] += value
+        self.idle = False
+        self._entered = None
+        for name, _, resume in reversed(self._hooks):
+            if resume is None:
+                continue
+            try:
+                resume()
+            except Exception as e:
+                print(f"Warning: Could not resume {name}: {e}")
+
+    def _since_enter(self):
+        """Return the time, CPU time and wakeups since enter()."""
+        entered = self._entered
+        if entered is None:
+            return {}
+        started, cpu_started, wakeups_started = entered
+        return {'seconds': self.clock() - started,
+                'cpu_seconds': self.cpu_clock() - cpu_started,
+                'wakeups': (self.wakeups() if self.wakeups else 0) - wakeups_started}
+
+    def stats(self):
+        """Return the idle totals plus CPU seconds, timer callbacks and wakeups per idle hour.
+
+        Safe to call from any thread; the current idle period counts so far.
+        """
+        stats = dict(self.counters)
+        for name, value in self._since_enter().items():
+            stats[name] += value
+        stats['idle'] = self.idle
+        hours = stats['seconds'] / HOUR
+        for name in ('cpu_seconds', 'timer_callbacks', 'wakeups'):
+            stats[f'{name}_per_hour'] = stats[name] / hours if hours else 0.0
+        return stats
@@ -0,0 +1,233 @@
+"""Local IPC between the running launcher and other processes.
+
+The first instance starts an IPCServer on a per-user, per-session endpoint
+(a named pipe on Windows, a Unix socket elsewhere). Owning that endpoint is
+what makes it the single instance: a second launcher finds the server,
+hands over its command ("show", "refresh") and exits, and the command line
+client (cli.py) uses the same channel to search and launch against the
+already built index.
+
+Messages are small dicts sent over multiprocessing.connection, which
+authenticates both ends with a per-user key before anything is unpickled.
+"""
+import os
+import sys
+import tempfile
+import threading
+from multiprocessing.connection import Listener, Client, AuthenticationError
+
+APP_NAME = "OfflineLauncher"
+REPLY_TIMEOUT = 5.0  # Seconds a client waits for an answer
+
+
+class NotRunning(Exception):
+    """No launcher instance is listening on the endpoint."""
+
+
+class AddressInUse(Exception):
+    """Another launcher instance already owns the endpoint."""
+
+
+def _family(address):
+    return "AF_PIPE" if address.startswith("\\\\.\\pipe\\") else "AF_UNIX"
+
+
+def _session_id():
+    try:
+        import ctypes
+        session = ctypes.c_ulong()
+        if ctypes.windll.kernel32.ProcessIdToSessionId(os.getpid(), ctypes.byref(session)):
+            return session.value
+    except Exception:
+        pass
+    return 0
+
+
+def default_address():
+    """Return the endpoint of the current user's launcher in this session."""
+    if sys.platform == "win32":
+        user = os.environ.get("USERNAME", "user")
+        return f"\\\\.\\pipe\\{APP_NAME}-{user}-{_session_id()}"
+    return os.path.join(tempfile.gettempdir(), f"{APP_NAME}-{os.getuid()}.sock")
+
+
+def default_key_file():
+    base = os.environ.get("LOCALAPPDATA") or os.path.expanduser("~")
+    return os.path.join(base, APP_NAME, "ipc.key")
+
+
+def load_authkey(key_file=None, create=False):
+    """Return the per-user IPC key, creating it (readable by the user only) if asked."""
+    key_file = key_file or default_key_file()
+    try:
+        with open(key_file, "rb") as f:
+            return f.read()
+    except FileNotFoundError:
+        if not create:
+            raise NotRunning(f"No IPC key at {key_file}")
+    os.makedirs(os.path.dirname(key_file), exist_ok=True)
+    key = os.urandom(32)
+    try:
+        fd = os.open(key_file, os.O_WRONLY | os.O_CREAT | os.O_EXCL | getattr(os, "O_BINARY", 0), 0o600)
+    except FileExistsError:
+        # Another instance created it first
+        with open(key_file, "rb") as f:
+            return f.read()
+    with os.fdopen(fd, "wb") as f:
+        f.write(key)
+    return key
+
+
+class IPCServer:
+    """Answers requests from other processes.
+
+    handlers maps a command name to a function called with the request's
+    arguments on a connection thread; its return value is sent back. Handlers
+    that touch Tk must hand the work over to the Tk thread themselves.
+    start() accepts connections on a thread of its own; a caller that runs
+    its own threads calls bind() and then serve_forever() until close().
+    """
+    def __init__(self, handlers, address=None, authkey=None):
+        self.handlers = dict(handlers)
+        self.handlers.setdefault("ping", lambda: "pong")
+        self.address = address or default_address()
+        self.authkey = authkey if authkey is not None else load_authkey(create=True)
+        self._listener = None
+        self._closed = threading.Event()
+        self._serving = False
+
+    def start(self):
+        """Bind the endpoint and start accepting; raises AddressInUse if it is taken."""
+        self.bind()
+        threading.Thread(target=self.serve_forever, name="IPCServer", daemon=True).start()
+
+    def bind(self):
+        """Claim the endpoint; raises AddressInUse if another instance has it."""
+        try:
+            self._listener = Listener(self.address, _family(self.address), authkey=self.authkey)
+        except OSError as e:
+            if _family(self.address) != "AF_UNIX" or not os.path.exists(self.address):
+                raise AddressInUse(str(e))
+            # A socket file is left behind if its owner died; reclaim it unless someone answers
+            if _is_listening(self.address, self.authkey):
+                raise AddressInUse(str(e))
+            os.unlink(self.address)
+            self._listener = Listener(self.address, "AF_UNIX", authkey=self.authkey)
+
+    def close(self):
+        self._closed.set()
+        if self._listener is None:
+            return
+        if self._serving:
+            # Closing the listener does not wake a blocked accept(); a last connection does
+            try:
+                Client(self.address, _family(self.address), authkey=self.authkey).close()
+            except (OSError, EOFError, AuthenticationError):
+                pass
+        try:
+            self._listener.close()
+        except OSError:
+            pass
+
+    def serve_forever(self):
+        """Accept connections, each answered on a thread of its own, until close()."""
+        self._serving = True
+        try:
+            while not self._closed.is_set():
+                try:
+                    conn = self._listener.accept()
+                except AuthenticationError:
+                    continue
+                except OSError:
+                    if self._closed.is_set():
+                        return
+                    continue
+                if self._closed.is_set():
+                    conn.close()
+                    return
+                threading.Thread(target=self._serve, args=(conn,), name="IPCConnection",
+                                 daemon=True).start()
+        finally:
+            self._serving = False
+
+    def _serve(self, conn):
+        """Answer requests on one connection until the client hangs up."""
+        with conn:
+            while True:
+                try:
+                    request = conn.recv()
+                except (EOFError, OSError):
+                    return
+                try:
+                    command = request['cmd']
+                    handler = self.handlers[command]
+                except (KeyError, TypeError):
+                    reply = {'ok': False, 'error': f"Unknown request: {request!r}"}
+                else:
+                    try:
+                        reply = {'ok': True, 'result': handler(*request.get('args', ()))}
+                    except Exception as e:
+                        reply = {'ok': False, 'error': f"{type(e).__name__}: {e}"}
+                try:
+                    conn.send(reply)
+                except OSError:
+                    return
+
+
+def _is_listening(address, authkey):
+    try:
+        IPCClient(address, authkey).close()
+        return True
+    except NotRunning:
+        return False
+
+
+class IPCClient:
+    """A connection to the running launcher; call() may be used repeatedly."""
+    def __init__(self, address=None, authkey=None, timeout=REPLY_TIMEOUT):
+        self.address = address or default_address()
+        self.timeout = timeout
+        self.authkey = authkey if authkey is not None else load_authkey()
+        self._conn = None
+        self._connect()
+
+    def _connect(self):
+        try:
+            self._conn = Client(self.address, _family(self.address), authkey=self.authkey)
+        except (FileNotFoundError, ConnectionRefusedError) as e:
+            raise NotRunning(str(e))
+        except OSError as e:
+            # ERROR_PIPE_BUSY and friends: the pipe exists but cannot be used
+            raise NotRunning(str(e))
+
+    def call(self, command, *args):
+        """Send a request and return its result; raises RuntimeError if it failed."""
+        if self._conn is None:
+            self._connect()
+        self._conn.send({'cmd': command, 'args': args})
+        if not self._conn.poll(self.timeout):
+            # The late reply would be read as the answer to the next call;
+            # drop the connection with it, the next call() reconnects
+            self.close()
+            raise TimeoutError(f"No reply to '{command}' within {self.timeout}s")
+        reply = self._conn.recv()
+        if not reply['ok']:
+            raise RuntimeError(reply['error'])
+        return reply['result']
+
+    def close(self):
+        if self._conn is not None:
+            self._conn.close()
+            self._conn = None
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+
+def call(command, *args, address=None, authkey=None):
+    """Send one request to the running launcher; raises NotRunning if there is none."""
+    with IPCClient(address, authkey) as client:
+        return client.call(command, *args)
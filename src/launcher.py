@@ -1,18 +1,44 @@
+import sys
+# Headless inventory export: runs before Tk, pystray and keyboard are imported
+if __name__ == "__main__" and "--export" in sys.argv[1:]:
+    import export
+    sys.exit(export.main([arg for arg in sys.argv[1:] if arg != "--export"]))
+# Scan profiling, likewise without the GUI
+if __name__ == "__main__" and "--profile-scan" in sys.argv[1:]:
+    import scan_profile
+    sys.exit(scan_profile.main([arg for arg in sys.argv[1:] if arg != "--profile-scan"]))
+
 import tkinter as tk
 from tkinter import ttk # Optional, for themed widgets
-import winreg
 import subprocess
 import os
-import sys
-import glob
 from pathlib import Path
-# Additional imports for better application discovery
-import winshell
-from win32com.client import Dispatch
+# Application discovery, search and result rendering
+import scanner
+from catalog import CatalogStore
+from search import QueryCache, load_aliases, apply_aliases
+import catalog_file
+# Machine-scope catalog shared by the sessions of a terminal server
+from shared_catalog import SharedCatalog, OverlayCatalog, user_only
+from results_view import ResultsView, NO_MATCHES_TEXT
+from icons import IconCache, IconLoader, IconGutter, ICON_SIZE
+from prefetch import Prefetcher, LaunchHistory
+# Single instance and the local query API
+import ipc
+# Hand-off from the hotkey, tray and IPC threads to the Tk thread
+from events import EventBridge
+# asyncio loop owning scans, the IPC server, prefetching and launches
+from core import AsyncCore, TaskRunning
+# Nothing scheduled and nothing hooked while the launcher is hidden
+from idle import IdleState
+from hotkeys import HotkeyListener, HotkeyError
+# Runtime counters and latency histograms (tray "Statistics", IPC "metrics")
+from metrics import MetricsRegistry, format_snapshot
 # Use keyboard library for hotkeys (simpler and more reliable)
 import keyboard
 import json
 import threading
+from concurrent.futures import TimeoutError as FutureTimeout
 import time
 import atexit
 # Add pystray for system tray icon
@@ -20,34 +46,40 @@ import pystray
 from PIL import Image, ImageDraw
 import io
 
-# --- Windows API specific imports for hotkeys ---
-import win32api
-import win32con
-import win32gui
-
 # --- Constants ---
 APP_NAME = "OfflineLauncher"
 # Remove CONFIG_FILE constant and use hardcoded hotkey
 HARDCODED_HOTKEY = "shift+f"
-# --- Hotkey constants ---
-HOTKEY_ID_BASE = 1000
-# Map of modifier names to win32con values
-MODIFIER_MAP = {
-    "shift": win32con.MOD_SHIFT,
-    "ctrl": win32con.MOD_CONTROL,
-    "control": win32con.MOD_CONTROL,
-    "alt": win32con.MOD_ALT,
-    "win": win32con.MOD_WIN
-}
 
 # --- Application Data ---
-installed_apps = [] # List to hold {'name': 'Display Name', 'path': 'executable_path'}
+# Current generation of {'name': 'Display Name', 'path': 'executable_path'} records
+# and their search index; scans publish new generations from their own thread
+catalog = CatalogStore()
+query_cache = QueryCache()  # Ranked results of recent queries against the current generation
+metrics = MetricsRegistry()
 # For hotkey management
 hotkey_registered = False
-exit_event = threading.Event()
+hotkey_listener = None  # HotkeyListener (RegisterHotKey); None if the keyboard hook is used instead
+# Cancels timers and suspends background work while the launcher is hidden
+idle_state = IdleState()
 config = {}  # Keep this for backward compatibility but don't use it
-launcher_hidden = False
+launcher_hidden = False  # Tk thread only
 root = None  # Global reference to root window
+ui_events = None  # EventBridge; other threads post to it instead of touching Tk
+core = None  # AsyncCore; background work runs as its tasks, never on the Tk thread
+icon_loader = None  # Loads result row icons in the background; None disables icons
+prefetcher = None  # Reads likely launches into the page cache; None disables prefetching
+launch_history = None
+PREFETCH_HISTORY_APPS = 3  # Most launched apps prefetched alongside the top result
+ipc_server = None  # Answers "show", "refresh", "search" and "launch" from other processes
+IPC_SEARCH_LIMIT = 20
+IPC_LAUNCH_WAIT = ipc.REPLY_TIMEOUT / 2  # Seconds "launch" waits for the process to start before replying
+# For background scanning
+scan_window = None  # (window, label, progress bar) shown until the initial scan's first pass
+shared_catalog = None  # SharedCatalog when the machine scope comes from the shared file
+machine_base = None  # This session's machine-scope catalog from shared_catalog, once it has one
+session_apps = None  # The user-scope records of the last complete scan, to layer over a new base
+layer_lock = threading.Lock()  # Orders publishing with machine_base against replacing it
 
 # --- Functions ---
 
@@ -56,7 +88,12 @@ def load_config():
     global config
     # Use hardcoded hotkey instead of loading from file
     config = {
-        "hotkeys": [HARDCODED_HOTKEY]
+        "hotkeys": [HARDCODED_HOTKEY],
+        # Seconds per scan source before deeper folders are left for the background pass
+        "scan_budgets": dict(scanner.DEFAULT_SCAN_BUDGETS),
+        # Share the machine-scope scan between sessions (for multi-session hosts)
+        "shared_catalog": "--shared-catalog" in sys.argv[1:]
+                          or os.environ.get("OFFLINELAUNCHER_SHARED_CATALOG") == "1",
     }
     print(f"Using hardcoded hotkey: {HARDCODED_HOTKEY}")
 
@@ -84,305 +121,376 @@ def get_screen_center(window):
     
     return x, y
 
-def extract_executable_path(display_icon_str):
-    """Tries to extract a valid executable path from DisplayIcon registry value."""
-    if not display_icon_str:
-        return None
-    path_part = display_icon_str.split(',')[0]
-    path = path_part.strip('"').strip()
-    if path and os.path.exists(path) and path.lower().endswith((".exe", ".com", ".bat", ".cmd")):
-        return path
-    return None
-
-def scan_installed_apps():
-    """Scans multiple sources for installed applications."""
-    global installed_apps
-    apps = {}  # Dictionary to avoid duplicates
-    
-    # Track progress
-    print("Scanning for installed applications...")
-    
-    # --- 1. Scan Windows Registry ---
-    print("Scanning Windows Registry...")
-    _scan_registry(apps)
-    
-    # --- 2. Scan Start Menu ---
-    print("Scanning Start Menu...")
-    _scan_start_menu(apps)
-    
-    # --- 3. Scan Common Program Directories ---
-    print("Scanning common program directories...")
-    _scan_program_dirs(apps)
-    
-    # --- 4. Scan Desktop Shortcuts ---
-    print("Scanning desktop shortcuts...")
-    _scan_desktop(apps)
-    
-    # --- Convert to list and sort by name ---
-    installed_apps = sorted(list(apps.values()), key=lambda x: x['name'].lower())
-    print(f"Scan complete. Found {len(installed_apps)} applications.")
-
-def _scan_registry(apps_dict):
-    """Scan Windows Registry for installed applications."""
-    registry_paths = [
-        (winreg.HKEY_LOCAL_MACHINE, r"SOFTWARE\Microsoft\Windows\CurrentVersion\App Paths"),
-        (winreg.HKEY_LOCAL_MACHINE, r"SOFTWARE\Microsoft\Windows\CurrentVersion\Uninstall"),
-        (winreg.HKEY_CURRENT_USER, r"SOFTWARE\Microsoft\Windows\CurrentVersion\Uninstall"),
-        (winreg.HKEY_LOCAL_MACHINE, r"SOFTWARE\Wow6432Node\Microsoft\Windows\CurrentVersion\Uninstall"),
-        (winreg.HKEY_CURRENT_USER, r"SOFTWARE\Wow6432Node\Microsoft\Windows\CurrentVersion\Uninstall"),
-    ]
-
-    for hkey, key_path in registry_paths:
-        try:
-            with winreg.OpenKey(hkey, key_path, 0, winreg.KEY_READ | winreg.KEY_ENUMERATE_SUB_KEYS) as key:
-                i = 0
-                while True:
-                    try:
-                        subkey_name = winreg.EnumKey(key, i)
-                        with winreg.OpenKey(key, subkey_name) as subkey:
-                            # For App Paths registry key, structure is different
-                            if "App Paths" in key_path:
-                                try:
-                                    path = winreg.QueryValueEx(subkey, "")[0]
-                                    if path and os.path.exists(path) and path.lower().endswith(".exe"):
-                                        # Use filename as app name if subkey_name ends with .exe
-                                        if subkey_name.lower().endswith(".exe"):
-                                            name = os.path.splitext(os.path.basename(subkey_name))[0]
-                                        else:
-                                            name = os.path.splitext(os.path.basename(path))[0]
-                                        
-                                        app_key = path.lower()
-                                        if app_key not in apps_dict:
-                                            apps_dict[app_key] = {'name': name, 'path': path}
-                                except (FileNotFoundError, OSError):
-                                    pass
-                            else:
-                                # For Uninstall registry keys
-                                display_name = None
-                                display_icon = None
-                                install_location = None
-
-                                def query_value(subkey_handle, value_name):
-                                    try: return winreg.QueryValueEx(subkey_handle, value_name)[0]
-                                    except (FileNotFoundError, OSError): return None
-
-                                display_name = query_value(subkey, "DisplayName")
-                                if not display_name or not isinstance(display_name, str):
-                                    i += 1
-                                    continue
-
-                                # Skip certain types of entries
-                                system_component = query_value(subkey, "SystemComponent")
-                                if system_component == 1: 
-                                    i += 1
-                                    continue
-                                    
-                                # Skip Windows Updates and certain system components
-                                name_lower = display_name.lower()
-                                filter_terms = ["update", "hotfix", "patch", "redistributable", 
-                                               "security update", "webview2 runtime",
-                                               "microsoft visual c++", "microsoft .net"]
-                                if any(term in name_lower for term in filter_terms): 
-                                    i += 1
-                                    continue
-
-                                # Look for executable path
-                                path = None
-                                
-                                # Try DisplayIcon first
-                                display_icon = query_value(subkey, "DisplayIcon")
-                                if display_icon and isinstance(display_icon, str):
-                                    path = extract_executable_path(display_icon)
-                                
-                                # Try InstallLocation if no path yet
-                                if not path:
-                                    uninstall_string = query_value(subkey, "UninstallString")
-                                    if uninstall_string and isinstance(uninstall_string, str):
-                                        # Extract the directory and look for main EXE
-                                        uninstall_dir = os.path.dirname(uninstall_string.strip('"'))
-                                        if os.path.exists(uninstall_dir):
-                                            potential_exes = glob.glob(os.path.join(uninstall_dir, "*.exe"))
-                                            for exe in potential_exes:
-                                                if not os.path.basename(exe).lower().startswith("unins"):
-                                                    path = exe
-                                                    break
-                                
-                                # Try InstallLocation
-                                if not path:
-                                    install_location = query_value(subkey, "InstallLocation")
-                                    if install_location and isinstance(install_location, str) and os.path.isdir(install_location):
-                                        app_name_part = ''.join(c for c in display_name.split('(')[0].strip() 
-                                                               if c.isalnum() or c == ' ').strip()
-                                        potential_exes = [
-                                            app_name_part + ".exe",
-                                            display_name.split('(')[0].strip() + ".exe",
-                                            subkey_name + ".exe"
-                                        ]
-                                        
-                                        # Also check for any .exe files
-                                        exe_files = glob.glob(os.path.join(install_location, "*.exe"))
-                                        for exe_file in exe_files:
-                                            file_name = os.path.basename(exe_file)
-                                            # Skip uninstaller and setup files
-                                            if not any(x in file_name.lower() for x in ["unins", "setup", "install"]):
-                                                potential_exes.append(file_name)
-                                        
-                                        for exe_name in potential_exes:
-                                            potential_path = os.path.join(install_location, exe_name)
-                                            if os.path.exists(potential_path) and os.path.isfile(potential_path):
-                                                path = potential_path
-                                                break
-
-                                if path:
-                                    app_key = path.lower()
-                                    if app_key not in apps_dict:
-                                        apps_dict[app_key] = {'name': display_name.strip(), 'path': path}
-                    except OSError:
-                        break  # No more subkeys
-                    except Exception as e:
-                        print(f"Warning: Error processing registry key: {e}")
-                    finally:
-                        i += 1
-        except (FileNotFoundError, OSError):
-            pass
-        except Exception as e:
-            print(f"Error scanning registry path ({key_path}): {e}")
-
-def _scan_start_menu(apps_dict):
-    """Scan Windows Start Menu for applications."""
+# --- Background Scan ---
+def _init_com():
+    """Set up COM for this worker thread (shortcuts are resolved through it); True if it was."""
     try:
-        # Common Start Menu paths
-        start_menu_paths = [
-            os.path.join(os.environ["PROGRAMDATA"], "Microsoft", "Windows", "Start Menu", "Programs"),
-            os.path.join(os.environ["APPDATA"], "Microsoft", "Windows", "Start Menu", "Programs")
-        ]
-        
-        for start_menu_path in start_menu_paths:
-            if os.path.exists(start_menu_path):
-                # Process both shortcuts and subfolders
-                _process_shortcut_dir(start_menu_path, apps_dict)
+        import pythoncom
+        pythoncom.CoInitialize()
+        return True
     except Exception as e:
-        print(f"Error scanning Start Menu: {e}")
+        print(f"Warning: Could not initialize COM for scanning: {e}")
+        return False
 
-def _process_shortcut_dir(directory, apps_dict, depth=0, max_depth=3):
-    """Process a directory containing shortcuts."""
-    if depth > max_depth:
-        return  # Prevent excessive recursion
-        
-    try:
-        # Process all .lnk files in this directory
-        for shortcut_path in glob.glob(os.path.join(directory, "*.lnk")):
-            try:
-                # Parse the shortcut
-                shell = Dispatch("WScript.Shell")
-                shortcut = shell.CreateShortCut(shortcut_path)
-                target_path = shortcut.Targetpath
-                
-                # Skip non-executable targets
-                if not target_path or not target_path.lower().endswith((".exe", ".bat", ".cmd")):
-                    continue
-                    
-                # Skip Windows system files
-                if "\\Windows\\" in target_path and any(x in target_path.lower() for x in 
-                                                      ["system32", "syswow64", "setup", "installer"]):
-                    continue
-                
-                # Get app name from shortcut name
-                app_name = os.path.splitext(os.path.basename(shortcut_path))[0]
-                
-                # Add to apps dictionary
-                app_key = target_path.lower()
-                if os.path.exists(target_path) and app_key not in apps_dict:
-                    apps_dict[app_key] = {'name': app_name, 'path': target_path}
-            except Exception as e:
-                print(f"Error processing shortcut {shortcut_path}: {e}")
-        
-        # Process subdirectories
-        for subdir in [d for d in os.listdir(directory) if os.path.isdir(os.path.join(directory, d))]:
-            subdir_path = os.path.join(directory, subdir)
-            _process_shortcut_dir(subdir_path, apps_dict, depth + 1, max_depth)
+def _uninit_com():
+    import pythoncom
+    pythoncom.CoUninitialize()
+
+def _scan_worker(publish_partial, cancel):
+    """Run the application scan in a core worker thread, posting "scan" events to the Tk thread.
+
+    Generations (records plus index) are built and published here, so the Tk
+    thread only has to redraw. Progress is always posted, for the progress
+    window; partial catalogs are published only if asked.
+    With a shared catalog, only the user scope is scanned here and layered
+    over the machine scope. The newest shared file is used as it is; if it
+    is stale or missing, the "machine_scan" task brings it up to date beside
+    this scan and layers the records over the new one.
+    """
+    global machine_base, session_apps
+    
+    def report(event):
+        if event['type'] == 'progress':
+            apps = event.pop('apps')
+            if publish_partial:
+                event['generation'] = publish_layered(apps, machine_base, complete=False)
+        core.ui("scan", event)
     
+    com_initialized = _init_com()
+    started = time.perf_counter()
+    try:
+        if shared_catalog:
+            base, how = shared_catalog.current()
+            if base is not None:  # Else keep a private base from an earlier rescan, if any
+                with layer_lock:
+                    machine_base = base
+            print(f"Machine-scope catalog: {how}"
+                  + (f", {len(base)} applications" if base is not None else ""))
+            if how != "shared" and not core.running("machine_scan"):
+                core.task("machine_scan", scan_machine())
+        plan = scanner.ScanPlan(progress=report, cancel=cancel,
+                                budgets=config.get("scan_budgets"),
+                                scope=scanner.USER if shared_catalog else None)
+        apps = plan.run()
+        # Re-read on every scan, so edits take effect with the next refresh
+        aliases = load_aliases()
+        apply_aliases(apps, aliases)
+        if plan.incomplete:
+            # Searchable now; the areas the budgets cut off follow in the background.
+            # The event also closes the progress window, saved catalog or not
+            event = {'type': 'pass', 'stats': plan.stats, 'found': len(apps)}
+            if publish_partial:
+                event['generation'] = publish_layered(apps, machine_base, complete=False)
+            core.ui("scan", event)
+            apps = apply_aliases(plan.resume(), aliases)
+        with layer_lock:
+            session_apps = apps
+            generation = publish_scan(apps, machine_base, cancel)
+        core.ui("scan", {'type': 'done', 'stats': plan.stats, 'generation': generation})
+        metrics.histogram("scan.total").record(time.perf_counter() - started)
     except Exception as e:
-        print(f"Error processing directory {directory}: {e}")
-
-def _scan_program_dirs(apps_dict):
-    """Scan common program directories for executables."""
-    program_dirs = [
-        os.environ.get("PROGRAMFILES", "C:\\Program Files"),
-        os.environ.get("PROGRAMFILES(X86)", "C:\\Program Files (x86)"),
-        os.path.join(os.environ.get("LOCALAPPDATA", ""), "Programs")
-    ]
-    
-    # Only scan top-level directories to avoid taking too long
-    for program_dir in program_dirs:
-        if os.path.exists(program_dir):
-            try:
-                # Get all top-level directories
-                for vendor_dir in [d for d in os.listdir(program_dir) 
-                                  if os.path.isdir(os.path.join(program_dir, d))]:
-                    vendor_path = os.path.join(program_dir, vendor_dir)
-                    
-                    # Look for .exe files in this directory and immediate subdirectories
-                    for exe_path in glob.glob(os.path.join(vendor_path, "*.exe")):
-                        _add_exe_to_apps(exe_path, apps_dict)
-                    
-                    # Check one level deeper
-                    for subdir in [d for d in os.listdir(vendor_path) 
-                                  if os.path.isdir(os.path.join(vendor_path, d))]:
-                        subdir_path = os.path.join(vendor_path, subdir)
-                        for exe_path in glob.glob(os.path.join(subdir_path, "*.exe")):
-                            _add_exe_to_apps(exe_path, apps_dict)
-            except Exception as e:
-                print(f"Error scanning program directory {program_dir}: {e}")
+        metrics.counter("scan.errors").add()
+        print(f"Error scanning for applications: {e}")
+        core.ui("scan", {'type': 'error', 'error': e})
+    finally:
+        if com_initialized:
+            _uninit_com()
+
+def _machine_scan_worker(cancel):
+    """Bring the shared machine-scope catalog up to date in a core worker thread.
 
-def _scan_desktop(apps_dict):
-    """Scan desktop for application shortcuts."""
+    Posts "machine_scan" events to the Tk thread. The machine scope is
+    scanned (by whichever session holds the lock) within the same budgets
+    as the user scope, and the session's user records are layered over the
+    new catalog when it is ready.
+    """
+    global machine_base
+    
+    def report(event):
+        # Partial machine catalogs are neither shared nor shown
+        if event['type'] == 'source':
+            core.ui("machine_scan", event)
+    
+    plan = scanner.ScanPlan(progress=report, cancel=cancel, budgets=config.get("scan_budgets"),
+                            scope=scanner.MACHINE)
+    
+    def scan():
+        apps = plan.run()
+        # The shared file is for every session, so the deferred areas go in it too
+        return plan.resume() if plan.incomplete else apps
+    
+    com_initialized = _init_com()
     try:
-        # Get desktop path using winshell
-        desktop = winshell.desktop()
-        _process_shortcut_dir(desktop, apps_dict)
-        
-        # Also check common desktop
-        common_desktop = winshell.desktop(common=True)
-        _process_shortcut_dir(common_desktop, apps_dict)
+        base, how = shared_catalog.rescan(scan, cancel=cancel)
+        event = {'type': 'done', 'how': how, 'stats': plan.stats if plan.stats['sources'] else None}
+        if base is not None and how != "cancelled":
+            with layer_lock:
+                machine_base = base
+                if session_apps is not None:
+                    event['generation'] = publish_layered(session_apps, base)
+            event['found'] = len(base)
+        core.ui("machine_scan", event)
     except Exception as e:
-        print(f"Error scanning desktop: {e}")
+        metrics.counter("scan.errors").add()
+        print(f"Error scanning the machine scope: {e}")
+        core.ui("machine_scan", {'type': 'error', 'error': e})
+    finally:
+        if com_initialized:
+            _uninit_com()
+
+def publish_layered(apps, base, complete=True):
+    """Publish apps, layered over the machine-scope base catalog if there is one."""
+    if base is None:
+        return catalog.publish(apps, complete)
+    overlay = OverlayCatalog(base, user_only(base, apps, scanner.FileSystem()))
+    return catalog.publish(overlay, complete, index=overlay)
+
+def publish_scan(apps, base=None, cancel=None):
+    """Save apps as the new catalog file and publish it mapped, else in memory.
+
+    With a machine-scope base, only the session's own records are saved.
+    A cancelled scan (the launcher is exiting) is not saved.
+    """
+    if base is not None:
+        apps = user_only(base, apps, scanner.FileSystem())
+    if cancel is None or not cancel.is_set():
+        try:
+            apps = catalog_file.MappedCatalog(catalog_file.save_catalog(apps), verify=False)
+        except (OSError, catalog_file.CatalogFileError) as e:
+            print(f"Warning: Could not save the catalog file: {e}")
+    if base is not None:
+        overlay = OverlayCatalog(base, list(apps))
+        return catalog.publish(overlay, index=overlay)
+    if isinstance(apps, catalog_file.MappedCatalog):
+        return catalog.publish(apps, index=apps)
+    return catalog.publish(apps)
+
+def load_saved_catalog():
+    """Publish the catalog saved by the last scan, if any; returns True if one was loaded."""
+    mapped = catalog_file.load_latest()
+    base = shared_catalog.latest() if shared_catalog else None
+    if base is not None:
+        # Stale or not: usable until this session's scan is done
+        generation = publish_layered(list(mapped) if mapped else [], base)
+        print(f"Loaded {len(generation)} applications from {base.path}"
+              + (f" and {mapped.path}" if mapped else ""))
+        return True
+    if mapped is None:
+        return False
+    generation = catalog.publish(mapped, index=mapped)
+    print(f"Loaded {len(generation)} applications from {mapped.path}")
+    return True
 
-def _add_exe_to_apps(exe_path, apps_dict):
-    """Helper to add an executable to the apps dictionary with filtering."""
+async def scan_apps(publish_partial=False):
+    """The core's "scan" task: scan in a worker thread until done or cancelled."""
+    cancel = threading.Event()
+    await core.blocking(_scan_worker, publish_partial, cancel, cancel=cancel)
+
+async def scan_machine():
+    """The core's "machine_scan" task: update the shared machine-scope catalog until done or cancelled."""
+    cancel = threading.Event()
+    await core.blocking(_machine_scan_worker, cancel, cancel=cancel)
+
+def start_background_scan(publish_partial=False):
+    """Start scanning for installed applications as a core task; returns its future."""
+    return core.task("scan", scan_apps(publish_partial))
+
+def refresh_apps():
+    """Rescan in the background and swap the catalog in when done."""
+    if core.running("scan"):
+        print("Scan already in progress.")
+        return
+    start_background_scan()
+
+def refresh_results():
+    """Rerun the search of a visible launcher against the current generation (Tk thread only)."""
+    if root is None or launcher_hidden:
+        return
+    for widget in launcher_windows():
+        widget._update_suggestions()
+
+def on_scan_event(event):
+    """Show a scan event from the worker (Tk thread only).
+
+    The initial scan has a progress window and shows the partial catalogs
+    the worker publishes as sources finish; a refresh has none and keeps the
+    old generation until the new one is complete.
+    """
+    if event['type'] == 'source' and scan_window:
+        _, scan_label, _ = scan_window
+        scan_label.config(text=f"Scanning {event['label']}...\n"
+                               f"{event['found']} found, {event['elapsed']:.1f}s")
+    elif event['type'] == 'progress' and scan_window:
+        _, _, scan_progress = scan_window
+        scan_progress.config(value=event['index'] + 1)
+        if 'generation' in event:  # Only without a saved catalog
+            refresh_results()
+    elif event['type'] == 'pass':
+        if 'generation' in event:
+            refresh_results()
+        # The first pass is what the user waits for; the rest is quiet
+        close_scan_window()
+        found = len(event['generation']) if 'generation' in event else event['found']
+        print(f"First pass ready with {found} applications; "
+              f"scanning {sum(s['deferred'] for s in event['stats']['sources'])} "
+              f"remaining areas in the background.")
+    elif event['type'] in ('done', 'error'):
+        if event['type'] == 'done':
+            refresh_results()
+            print_scan_stats(event['stats'])
+            record_scan_metrics(event['stats'], event['generation'])
+        close_scan_window()
+        generation = catalog.current()
+        print(f"Launcher ready with {len(generation)} applications (generation {generation.id}).")
+
+def on_machine_scan_event(event):
+    """Show an event of the machine-scope rescan (Tk thread only)."""
+    if event['type'] == 'source' and scan_window:
+        _, scan_label, _ = scan_window
+        scan_label.config(text=f"Scanning {event['label']} for all users...\n"
+                               f"{event['found']} found, {event['elapsed']:.1f}s")
+    elif event['type'] == 'done':
+        if 'generation' in event:
+            refresh_results()
+        if event['stats']:
+            print_scan_stats(event['stats'])
+        print(f"Machine-scope catalog: {event['how']}"
+              + (f", {event['found']} applications" if 'found' in event else ""))
+    elif event['type'] == 'error':
+        print(f"Machine-scope catalog not updated: {event['error']}")
+
+def close_scan_window():
+    global scan_window
+    if scan_window:
+        scan_window[0].destroy()
+        scan_window = None
+
+def print_scan_stats(stats):
+    """Print how long each source took against its budget."""
+    for source in stats['sources']:
+        budget = "unlimited" if source['budget'] is None else f"{source['budget']:.1f}s"
+        print(f"  {source['source']:<14} {source['seconds']:6.2f}s (budget {budget}), "
+              f"{source['found']} found, {source['deferred']} areas deferred")
+    resumed = stats['resumed']
+    if resumed:
+        print(f"  {'background':<14} {resumed['seconds']:6.2f}s, {resumed['areas']} areas, "
+              f"{resumed['found']} found, {resumed['left']} left")
+
+def record_scan_metrics(stats, generation):
+    """Keep the last scan's per-source duration and yield as gauges."""
+    metrics.counter("scan.count").add()
+    metrics.gauge("catalog.apps").set(len(generation))
+    for source in stats['sources']:
+        name = source['source']
+        metrics.gauge(f"scan.{name}.seconds").set(source['seconds'])
+        metrics.gauge(f"scan.{name}.found").set(source['found'])
+        metrics.gauge(f"scan.{name}.deferred").set(source['deferred'])
+    resumed = stats['resumed']
+    if resumed:
+        metrics.gauge("scan.background.seconds").set(resumed['seconds'])
+        metrics.gauge("scan.background.found").set(resumed['found'])
+
+def launch_app(app):
+    """Start an application detached from the launcher (blocking; see start_launch)."""
+    # Get the directory of the application
+    app_dir = os.path.dirname(app['path'])
+    # An app on an offline share fails within the probe timeout instead of hanging
+    if scanner.network_guard.host(app['path']):
+        if not scanner.network_guard.call(app['path'], os.path.exists, app['path']):
+            raise FileNotFoundError(f"{app['path']} does not exist")
+    if prefetcher:
+        prefetcher.record_launch(app['path'])
+    if launch_history:
+        launch_history.record(app['path'])
+    
+    # Launch the application
     try:
-        # Skip system utilities and small executables (likely not full applications)
-        file_size = os.path.getsize(exe_path)
-        
-        # Skip small executables (less than 100KB) as they're likely helpers/utilities
-        if file_size < 100 * 1024:
-            return
-            
-        # Skip executables in certain folders
-        if any(x in exe_path.lower() for x in ["\\windows\\", "\\system32\\", "\\syswow64\\", 
-                                             "\\temp\\", "\\tmp\\", "uninstall", "setup"]):
-            return
-            
-        # Get app name from executable name
-        app_name = os.path.splitext(os.path.basename(exe_path))[0]
-        
-        # Improve app name by replacing underscores and dashes with spaces
-        app_name = app_name.replace("_", " ").replace("-", " ")
-        
-        # Title case the app name for nicer display
-        app_name = " ".join(word.capitalize() for word in app_name.split())
-        
-        # Add to apps dictionary
-        app_key = exe_path.lower()
-        if app_key not in apps_dict:
-            apps_dict[app_key] = {'name': app_name, 'path': exe_path}
-    except Exception as e:
-        print(f"Error adding exe to apps list {exe_path}: {e}")
+        with metrics.histogram("launch.start").time():
+            subprocess.Popen([app['path']], cwd=app_dir,
+                            creationflags=subprocess.DETACHED_PROCESS | subprocess.CREATE_NEW_PROCESS_GROUP,
+                            close_fds=True)
+    except Exception:
+        metrics.counter("launch.errors").add()
+        raise
+    metrics.counter("launch.count").add()
+
+def start_launch(app, window=None):
+    """Launch app as a core task; returns its future.
+
+    Process creation can stall (antivirus, slow shares), so it never runs
+    on the Tk thread. The outcome is posted back as a "launched" event for
+    window, which hides on success and shows the error otherwise.
+    """
+    def done(future):
+        error = None if future.cancelled() else future.exception()
+        if not isinstance(error, TaskRunning):  # Already being launched
+            core.ui("launched", window, app, error)
+    future = core.task(f"launch {app['path'].lower()}", core.blocking(launch_app, app))
+    future.add_done_callback(done)
+    return future
+
+def on_launched(window, app, error):
+    """Hide the launcher after a launch, or show why it failed (Tk thread only)."""
+    if error is not None:
+        print(f"Error launching {app['name']}: {error}")
+    if window is None or not window.winfo_exists():
+        return
+    if error is None:
+        # Hide after a brief pause to confirm the launch
+        idle_state.after(window, 100, window._hide_app)
+    else:
+        window._show_error_message(f"Error launching:\n{app['name']}\n{type(error).__name__}: {error}")
+
+# --- IPC Handlers ---
+# These run on IPC connection threads: anything touching Tk is posted to
+# ui_events, background work goes to the core, searching the current
+# catalog generation is safe as is.
+def _ipc_show():
+    ui_events.post("show")
+    return "ok"
+
+def _ipc_refresh():
+    ui_events.post("refresh")
+    return "ok"
+
+def _ipc_search(query, limit=IPC_SEARCH_LIMIT):
+    results = query_cache.search(catalog.current(), query.lower().strip())[:limit]
+    return [{'name': app['name'], 'path': app['path']} for app in results]
+
+def _ipc_launch(name):
+    results = query_cache.search(catalog.current(), name.lower().strip())
+    if not results:
+        raise LookupError(f"No application matches '{name}'")
+    app = results[0]
+    print(f"Launching via IPC: {app['name']} ({app['path']})")
+    try:
+        start_launch(app).result(IPC_LAUNCH_WAIT)
+    except FutureTimeout:
+        # Still starting; a failure is reported by on_launched. Answering now
+        # keeps the reply well inside the client's timeout
+        print(f"{app['name']} is still starting; not waiting for it")
+    return {'name': app['name'], 'path': app['path']}
+
+def _ipc_metrics():
+    return metrics.snapshot()
+
+IPC_HANDLERS = {
+    "show": _ipc_show,
+    "refresh": _ipc_refresh,
+    "search": _ipc_search,
+    "launch": _ipc_launch,
+    "metrics": _ipc_metrics,
+}
 
 # --- Hotkey Related Functions ---
 def register_hotkeys():
-    """Register global hotkeys to show the launcher."""
-    global hotkey_registered
+    """Register global hotkeys to show the launcher.
+
+    RegisterHotKey only wakes the process for its own combinations; the
+    keyboard library's hook, which sees every key press on the machine, is
+    the fallback.
+    """
+    global hotkey_registered, hotkey_listener
     
     try:
         # Use hardcoded hotkey instead of config
@@ -391,11 +499,22 @@ def register_hotkeys():
         # Clear any existing hotkeys
         clear_hotkeys()
         
+        try:
+            # The listener thread must not touch Tk; the toggle runs on the Tk thread
+            hotkey_listener = HotkeyListener(hotkeys, lambda hotkey: ui_events.post("toggle")).start()
+            print(f"Registered hotkeys: {', '.join(hotkeys)}")
+            hotkey_registered = True
+            return
+        except HotkeyError as e:
+            hotkey_listener = None
+            print(f"Warning: {e}; using the keyboard hook instead")
+        
         # Register each hotkey
         for hotkey_str in hotkeys:
             try:
                 # Use suppress=True to prevent the system beep/alert sound
-                keyboard.add_hotkey(hotkey_str, toggle_launcher_visibility, suppress=True)
+                # The hook thread must not touch Tk; the toggle runs on the Tk thread
+                keyboard.add_hotkey(hotkey_str, lambda: ui_events.post("toggle"), suppress=True)
                 print(f"Registered hotkey: {hotkey_str}")
                 hotkey_registered = True
             except Exception as e:
@@ -407,6 +526,10 @@ def register_hotkeys():
 
 def clear_hotkeys():
     """Clear all registered hotkeys."""
+    global hotkey_listener
+    if hotkey_listener:
+        hotkey_listener.stop()
+        hotkey_listener = None
     try:
         keyboard.unhook_all()
     except Exception as e:
@@ -423,35 +546,108 @@ def toggle_launcher_visibility():
     # Check if we need to create a new launcher window or show an existing one
     if launcher_hidden:
         # Find if there's an existing launcher window
-        launcher_ui = None
-        for widget in root.winfo_children():
-            if isinstance(widget, LauncherWindow):
-                launcher_ui = widget
-                break
+        launcher_ui = next(iter(launcher_windows()), None)
                 
-        if launcher_ui:
-            # Show existing window - call show_and_focus which handles focus correctly
-            launcher_ui.show_and_focus()
-        else:
-            # Create new launcher window - the constructor calls show_and_focus
-            launcher_ui = LauncherWindow(root)
+        with metrics.histogram("launcher.show").time():
+            idle_state.leave()
+            if launcher_ui:
+                # Show existing window - call show_and_focus which handles focus correctly
+                launcher_ui.show_and_focus()
+            else:
+                # Create new launcher window - the constructor calls show_and_focus
+                launcher_ui = LauncherWindow(root)
+        metrics.counter("launcher.shown").add()
             
         launcher_hidden = False
         
         # Add extra focus checks to ensure the entry widget gets focus
         # These are scheduled with increasing delays to overcome any focus stealing
-        root.after(150, lambda: force_entry_focus(launcher_ui))
-        root.after(300, lambda: force_entry_focus(launcher_ui))
+        idle_state.after(root, 150, force_entry_focus, launcher_ui)
+        idle_state.after(root, 300, force_entry_focus, launcher_ui)
     else:
         # Hide all launcher windows
-        for widget in root.winfo_children():
-            if isinstance(widget, LauncherWindow):
-                widget.grab_release()  # Release grab before withdrawing
-                widget.withdraw()
+        for widget in launcher_windows():
+            widget.grab_release()  # Release grab before withdrawing
+            widget.withdraw()
         launcher_hidden = True
+        metrics.counter("launcher.hidden").add()
+        idle_state.enter()
         
     print(f"Launcher visibility toggled. Hidden: {launcher_hidden}")
 
+def launcher_windows():
+    """Return the LauncherWindow instances (Tk thread only)."""
+    if root is None:
+        return []
+    return [widget for widget in root.winfo_children() if isinstance(widget, LauncherWindow)]
+
+def set_focus_tracking(enabled):
+    """Bind or unbind the focus handlers, which only matter while the launcher is shown (Tk thread only)."""
+    if enabled:
+        # Set focus mode to be more aggressive (helps with focus issues)
+        root.tk.call('tk_focusFollowsMouse')
+    else:
+        root.unbind_all("<Enter>")  # The binding tk_focusFollowsMouse adds
+    for window in launcher_windows():
+        window.track_focus(enabled)
+
+def suspend_icons():
+    for window in launcher_windows():
+        if window.icons:
+            window.icons.cancel()
+
+def suspend_prefetch():
+    if prefetcher:
+        prefetcher.cancel()
+
+def show_launcher():
+    """Show the launcher if it is hidden (Tk thread only)."""
+    if root and launcher_hidden:
+        toggle_launcher_visibility()
+
+def quit_app():
+    """Leave the Tk main loop (Tk thread only)."""
+    if root:
+        root.quit()
+
+def show_statistics():
+    """Show the metrics in a window and save them as JSON (Tk thread only)."""
+    try:
+        saved_to = f"Saved to {metrics.dump()}"
+    except OSError as e:
+        saved_to = f"Could not save metrics: {e}"
+    window = tk.Toplevel(root)
+    window.title(f"{APP_NAME} Statistics")
+    window.configure(bg="#2e2e2e")
+    text = tk.Text(window, width=72, height=32, font=('Consolas', 9),
+                   bg="#3c3c3c", fg="white", bd=0, highlightthickness=0)
+    text.pack(fill=tk.BOTH, expand=True, padx=10, pady=(10, 0))
+    
+    def fill():
+        text.config(state=tk.NORMAL)
+        text.delete("1.0", tk.END)
+        text.insert(tk.END, format_snapshot(metrics.snapshot()))
+        text.config(state=tk.DISABLED)
+    fill()
+    
+    buttons = tk.Frame(window, bg="#2e2e2e")
+    buttons.pack(fill=tk.X, padx=10, pady=10)
+    tk.Label(buttons, text=saved_to, font=('Segoe UI', 9), bg="#2e2e2e", fg="#aaaaaa").pack(side=tk.LEFT)
+    tk.Button(buttons, text="Close", command=window.destroy).pack(side=tk.RIGHT)
+    tk.Button(buttons, text="Refresh", command=fill).pack(side=tk.RIGHT, padx=(0, 6))
+
+# Events other threads post to ui_events, run on the Tk thread
+UI_EVENT_HANDLERS = {
+    "toggle": toggle_launcher_visibility,
+    "show": show_launcher,
+    "refresh": refresh_apps,
+    "quit": quit_app,
+    "statistics": show_statistics,
+    "scan": on_scan_event,
+    "machine_scan": on_machine_scan_event,
+    "launched": on_launched,
+}
+
 def force_entry_focus(launcher_window):
     """Force focus to the entry widget of the launcher window."""
     if launcher_window and hasattr(launcher_window, 'entry'):
@@ -513,25 +709,38 @@ class LauncherWindow(tk.Toplevel):
         self.listbox_frame = tk.Frame(self.frame, bg=bg_color)
         self.listbox_frame.pack(fill=tk.BOTH, expand=True)
         
+        # Icons are drawn on a narrow canvas lined up with the visible rows
+        self.icons = None
+        if icon_loader:
+            self.icon_canvas = tk.Canvas(self.listbox_frame, width=ICON_SIZE + 6,
+                                         bg="#3c3c3c", highlightthickness=0, bd=0)
+            self.icon_canvas.pack(side=tk.LEFT, fill=tk.Y)
+        
         self.listbox = tk.Listbox(self.listbox_frame, font=('Segoe UI', 12), 
                                  bg="#3c3c3c", fg=fg_color, 
                                  selectbackground=accent_color, selectforeground=fg_color,
                                  highlightthickness=0, bd=0, 
                                  activestyle='none', height=10)
         self.listbox.pack(side=tk.LEFT, fill=tk.BOTH, expand=True)
+        # Keystrokes only send the rows that changed to the listbox
+        self.results_view = ResultsView(self.listbox)
         
         # Add scrollbar
         self.scrollbar = tk.Scrollbar(self.listbox_frame, orient=tk.VERTICAL, 
                                      command=self.listbox.yview)
         self.scrollbar.pack(side=tk.RIGHT, fill=tk.Y)
-        self.listbox.config(yscrollcommand=self.scrollbar.set)
+        self.listbox.config(yscrollcommand=self._on_list_scroll)
+        
+        if icon_loader:
+            self.icons = IconGutter(self.icon_canvas, self.listbox, icon_loader)
+            self.listbox.bind("<Configure>", self.icons.redraw)
         
         # --- Status bar ---
         self.status_frame = tk.Frame(self.frame, bg=bg_color)
         self.status_frame.pack(fill=tk.X, pady=(10, 0))
         
         self.status_label = tk.Label(self.status_frame, 
-                                    text=f"Found {len(installed_apps)} applications", 
+                                    text=f"Found {len(catalog.current())} applications", 
                                     font=('Segoe UI', 9), 
                                     bg=bg_color, fg="#aaaaaa")
         self.status_label.pack(side=tk.LEFT)
@@ -549,7 +758,7 @@ class LauncherWindow(tk.Toplevel):
         self.entry.bind("<Escape>", self._hide_app) # Changed to hide instead of quit
         self.entry.bind("<Down>", self._move_selection_down)
         self.entry.bind("<Up>", self._move_selection_up)
-        self.bind("<FocusOut>", self._check_focus_lost)
+        self.track_focus(True)
         
         self.listbox.bind("<Double-Button-1>", self._launch_selected)
         self.listbox.bind("<ButtonRelease-1>", self._launch_selected) # Single click launch
@@ -563,77 +772,52 @@ class LauncherWindow(tk.Toplevel):
         # Call AFTER all widgets are created and packed
         self.show_and_focus()
 
+    def track_focus(self, enabled):
+        """Hide when focus leaves the window, while enabled."""
+        if enabled:
+            self.bind("<FocusOut>", self._check_focus_lost)
+        else:
+            self.unbind("<FocusOut>")
+
+    def _on_list_scroll(self, first, last):
+        """Keep the scrollbar and the icon gutter in step with the listbox."""
+        self.scrollbar.set(first, last)
+        if self.icons:
+            self.icons.redraw()
+
     def _update_suggestions(self, *args):
         """Filter apps based on search query and update listbox."""
+        started = time.perf_counter()
         query = self.search_var.get().lower().strip()
-        self.listbox.delete(0, tk.END)
-        self.current_results = []
-        self.listbox.config(fg="white")  # Reset color
+        # One generation per query: a scan publishing meanwhile cannot mix catalogs
+        generation = catalog.current()
+        self.current_results = query_cache.search(generation, query)
 
         if not query:
-            # If no query, show most used or recent apps
-            self.status_label.config(text=f"Found {len(installed_apps)} applications")
-            # Show a limited number of apps as examples
-            sample_size = min(10, len(installed_apps))
-            self.current_results = installed_apps[:sample_size]
-            for app in self.current_results:
-                display_name = app['name'][:70] + '...' if len(app['name']) > 70 else app['name']
-                self.listbox.insert(tk.END, display_name)
+            # If no query, show a limited number of apps as examples
+            self.status_label.config(text=f"Found {len(generation)} applications")
+            self.results_view.show(self.current_results)
         else:
-            # Apply multi-term search
-            exact_matches = []
-            starts_with = []
-            contains = []
-            
-            # Split search into terms for better matching
-            query_terms = query.lower().split()
-            
-            for app in installed_apps:
-                name_lower = app['name'].lower()
-                
-                # Skip if any term is completely missing
-                if not all(term in name_lower for term in query_terms):
-                    continue
-                
-                # Check exact match
-                if name_lower == query:
-                    exact_matches.append(app)
-                # Check starts with first term
-                elif name_lower.startswith(query_terms[0]):
-                    starts_with.append(app)
-                # Contains all terms
-                else:
-                    contains.append(app)
-            
-            # Combine results in order of relevance
-            self.current_results = exact_matches + starts_with + contains
-            
             # Update status label with count
             self.status_label.config(text=f"Found {len(self.current_results)} matches")
-            
-            # Add results to listbox
-            if self.current_results:
-                for app in self.current_results:
-                    display_name = app['name'][:70] + '...' if len(app['name']) > 70 else app['name']
-                    self.listbox.insert(tk.END, display_name)
-            else:
-                self.listbox.insert(tk.END, "No matching applications found")
-                self.listbox.config(fg="gray")
+            self.results_view.show(self.current_results, NO_MATCHES_TEXT)
+
+        if self.icons:
+            self.icons.show(self.current_results)
+        if prefetcher:
+            likely = [app['path'] for app in self.current_results[:1]]
+            if launch_history:
+                likely += launch_history.most_launched(PREFETCH_HISTORY_APPS)
+            prefetcher.request(likely)
+        metrics.histogram("search.keystroke").record(time.perf_counter() - started)
 
-        # Select first item if there are results
-        if self.current_results:
-            self.listbox.select_set(0)
-            self.listbox.activate(0)
-            
     def _launch_selected(self, event=None):
         """Launch the currently selected application and hide."""
         # For single-click in listbox, need to ensure the click was on an item
         if event and event.type == '4':  # ButtonRelease event
             index = self.listbox.nearest(event.y)
             if index != self.listbox.curselection():
-                self.listbox.selection_clear(0, tk.END)
-                self.listbox.selection_set(index)
-                self.listbox.activate(index)
+                self.results_view.select(index)
                 return "break"  # Don't launch on selection change
                 
         selected_indices = self.listbox.curselection()
@@ -646,33 +830,18 @@ class LauncherWindow(tk.Toplevel):
         selected_index = selected_indices[0]
         if 0 <= selected_index < len(self.current_results):
             app_to_launch = self.current_results[selected_index]
-            try:
-                print(f"Launching: {app_to_launch['name']} ({app_to_launch['path']})")
-                
-                # Update status to show launching
-                self.status_label.config(text=f"Launching {app_to_launch['name']}...", fg="light green")
-                self.update()
-                
-                # Get the directory of the application
-                app_dir = os.path.dirname(app_to_launch['path'])
-                
-                # Launch the application
-                subprocess.Popen([app_to_launch['path']], cwd=app_dir,
-                                creationflags=subprocess.DETACHED_PROCESS | subprocess.CREATE_NEW_PROCESS_GROUP,
-                                close_fds=True)
-                
-                # Hide launcher after brief pause to confirm launch
-                self.after(100, self._hide_app)
-            except Exception as e:
-                print(f"Error launching {app_to_launch['name']}: {e}")
-                self._show_error_message(f"Error launching:\n{app_to_launch['name']}\n{type(e).__name__}: {e}")
+            print(f"Launching: {app_to_launch['name']} ({app_to_launch['path']})")
+            
+            # Update status to show launching; on_launched hides the launcher or shows the error
+            self.status_label.config(text=f"Launching {app_to_launch['name']}...", fg="light green")
+            start_launch(app_to_launch, self)
         else:
             print(f"Invalid selected index {selected_index}")
 
     def _show_error_message(self, message):
         """Displays a temporary error message."""
         print(f"DEBUG: Showing error message: {message}")
-        self.listbox.delete(0, tk.END)
+        self.results_view.invalidate()
         self.current_results = []
         lines = message.split('\n')
         for i, line in enumerate(lines):
@@ -680,6 +849,8 @@ class LauncherWindow(tk.Toplevel):
              self.listbox.insert(tk.END, line)
         self.listbox.config(fg="red")
         self.listbox.see(0)
+        if self.icons:
+            self.icons.show([])
 
     def _clear_error_message(self):
          print("DEBUG: Clearing error message.")
@@ -695,10 +866,7 @@ class LauncherWindow(tk.Toplevel):
         if current_selection: current_index = current_selection[0]
         next_index = 0
         if current_index < max_index: next_index = current_index + 1
-        if current_selection: self.listbox.select_clear(current_index)
-        self.listbox.select_set(next_index)
-        self.listbox.activate(next_index)
-        self.listbox.see(next_index)
+        self.results_view.select(next_index)
         return "break"
 
     def _move_selection_up(self, event=None):
@@ -710,10 +878,7 @@ class LauncherWindow(tk.Toplevel):
         if current_selection: current_index = current_selection[0]
         prev_index = max_index
         if current_index > 0: prev_index = current_index - 1
-        if current_selection: self.listbox.select_clear(current_index)
-        self.listbox.select_set(prev_index)
-        self.listbox.activate(prev_index)
-        self.listbox.see(prev_index)
+        self.results_view.select(prev_index)
         return "break"
 
     def show_and_focus(self):
@@ -759,9 +924,8 @@ class LauncherWindow(tk.Toplevel):
         self.entry.icursor(tk.END)
         
         # Schedule additional focus calls to defeat any focus stealing
-        self.after(10, lambda: self.entry.focus_force())
-        self.after(50, lambda: self.entry.focus_force())
-        self.after(100, lambda: self.entry.focus_force())
+        for delay in (10, 50, 100):
+            idle_state.after(self, delay, self.entry.focus_force)
         
         # Reset search text
         self.search_var.set("")
@@ -774,6 +938,9 @@ class LauncherWindow(tk.Toplevel):
         self.grab_release()  # Release input grab
         self.withdraw()
         launcher_hidden = True
+        metrics.counter("launcher.hidden").add()
+        # Icon polls, prefetching and focus timers stop until the next show
+        idle_state.enter()
         return "break"
 
     def _check_focus_lost(self, event=None):
@@ -785,7 +952,7 @@ class LauncherWindow(tk.Toplevel):
         if focused_widget not in (self, self.entry, self.listbox, self.frame):
              # Adding a small delay because focus shifts can be rapid/intermediate
              # Only hide if focus is *still* outside after a moment
-             self.after(50, self._confirm_focus_lost)
+             idle_state.after(self, 50, self._confirm_focus_lost)
 
     def _confirm_focus_lost(self):
         """Confirms focus is still lost and then hides."""
@@ -810,22 +977,23 @@ def create_tray_icon():
         d.text((20, 20), "OL", fill=(255, 255, 255))
 
     # Define menu items
-    def show_launcher():
-        global launcher_hidden, root
-        if root and launcher_hidden:
-            # Must be run in the main thread
-            root.after(0, toggle_launcher_visibility)
+    # These run on the tray thread, so Tk work is posted to the Tk thread
+    def tray_show_launcher():
+        ui_events.post("show")
+
+    def tray_statistics():
+        ui_events.post("statistics")
 
     def exit_app():
-        global root, tray_icon
+        global tray_icon
         if tray_icon:
             tray_icon.stop()
-        if root:
-            root.quit()
+        ui_events.post("quit")
 
     # Create system tray icon
     menu = (
-        pystray.MenuItem('Show Launcher', show_launcher),
+        pystray.MenuItem('Show Launcher', tray_show_launcher),
+        pystray.MenuItem('Statistics', tray_statistics),
         pystray.MenuItem('Exit', exit_app)
     )
     
@@ -839,18 +1007,15 @@ def run_tray_icon():
 
 # --- Main Execution ---
 if __name__ == "__main__":
-    # Check for required packages
+    # Check for required packages; the scanner's are only looked up, not
+    # loaded, since scanner.py imports them when it first needs them
+    import importlib.util
     missing_packages = []
-    try:
-        import winshell
-    except ImportError:
+    if importlib.util.find_spec("winshell") is None:
         missing_packages.append("winshell")
-    
-    try:
-        from win32com.client import Dispatch
-    except ImportError:
+    if importlib.util.find_spec("win32com") is None:
         missing_packages.append("pywin32")
-        
+    
     try:
         import keyboard
     except ImportError:
@@ -871,13 +1036,21 @@ if __name__ == "__main__":
         input("Press Enter to exit...")
         sys.exit(1)
     
+    # Hand over to an instance that is already running instead of starting twice
+    ipc_command = "refresh" if "--refresh" in sys.argv[1:] else "show"
+    try:
+        ipc.call(ipc_command)
+        print(f"{APP_NAME} is already running; sent '{ipc_command}'.")
+        sys.exit(0)
+    except ipc.NotRunning:
+        pass
+    except Exception as e:
+        print(f"Warning: Could not reach the running instance: {e}")
+    
     # Load configuration
     load_config()
     
-    # 1. Scan for applications
-    print("Scanning for installed applications...")
-    
-    # Create root window during scan to avoid flickering
+    # Create root window before scanning to avoid flickering
     root = tk.Tk()
     root.withdraw()  # Hide the main root window
     
@@ -897,52 +1070,102 @@ if __name__ == "__main__":
         except:
             pass
     
-    # Show a scanning progress window
-    scan_window = tk.Toplevel(root)
-    scan_window.title("Scanning")
-    scan_window.geometry("300x100")
-    scan_window.overrideredirect(True)
-    scan_window.configure(bg="#2e2e2e")
-    
-    # Place in center of screen
-    scan_window.update_idletasks()
-    width = scan_window.winfo_width()
-    height = scan_window.winfo_height()
-    x = (scan_window.winfo_screenwidth() // 2) - (width // 2)
-    y = (scan_window.winfo_screenheight() // 2) - (height // 2)
-    scan_window.geometry(f"+{x}+{y}")
-    
-    # Add progress message
-    scan_label = tk.Label(scan_window, text="Scanning for applications...", 
-                        font=('Segoe UI', 12), bg="#2e2e2e", fg="white")
-    scan_label.pack(pady=20)
+    # Route hotkey, tray, IPC and core events to the Tk thread
+    ui_events = EventBridge(UI_EVENT_HANDLERS)
+    ui_events.attach(root)
+    # Background work runs as tasks of the core, on its own event loop thread
+    core = AsyncCore(ui_events).start()
+    if config.get("shared_catalog"):
+        shared_catalog = SharedCatalog()
+    metrics.add_collector("query_cache", query_cache.stats)
+    metrics.add_collector("ui_events", ui_events.stats)
+    metrics.add_collector("core", core.stats)
     
-    scan_window.update()
-    
-    # Perform scan
-    scan_installed_apps()
-    
-    # Close scan window
-    scan_window.destroy()
+    # Claim the single-instance endpoint; losing a startup race means handing over
+    ipc_server = ipc.IPCServer(IPC_HANDLERS)
+    try:
+        ipc_server.bind()
+        core.task("ipc", core.blocking(ipc_server.serve_forever, cancel=ipc_server.close))
+    except ipc.AddressInUse:
+        try:
+            ipc.call(ipc_command)
+        except Exception as e:
+            print(f"Warning: Could not reach the running instance: {e}")
+        print(f"{APP_NAME} is already running.")
+        sys.exit(0)
+    except Exception as e:
+        print(f"Warning: IPC disabled: {e}")
+        ipc_server = None
     
-    # Register global hotkeys
+    # 1. Register global hotkeys first so the launcher is usable while scanning
     register_hotkeys()
     
     # Ensure hotkeys are cleared on exit
     atexit.register(clear_hotkeys)
     
-    # 3. Create the launcher UI window instance
+    # 2. Create the launcher UI window instance, with icons loaded in the background
+    try:
+        icon_loader = IconLoader(IconCache())
+    except Exception as e:
+        print(f"Warning: Icons disabled: {e}")
+    try:
+        launch_history = LaunchHistory()
+        prefetcher = Prefetcher(thread=False)
+        core.task("prefetch", core.blocking(prefetcher.run, cancel=prefetcher.stop))
+        metrics.add_collector("prefetch", prefetcher.stats)
+    except Exception as e:
+        print(f"Warning: Prefetching disabled: {e}")
+    
     launcher_ui = LauncherWindow(root)
     launcher_hidden = True  # Start with launcher hidden
     launcher_ui.withdraw()  # Hide initially
     
-    # 4. Create system tray icon
+    # While hidden, nothing runs until the next hotkey (see idle.py)
+    idle_state.root = root
+    idle_state.wakeups = lambda: ui_events.dispatched
+    idle_state.add_hook("focus tracking", lambda: set_focus_tracking(False),
+                        lambda: set_focus_tracking(True))
+    idle_state.add_hook("icon loading", suspend_icons)
+    idle_state.add_hook("prefetching", suspend_prefetch)
+    metrics.add_collector("idle", idle_state.stats)
+    idle_state.enter()
+    
+    # 3. Create system tray icon
     tray_icon = create_tray_icon()
     tray_thread = threading.Thread(target=run_tray_icon, daemon=True)
     tray_thread.start()
     
+    # 4. Scan for applications in the background, showing progress
+    print("Scanning for installed applications...")
+    progress_window = tk.Toplevel(root)
+    progress_window.title("Scanning")
+    progress_window.geometry("300x100")
+    progress_window.overrideredirect(True)
+    progress_window.configure(bg="#2e2e2e")
+    
+    # Place in center of screen
+    progress_window.update_idletasks()
+    width = progress_window.winfo_width()
+    height = progress_window.winfo_height()
+    x = (progress_window.winfo_screenwidth() // 2) - (width // 2)
+    y = (progress_window.winfo_screenheight() // 2) - (height // 2)
+    progress_window.geometry(f"+{x}+{y}")
+    
+    # Add progress message and bar (one step per scan source)
+    scan_label = tk.Label(progress_window, text="Scanning for applications...", 
+                        font=('Segoe UI', 10), bg="#2e2e2e", fg="white")
+    scan_label.pack(pady=(12, 6))
+    scan_progress = ttk.Progressbar(progress_window, mode="determinate", length=260,
+                                    maximum=len(scanner.SCAN_SOURCES))
+    scan_progress.pack()
+    scan_window = (progress_window, scan_label, scan_progress)
+    
+    # The catalog saved by the last scan is searchable right away; partial
+    # catalogs are only worth showing when there is nothing better yet
+    start_background_scan(publish_partial=not load_saved_catalog())
+    
     # 5. Start the Tkinter event loop
-    print(f"Launcher running in system tray with {len(installed_apps)} applications.")
+    print("Launcher running in system tray.")
     print("Type to search, Enter to launch, Esc to hide.")
     
     # Display currently active hotkeys - use hardcoded hotkey
@@ -951,6 +1174,14 @@ if __name__ == "__main__":
     try:
         root.mainloop()
     finally:
+        # Cancel the core's tasks (a running scan, the IPC server, prefetching,
+        # launches) and wait for them to wind down
+        core.shutdown()
+        # Leave the session's numbers for fleet collection
+        try:
+            metrics.dump()
+        except OSError as e:
+            print(f"Warning: Could not save metrics: {e}")
         # Clear hotkeys
         clear_hotkeys()
         # Stop tray icon if still running
@@ -0,0 +1,204 @@
+"""Runtime performance metrics: counters, gauges and latency histograms.
+
+The registry is fed from the scan, search, show/hide and launch paths and
+read by the tray's Statistics window, the "metrics" IPC command and the JSON
+file written for fleet collection. Histograms have fixed log-scale buckets
+held in preallocated arrays, so record() appends nothing and keeps no
+samples: per-keystroke timing costs a bisect and two array updates.
+Other components' counters (query cache, prefetcher, event bridge) are
+pulled in by collectors when a snapshot is taken.
+"""
+import json
+import math
+import os
+import threading
+import time
+from array import array
+from bisect import bisect_left
+
+# Bucket upper bounds in seconds: 1 us to ~100 s, four buckets per doubling
+BUCKET_BOUNDS = [1e-6 * 2 ** (i / 4) for i in range(4 * 27)]
+
+
+class Counter:
+    __slots__ = ('value', '_lock')
+
+    def __init__(self):
+        self.value = 0
+        self._lock = threading.Lock()
+
+    def add(self, amount=1):
+        with self._lock:
+            self.value += amount
+
+
+class Gauge:
+    __slots__ = ('value',)
+
+    def __init__(self):
+        self.value = 0
+
+    def set(self, value):
+        self.value = value
+
+
+class Histogram:
+    """Latency distribution with fixed buckets (BUCKET_BOUNDS, plus overflow)."""
+    __slots__ = ('counts', 'totals', '_lock')
+
+    def __init__(self):
+        self.counts = array('q', bytes(8 * (len(BUCKET_BOUNDS) + 1)))
+        self.totals = array('d', [0.0, 0.0, math.inf])  # sum, max, min
+        self._lock = threading.Lock()
+
+    def record(self, seconds):
+        i = bisect_left(BUCKET_BOUNDS, seconds)
+        totals = self.totals
+        with self._lock:
+            self.counts[i] += 1
+            totals[0] += seconds
+            if seconds > totals[1]:
+                totals[1] = seconds
+            if seconds < totals[2]:
+                totals[2] = seconds
+
+    def time(self):
+        """Return a context manager recording the duration of its block."""
+        return _Timer(self)
+
+    def percentile(self, fraction, counts=None):
+        """Upper bound of the bucket holding the given fraction of samples, in seconds."""
+        counts = counts if counts is not None else self.counts
+        total = sum(counts)
+        if not total:
+            return 0.0
+        rank = max(1, math.ceil(fraction * total))
+        seen = 0
+        for i, count in enumerate(counts):
+            seen += count
+            if seen >= rank:
+                return BUCKET_BOUNDS[i] if i < len(BUCKET_BOUNDS) else self.totals[1]
+        return self.totals[1]
+
+    def summary(self):
+        """Return count, mean, percentiles and extremes in milliseconds."""
+        with self._lock:
+            counts = array('q', self.counts)
+            total, largest, smallest = self.totals
+        count = sum(counts)
+        if not count:
+            return {'count': 0}
+        ms = 1000.0
+        return {
+            'count': count,
+            'mean_ms': total / count * ms,
+            'p50_ms': self.percentile(0.50, counts) * ms,
+            'p90_ms': self.percentile(0.90, counts) * ms,
+            'p99_ms': self.percentile(0.99, counts) * ms,
+            'min_ms': smallest * ms,
+            'max_ms': largest * ms,
+        }
+
+
+class _Timer:
+    __slots__ = ('histogram', 'start')
+
+    def __init__(self, histogram):
+        self.histogram = histogram
+
+    def __enter__(self):
+        self.start = time.perf_counter()
+        return self
+
+    def __exit__(self, *exc):
+        self.histogram.record(time.perf_counter() - self.start)
+        return False
+
+
+class MetricsRegistry:
+    """Named metrics, created on first use; snapshot() returns plain dicts."""
+    def __init__(self):
+        self.started = time.time()
+        self.counters = {}
+        self.gauges = {}
+        self.histograms = {}
+        self.collectors = {}  # name -> function returning a dict of numbers
+        self._lock = threading.Lock()
+
+    def _get(self, table, name, kind):
+        metric = table.get(name)
+        if metric is None:
+            with self._lock:
+                metric = table.setdefault(name, kind())
+        return metric
+
+    def counter(self, name):
+        return self._get(self.counters, name, Counter)
+
+    def gauge(self, name):
+        return self._get(self.gauges, name, Gauge)
+
+    def histogram(self, name):
+        return self._get(self.histograms, name, Histogram)
+
+    def add_collector(self, name, collect):
+        """Include collect() (e.g. a component's stats()) in every snapshot under name."""
+        self.collectors[name] = collect
+
+    def snapshot(self):
+        snapshot = {
+            'started': self.started,
+            'uptime_seconds': time.time() - self.started,
+            'counters': {name: c.value for name, c in sorted(self.counters.items())},
+            'gauges': {name: g.value for name, g in sorted(self.gauges.items())},
+            'histograms': {name: h.summary() for name, h in sorted(self.histograms.items())},
+        }
+        for name, collect in sorted(self.collectors.items()):
+            try:
+                snapshot[name] = collect()
+            except Exception as e:
+                snapshot[name] = {'error': str(e)}
+        return snapshot
+
+    def dump(self, path=None):
+        """Write a snapshot as JSON (atomically) and return the path."""
+        path = path or default_metrics_file()
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        temp_path = f"{path}.tmp"
+        with open(temp_path, "w", encoding="utf-8") as f:
+            json.dump(self.snapshot(), f, indent=2)
+        os.replace(temp_path, path)
+        return path
+
+
+def default_metrics_file():
+    base = os.environ.get("LOCALAPPDATA") or os.path.expanduser("~")
+    return os.path.join(base, "OfflineLauncher", "metrics.json")
+
+
+def format_snapshot(snapshot):
+    """Return a snapshot as the text shown in the Statistics window."""
+    lines = [f"Uptime: {snapshot['uptime_seconds'] / 60:.0f} min", ""]
+    if snapshot['histograms']:
+        lines.append("Latencies (ms)          count    p50    p90    p99    max")
+        for name, h in snapshot['histograms'].items():
+            if h['count']:
+                lines.append(f"  {name:<20} {h['count']:>7} {h['p50_ms']:6.1f} {h['p90_ms']:6.1f} "
+                             f"{h['p99_ms']:6.1f} {h['max_ms']:6.1f}")
+        lines.append("")
+    for title, table in (("Counters", snapshot['counters']), ("Gauges", snapshot['gauges'])):
+        if table:
+            lines.append(title)
+            lines.extend(f"  {name:<32} {_number(value)}" for name, value in table.items())
+            lines.append("")
+    for name, values in snapshot.items():
+        if name in ('started', 'uptime_seconds', 'counters', 'gauges', 'histograms'):
+            continue
+        lines.append(name.replace("_", " ").capitalize())
+        lines.extend(f"  {key:<32} {_number(value)}" for key, value in values.items())
+        lines.append("")
+    return "\n".join(lines).rstrip() + "\n"
+
+
+def _number(value):
+    return f"{value:.3f}" if isinstance(value, float) else str(value)
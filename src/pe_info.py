@@ -0,0 +1,291 @@
+"""Names and kinds of Windows executables, read from their PE headers.
+
+Program folders are full of executables whose file names make poor display
+names ("msedge", "Code") and of console helpers nobody launches from a
+launcher. read_pe_info() reads what Windows Explorer shows instead: the PE
+subsystem and DLL flag from the headers, and FileDescription, ProductName
+and CompanyName from the version resource. It is pure Python, so it runs
+on any platform, and it maps only the header pages and the resource
+section of the file, never the code.
+
+PEInfoCache keeps the result per executable while its size and mtime are
+unchanged, so a rescan parses only new or updated executables.
+"""
+import mmap
+import os
+import struct
+
+# --- Header fields ---
+DOS_MAGIC = b"MZ"
+PE_MAGIC = b"PE\x00\x00"
+PE32 = 0x10B
+PE32_PLUS = 0x20B
+IMAGE_FILE_DLL = 0x2000
+SUBSYSTEM_GUI = 2
+SUBSYSTEM_CONSOLE = 3
+RESOURCE_DIRECTORY = 2  # Index of the resource table among the data directories
+RT_VERSION = 16
+HEADER_BYTES = 4096  # Mapped first; enough for the headers of nearly every executable
+MAX_HEADER_BYTES = 64 * 1024
+MAX_RESOURCE_DEPTH = 3  # Type, name, language
+MAX_NAME_LENGTH = 64  # Longer descriptions are sentences, not names
+
+# Version strings read, as result keys
+VERSION_STRINGS = {'FileDescription': 'description', 'ProductName': 'product',
+                   'CompanyName': 'company'}
+# String tables tried first: US English, then language neutral
+PREFERRED_LANGUAGES = ("0409", "0000")
+
+_COFF = struct.Struct("<HHIIIHH")  # machine, sections, timestamp, symbols (2), optional size, flags
+_SECTION = struct.Struct("<8sIIII")  # name, virtual size, virtual address, raw size, raw offset
+_SECTION_SIZE = 40
+_RESOURCE_ENTRY = struct.Struct("<II")  # name or id, offset (high bit: subdirectory)
+_RESOURCE_DATA = struct.Struct("<II")  # data RVA, size
+_BLOCK = struct.Struct("<HHH")  # length, value length, type (1 = text)
+
+
+class PEFormatError(ValueError):
+    """The file is not a PE executable, or its headers are damaged."""
+
+
+def read_pe_info(path):
+    """Return {'subsystem', 'dll', 'description', 'product', 'company'} of a PE file.
+
+    The version strings are None when the file has no version resource or
+    does not set them. Raises PEFormatError for files that are not PE
+    executables and OSError if the file cannot be read.
+    """
+    with open(path, "rb") as f:
+        size = os.fstat(f.fileno()).st_size
+        if size < 64:
+            raise PEFormatError(f"{path}: too small for a PE file")
+        try:
+            length = min(size, HEADER_BYTES)
+            while True:
+                with _map(f, 0, length) as headers:
+                    needed = _header_size(headers, path)
+                    if needed <= length:
+                        info, sections, resources = _parse_headers(headers, path)
+                        break
+                if needed > min(size, MAX_HEADER_BYTES):
+                    raise PEFormatError(f"{path}: truncated headers")
+                length = needed
+            info.update(dict.fromkeys(VERSION_STRINGS.values()))
+            resource_rva, resource_size = resources
+            section = _section_of(sections, resource_rva) if resource_size else None
+            if section is not None:
+                info.update(_read_version_strings(f, size, section, resource_rva))
+        except struct.error:
+            raise PEFormatError(f"{path}: truncated headers")
+    return info
+
+
+def is_gui_app(info):
+    """True for executables a launcher should list from a program folder: GUI, not a DLL."""
+    return info['subsystem'] == SUBSYSTEM_GUI and not info['dll']
+
+
+def is_program(info):
+    """True for GUI and console executables, which PATH may both hold; False for DLLs and drivers."""
+    return info['subsystem'] in (SUBSYSTEM_GUI, SUBSYSTEM_CONSOLE) and not info['dll']
+
+
+def display_name(info):
+    """Return the name Explorer shows for the executable, or None if it has none."""
+    for field in ('description', 'product'):
+        name = info.get(field)
+        if name and len(name) <= MAX_NAME_LENGTH:
+            return name
+    return None
+
+
+def _map(f, offset, length):
+    """Map length bytes of f from offset, which need not be aligned."""
+    start = offset - offset % mmap.ALLOCATIONGRANULARITY
+    return mmap.mmap(f.fileno(), offset + length - start, offset=start, access=mmap.ACCESS_READ)
+
+
+def _header_size(buf, path):
+    """Return the size of the DOS, PE and section headers together."""
+    if buf[:2] != DOS_MAGIC:
+        raise PEFormatError(f"{path}: not an executable")
+    pe_offset = struct.unpack_from("<I", buf, 0x3C)[0]
+    if pe_offset + 4 + _COFF.size > len(buf):
+        return pe_offset + 4 + _COFF.size  # Checked again once mapped
+    if buf[pe_offset:pe_offset + 4] != PE_MAGIC:
+        raise PEFormatError(f"{path}: not a PE executable")
+    _, sections, _, _, _, optional_size, _ = _COFF.unpack_from(buf, pe_offset + 4)
+    return pe_offset + 4 + _COFF.size + optional_size + sections * _SECTION_SIZE
+
+
+def _parse_headers(buf, path):
+    """Return (info, [(virtual address, virtual size, raw offset, raw size)], (resource RVA, size))."""
+    pe_offset = struct.unpack_from("<I", buf, 0x3C)[0]
+    if buf[pe_offset:pe_offset + 4] != PE_MAGIC:
+        raise PEFormatError(f"{path}: not a PE executable")
+    _, count, _, _, _, optional_size, flags = _COFF.unpack_from(buf, pe_offset + 4)
+    optional = pe_offset + 4 + _COFF.size
+    magic = struct.unpack_from("<H", buf, optional)[0]
+    if magic == PE32:
+        directories = optional + 96
+    elif magic == PE32_PLUS:
+        directories = optional + 112
+    else:
+        raise PEFormatError(f"{path}: unknown optional header {magic:#x}")
+    subsystem = struct.unpack_from("<H", buf, optional + 68)[0]
+    directory_count = struct.unpack_from("<I", buf, directories - 4)[0]
+    resources = (0, 0)
+    resources_end = directories + 8 * (RESOURCE_DIRECTORY + 1)
+    if directory_count > RESOURCE_DIRECTORY and resources_end <= optional + optional_size:
+        resources = struct.unpack_from("<II", buf, directories + 8 * RESOURCE_DIRECTORY)
+    sections = []
+    for i in range(count):
+        _, virtual_size, address, raw_size, raw_offset = _SECTION.unpack_from(
+            buf, optional + optional_size + i * _SECTION_SIZE)
+        sections.append((address, virtual_size, raw_offset, raw_size))
+    info = {'subsystem': subsystem, 'dll': bool(flags & IMAGE_FILE_DLL)}
+    return info, sections, resources
+
+
+def _section_of(sections, rva):
+    for section in sections:
+        address, virtual_size, _, raw_size = section
+        if address <= rva < address + max(virtual_size, raw_size):
+            return section
+    return None
+
+
+def _read_version_strings(f, size, section, resource_rva):
+    """Map the resource section and return the version strings found in it."""
+    address, _, raw_offset, raw_size = section
+    raw_size = min(raw_size, size - raw_offset)
+    if raw_size <= 0:
+        return {}
+    with _map(f, raw_offset, raw_size) as mapped:
+        delta = raw_offset % mmap.ALLOCATIONGRANULARITY  # Where the section starts in the map
+        root = delta + resource_rva - address
+        entry = _find_resource(mapped, root, RT_VERSION)
+        if entry is None:
+            return {}
+        data_rva, data_size = _RESOURCE_DATA.unpack_from(mapped, root + entry)
+        start = delta + data_rva - address
+        if data_rva < address or start + data_size > len(mapped):
+            return {}  # Not in the resource section; not worth a second mapping
+        data = mapped[start:start + data_size]
+    return _version_strings(data)
+
+
+def _find_resource(buf, root, type_id):
+    """Return the offset (from root) of the data entry of the first resource of type_id, or None."""
+    offset = 0
+    for depth in range(MAX_RESOURCE_DEPTH):
+        named, ids = struct.unpack_from("<HH", buf, root + offset + 12)
+        entries = [_RESOURCE_ENTRY.unpack_from(buf, root + offset + 16 + 8 * i)
+                   for i in range(named + ids)]
+        if depth == 0:
+            # The type level: ids come after the named entries
+            entries = [entry for entry in entries[named:] if entry[0] == type_id]
+        if not entries:
+            return None
+        target = entries[0][1]
+        if (target & 0x80000000) != (depth < MAX_RESOURCE_DEPTH - 1) << 31:
+            return None  # A leaf where a directory belongs, or the other way round
+        offset = target & 0x7FFFFFFF
+    return offset
+
+
+def _version_strings(data):
+    """Return the VERSION_STRINGS of a VS_VERSIONINFO block, from the preferred string table."""
+    tables = []
+    for key, _, blocks in _children(data, 0, len(data)):
+        if key != "VS_VERSION_INFO":
+            break
+        for key, _, string_tables in blocks:
+            if key != "StringFileInfo":
+                continue
+            for language, _, strings in string_tables:
+                tables.append((language[:4].lower(), {name: value for name, value, _ in strings}))
+    tables.sort(key=lambda table: (PREFERRED_LANGUAGES.index(table[0])
+                                   if table[0] in PREFERRED_LANGUAGES else len(PREFERRED_LANGUAGES)))
+    found = {}
+    for name, field in VERSION_STRINGS.items():
+        for _, strings in tables:
+            value = (strings.get(name) or "").strip()
+            if value:
+                found[field] = value
+                break
+    return found
+
+
+def _children(data, start, end):
+    """Yield (key, text value or None, children) for the version blocks between start and end.
+
+    children is a generator over the block's own children.
+    """
+    offset = start
+    while offset + _BLOCK.size <= end:
+        length, value_length, kind = _BLOCK.unpack_from(data, offset)
+        if length < _BLOCK.size:
+            return
+        block_end = min(offset + length, end)
+        key_end = _utf16_end(data, offset + _BLOCK.size, block_end)
+        key = data[offset + _BLOCK.size:key_end].decode("utf-16-le", "replace")
+        value_start = _align(key_end + 2)
+        value = None
+        if kind == 1:
+            if value_length:
+                # value_length counts characters, though some linkers write bytes
+                value = data[value_start:_utf16_end(data, value_start, block_end)].decode("utf-16-le", "replace")
+            value_end = value_start + 2 * value_length
+        else:
+            value_end = value_start + value_length
+        yield key, value, _children(data, _align(value_end), block_end)
+        offset = _align(block_end)
+
+
+def _utf16_end(data, start, end):
+    """Return the offset of the UTF-16 NUL terminating the string at start (or end)."""
+    offset = start
+    while True:
+        offset = data.find(b"\x00\x00", offset, end)
+        if offset < 0:
+            return end
+        if (offset - start) % 2 == 0:
+            return offset
+        offset += 1
+
+
+def _align(offset):
+    return (offset + 3) & ~3
+
+
+class PEInfoCache:
+    """PE info per executable, reused while the file's size and mtime are unchanged.
+
+    info() returns None for files that are not PE executables, and raises
+    OSError for files it cannot stat or read. Thread-safe for the scans of
+    one process (each entry is replaced whole).
+    """
+    def __init__(self, reader=read_pe_info):
+        self.reader = reader
+        self._entries = {}  # normcased path -> (size, mtime, info or None)
+        self.hits = 0
+        self.misses = 0
+
+    def info(self, path):
+        st = os.stat(path)
+        key = os.path.normcase(path)
+        cached = self._entries.get(key)
+        if cached is not None and cached[0] == st.st_size and cached[1] == st.st_mtime:
+            self.hits += 1
+            return cached[2]
+        self.misses += 1
+        try:
+            info = self.reader(path)
+        except PEFormatError:
+            info = None
+        self._entries[key] = (st.st_size, st.st_mtime, info)
+        return info
+
+    def __len__(self):
+        return len(self._entries)
@@ -0,0 +1,199 @@
+"""Reading likely launches into the OS page cache ahead of time.
+
+While the launcher is visible, the Prefetcher reads the executable of the
+top-ranked result, the DLLs next to it and the most launched apps on a
+background thread, so a cold launch finds them in the page cache instead of
+waiting on the disk. Every request replaces the previous one (typing
+cancels what the last keystroke asked for), reads are throttled and stop
+at a byte budget, and where the OS offers an advisory call
+(posix_fadvise WILLNEED) it is issued first.
+
+LaunchHistory keeps per-app launch counts; hit rate is the share of
+launches whose executable had been prefetched shortly before. An app whose
+reads the byte budget cut short still counts as prefetched (its first
+pages are cached); 'truncated' counts those.
+"""
+import json
+import os
+import threading
+import time
+
+BYTE_BUDGET = 64 * 1024 * 1024      # Per request
+CHUNK_SIZE = 1024 * 1024
+MAX_RATE = 128 * 1024 * 1024        # Bytes per second; keeps the disk free for the user
+HIT_WINDOW = 300.0                  # A prefetch older than this does not count as a hit
+MAX_DLLS_PER_APP = 16
+
+
+def default_history_file():
+    base = os.environ.get("LOCALAPPDATA") or os.path.expanduser("~")
+    return os.path.join(base, "OfflineLauncher", "launch_history.json")
+
+
+class LaunchHistory:
+    """Launch counts per executable path, saved as JSON; safe to use from any thread."""
+    def __init__(self, path=None):
+        self.path = path or default_history_file()
+        self.counts = {}
+        self._lock = threading.Lock()
+        try:
+            with open(self.path, encoding="utf-8") as f:
+                self.counts = {k: int(v) for k, v in json.load(f).items()}
+        except (OSError, ValueError, AttributeError):
+            pass
+
+    def record(self, exe_path):
+        key = exe_path.lower()
+        with self._lock:
+            self.counts[key] = self.counts.get(key, 0) + 1
+            try:
+                os.makedirs(os.path.dirname(self.path), exist_ok=True)
+                temp_path = f"{self.path}.tmp"
+                with open(temp_path, "w", encoding="utf-8") as f:
+                    json.dump(self.counts, f)
+                os.replace(temp_path, self.path)
+            except OSError as e:
+                print(f"Warning: Could not save launch history: {e}")
+
+    def most_launched(self, count):
+        """Return up to count paths (lowered), most launched first."""
+        with self._lock:
+            ranked = sorted(self.counts.items(), key=lambda item: -item[1])
+        return [path for path, _ in ranked[:count]]
+
+
+def companion_files(exe_path, limit=MAX_DLLS_PER_APP):
+    """Return the DLLs in the executable's folder, which a launch loads too."""
+    directory = os.path.dirname(exe_path)
+    try:
+        with os.scandir(directory) as entries:
+            dlls = [e.path for e in entries if e.name.lower().endswith(".dll") and e.is_file()]
+    except OSError:
+        return []
+    return sorted(dlls)[:limit]
+
+
+class Prefetcher:
+    """Reads files into the page cache on a throttled background thread.
+
+    request() replaces the pending work; cancel() drops it. Counters for
+    the hit rate and the bytes read are in stats(). With thread=False no
+    thread is started, and the caller runs run() on one of its own until
+    stop().
+    """
+    def __init__(self, byte_budget=BYTE_BUDGET, chunk_size=CHUNK_SIZE, max_rate=MAX_RATE,
+                 companions=companion_files, clock=time.monotonic, thread=True):
+        self.byte_budget = byte_budget
+        self.chunk_size = chunk_size
+        self.max_rate = max_rate
+        self.companions = companions
+        self.clock = clock
+        self._lock = threading.Lock()
+        self._wake = threading.Event()
+        self._request = 0   # Bumped by every request() and cancel()
+        self._paths = []
+        self._done = {}     # path.lower() -> time its prefetch finished
+        self._stopped = False
+        self.idle = threading.Event()
+        self.idle.set()
+        self.counters = {'requests': 0, 'cancelled': 0, 'files': 0, 'bytes': 0,
+                         'truncated': 0, 'launches': 0, 'hits': 0}
+        if thread:
+            threading.Thread(target=self.run, name="Prefetcher", daemon=True).start()
+
+    def request(self, exe_paths):
+        """Prefetch exe_paths (most likely first) and their DLLs, replacing older requests."""
+        with self._lock:
+            if not self.idle.is_set():
+                self.counters['cancelled'] += 1
+            self._request += 1
+            # Without repeats, each in the place of its first (most likely) occurrence
+            seen = set()
+            self._paths = [path for path in exe_paths
+                           if path.lower() not in seen and not seen.add(path.lower())]
+            self.counters['requests'] += 1
+            self.idle.clear()
+        self._wake.set()
+
+    def cancel(self):
+        with self._lock:
+            if not self.idle.is_set():
+                self.counters['cancelled'] += 1
+            self._request += 1
+            self._paths = []
+        self._wake.set()
+
+    def stop(self):
+        """Drop the pending work and make run() return."""
+        self._stopped = True
+        self.cancel()
+
+    def record_launch(self, exe_path):
+        """Count a launch, and a hit if exe_path was prefetched within HIT_WINDOW."""
+        with self._lock:
+            self.counters['launches'] += 1
+            done_at = self._done.get(exe_path.lower())
+            if done_at is not None and self.clock() - done_at <= HIT_WINDOW:
+                self.counters['hits'] += 1
+
+    def stats(self):
+        with self._lock:
+            stats = dict(self.counters)
+        stats['hit_rate'] = stats['hits'] / stats['launches'] if stats['launches'] else 0.0
+        return stats
+
+    def _current(self, request):
+        return self._request == request
+
+    def run(self):
+        """Serve requests until stop()."""
+        buffer = bytearray(self.chunk_size)
+        while not self._stopped:
+            self._wake.wait()
+            with self._lock:
+                self._wake.clear()
+                request = self._request
+                paths = self._paths
+            budget = self.byte_budget
+            for exe_path in paths:
+                if budget <= 0 or not self._current(request):
+                    break
+                for path in [exe_path] + self.companions(exe_path):
+                    if budget <= 0 or not self._current(request):
+                        break
+                    budget -= self._read(path, budget, buffer, request)
+                # Prefetched unless a newer request cut it short; a budget cut leaves its start cached
+                if self._current(request):
+                    with self._lock:
+                        self._done[exe_path.lower()] = self.clock()
+                        if budget <= 0:
+                            self.counters['truncated'] += 1
+            with self._lock:
+                if self._request == request:
+                    self.idle.set()
+
+    def _read(self, path, budget, buffer, request):
+        """Read up to budget bytes of path, giving up when the request changes."""
+        read_total = 0
+        try:
+            with open(path, "rb", buffering=0) as f:
+                if hasattr(os, "posix_fadvise"):
+                    os.posix_fadvise(f.fileno(), 0, min(budget, os.fstat(f.fileno()).st_size),
+                                     os.POSIX_FADV_WILLNEED)
+                view = memoryview(buffer)
+                start = time.monotonic()
+                while read_total < budget and self._current(request):
+                    n = f.readinto(view[:min(len(buffer), budget - read_total)])
+                    if not n:
+                        break
+                    read_total += n
+                    # Throttle to max_rate
+                    ahead = read_total / self.max_rate - (time.monotonic() - start)
+                    if ahead > 0:
+                        time.sleep(ahead)
+        except OSError:
+            return read_total
+        with self._lock:
+            self.counters['files'] += 1
+            self.counters['bytes'] += read_total
+        return read_total
@@ -0,0 +1,175 @@
+"""Rendering of search results into the launcher's Listbox.
+
+Only the widget's Tcl-facing methods are used, so any object with the
+Listbox interface (including the benchmarks' fake widget) can be passed in.
+"""
+
+from bisect import bisect_left
+
+END = "end"  # Same value as tkinter.END
+MAX_DISPLAY_LENGTH = 70
+NO_MATCHES_TEXT = "No matching applications found"
+
+def display_name(app):
+    """Return the app name truncated for display in the list."""
+    name = app['name']
+    return name[:MAX_DISPLAY_LENGTH] + '...' if len(name) > MAX_DISPLAY_LENGTH else name
+
+def fill_listbox(listbox, results, empty_text=None):
+    """Replace the listbox contents with results and select the first row.
+
+    If there are no results and empty_text is given, it is shown greyed out.
+    """
+    listbox.delete(0, END)
+    listbox.config(fg="white")  # Reset color
+
+    for app in results:
+        listbox.insert(END, display_name(app))
+
+    if not results and empty_text:
+        listbox.insert(END, empty_text)
+        listbox.config(fg="gray")
+
+    # Select first item if there are results
+    if results:
+        listbox.select_set(0)
+        listbox.activate(0)
+
+
+# --- Incremental rendering ---
+
+def _row_keys(results, empty_text):
+    """Return one hashable key per row; equal keys render identically."""
+    if not results:
+        return [(None, empty_text)] if empty_text else []
+    keys = []
+    seen = {}
+    for app in results:
+        key = (app['path'], display_name(app))
+        # Number repeats so every key is unique within one render
+        seen[key] = seen.get(key, -1) + 1
+        keys.append(key + (seen[key],))
+    return keys
+
+def _kept_rows(old, new):
+    """Return the (old index, new index) pairs of the rows kept between two renders.
+
+    Rows present in both lists stay if their order allows it; the kept rows
+    are the longest run of them in increasing old order (patience sorting),
+    so everything else is one delete or one insert.
+    """
+    old_index = {key: i for i, key in enumerate(old)}
+    pairs = [(old_index[key], j) for j, key in enumerate(new) if key in old_index]
+    if not pairs:
+        return []
+    # Longest increasing subsequence of the old indices, O(n log n)
+    tails = []  # tails[k] = position in pairs of the smallest tail of a run of length k + 1
+    previous = [-1] * len(pairs)
+    tail_values = []
+    for p, (i, _) in enumerate(pairs):
+        k = bisect_left(tail_values, i)
+        if k == len(tails):
+            tails.append(p)
+            tail_values.append(i)
+        else:
+            tails[k] = p
+            tail_values[k] = i
+        previous[p] = tails[k - 1] if k else -1
+    kept = []
+    p = tails[-1]
+    while p != -1:
+        kept.append(pairs[p])
+        p = previous[p]
+    kept.reverse()
+    return kept
+
+def _runs(indices):
+    """Group sorted indices into (first, last) runs of consecutive values."""
+    runs = []
+    for i in indices:
+        if runs and runs[-1][1] == i - 1:
+            runs[-1][1] = i
+        else:
+            runs.append([i, i])
+    return runs
+
+
+class ResultsView:
+    """View model of the results Listbox that only sends what changed.
+
+    show() diffs the new rows against the ones on screen and applies the
+    difference as range deletes and multi-row inserts. A selection the user
+    moved with select() stays on the same app while it is in the results;
+    otherwise the first row is selected, as fill_listbox() does.
+    """
+    def __init__(self, listbox):
+        self.listbox = listbox
+        self.rows = []          # Keys of the rows on screen
+        self.fg = None
+        self.selected = None    # Index of the selected row
+        self.user_selected = False
+
+    def invalidate(self):
+        """Forget what is on screen after the listbox was changed directly."""
+        self.rows = []
+        self.fg = None
+        self.selected = None
+        self.user_selected = False
+        self.listbox.delete(0, END)
+
+    def show(self, results, empty_text=None):
+        listbox = self.listbox
+        old = self.rows
+        new = _row_keys(results, empty_text)
+        selected_key = old[self.selected] if self.selected is not None else None
+
+        kept = _kept_rows(old, new)
+        kept_old = {i for i, _ in kept}
+        kept_new = {j for _, j in kept}
+
+        # Deletes from the bottom up, so earlier indices stay valid
+        for first, last in reversed(_runs(i for i in range(len(old)) if i not in kept_old)):
+            if last == len(old) - 1:
+                listbox.delete(first, END)
+            elif first == last:
+                listbox.delete(first)
+            else:
+                listbox.delete(first, last)
+        # Inserts from the top down: rows before each run are already in place
+        for first, last in _runs(j for j in range(len(new)) if j not in kept_new):
+            listbox.insert(first, *[key[1] for key in new[first:last + 1]])
+        self.rows = new
+
+        fg = "white" if results else "gray"
+        if fg != self.fg:
+            listbox.config(fg=fg)
+            self.fg = fg
+
+        # Tk keeps the selection on its element; find where that element went
+        on_screen = None
+        if selected_key is not None and self.selected in kept_old:
+            on_screen = dict(kept)[self.selected]
+        target = None
+        if results:
+            target = 0
+            if self.user_selected and on_screen is not None:
+                target = on_screen
+            else:
+                self.user_selected = False
+        if target != on_screen:
+            if on_screen is not None:
+                listbox.select_clear(0, END)
+            if target is not None:
+                listbox.select_set(target)
+                listbox.activate(target)
+        self.selected = target
+
+    def select(self, index):
+        """Move the selection to index on the user's request and scroll to it."""
+        listbox = self.listbox
+        listbox.select_clear(0, END)  # Also drops a row Tk selected itself on a click
+        listbox.select_set(index)
+        listbox.activate(index)
+        listbox.see(index)
+        self.selected = index
+        self.user_selected = index != 0
@@ -0,0 +1,244 @@
+"""Where a scan spends its time, and why it leaves candidates out.
+
+Usage:
+    launcher.py --profile-scan [--source ID ...] [--scope machine|user]
+                               [--format text|json] [--output FILE] [--top N]
+                               [--cprofile FILE] [--replay ARCHIVE]
+
+The scanners tell a ScanProfile in their providers when they start on a
+root (a registry key, or a Start Menu, desktop, program or PATH folder)
+and, for each candidate below it (an Uninstall subkey, a shortcut, an
+executable), whether it was added or which of scanner.REJECTION_RULES
+turned it down. profile_scan() runs an unbudgeted scan with one and
+returns a report with these counts per source and per root, slowest first:
+- the seconds spent
+- the candidates seen and added
+- the apps that were new to the scan
+- the rejections, by rule
+
+The report shows which roots, depth limits and filters are worth tuning.
+With --cprofile the scan also runs under cProfile. Its stats are written
+to FILE for pstats or snakeviz, and the report lists the functions with
+the most own time.
+
+Like --export, this runs without the GUI and without importing Tk.
+Without a profile, a scan only checks providers.profile once per candidate.
+"""
+import argparse
+import contextlib
+import cProfile
+import json
+import os
+import pstats
+import sys
+import time
+
+import scanner
+
+SCOPES = {"machine": scanner.MACHINE, "user": scanner.USER}
+TOP = 20  # Roots and functions listed in the text report
+UNATTRIBUTED = ("unattributed", "")  # Candidates counted outside any root
+
+
+class ScanProfile:
+    """Seconds and candidates per (source, root), as the scanners report them.
+
+    One profile belongs to one scan at a time; it is not thread-safe.
+    """
+    def __init__(self, clock=time.perf_counter):
+        self.clock = clock
+        self.roots = {}  # (source, root) -> entry dict
+        self._current = None
+
+    def _entry(self, source, root):
+        entry = self.roots.get((source, root))
+        if entry is None:
+            entry = self.roots[(source, root)] = {
+                'source': source, 'root': root, 'seconds': 0.0, 'visits': 0,
+                'seen': 0, 'added': 0, 'new': 0, 'rejected': {}}
+        return entry
+
+    @contextlib.contextmanager
+    def root(self, source, root, apps_dict):
+        """Count the time and candidates of the block towards root of source."""
+        entry = self._entry(source, root)
+        outer, self._current = self._current, entry
+        found_before = len(apps_dict)
+        start = self.clock()
+        try:
+            yield entry
+        finally:
+            entry['seconds'] += self.clock() - start
+            entry['visits'] += 1
+            entry['new'] += len(apps_dict) - found_before
+            self._current = outer
+
+    def count(self, rejected=None):
+        """Count a candidate of the current root: added, or rejected by the rule id rejected."""
+        entry = self._current or self._entry(*UNATTRIBUTED)
+        entry['seen'] += 1
+        if rejected is None:
+            entry['added'] += 1
+        else:
+            entry['rejected'][rejected] = entry['rejected'].get(rejected, 0) + 1
+
+
+def profiled_providers(providers, profile):
+    """Return providers reading from the same sources that report to profile."""
+    return scanner.ScanProviders(providers.fs, providers.registry, providers.shortcuts,
+                                 providers.folders, providers.listings, providers.exe_info, profile)
+
+
+def _top_functions(profiler, limit):
+    """Return the functions with the most own time in profiler, as dicts."""
+    functions = []
+    for (filename, line, name), (_, calls, own, cumulative, _) in pstats.Stats(profiler).stats.items():
+        # Built-ins have no file: ('~', 0, "<built-in method ...>")
+        function = f"{os.path.basename(filename)}:{line}({name})" if line else name
+        functions.append({'function': function, 'calls': calls,
+                          'seconds': own, 'cumulative': cumulative})
+    functions.sort(key=lambda function: function['seconds'], reverse=True)
+    return functions[:limit]
+
+
+def build_report(profile, plan, catalog, seconds):
+    """Return the report of a profiled ScanPlan: sources, roots (slowest first) and rules."""
+    roots = sorted(profile.roots.values(), key=lambda entry: entry['seconds'], reverse=True)
+    source_seconds = {source['source']: source['seconds'] for source in plan.stats['sources']}
+    sources = {}
+    for entry in roots:
+        totals = sources.setdefault(entry['source'], {
+            'source': entry['source'], 'seconds': source_seconds.get(entry['source'], 0.0),
+            'roots': 0, 'seen': 0, 'added': 0, 'new': 0, 'rejected': {}})
+        totals['roots'] += 1
+        for field in ('seen', 'added', 'new'):
+            totals[field] += entry[field]
+        for rule, count in entry['rejected'].items():
+            totals['rejected'][rule] = totals['rejected'].get(rule, 0) + count
+    rules = {}
+    for totals in sources.values():
+        for rule, count in totals['rejected'].items():
+            rules[rule] = rules.get(rule, 0) + count
+    return {
+        'seconds': seconds,
+        'apps': len(catalog),
+        'seen': sum(entry['seen'] for entry in roots),
+        'added': sum(entry['added'] for entry in roots),
+        'sources': sorted(sources.values(), key=lambda totals: totals['seconds'], reverse=True),
+        'roots': [dict(entry, rejected=_by_count(entry['rejected'])) for entry in roots],
+        'rules': _by_count(rules),
+        'network': plan.stats['network'],
+        'cprofile': None,
+    }
+
+
+def _by_count(counts):
+    return dict(sorted(counts.items(), key=lambda item: (-item[1], item[0])))
+
+
+def profile_scan(providers=None, sources=None, scope=None, cprofile=None, top=TOP):
+    """Scan with a ScanProfile and return its report (see build_report).
+
+    sources and scope are as for scanner.ScanPlan. With cprofile, a file
+    name, the scan runs under cProfile, its stats are saved there and the
+    report's 'cprofile' lists the top functions by own time.
+    """
+    profile = ScanProfile()
+    providers = profiled_providers(providers or scanner.default_providers(), profile)
+    plan = scanner.ScanPlan(providers, scope=scope, sources=sources)
+    profiler = cProfile.Profile() if cprofile else None
+    start = time.perf_counter()
+    # Keep the scanners' messages out of the report
+    with contextlib.redirect_stdout(sys.stderr):
+        catalog = profiler.runcall(plan.run) if profiler else plan.run()
+    report = build_report(profile, plan, catalog, time.perf_counter() - start)
+    if profiler:
+        profiler.dump_stats(cprofile)
+        report['cprofile'] = {'file': cprofile, 'functions': _top_functions(profiler, top)}
+    return report
+
+
+def _rejections(rejected):
+    return ", ".join(f"{rule} {count}" for rule, count in rejected.items())
+
+
+def format_report(report, top=TOP):
+    """Return the report of profile_scan() as lines of text."""
+    lines = [f"Scan profile: {report['apps']} apps in {report['seconds']:.3f}s, "
+             f"{report['seen']} candidates seen, {report['added']} added, "
+             f"{report['seen'] - report['added']} rejected", "",
+             "Sources (slowest first)",
+             f"  {'source':<14} {'seconds':>8} {'roots':>6} {'seen':>7} {'added':>7} {'new':>7}  rejected"]
+    for source in report['sources']:
+        lines.append(f"  {source['source']:<14} {source['seconds']:>8.3f} {source['roots']:>6} "
+                     f"{source['seen']:>7} {source['added']:>7} {source['new']:>7}  "
+                     f"{_rejections(source['rejected'])}")
+
+    roots = report['roots'][:top]
+    lines += ["", f"Roots (slowest {len(roots)} of {len(report['roots'])})",
+              f"  {'seconds':>8} {'seen':>7} {'added':>7} {'new':>7}  {'source':<14} root"]
+    for root in roots:
+        lines.append(f"  {root['seconds']:>8.3f} {root['seen']:>7} {root['added']:>7} {root['new']:>7}  "
+                     f"{root['source']:<14} {root['root']}")
+        if root['rejected']:
+            lines.append(f"  {'':>8} rejected: {_rejections(root['rejected'])}")
+
+    if report['rules']:
+        lines += ["", "Rejections"]
+        for rule, count in report['rules'].items():
+            lines.append(f"  {rule:<18} {count:>7}  {scanner.REJECTION_RULES.get(rule, '')}")
+
+    network = report['network']
+    if network and (network['timeouts'] or network['skipped']):
+        lines += ["", f"Network: {network['probes']} probes, {network['timeouts']} timed out, "
+                      f"{network['skipped']} skipped ({', '.join(network['hosts_down']) or 'no host down now'})"]
+
+    if report['cprofile']:
+        lines += ["", f"Functions by own time (cProfile stats in {report['cprofile']['file']})",
+                  f"  {'seconds':>8} {'cumulative':>10} {'calls':>8}  function"]
+        for function in report['cprofile']['functions'][:top]:
+            lines.append(f"  {function['seconds']:>8.3f} {function['cumulative']:>10.3f} "
+                         f"{function['calls']:>8}  {function['function']}")
+    return lines
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(prog="launcher.py --profile-scan",
+                                     description="Report where a scan spends its time and what it rejects")
+    parser.add_argument("--source", action="append", metavar="ID",
+                        choices=[source_id for source_id, _, _ in scanner.SCAN_SOURCES],
+                        help="profile only this source (repeatable): %(choices)s")
+    parser.add_argument("--scope", choices=sorted(SCOPES), help="scan only machine-wide or per-user sources")
+    parser.add_argument("--format", choices=("text", "json"), default="text")
+    parser.add_argument("--output", "-o", help="write the report to this file instead of stdout")
+    parser.add_argument("--top", type=int, default=TOP,
+                        help="roots and functions listed in the text report (default %(default)s)")
+    parser.add_argument("--cprofile", metavar="FILE", help="also run under cProfile and save its stats here")
+    parser.add_argument("--replay", metavar="ARCHIVE", help="profile a scan of a recording")
+    args = parser.parse_args(argv)
+
+    try:
+        if args.replay:
+            import scan_record
+            providers = scan_record.replay_providers(args.replay)[0]
+        else:
+            providers = scanner.default_providers()
+    except (ImportError, OSError, ValueError) as e:
+        print(f"Error: Cannot read applications: {e}", file=sys.stderr)
+        return 1
+
+    report = profile_scan(providers, args.source, SCOPES.get(args.scope), args.cprofile, args.top)
+    if args.format == "json":
+        text = json.dumps(report, indent=2) + "\n"
+    else:
+        text = "\n".join(format_report(report, args.top)) + "\n"
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as f:
+            f.write(text)
+    elif sys.stdout is not None:  # A windowed build has no console to write to
+        sys.stdout.write(text)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,459 @@
+"""Recording a scan's inputs on one machine and replaying them on another.
+
+record_providers() wraps a ScanProviders so every filesystem call, registry
+enumeration, shortcut target, folder lookup and executable's PE info the
+scanners make is written
+down together with its result (or the error it raised) and how long it
+took. The recording is saved as a gzipped JSON archive. replay_providers()
+loads such an archive into providers that answer the same calls from it, so
+scan_installed_apps() runs unchanged on Linux against a customer's machine,
+optionally sleeping for the recorded latencies.
+
+Usage:
+    python scan_record.py record customer.scan.gz
+    python scan_record.py replay customer.scan.gz [--latency 1.0] [--repeat 5]
+                                                  [--budget program_dirs=0.5 ...]
+"""
+import argparse
+import base64
+import builtins
+import gzip
+import importlib
+import json
+import platform
+import sys
+import time
+from collections import namedtuple
+
+import scanner
+
+FORMAT = "offline-launcher-scan"
+VERSION = 1
+STAT_FIELDS = ("st_size", "st_mtime", "st_mtime_ns", "st_ino", "st_dev", "st_mode")
+
+ReplayStat = namedtuple("ReplayStat", STAT_FIELDS)
+
+
+class ReplayError(Exception):
+    """A recorded call raised an error that is not a built-in OSError."""
+
+
+def _encode(value):
+    """Make a provider result JSON-serializable."""
+    if isinstance(value, bytes):
+        return {'bytes': base64.b64encode(value).decode("ascii")}
+    if hasattr(value, "st_size"):  # Before tuples: stat results are tuples too
+        return {'stat': [getattr(value, field, 0) for field in STAT_FIELDS]}
+    if isinstance(value, (list, tuple)):
+        return [_encode(v) for v in value]
+    if isinstance(value, dict):
+        return {'dict': {k: _encode(v) for k, v in value.items()}}
+    if value is None or isinstance(value, (str, int, float, bool)):
+        return value
+    return str(value)
+
+
+def _decode(value):
+    if isinstance(value, dict):
+        if 'bytes' in value:
+            return base64.b64decode(value['bytes'])
+        if 'dict' in value:
+            return {k: _decode(v) for k, v in value['dict'].items()}
+        return ReplayStat(*value['stat'])
+    if isinstance(value, list):
+        return [_decode(v) for v in value]
+    return value
+
+
+def _error(e):
+    # Errors of our own (e.g. guarded_fs.Unreachable) are kept as the built-in one they derive from
+    error_type = next(t for t in type(e).__mro__ if getattr(builtins, t.__name__, None) is t)
+    return {'error': [error_type.__name__, str(e)]}
+
+
+def _raise(outcome):
+    name, message = outcome['error']
+    error_type = getattr(builtins, name, None)
+    if isinstance(error_type, type) and issubclass(error_type, OSError):
+        raise error_type(message)
+    raise ReplayError(f"{name}: {message}")
+
+
+# --- Recording ---
+
+class Recorder:
+    """Collects provider calls; the first answer to a repeated call is kept."""
+    def __init__(self, path_module):
+        self.path_module = path_module
+        self.calls = {}     # (method, args) -> (outcome, seconds)
+        self.registry = {}  # (hive, key_path) -> (outcome, seconds)
+
+    def call(self, method, fn, args):
+        start = time.perf_counter()
+        try:
+            result = fn(*args)
+        except Exception as e:
+            self.calls.setdefault((method, args), (_error(e), time.perf_counter() - start))
+            raise
+        self.calls.setdefault((method, args), ({'result': _encode(result)},
+                                               time.perf_counter() - start))
+        return result
+
+    def save(self, path):
+        archive = {
+            'format': FORMAT,
+            'version': VERSION,
+            'path_module': self.path_module,
+            'recorded_at': time.strftime("%Y-%m-%dT%H:%M:%S"),
+            'platform': platform.platform(),
+            'calls': [[method, list(args), outcome, round(seconds, 6)]
+                      for (method, args), (outcome, seconds) in self.calls.items()],
+            'registry': [[hive, key_path, outcome, round(seconds, 6)]
+                         for (hive, key_path), (outcome, seconds) in self.registry.items()],
+        }
+        with gzip.open(path, "wt", encoding="utf-8") as f:
+            json.dump(archive, f, separators=(",", ":"))
+
+
+class _RecordingFileSystem:
+    def __init__(self, fs, recorder):
+        self.path = fs.path
+        self._fs = fs
+        self._recorder = recorder
+
+    def _call(self, method, *args):
+        return self._recorder.call("fs." + method, getattr(self._fs, method), args)
+
+    def exists(self, path):
+        return self._call("exists", path)
+
+    def isdir(self, path):
+        return self._call("isdir", path)
+
+    def isfile(self, path):
+        return self._call("isfile", path)
+
+    def listdir(self, path):
+        return self._call("listdir", path)
+
+    def glob(self, directory, pattern):
+        return self._call("glob", directory, pattern)
+
+    def getsize(self, path):
+        return self._call("getsize", path)
+
+    def stat(self, path):
+        return self._call("stat", path)
+
+    def realpath(self, path):
+        return self._call("realpath", path)
+
+    def expandvars(self, path):
+        return self._call("expandvars", path)
+
+
+class _RecordingValues:
+    def __init__(self, values, recorded, timing):
+        self._values = values
+        self._recorded = recorded
+        self._timing = timing
+
+    def get(self, value_name):
+        start = time.perf_counter()
+        value = self._values.get(value_name)
+        self._timing[0] += time.perf_counter() - start
+        self._recorded.setdefault(value_name, _encode(value))
+        return value
+
+
+class _RecordingRegistry:
+    def __init__(self, registry, recorder):
+        self._registry = registry
+        self._recorder = recorder
+
+    def iter_subkeys(self, hive, key_path):
+        subkeys = []
+        timing = [0.0]  # Time spent in the real provider, not in the consumer
+        subkey_iter = self._registry.iter_subkeys(hive, key_path)
+        outcome = None
+        try:
+            while True:
+                start = time.perf_counter()
+                try:
+                    name, values = next(subkey_iter)
+                except StopIteration:
+                    timing[0] += time.perf_counter() - start
+                    break
+                timing[0] += time.perf_counter() - start
+                recorded = {}
+                subkeys.append([name, recorded])
+                yield name, _RecordingValues(values, recorded, timing)
+        except Exception as e:
+            outcome = _error(e)
+            raise
+        finally:
+            # Also reached when the scanner stops early; what it saw is enough
+            self._recorder.registry.setdefault((hive, key_path),
+                                               (outcome or {'subkeys': subkeys}, timing[0]))
+
+
+class _RecordingShortcuts:
+    def __init__(self, shortcuts, recorder):
+        self._shortcuts = shortcuts
+        self._recorder = recorder
+
+    def target(self, shortcut_path):
+        return self._recorder.call("shortcuts.target", self._shortcuts.target, (shortcut_path,))
+
+
+def _scope_args(scope):
+    # Unscoped calls keep the argument-less form older recordings used
+    return () if scope is None else (scope,)
+
+
+class _RecordingFolders:
+    def __init__(self, folders, recorder):
+        self._folders = folders
+        self._recorder = recorder
+
+    def start_menu_dirs(self, scope=None):
+        return self._recorder.call("folders.start_menu_dirs", self._folders.start_menu_dirs, _scope_args(scope))
+
+    def program_dirs(self, scope=None):
+        return self._recorder.call("folders.program_dirs", self._folders.program_dirs, _scope_args(scope))
+
+    def desktop_dirs(self, scope=None):
+        return self._recorder.call("folders.desktop_dirs", self._folders.desktop_dirs, _scope_args(scope))
+
+    def path_dirs(self, scope=None):
+        return self._recorder.call("folders.path_dirs", self._folders.path_dirs, _scope_args(scope))
+
+    def path_extensions(self):
+        return self._recorder.call("folders.path_extensions", self._folders.path_extensions, ())
+
+
+class _RecordingExeInfo:
+    def __init__(self, exe_info, recorder):
+        self._exe_info = exe_info
+        self._recorder = recorder
+
+    def info(self, exe_path):
+        return self._recorder.call("exe_info.info", self._exe_info.info, (exe_path,))
+
+
+def record_providers(providers=None):
+    """Return (recording providers, Recorder) wrapping providers (default: this machine)."""
+    providers = providers or scanner.default_providers()
+    recorder = Recorder(providers.fs.path.__name__)
+    exe_info = providers.exe_info and _RecordingExeInfo(providers.exe_info, recorder)
+    return scanner.ScanProviders(_RecordingFileSystem(providers.fs, recorder),
+                                 _RecordingRegistry(providers.registry, recorder),
+                                 _RecordingShortcuts(providers.shortcuts, recorder),
+                                 _RecordingFolders(providers.folders, recorder),
+                                 exe_info=exe_info), recorder
+
+
+# --- Replay ---
+
+# What a call nobody recorded returns: the path is treated as missing, and
+# folders the recording never listed (e.g. below the old depth limit) as empty
+_MISSING = {
+    "fs.exists": False,
+    "fs.isdir": False,
+    "fs.isfile": False,
+    "fs.listdir": [],
+    "fs.glob": [],
+    "shortcuts.target": "",
+    "folders.start_menu_dirs": [],
+    "folders.program_dirs": [],
+    "folders.desktop_dirs": [],
+    "folders.path_dirs": [],
+    "folders.path_extensions": [],
+    "exe_info.info": None,  # Recorded without PE info: named after the file
+}
+
+
+class Replay:
+    """Answers provider calls from a loaded archive.
+
+    latency scales the recorded duration slept for each call (0 = none).
+    misses counts calls the archive has no answer for, e.g. because the
+    scanners changed since it was recorded.
+    """
+    def __init__(self, archive, latency=0.0):
+        if archive.get('format') != FORMAT or archive.get('version') != VERSION:
+            raise ValueError("not a scan recording this version can replay")
+        self.path_module = importlib.import_module(archive['path_module'])
+        self.latency = latency
+        self.calls = {(method, tuple(args)): (outcome, seconds)
+                      for method, args, outcome, seconds in archive['calls']}
+        self.registry = {(hive, key_path): (outcome, seconds)
+                         for hive, key_path, outcome, seconds in archive['registry']}
+        self.misses = 0
+
+    def _sleep(self, seconds):
+        if self.latency:
+            time.sleep(seconds * self.latency)
+
+    def call(self, method, args):
+        try:
+            outcome, seconds = self.calls[(method, args)]
+        except KeyError:
+            self.misses += 1
+            if method in _MISSING:
+                return _MISSING[method]
+            if method in ("fs.realpath", "fs.expandvars"):
+                return args[0]
+            raise FileNotFoundError(args[0] if args else method)
+        self._sleep(seconds)
+        if 'error' in outcome:
+            _raise(outcome)
+        return _decode(outcome['result'])
+
+    def iter_subkeys(self, hive, key_path):
+        try:
+            outcome, seconds = self.registry[(hive, key_path)]
+        except KeyError:
+            self.misses += 1
+            raise FileNotFoundError(key_path)
+        self._sleep(seconds)
+        if 'error' in outcome:
+            _raise(outcome)
+        for name, values in outcome['subkeys']:
+            yield name, {value_name: _decode(value) for value_name, value in values.items()}
+
+
+class _ReplayFileSystem:
+    def __init__(self, replay):
+        self.path = replay.path_module
+        self._replay = replay
+
+    def exists(self, path):
+        return self._replay.call("fs.exists", (path,))
+
+    def isdir(self, path):
+        return self._replay.call("fs.isdir", (path,))
+
+    def isfile(self, path):
+        return self._replay.call("fs.isfile", (path,))
+
+    def listdir(self, path):
+        return self._replay.call("fs.listdir", (path,))
+
+    def glob(self, directory, pattern):
+        return self._replay.call("fs.glob", (directory, pattern))
+
+    def getsize(self, path):
+        return self._replay.call("fs.getsize", (path,))
+
+    def stat(self, path):
+        return self._replay.call("fs.stat", (path,))
+
+    def realpath(self, path):
+        return self._replay.call("fs.realpath", (path,))
+
+    def expandvars(self, path):
+        return self._replay.call("fs.expandvars", (path,))
+
+
+class _ReplayShortcuts:
+    def __init__(self, replay):
+        self._replay = replay
+
+    def target(self, shortcut_path):
+        return self._replay.call("shortcuts.target", (shortcut_path,))
+
+
+class _ReplayFolders:
+    def __init__(self, replay):
+        self._replay = replay
+
+    def start_menu_dirs(self, scope=None):
+        return self._replay.call("folders.start_menu_dirs", _scope_args(scope))
+
+    def program_dirs(self, scope=None):
+        return self._replay.call("folders.program_dirs", _scope_args(scope))
+
+    def desktop_dirs(self, scope=None):
+        return self._replay.call("folders.desktop_dirs", _scope_args(scope))
+
+    def path_dirs(self, scope=None):
+        return self._replay.call("folders.path_dirs", _scope_args(scope))
+
+    def path_extensions(self):
+        return self._replay.call("folders.path_extensions", ())
+
+
+class _ReplayExeInfo:
+    def __init__(self, replay):
+        self._replay = replay
+
+    def info(self, exe_path):
+        return self._replay.call("exe_info.info", (exe_path,))
+
+
+def load_archive(path):
+    with gzip.open(path, "rt", encoding="utf-8") as f:
+        return json.load(f)
+
+
+def replay_providers(archive, latency=0.0):
+    """Return (providers answering from archive, Replay); archive is a path or a loaded dict."""
+    if isinstance(archive, str):
+        archive = load_archive(archive)
+    replay = Replay(archive, latency)
+    return scanner.ScanProviders(_ReplayFileSystem(replay), replay,
+                                 _ReplayShortcuts(replay), _ReplayFolders(replay),
+                                 exe_info=_ReplayExeInfo(replay)), replay
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(prog="scan_record.py",
+                                     description="Record or replay the inputs of an application scan")
+    commands = parser.add_subparsers(dest="command", required=True)
+    record = commands.add_parser("record", help="scan this machine and save what the scanners read")
+    record.add_argument("archive")
+    replay = commands.add_parser("replay", help="scan again from a recording")
+    replay.add_argument("archive")
+    replay.add_argument("--latency", type=float, default=0.0,
+                        help="sleep for the recorded call durations times this factor")
+    replay.add_argument("--repeat", type=int, default=1)
+    replay.add_argument("--budget", action="append", default=[], metavar="SOURCE=SECONDS",
+                        help="scan with a time budget for a source (repeatable)")
+    args = parser.parse_args(argv)
+
+    if args.command == "record":
+        providers, recorder = record_providers()
+        start = time.perf_counter()
+        apps = scanner.scan_installed_apps(providers)
+        elapsed = time.perf_counter() - start
+        recorder.save(args.archive)
+        print(f"Recorded {len(recorder.calls)} calls and {len(recorder.registry)} registry keys "
+              f"({len(apps)} apps, {elapsed:.2f}s) to {args.archive}")
+        return 0
+
+    budgets = {}
+    for budget in args.budget:
+        source, _, seconds = budget.partition("=")
+        budgets[source] = float(seconds)
+    archive = load_archive(args.archive)
+    for run in range(args.repeat):
+        providers, replayed = replay_providers(archive, args.latency)
+        plan = scanner.ScanPlan(providers, budgets)
+        start = time.perf_counter()
+        apps = plan.run()
+        first_pass = time.perf_counter() - start
+        if plan.incomplete:
+            print(f"Run {run + 1}: first pass {len(apps)} apps in {first_pass:.3f}s, "
+                  f"{len(plan.incomplete)} areas deferred")
+            apps = plan.resume()
+        elapsed = time.perf_counter() - start
+        print(f"Run {run + 1}: {len(apps)} apps in {elapsed:.3f}s, {replayed.misses} unrecorded calls")
+        for source in plan.stats['sources']:
+            print(f"  {source['source']:<14} {source['seconds']:.3f}s (budget {source['budget']}), "
+                  f"{source['found']} found, {source['deferred']} deferred")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,913 @@
+"""Application discovery for OfflineLauncher.
+
+The scanners never touch the registry, the filesystem or the shell directly;
+they go through the provider objects bundled in ScanProviders. The default
+providers wrap winreg, os/glob, WScript.Shell and winshell, while the
+benchmarks substitute in-memory fakes so the same code runs on any platform.
+
+A ScanPlan runs the sources in priority order, each within a time budget.
+When a source runs out of time, the directories and registry keys it has not
+reached are recorded as incomplete areas instead of being dropped, and
+resume() scans them afterwards, typically in the background.
+
+Executables on PATH (as PATHEXT defines them, including the App Execution
+Alias stubs in WindowsApps) are found from cached per-directory listings,
+which are reused until the directory's mtime changes.
+
+Executables found by walking program folders or PATH are named from their
+version resource (FileDescription, as Explorer shows it) instead of their
+file name, and console helpers and DLLs in program folders are skipped
+(see pe_info.py). The PE info is cached per file until its size or mtime
+changes.
+
+Paths on UNC shares and mapped drives are probed through a NetworkGuard
+(see guarded_fs.py): an offline host costs one timeout, after which its
+paths are skipped for a while instead of stalling the scan. ScanPlan.stats
+records the timeouts and skips of each scan.
+
+Every candidate a scanner looks at (an Uninstall subkey, a shortcut, an
+executable) is either added or rejected by one of the rules in
+REJECTION_RULES. With a ScanProfile in the providers (see scan_profile.py)
+the time, candidates and rejections are counted per source and root.
+
+A scan can be limited to one scope: MACHINE (HKLM, ProgramData Start Menu,
+common desktop, Program Files) or USER (HKCU, the user's Start Menu and
+desktop, LocalAppData\\Programs). Multi-session hosts share one machine-scope
+catalog between sessions (see shared_catalog.py). PATH entries below the
+user profile belong to the user scope.
+"""
+import contextlib
+import os
+import glob
+import time
+
+import dedup
+import pe_info
+from guarded_fs import NetworkGuard, GuardedFileSystem
+
+# --- Registry roots ---
+HKLM = "HKEY_LOCAL_MACHINE"
+HKCU = "HKEY_CURRENT_USER"
+
+# --- Scan scopes ---
+MACHINE = "machine"
+USER = "user"
+SCOPE_HIVES = {MACHINE: (HKLM,), USER: (HKCU,)}
+
+REGISTRY_PATHS = [
+    (HKLM, r"SOFTWARE\Microsoft\Windows\CurrentVersion\App Paths"),
+    (HKLM, r"SOFTWARE\Microsoft\Windows\CurrentVersion\Uninstall"),
+    (HKCU, r"SOFTWARE\Microsoft\Windows\CurrentVersion\Uninstall"),
+    (HKLM, r"SOFTWARE\Wow6432Node\Microsoft\Windows\CurrentVersion\Uninstall"),
+    (HKCU, r"SOFTWARE\Wow6432Node\Microsoft\Windows\CurrentVersion\Uninstall"),
+]
+
+# --- Filtering rules ---
+# Skip Windows Updates and certain system components
+UNINSTALL_FILTER_TERMS = ["update", "hotfix", "patch", "redistributable",
+                          "security update", "webview2 runtime",
+                          "microsoft visual c++", "microsoft .net"]
+# Skip executables in certain folders
+EXCLUDED_EXE_PARTS = ["\\windows\\", "\\system32\\", "\\syswow64\\",
+                      "\\temp\\", "\\tmp\\", "uninstall", "setup"]
+# Skip small executables (less than 100KB) as they're likely helpers/utilities
+MIN_EXE_SIZE = 100 * 1024
+MAX_SHORTCUT_DEPTH = 3
+MAX_PROGRAM_DIR_DEPTH = 2  # Vendor folders and one level below them
+DEFAULT_PATHEXT = ".COM;.EXE;.BAT;.CMD"
+BINARY_EXTENSIONS = (".exe", ".com")  # Subject to MIN_EXE_SIZE; scripts are not
+# %LOCALAPPDATA%\Microsoft\WindowsApps holds zero-byte App Execution Alias stubs
+APP_ALIAS_DIR = "windowsapps"
+# Why a candidate was not added, by rule id (see scan_profile.py)
+REJECTION_RULES = {
+    "no_display_name": "Uninstall entry without a DisplayName",
+    "system_component": "Uninstall entry marked SystemComponent",
+    "filter_terms": "name contains one of UNINSTALL_FILTER_TERMS",
+    "no_executable": "no executable found from DisplayIcon, UninstallString or InstallLocation",
+    "missing_path": "registered path or shortcut target does not exist",
+    "not_executable": "path is not an executable",
+    "no_target": "shortcut without a target",
+    "system_file": "shortcut to a Windows system file or installer",
+    "excluded_path": "path contains one of EXCLUDED_EXE_PARTS",
+    "too_small": "executable smaller than MIN_EXE_SIZE",
+    "not_gui": "console program or DLL in a program folder",
+    "not_program": "DLL or driver named like an executable",
+    "error": "error while reading the candidate",
+}
+
+# --- Scan budgets ---
+# Seconds each source may spend before the rest of its work is deferred;
+# None means no limit. Budgeted scans may also traverse deeper, since the
+# budget rather than the depth limit keeps them short.
+DEFAULT_SCAN_BUDGETS = {
+    "start_menu": 1.0,
+    "registry": 2.0,
+    "desktop": 0.5,
+    "path": 0.5,
+    "program_dirs": 2.0,
+}
+BUDGETED_SHORTCUT_DEPTH = 6
+BUDGETED_PROGRAM_DIR_DEPTH = 3
+
+# --- Providers ---
+
+class FileSystem:
+    """Filesystem provider backed by os and glob."""
+    path = os.path
+
+    def exists(self, path):
+        return os.path.exists(path)
+
+    def isdir(self, path):
+        return os.path.isdir(path)
+
+    def isfile(self, path):
+        return os.path.isfile(path)
+
+    def listdir(self, path):
+        return os.listdir(path)
+
+    def glob(self, directory, pattern):
+        return glob.glob(os.path.join(directory, pattern))
+
+    def getsize(self, path):
+        return os.path.getsize(path)
+
+    def stat(self, path):
+        return os.stat(path)
+
+    def realpath(self, path):
+        return os.path.realpath(path)
+
+    def expandvars(self, path):
+        return os.path.expandvars(path)
+
+
+class _RegistryValues:
+    """Read access to the values of an open registry key."""
+    def __init__(self, winreg, handle):
+        self._winreg = winreg
+        self._handle = handle
+
+    def get(self, value_name):
+        try:
+            return self._winreg.QueryValueEx(self._handle, value_name)[0]
+        except (FileNotFoundError, OSError):
+            return None
+
+
+class WindowsRegistry:
+    """Registry provider backed by winreg."""
+    def __init__(self):
+        import winreg
+        self._winreg = winreg
+
+    def iter_subkeys(self, hive, key_path):
+        """Yield (subkey_name, values) for each subkey; values.get(name) returns None if unset."""
+        winreg = self._winreg
+        with winreg.OpenKey(getattr(winreg, hive), key_path, 0,
+                            winreg.KEY_READ | winreg.KEY_ENUMERATE_SUB_KEYS) as key:
+            i = 0
+            while True:
+                try:
+                    subkey_name = winreg.EnumKey(key, i)
+                except OSError:
+                    break  # No more subkeys
+                i += 1
+                try:
+                    subkey = winreg.OpenKey(key, subkey_name)
+                except OSError:
+                    continue
+                with subkey:
+                    yield subkey_name, _RegistryValues(winreg, subkey)
+
+
+class ShellShortcuts:
+    """Shortcut provider that resolves .lnk targets through WScript.Shell."""
+    def __init__(self):
+        self._shell = None
+
+    def target(self, shortcut_path):
+        if self._shell is None:
+            from win32com.client import Dispatch
+            self._shell = Dispatch("WScript.Shell")
+        return self._shell.CreateShortCut(shortcut_path).Targetpath
+
+
+class SystemFolders:
+    """Well-known folders taken from the environment and winshell.
+
+    Each method takes an optional scope (MACHINE or USER); None returns the
+    folders of both.
+    """
+    def __init__(self, environ=None):
+        self.environ = os.environ if environ is None else environ
+
+    def start_menu_dirs(self, scope=None):
+        variables = {None: ("PROGRAMDATA", "APPDATA"), MACHINE: ("PROGRAMDATA",), USER: ("APPDATA",)}
+        return [os.path.join(self.environ[var], "Microsoft", "Windows", "Start Menu", "Programs")
+                for var in variables[scope] if var in self.environ]
+
+    def program_dirs(self, scope=None):
+        machine = [
+            self.environ.get("PROGRAMFILES", "C:\\Program Files"),
+            self.environ.get("PROGRAMFILES(X86)", "C:\\Program Files (x86)"),
+        ]
+        user = [os.path.join(self.environ.get("LOCALAPPDATA", ""), "Programs")]
+        return {None: machine + user, MACHINE: machine, USER: user}[scope]
+
+    def desktop_dirs(self, scope=None):
+        import winshell
+        return {None: [winshell.desktop(), winshell.desktop(common=True)],
+                MACHINE: [winshell.desktop(common=True)], USER: [winshell.desktop()]}[scope]
+
+    def path_dirs(self, scope=None):
+        """PATH entries in order, without repeats; those below the profile are USER scope."""
+        profile = os.path.normcase(self.environ.get("USERPROFILE", "")).rstrip("\\/")
+        dirs = []
+        seen = set()
+        for entry in self.environ.get("PATH", "").split(os.pathsep):
+            entry = entry.strip().strip('"')
+            key = os.path.normcase(os.path.normpath(entry)) if entry else ""
+            if not key or key in seen:
+                continue
+            seen.add(key)
+            is_user = bool(profile) and key.startswith(profile + os.sep)
+            if scope is None or is_user == (scope == USER):
+                dirs.append(entry)
+        return dirs
+
+    def path_extensions(self):
+        """Lowered PATHEXT extensions, e.g. [".com", ".exe", ".bat", ".cmd"]."""
+        pathext = self.environ.get("PATHEXT") or DEFAULT_PATHEXT
+        return [ext.strip().lower() for ext in pathext.split(";") if ext.strip()]
+
+
+class ScanProviders:
+    """Everything a scan reads from: filesystem, registry, shortcuts and folders.
+
+    listings, if given, is a ListingCache kept across scans; without one
+    every scan lists the PATH directories afresh. exe_info, if given, is a
+    pe_info.PEInfoCache; without one executables are named after their
+    file names. profile, if given, is a scan_profile.ScanProfile counting
+    time and candidates per root.
+    """
+    def __init__(self, fs, registry, shortcuts, folders, listings=None, exe_info=None, profile=None):
+        self.fs = fs
+        self.registry = registry
+        self.shortcuts = shortcuts
+        self.folders = folders
+        self.listings = listings
+        self.exe_info = exe_info
+        self.profile = profile
+
+
+class ListingCache:
+    """Executables per directory, reused while the directory's mtime is unchanged.
+
+    Creating, deleting or renaming an entry updates the directory's mtime,
+    so a refresh costs one stat per unchanged directory.
+    """
+    def __init__(self):
+        self._listings = {}  # normcased directory -> (mtime, extensions, [(path, size)])
+        self.hits = 0
+        self.misses = 0
+
+    def executables(self, directory, extensions, fs):
+        """Return [(path, size)] of the files in directory with one of extensions."""
+        mtime = fs.stat(directory).st_mtime
+        key = fs.path.normcase(directory)
+        extensions = tuple(extensions)
+        cached = self._listings.get(key)
+        if cached is not None and cached[0] == mtime and cached[1] == extensions:
+            self.hits += 1
+            return cached[2]
+        self.misses += 1
+        found = []
+        for name in fs.listdir(directory):
+            if fs.path.splitext(name)[1].lower() in extensions:
+                path = fs.path.join(directory, name)
+                if fs.isfile(path):
+                    found.append((path, fs.getsize(path)))
+        self._listings[key] = (mtime, extensions, found)
+        return found
+
+
+# Shared by the scans of this process, so refreshes skip unchanged PATH directories
+_path_listings = ListingCache()
+# and parse each executable's headers once
+_exe_info = pe_info.PEInfoCache()
+# Unreachable network hosts, shared by scans and launches
+network_guard = NetworkGuard()
+
+
+def default_providers():
+    """Return providers for the real Windows system."""
+    return ScanProviders(GuardedFileSystem(FileSystem(), network_guard), WindowsRegistry(),
+                         ShellShortcuts(), SystemFolders(), _path_listings, _exe_info)
+
+
+class _ScopedRegistry:
+    """Registry provider that hides the hives outside one scope."""
+    def __init__(self, registry, scope):
+        self.registry = registry
+        self.hives = SCOPE_HIVES[scope]
+
+    def iter_subkeys(self, hive, key_path):
+        if hive not in self.hives:
+            return iter(())
+        return self.registry.iter_subkeys(hive, key_path)
+
+
+class _ScopedFolders:
+    """Folders provider that only returns one scope's folders."""
+    def __init__(self, folders, scope):
+        self.folders = folders
+        self.scope = scope
+
+    def start_menu_dirs(self):
+        return self.folders.start_menu_dirs(self.scope)
+
+    def program_dirs(self):
+        return self.folders.program_dirs(self.scope)
+
+    def desktop_dirs(self):
+        return self.folders.desktop_dirs(self.scope)
+
+    def path_dirs(self):
+        return self.folders.path_dirs(self.scope)
+
+    def path_extensions(self):
+        return self.folders.path_extensions()
+
+
+def scoped_providers(providers, scope):
+    """Return providers that only see the registry hives and folders of scope."""
+    if scope is None:
+        return providers
+    return ScanProviders(providers.fs, _ScopedRegistry(providers.registry, scope),
+                         providers.shortcuts, _ScopedFolders(providers.folders, scope),
+                         providers.listings, providers.exe_info, providers.profile)
+
+
+class ScanBudget:
+    """Time allowance and depth limits of one source.
+
+    Once expired(), scanners stop descending and defer() what they skipped
+    as an area tuple, which resume_area() can scan later. The default budget
+    never expires and keeps the fixed depth limits of an unbudgeted scan.
+    """
+    def __init__(self, seconds=None, shortcut_depth=MAX_SHORTCUT_DEPTH,
+                 program_dir_depth=MAX_PROGRAM_DIR_DEPTH):
+        self.seconds = seconds
+        self.deadline = None if seconds is None else time.perf_counter() + seconds
+        self.shortcut_depth = shortcut_depth
+        self.program_dir_depth = program_dir_depth
+        self.deferred = []
+
+    def expired(self):
+        return self.deadline is not None and time.perf_counter() >= self.deadline
+
+    def defer(self, area):
+        self.deferred.append(area)
+
+# --- Scanning ---
+
+def extract_executable_path(display_icon_str, fs):
+    """Tries to extract a valid executable path from DisplayIcon registry value."""
+    if not display_icon_str:
+        return None
+    path_part = display_icon_str.split(',')[0]
+    path = fs.expandvars(path_part.strip('"').strip())
+    if path and fs.exists(path) and path.lower().endswith((".exe", ".com", ".bat", ".cmd")):
+        return path
+    return None
+
+def scan_installed_apps(providers=None, progress=None, cancel=None, budgets=None, scope=None):
+    """Scans multiple sources for installed applications and returns them sorted by name.
+
+    progress, if given, is called with event dicts and may be called from a
+    worker thread: {'type': 'source', ...} when a source starts and
+    {'type': 'progress', ...} with a partial (not yet merged) catalog when it
+    finishes. cancel is a threading.Event checked between sources; once set,
+    the apps found so far are returned. With budgets, areas a source had no
+    time for are scanned after all sources have run. scope limits the scan
+    to MACHINE or USER sources.
+    """
+    plan = ScanPlan(providers, budgets, progress, cancel, scope)
+    catalog = plan.run()
+    if plan.incomplete:
+        catalog = plan.resume()
+    return catalog
+
+
+class ScanPlan:
+    """One scan: sources in SCAN_SOURCES order, each limited by its budget.
+
+    budgets maps a source id to seconds (None or missing: unlimited); without
+    any budgets the scan behaves like before budgets existed. run() returns
+    the catalog of the first pass; incomplete lists the areas deferred
+    because a budget ran out, and resume() scans them and returns the full
+    catalog. stats holds per-source timings, budgets and yields. scope
+    (MACHINE or USER) hides the other scope's registry hives and folders;
+    sources, if given, lists the ids of the only sources to run.
+    """
+    def __init__(self, providers=None, budgets=None, progress=None, cancel=None, scope=None,
+                 sources=None):
+        self.providers = scoped_providers(providers or default_providers(), scope)
+        self.budgets = dict(budgets or {})
+        self.sources = None if sources is None else set(sources)
+        self.progress = progress
+        self.cancel = cancel
+        self.apps = {}  # Dictionary to avoid duplicates
+        self.incomplete = []
+        self.stats = {'sources': [], 'resumed': None, 'network': None}
+        self._guard = getattr(self.providers.fs, 'guard', None)
+        self._guard_counters = dict(self._guard.counters) if self._guard else None
+
+    def _cancelled(self):
+        return self.cancel is not None and self.cancel.is_set()
+
+    def _budget(self, seconds):
+        if not self.budgets:
+            return ScanBudget()
+        return ScanBudget(seconds, BUDGETED_SHORTCUT_DEPTH, BUDGETED_PROGRAM_DIR_DEPTH)
+
+    def run(self):
+        """Run every source within its budget and return the catalog found so far."""
+        apps = self.apps
+        progress = self.progress
+        start = time.perf_counter()
+
+        # Track progress
+        print("Scanning for installed applications...")
+
+        for index, (source_id, label, scan_source) in enumerate(SCAN_SOURCES):
+            if self.sources is not None and source_id not in self.sources:
+                continue
+            if self._cancelled():
+                print("Scan cancelled.")
+                break
+            print(f"Scanning {label}...")
+            if progress:
+                progress({'type': 'source', 'source': source_id, 'label': label, 'index': index,
+                          'found': len(apps), 'elapsed': time.perf_counter() - start})
+            budget = self._budget(self.budgets.get(source_id))
+            source_start = time.perf_counter()
+            found_before = len(apps)
+            scan_source(apps, self.providers, budget)
+            self.incomplete.extend(budget.deferred)
+            self.stats['sources'].append({
+                'source': source_id,
+                'seconds': time.perf_counter() - source_start,
+                'budget': budget.seconds,
+                'found': len(apps) - found_before,
+                'deferred': len(budget.deferred),
+            })
+            if budget.deferred:
+                print(f"{label}: budget of {budget.seconds}s used up, "
+                      f"{len(budget.deferred)} areas left for later.")
+            if progress:
+                progress({'type': 'progress', 'source': source_id, 'label': label, 'index': index,
+                          'found': len(apps), 'elapsed': time.perf_counter() - start,
+                          'deferred': len(self.incomplete),
+                          'apps': build_catalog([dict(app) for app in apps.values()])})
+        self._network_stats()
+        return self.catalog()
+
+    def resume(self, seconds=None):
+        """Scan incomplete areas (for up to seconds) and return the updated catalog.
+
+        Areas that are still left, including new ones found while resuming,
+        stay in incomplete.
+        """
+        areas, self.incomplete = self.incomplete, []
+        budget = self._budget(seconds)
+        start = time.perf_counter()
+        found_before = len(self.apps)
+        scanned = 0
+        for area in areas:
+            if self._cancelled() or budget.expired():
+                budget.defer(area)
+                continue
+            resume_area(area, self.apps, self.providers, budget)
+            scanned += 1
+        self.incomplete = budget.deferred
+        self.stats['resumed'] = {
+            'seconds': time.perf_counter() - start,
+            'areas': scanned,
+            'found': len(self.apps) - found_before,
+            'left': len(self.incomplete),
+        }
+        print(f"Resumed {scanned} incomplete areas, {len(self.incomplete)} left.")
+        self._network_stats()
+        return self.catalog()
+
+    def _network_stats(self):
+        """Record the network probes, timeouts and skips of this scan so far in stats."""
+        if self._guard is None:
+            return
+        network = {name: value - self._guard_counters[name]
+                   for name, value in self._guard.counters.items()}
+        network['hosts_down'] = self._guard.hosts_down()
+        self.stats['network'] = network
+        if network['timeouts'] or network['skipped']:
+            hosts = f" ({', '.join(network['hosts_down'])})" if network['hosts_down'] else ""
+            print(f"Network paths: {network['timeouts']} timed out, {network['skipped']} skipped "
+                  f"on unreachable hosts{hosts}.")
+
+    def catalog(self):
+        """Merge the records found so far into a sorted catalog."""
+        # Merge entries that point at the same executable through different
+        # paths; copies, because merging updates records and a resume merges again
+        records = [dict(app, sources=list(app['sources'])) for app in self.apps.values()]
+        merged = dedup.merge_apps(records, self.providers.fs)
+        if len(merged) < len(records):
+            print(f"Merged {len(records) - len(merged)} duplicate entries.")
+
+        catalog = build_catalog(merged)
+        print(f"Scan complete. Found {len(catalog)} applications.")
+        return catalog
+
+
+def resume_area(area, apps_dict, providers, budget=None):
+    """Scan one area a budgeted source deferred."""
+    budget = budget or ScanBudget()
+    kind = area[0]
+    if kind == "registry":
+        _scan_registry_key(area[1], area[2], apps_dict, providers)
+    elif kind == "shortcut_dir":
+        _, directory, source, depth = area
+        with _profiled(providers, source, directory, apps_dict):
+            _process_shortcut_dir(directory, apps_dict, providers, source, depth,
+                                  budget.shortcut_depth, budget)
+    elif kind == "program_dir":
+        _, directory, depth = area
+        with _profiled(providers, "program_dirs", directory, apps_dict):
+            _scan_program_tree(directory, apps_dict, providers, depth, budget)
+    elif kind == "path_dir":
+        _scan_path_dir(area[1], apps_dict, providers, _path_extensions(providers))
+    else:
+        print(f"Warning: Unknown scan area {area!r}")
+
+def build_catalog(apps):
+    """Return the app records as a list sorted by lowered name."""
+    return sorted(apps, key=lambda x: x['name'].lower())
+
+def _add_app(apps_dict, name, path, source, **fields):
+    """Record an app found by source; duplicates of the same path are merged.
+
+    fields are extra searchable fields such as publisher.
+    """
+    record = {'name': name, 'path': path, 'sources': [source]}
+    record.update((field, value) for field, value in fields.items() if value)
+    dedup.add_record(apps_dict, record)
+
+def _profiled(providers, source, root, apps_dict):
+    """Context counting time and candidates towards one root of source, if profiling."""
+    if providers.profile is None:
+        return contextlib.nullcontext()
+    return providers.profile.root(source, root, apps_dict)
+
+def _count(providers, rejected):
+    """Count a candidate as added (rejected is None) or rejected by a rule, if profiling."""
+    if providers.profile is not None:
+        providers.profile.count(rejected)
+
+def _scan_registry(apps_dict, providers, budget=None):
+    """Scan Windows Registry for installed applications."""
+    for hive, key_path in REGISTRY_PATHS:
+        if budget and budget.expired():
+            budget.defer(("registry", hive, key_path))
+            continue
+        _scan_registry_key(hive, key_path, apps_dict, providers)
+
+def _scan_registry_key(hive, key_path, apps_dict, providers):
+    """Add the apps registered under one App Paths or Uninstall key."""
+    fs = providers.fs
+    with _profiled(providers, "registry", f"{hive}\\{key_path}", apps_dict):
+        try:
+            for subkey_name, values in providers.registry.iter_subkeys(hive, key_path):
+                try:
+                    # For App Paths registry key, structure is different
+                    if "App Paths" in key_path:
+                        rejected = _add_app_path(subkey_name, values, apps_dict, fs)
+                    else:
+                        rejected = _add_uninstall_entry(subkey_name, values, apps_dict, fs)
+                except Exception as e:
+                    rejected = "error"
+                    print(f"Warning: Error processing registry key: {e}")
+                _count(providers, rejected)
+        except (FileNotFoundError, OSError):
+            pass
+        except Exception as e:
+            print(f"Error scanning registry path ({key_path}): {e}")
+
+def _add_app_path(subkey_name, values, apps_dict, fs):
+    """Add the executable registered under an App Paths subkey; returns the rule rejecting it, if any."""
+    path = values.get("")
+    if path and isinstance(path, str):
+        path = fs.expandvars(path.strip('"'))
+    if not path or not fs.exists(path):
+        return "missing_path"
+    if not path.lower().endswith(".exe"):
+        return "not_executable"
+    # Use filename as app name if subkey_name ends with .exe
+    if subkey_name.lower().endswith(".exe"):
+        name = fs.path.splitext(fs.path.basename(subkey_name))[0]
+    else:
+        name = fs.path.splitext(fs.path.basename(path))[0]
+
+    _add_app(apps_dict, name, path, "app_paths")
+
+def _add_uninstall_entry(subkey_name, values, apps_dict, fs):
+    """Add the main executable of an Uninstall subkey; returns the rule rejecting it, if any."""
+    display_name = values.get("DisplayName")
+    if not display_name or not isinstance(display_name, str):
+        return "no_display_name"
+
+    # Skip certain types of entries
+    if values.get("SystemComponent") == 1:
+        return "system_component"
+
+    name_lower = display_name.lower()
+    if any(term in name_lower for term in UNINSTALL_FILTER_TERMS):
+        return "filter_terms"
+
+    # Look for executable path
+    path = None
+
+    # Try DisplayIcon first
+    display_icon = values.get("DisplayIcon")
+    if display_icon and isinstance(display_icon, str):
+        path = extract_executable_path(display_icon, fs)
+
+    # Try the directory of the uninstaller if no path yet
+    if not path:
+        uninstall_string = values.get("UninstallString")
+        if uninstall_string and isinstance(uninstall_string, str):
+            # Extract the directory and look for main EXE
+            uninstall_dir = fs.path.dirname(fs.expandvars(uninstall_string.strip('"')))
+            if fs.exists(uninstall_dir):
+                for exe in fs.glob(uninstall_dir, "*.exe"):
+                    if not fs.path.basename(exe).lower().startswith("unins"):
+                        path = exe
+                        break
+
+    # Try InstallLocation
+    if not path:
+        install_location = values.get("InstallLocation")
+        if install_location and isinstance(install_location, str):
+            install_location = fs.expandvars(install_location.strip('"'))
+        if install_location and fs.isdir(install_location):
+            app_name_part = ''.join(c for c in display_name.split('(')[0].strip()
+                                    if c.isalnum() or c == ' ').strip()
+            potential_exes = [
+                app_name_part + ".exe",
+                display_name.split('(')[0].strip() + ".exe",
+                subkey_name + ".exe"
+            ]
+
+            # Also check for any .exe files
+            for exe_file in fs.glob(install_location, "*.exe"):
+                file_name = fs.path.basename(exe_file)
+                # Skip uninstaller and setup files
+                if not any(x in file_name.lower() for x in ["unins", "setup", "install"]):
+                    potential_exes.append(file_name)
+
+            for exe_name in potential_exes:
+                potential_path = fs.path.join(install_location, exe_name)
+                if fs.exists(potential_path) and fs.isfile(potential_path):
+                    path = potential_path
+                    break
+
+    if not path:
+        return "no_executable"
+    publisher = values.get("Publisher")
+    _add_app(apps_dict, display_name.strip(), path, "registry",
+             publisher=publisher.strip() if isinstance(publisher, str) else None,
+             product=display_name.strip())
+
+def _scan_start_menu(apps_dict, providers, budget=None):
+    """Scan Windows Start Menu for applications."""
+    max_depth = budget.shortcut_depth if budget else MAX_SHORTCUT_DEPTH
+    try:
+        for start_menu_path in providers.folders.start_menu_dirs():
+            if providers.fs.exists(start_menu_path):
+                # Process both shortcuts and subfolders
+                with _profiled(providers, "start_menu", start_menu_path, apps_dict):
+                    _process_shortcut_dir(start_menu_path, apps_dict, providers, "start_menu",
+                                          max_depth=max_depth, budget=budget)
+    except Exception as e:
+        print(f"Error scanning Start Menu: {e}")
+
+def _process_shortcut_dir(directory, apps_dict, providers, source, depth=0, max_depth=MAX_SHORTCUT_DEPTH,
+                          budget=None):
+    """Process a directory containing shortcuts, recording finds under source.
+
+    Subdirectories reached after the budget expired are deferred, not scanned.
+    """
+    if depth > max_depth:
+        return  # Prevent excessive recursion
+
+    fs = providers.fs
+    try:
+        # Process all .lnk files in this directory
+        for shortcut_path in fs.glob(directory, "*.lnk"):
+            _count(providers, _add_shortcut(shortcut_path, apps_dict, providers, source))
+
+        # Process subdirectories
+        if depth == max_depth:
+            return
+        for subdir in [d for d in fs.listdir(directory) if fs.isdir(fs.path.join(directory, d))]:
+            subdir_path = fs.path.join(directory, subdir)
+            if budget and budget.expired():
+                budget.defer(("shortcut_dir", subdir_path, source, depth + 1))
+                continue
+            _process_shortcut_dir(subdir_path, apps_dict, providers, source, depth + 1, max_depth,
+                                  budget)
+
+    except Exception as e:
+        print(f"Error processing directory {directory}: {e}")
+
+def _add_shortcut(shortcut_path, apps_dict, providers, source):
+    """Add the target of a shortcut; returns the rule rejecting it, if any."""
+    fs = providers.fs
+    try:
+        target_path = fs.expandvars(providers.shortcuts.target(shortcut_path) or "")
+
+        # Skip non-executable targets
+        if not target_path:
+            return "no_target"
+        if not target_path.lower().endswith((".exe", ".bat", ".cmd")):
+            return "not_executable"
+
+        # Skip Windows system files
+        if "\\Windows\\" in target_path and any(x in target_path.lower() for x in
+                                              ["system32", "syswow64", "setup", "installer"]):
+            return "system_file"
+
+        # Get app name from shortcut name
+        app_name = fs.path.splitext(fs.path.basename(shortcut_path))[0]
+
+        # Add to apps dictionary
+        if not fs.exists(target_path):
+            return "missing_path"
+        _add_app(apps_dict, app_name, target_path, source)
+    except Exception as e:
+        print(f"Error processing shortcut {shortcut_path}: {e}")
+        return "error"
+
+def _scan_program_dirs(apps_dict, providers, budget=None):
+    """Scan common program directories for executables."""
+    fs = providers.fs
+    budget = budget or ScanBudget()
+
+    # Vendor folders and what is below them, down to the budget's depth limit
+    for program_dir in providers.folders.program_dirs():
+        if fs.exists(program_dir):
+            with _profiled(providers, "program_dirs", program_dir, apps_dict):
+                _scan_program_tree(program_dir, apps_dict, providers, 0, budget)
+
+def _scan_program_tree(directory, apps_dict, providers, depth, budget):
+    """Add the executables in directory (below the program folder itself) and its subfolders."""
+    fs = providers.fs
+    try:
+        if depth > 0:
+            for exe_path in fs.glob(directory, "*.exe"):
+                _count(providers, _add_exe_to_apps(exe_path, apps_dict, providers))
+        if depth >= budget.program_dir_depth:
+            return
+        for subdir in [d for d in fs.listdir(directory) if fs.isdir(fs.path.join(directory, d))]:
+            subdir_path = fs.path.join(directory, subdir)
+            if budget.expired():
+                budget.defer(("program_dir", subdir_path, depth + 1))
+                continue
+            _scan_program_tree(subdir_path, apps_dict, providers, depth + 1, budget)
+    except Exception as e:
+        print(f"Error scanning program directory {directory}: {e}")
+
+def _scan_desktop(apps_dict, providers, budget=None):
+    """Scan desktop for application shortcuts."""
+    max_depth = budget.shortcut_depth if budget else MAX_SHORTCUT_DEPTH
+    try:
+        # User desktop first, then the common desktop
+        for desktop in providers.folders.desktop_dirs():
+            with _profiled(providers, "desktop", desktop, apps_dict):
+                _process_shortcut_dir(desktop, apps_dict, providers, "desktop",
+                                      max_depth=max_depth, budget=budget)
+    except Exception as e:
+        print(f"Error scanning desktop: {e}")
+
+def _scan_path(apps_dict, providers, budget=None):
+    """Scan the PATH directories for executables and scripts (per PATHEXT)."""
+    budget = budget or ScanBudget()
+    try:
+        extensions = _path_extensions(providers)
+        for directory in providers.folders.path_dirs():
+            if budget.expired():
+                budget.defer(("path_dir", directory))
+                continue
+            _scan_path_dir(directory, apps_dict, providers, extensions)
+    except Exception as e:
+        print(f"Error scanning PATH: {e}")
+
+def _path_extensions(providers):
+    return providers.folders.path_extensions() or DEFAULT_PATHEXT.lower().split(";")
+
+def _scan_path_dir(directory, apps_dict, providers, extensions):
+    """Add the executables in one PATH directory, from the listing cache if unchanged."""
+    fs = providers.fs
+    directory = fs.expandvars(directory)
+    listings = providers.listings or ListingCache()
+    with _profiled(providers, "path", directory, apps_dict):
+        try:
+            executables = listings.executables(directory, extensions, fs)
+        except OSError:
+            return  # PATH entries for uninstalled programs are common
+        aliases = fs.path.basename(directory.rstrip("\\/")).lower() == APP_ALIAS_DIR
+        for exe_path, size in executables:
+            _count(providers, _add_path_exe(exe_path, size, aliases, apps_dict, providers))
+
+def _add_path_exe(exe_path, size, aliases, apps_dict, providers):
+    """Add an executable listed in a PATH directory; returns the rule rejecting it, if any."""
+    if any(x in exe_path.lower() for x in EXCLUDED_EXE_PARTS):
+        return "excluded_path"
+    # Alias stubs are empty; scripts are small by nature
+    binary = exe_path.lower().endswith(BINARY_EXTENSIONS)
+    if not aliases and size < MIN_EXE_SIZE and binary:
+        return "too_small"
+    # Alias stubs are reparse points without headers of their own
+    info = _exe_info(exe_path, providers) if binary and not aliases else None
+    if info is not None and not pe_info.is_program(info):
+        return "not_program"  # DLLs and drivers named .exe
+    _add_exe_app(apps_dict, exe_path, "path", providers.fs, info)
+
+def _exe_info(exe_path, providers):
+    """Return the PE info of an executable, or None (no cache, not a PE file, unreadable)."""
+    if providers.exe_info is None:
+        return None
+    guard = getattr(providers.fs, 'guard', None)
+    try:
+        if guard is not None:
+            return guard.call(exe_path, providers.exe_info.info, exe_path)
+        return providers.exe_info.info(exe_path)
+    except OSError:
+        return None
+
+def _add_exe_app(apps_dict, exe_path, source, fs, info):
+    """Add an executable found by source, named from its version resource if it has one."""
+    if info is None:
+        _add_app(apps_dict, _exe_app_name(exe_path, fs), exe_path, source)
+        return
+    _add_app(apps_dict, pe_info.display_name(info) or _exe_app_name(exe_path, fs), exe_path, source,
+             publisher=info['company'], product=info['product'])
+
+def _exe_app_name(exe_path, fs):
+    """Return a display name derived from an executable's file name."""
+    # Get app name from executable name
+    app_name = fs.path.splitext(fs.path.basename(exe_path))[0]
+
+    # Improve app name by replacing underscores and dashes with spaces
+    app_name = app_name.replace("_", " ").replace("-", " ")
+
+    # Title case the app name for nicer display
+    return " ".join(word.capitalize() for word in app_name.split())
+
+def _add_exe_to_apps(exe_path, apps_dict, providers):
+    """Helper to add an executable to the apps dictionary with filtering.
+
+    Returns the rule rejecting the executable, if any.
+    """
+    fs = providers.fs
+    try:
+        # Skip system utilities and small executables (likely not full applications)
+        if fs.getsize(exe_path) < MIN_EXE_SIZE:
+            return "too_small"
+
+        if any(x in exe_path.lower() for x in EXCLUDED_EXE_PARTS):
+            return "excluded_path"
+
+        # Console helpers and DLL-like stubs are not what users launch
+        info = _exe_info(exe_path, providers)
+        if info is not None and not pe_info.is_gui_app(info):
+            return "not_gui"
+
+        # Add to apps dictionary
+        _add_exe_app(apps_dict, exe_path, "program_dirs", fs, info)
+    except Exception as e:
+        print(f"Error adding exe to apps list {exe_path}: {e}")
+        return "error"
+
+# Sources in scan order as (id, label, function), highest yield per second
+# first: the Start Menu and the registry (App Paths before Uninstall) find
+# most apps cheaply, PATH is a handful of directories listed from cache,
+# walking program folders finds few new ones slowly. When
+# the same app is found twice, dedup decides which name and path are kept.
+SCAN_SOURCES = [
+    ("start_menu", "Start Menu", _scan_start_menu),
+    ("registry", "Windows Registry", _scan_registry),
+    ("desktop", "desktop shortcuts", _scan_desktop),
+    ("path", "PATH", _scan_path),
+    ("program_dirs", "common program directories", _scan_program_dirs),
+]
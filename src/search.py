@@ -0,0 +1,387 @@
+"""Search and ranking over the application catalog.
+
+Kept free of any UI or Windows imports so it can be benchmarked headless.
+
+Besides the name, records may carry extra searchable fields: 'publisher'
+and 'product' (strings) and 'aliases' (a list of strings); the executable's
+file name ('exe') is taken from the path. Apps whose name contains every
+query term rank first, in the exact, prefix and substring buckets. Apps
+where some term is found only in the other fields follow, by the sum over
+terms of the best weight of a field matching the term (FIELD_WEIGHTS), so
+"adobe" lists every app published by Adobe after the apps named Adobe.
+Other fields match a term at a word start only ("sys" finds "Adobe
+Systems", "dobe" does not), which the index answers by bisection.
+"""
+import json
+import os
+import re
+import threading
+from bisect import bisect_left
+from collections import OrderedDict
+from itertools import chain
+from operator import itemgetter
+
+# Number of apps shown when the search box is empty
+SAMPLE_SIZE = 10
+
+# --- Fields ---
+# Per-field weights of a term match; a field without a weight is not searched
+FIELD_WEIGHTS = {'name': 8, 'aliases': 6, 'product': 4, 'exe': 3, 'publisher': 2}
+EXTRA_FIELDS = ('aliases', 'product', 'exe', 'publisher')
+# Where a field match may start: a non-space character not preceded by a letter or digit
+_WORD_START_RE = re.compile(r"(?<![^\W_])\S")
+
+
+def exe_stem(path):
+    """Return the file name of path without its extension."""
+    name = path.replace("/", "\\").rsplit("\\", 1)[-1]
+    return name.rsplit(".", 1)[0] if "." in name else name
+
+
+def _squeezed(text):
+    return text.lower().replace(" ", "")
+
+
+def field_values(app):
+    """Yield (field, value) for each value of app's extra fields, in EXTRA_FIELDS order.
+
+    Values that only repeat the name (ignoring case and spaces) are left out.
+    """
+    name = _squeezed(app['name'])
+    for alias in app.get('aliases') or ():
+        yield 'aliases', alias
+    if app.get('product') and _squeezed(app['product']) != name:
+        yield 'product', app['product']
+    exe = exe_stem(app['path'])
+    if _squeezed(exe) != name:
+        yield 'exe', exe
+    if app.get('publisher'):
+        yield 'publisher', app['publisher']
+
+
+def word_starts(text):
+    """Return the positions in text where a field match may start."""
+    return [match.start() for match in _WORD_START_RE.finditer(text)]
+
+
+def field_keys(app, weights=FIELD_WEIGHTS, name_lower=None):
+    """Yield (field, lowered value, word start, weight) for app's searchable field words.
+
+    A term matches a field where it is a prefix of the value from one of its
+    word starts on. Words the name already contains are skipped when the
+    field weighs no more than the name, since the name match scores at least
+    as much.
+    """
+    if name_lower is None:
+        name_lower = app['name'].lower()
+    name_weight = weights.get('name', 0)
+    for field, value in field_values(app):
+        weight = weights.get(field)
+        if not weight:
+            continue
+        text = value.lower()
+        for start in word_starts(text):
+            if weight <= name_weight and text[start:].split(None, 1)[0] in name_lower:
+                continue
+            yield field, text, start, weight
+
+
+def field_score(app, query_terms, weights=FIELD_WEIGHTS, name_lower=None):
+    """Return the summed best field weight of each term, or 0 if a term matches nowhere.
+
+    A term matches the name anywhere and the other fields at a word start.
+    """
+    if name_lower is None:
+        name_lower = app['name'].lower()
+    texts = []
+    for field, value in field_values(app):
+        if weights.get(field):
+            text = value.lower()
+            texts.append((weights[field], text, word_starts(text)))
+    name_weight = weights.get('name', 0)
+    score = 0
+    for term in query_terms:
+        best = name_weight if term in name_lower else 0
+        for weight, text, starts in texts:
+            if weight > best and any(text.startswith(term, start) for start in starts):
+                best = weight
+        if not best:
+            return 0
+        score += best
+    return score
+
+
+# --- User aliases ---
+
+def default_aliases_file():
+    base = os.environ.get("LOCALAPPDATA") or os.path.expanduser("~")
+    return os.path.join(base, "OfflineLauncher", "aliases.json")
+
+
+def load_aliases(path=None):
+    """Return {lowered app name or exe path: [alias, ...]} from the user's aliases file.
+
+    The file is a JSON object such as {"Adobe Photoshop 2024": ["ps"]}; a
+    missing or unreadable file means no aliases.
+    """
+    path = path or default_aliases_file()
+    try:
+        with open(path, encoding="utf-8") as f:
+            entries = json.load(f)
+    except FileNotFoundError:
+        return {}
+    except (OSError, ValueError) as e:
+        print(f"Warning: Could not read aliases from {path}: {e}")
+        return {}
+    if not isinstance(entries, dict):
+        print(f"Warning: Ignoring {path}: expected an object of app names to aliases")
+        return {}
+    aliases = {}
+    for key, values in entries.items():
+        values = [values] if isinstance(values, str) else values
+        if isinstance(values, list):
+            aliases[key.lower()] = [value for value in values if isinstance(value, str) and value]
+    return aliases
+
+
+def apply_aliases(apps, aliases):
+    """Set 'aliases' on the records whose name or path has an entry in aliases."""
+    if not aliases:
+        return apps
+    for app in apps:
+        values = aliases.get(app['path'].lower()) or aliases.get(app['name'].lower())
+        if values:
+            app['aliases'] = list(values)
+    return apps
+
+
+def search_apps(apps, query, weights=FIELD_WEIGHTS):
+    """Return the apps matching query, exact matches first, then prefix, then substring.
+
+    Apps matching only through their other fields follow, best field score
+    first. query must already be lowered and stripped. An empty query
+    returns the first SAMPLE_SIZE apps of the (name-sorted) catalog.
+    """
+    if not query:
+        return apps[:SAMPLE_SIZE]
+
+    # Apply multi-term search
+    exact_matches = []
+    starts_with = []
+    contains = []
+    field_matches = []
+
+    # Split search into terms for better matching
+    query_terms = query.split()
+
+    for app in apps:
+        name_lower = app['name'].lower()
+
+        # Not a name match; maybe the other fields have the missing terms
+        if not all(term in name_lower for term in query_terms):
+            score = field_score(app, query_terms, weights, name_lower)
+            if score:
+                field_matches.append((-score, app))
+            continue
+
+        # Check exact match
+        if name_lower == query:
+            exact_matches.append(app)
+        # Check starts with first term
+        elif name_lower.startswith(query_terms[0]):
+            starts_with.append(app)
+        # Contains all terms
+        else:
+            contains.append(app)
+
+    # Combine results in order of relevance; the sort is stable, so equal
+    # scores stay in catalog order
+    field_matches.sort(key=lambda match: match[0])
+    return exact_matches + starts_with + contains + [app for _, app in field_matches]
+
+
+class PrefixIndex:
+    """Search index over a catalog sorted by lowered name.
+
+    Names are lowered once up front. Because the catalog is already sorted,
+    the apps whose name starts with a prefix form one contiguous run of the
+    lowered-name array, found by bisection in O(log n + k). A second sorted
+    array of (word, app position) pairs answers per-word prefixes, so
+    "studio" finds "Visual Studio". A third sorted array holds the lowered
+    extra field values from every word start on (field_keys()), so the field
+    values where a term starts a word are one run of it as well.
+
+    search() returns exactly what search_apps() returns for the same catalog
+    and weights.
+    """
+    def __init__(self, apps, weights=None):
+        names = [app['name'].lower() for app in apps]
+        if any(names[i] > names[i + 1] for i in range(len(names) - 1)):
+            order = sorted(range(len(apps)), key=names.__getitem__)
+            apps = [apps[i] for i in order]
+            names = [names[i] for i in order]
+        self.apps = apps
+        self.names = names
+
+        words = sorted((word, i) for i, name in enumerate(names) for word in set(name.split()))
+        self.words = [word for word, _ in words]
+        self.word_ids = [i for _, i in words]
+
+        self.weights = weights or FIELD_WEIGHTS
+        keys = sorted((text[start:], i, weight) for i, app in enumerate(apps)
+                      for _, text, start, weight in field_keys(app, self.weights, names[i]))
+        self.field_keys = [key for key, _, _ in keys]
+        self.field_hits = [(i, weight) for _, i, weight in keys]
+
+    def __len__(self):
+        return len(self.apps)
+
+    def _range(self, array, prefix):
+        """Return the [lo, hi) slice of a sorted array whose items start with prefix."""
+        lo = bisect_left(array, prefix)
+        hi = bisect_left(array, prefix[:-1] + chr(ord(prefix[-1]) + 1), lo) if prefix else len(array)
+        return lo, hi
+
+    def starts_with(self, prefix):
+        """Return the apps whose lowered name starts with prefix, in catalog order."""
+        lo, hi = self._range(self.names, prefix)
+        return self.apps[lo:hi]
+
+    def word_starts_with(self, prefix):
+        """Return the apps with a word starting with prefix, in catalog order."""
+        lo, hi = self._range(self.words, prefix)
+        return [self.apps[i] for i in sorted(set(self.word_ids[lo:hi]))]
+
+    def search(self, query):
+        """Rank apps for query exactly like search_apps(), using the index."""
+        if not query:
+            return self.apps[:SAMPLE_SIZE]
+
+        query_terms = query.split()
+        other_terms = query_terms[1:]
+        names = self.names
+        apps = self.apps
+
+        # Names starting with the first term are one run of the sorted array
+        lo, hi = self._range(names, query_terms[0])
+        exact_matches = []
+        starts_with = []
+        for i in range(lo, hi):
+            name_lower = names[i]
+            if name_lower == query:
+                exact_matches.append(apps[i])
+            elif all(term in name_lower for term in other_terms):
+                starts_with.append(apps[i])
+
+        # Everything else can only be a substring match; filter one term at a time
+        candidates = [i for i in chain(range(lo), range(hi, len(names)))
+                      if query_terms[0] in names[i]]
+        for term in other_terms:
+            candidates = [i for i in candidates if term in names[i]]
+        contains = [apps[i] for i in candidates]
+
+        return exact_matches + starts_with + contains + self._field_matches(query_terms)
+
+    def _field_hits(self, term):
+        """Return {app position: best weight} of the field values with a word starting with term."""
+        lo, hi = self._range(self.field_keys, term)
+        # Later pairs overwrite earlier ones, so ascending weights leave the best
+        return dict(sorted(self.field_hits[lo:hi], key=itemgetter(1)))
+
+    def _field_matches(self, query_terms):
+        """Return the apps missing a term in the name but having it in another field."""
+        return _rank_field_matches(query_terms, [self._field_hits(term) for term in query_terms],
+                                   self.names.__getitem__, self.weights.get('name', 0),
+                                   self.apps.__getitem__)
+
+
+def _rank_field_matches(query_terms, term_hits, lowered_name, name_weight, record):
+    """Score the apps in term_hits (one {position: weight} per term) like field_score()."""
+    if len(query_terms) == 1:
+        term = query_terms[0]
+        ranked = sorted((-weight, i) for i, weight in term_hits[0].items() if term not in lowered_name(i))
+        return [record(i) for _, i in ranked]
+    ranked = []
+    # Every field match has some term outside its name, so it is in one of the hit sets
+    for i in set().union(*term_hits):
+        name = lowered_name(i)
+        score = 0
+        in_name = 0
+        for term, hits in zip(query_terms, term_hits):
+            weight = hits.get(i, 0)
+            if term in name:
+                in_name += 1
+                if name_weight > weight:
+                    weight = name_weight
+            if not weight:
+                break
+            score += weight
+        else:
+            if in_name < len(query_terms):
+                ranked.append((-score, i))
+    ranked.sort()
+    return [record(i) for _, i in ranked]
+
+
+class QueryCache:
+    """Bounded LRU of ranked results, keyed by catalog generation and query.
+
+    Entries belong to one catalog generation and are dropped as soon as a
+    search arrives for another one. A miss whose query extends a cached
+    query ("chro" after "chr") ranks only the cached results, since every
+    app matching the longer query also matches the shorter one. Result
+    lists are shared between callers and must not be modified.
+    """
+    def __init__(self, max_entries=256):
+        self.max_entries = max_entries
+        self._entries = OrderedDict()  # query -> results
+        self._generation_id = None
+        self._lock = threading.Lock()  # The Tk thread and IPC threads both search
+        self.counters = {'hits': 0, 'prefix_hits': 0, 'misses': 0,
+                         'evictions': 0, 'invalidations': 0}
+
+    def search(self, generation, query):
+        """Return generation.search(query) for a lowered and stripped query."""
+        with self._lock:
+            if generation.id != self._generation_id:
+                if self._entries:
+                    self.counters['invalidations'] += 1
+                self._entries.clear()
+                self._generation_id = generation.id
+            results = self._entries.get(query)
+            if results is not None:
+                self._entries.move_to_end(query)
+                self.counters['hits'] += 1
+                return results
+            seed = self._longest_prefix(query)
+
+        if seed is None:
+            results = generation.search(query)
+        else:
+            # Cached results are in bucket order; search_apps needs catalog order
+            results = search_apps(sorted(seed, key=lambda app: app['name'].lower()), query)
+
+        with self._lock:
+            if generation.id == self._generation_id:
+                self.counters['misses' if seed is None else 'prefix_hits'] += 1
+                self._entries[query] = results
+                if len(self._entries) > self.max_entries:
+                    self._entries.popitem(last=False)
+                    self.counters['evictions'] += 1
+        return results
+
+    def _longest_prefix(self, query):
+        # The empty query returns a sample, not every match, so it never seeds
+        for end in range(len(query) - 1, 0, -1):
+            seed = self._entries.get(query[:end])
+            if seed is not None:
+                return seed
+        return None
+
+    def stats(self):
+        with self._lock:
+            stats = dict(self.counters)
+            stats['entries'] = len(self._entries)
+        lookups = stats['hits'] + stats['prefix_hits'] + stats['misses']
+        stats['hit_rate'] = stats['hits'] / lookups if lookups else 0.0
+        return stats
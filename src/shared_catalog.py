@@ -0,0 +1,299 @@
+"""Machine-wide catalog shared by all sessions of a multi-session host.
+
+On terminal servers every user's launcher used to scan the same HKLM keys,
+ProgramData Start Menu, common desktop and Program Files. With the shared
+catalog the machine-scope sources are scanned by one session into a catalog
+file under %PROGRAMDATA%\\OfflineLauncher, which every session maps
+read-only; each session scans only its own user-scope sources and layers
+them over it (OverlayCatalog).
+
+Versioning: shared files are ordinary catalog files (catalog_file.py), one
+new file per scan with a timestamped name, so a file never changes while
+sessions have it mapped and the newest file is the current version. The
+directory is per SHARED_VERSION, so launchers whose machine scans differ
+never read each other's files. A file older than max_age is stale.
+
+Starting: a session takes the newest file as it is, fresh or stale
+(current()), and starts on its user scope right away. Rescanning a stale or
+missing machine catalog (rescan()) runs beside it, in the background.
+
+Locking: rescanning the machine scope happens under an OS file lock on
+scan.lock, which the OS releases if the scanning session dies. Sessions that
+find the lock taken keep the stale catalog, or, on a machine without one, wait
+for the scanning session to publish. The lock file is opened read-only
+(flock and LockFile need no write access), and the directory is made
+writable for all users when it is created, so every user's sessions can
+lock and publish; a session that still cannot use it scans privately or
+uses the stale catalog.
+"""
+import heapq
+import os
+import subprocess
+import time
+from itertools import islice
+
+import catalog_file
+import dedup
+from search import PrefixIndex, SAMPLE_SIZE, field_score
+
+SHARED_VERSION = 2  # Bumped with the catalog file format
+MAX_AGE = 24 * 3600.0  # Seconds before sessions rescan the machine scope
+WAIT_SECONDS = 120.0   # How long a session waits for another one's first machine scan before scanning itself
+POLL_SECONDS = 0.05
+LOCK_FILE = "scan.lock"
+USERS_SID = "*S-1-5-32-545"  # BUILTIN\Users, in any Windows language
+
+
+def default_shared_dir():
+    base = os.environ.get("PROGRAMDATA") or os.path.join(os.path.expanduser("~"), ".local", "share")
+    return os.path.join(base, "OfflineLauncher", f"shared-v{SHARED_VERSION}")
+
+
+# --- Locking ---
+
+def share_with_all_users(path):
+    """Let every user create and replace files in directory path (or read and lock file path)."""
+    try:
+        if os.name == "nt":
+            if os.path.isdir(path):
+                # Modify for Users, inherited by the files created below
+                subprocess.run(["icacls", path, "/grant", f"{USERS_SID}:(OI)(CI)M"],
+                               check=True, capture_output=True, creationflags=subprocess.CREATE_NO_WINDOW)
+        else:
+            os.chmod(path, 0o777 if os.path.isdir(path) else 0o666)
+    except (OSError, subprocess.CalledProcessError) as e:
+        print(f"Warning: Could not share {path} with other users: {e}")
+
+
+class ScanLock:
+    """Exclusive, non-blocking OS lock on a file (released if the process dies)."""
+    def __init__(self, path):
+        self.path = path
+        self._fd = None
+
+    def acquire(self):
+        """Take the lock and return True, or return False if another holder has it.
+
+        Raises OSError if the lock file can be neither opened nor created.
+        """
+        try:
+            fd = os.open(self.path, os.O_RDONLY | os.O_CREAT | os.O_EXCL, 0o666)
+            share_with_all_users(self.path)
+        except FileExistsError:
+            # Another user's file: read access is enough to lock it
+            fd = os.open(self.path, os.O_RDONLY)
+        try:
+            if os.name == "nt":
+                import msvcrt
+                msvcrt.locking(fd, msvcrt.LK_NBLCK, 1)
+            else:
+                import fcntl
+                fcntl.flock(fd, fcntl.LOCK_EX | fcntl.LOCK_NB)
+        except OSError:
+            os.close(fd)
+            return False
+        self._fd = fd
+        return True
+
+    def release(self):
+        if self._fd is None:
+            return
+        try:
+            if os.name == "nt":
+                import msvcrt
+                os.lseek(self._fd, 0, os.SEEK_SET)
+                msvcrt.locking(self._fd, msvcrt.LK_UNLCK, 1)
+            else:
+                import fcntl
+                fcntl.flock(self._fd, fcntl.LOCK_UN)
+        finally:
+            os.close(self._fd)
+            self._fd = None
+
+
+class SharedCatalog:
+    """The machine-scope catalog files in one shared directory."""
+    def __init__(self, directory=None, max_age=MAX_AGE, clock=time.time):
+        self.directory = directory or default_shared_dir()
+        self.max_age = max_age
+        self.clock = clock
+
+    def latest(self):
+        """Return a MappedCatalog of the newest readable shared file, or None."""
+        return catalog_file.load_latest(self.directory)
+
+    def is_fresh(self, mapped):
+        """True if mapped was written less than max_age ago (judged by its file name)."""
+        name = os.path.basename(mapped.path)
+        try:
+            written = int(name[len(catalog_file.FILE_PREFIX):-len(catalog_file.FILE_SUFFIX)]) / 1e9
+        except ValueError:
+            return False
+        return self.clock() - written < self.max_age
+
+    def lock(self):
+        if not os.path.isdir(self.directory):
+            os.makedirs(self.directory, exist_ok=True)
+            share_with_all_users(self.directory)
+        return ScanLock(os.path.join(self.directory, LOCK_FILE))
+
+    def current(self):
+        """Return (base, how) without scanning or waiting.
+
+        how is "shared" for a fresh file, "stale" for an old one that is
+        usable until rescan() replaces it, or "missing" (base is None).
+        """
+        latest = self.latest()
+        if latest is None:
+            return None, "missing"
+        return latest, "shared" if self.is_fresh(latest) else "stale"
+
+    def rescan(self, scan, wait=WAIT_SECONDS, cancel=None):
+        """Bring the machine-scope catalog up to date; return (base, how).
+
+        Meant to run in the background while the session scans its user
+        scope. scan() returns the machine-scope records and is called only by
+        the session holding the lock. how says where base came from: "shared"
+        (a fresh file, e.g. published while we waited), "scanned" (this
+        session rescanned it), "stale" (an old file while another session
+        rescans, or that this session cannot lock) or "private" (scanned
+        because the shared directory is not usable, or another session's
+        first scan did not finish within wait; base is then a PrefixIndex).
+        If cancel is set by the time scan() returns, its records are
+        returned as "cancelled" without being saved, since they may be
+        incomplete; if it is set while waiting, base is None.
+        """
+        latest = self.latest()
+        if latest is not None and self.is_fresh(latest):
+            return latest, "shared"
+        deadline = time.monotonic() + wait
+        while True:
+            try:
+                lock = self.lock()
+                acquired = lock.acquire()
+            except OSError as e:
+                print(f"Warning: Shared catalog directory is not usable: {e}")
+                if latest is not None:
+                    return latest, "stale"
+                return PrefixIndex(scan()), "private"
+            if acquired:
+                try:
+                    # Another session may have published while we waited for the lock
+                    newest = self.latest()
+                    if newest is not None and self.is_fresh(newest):
+                        return newest, "shared"
+                    apps = scan()
+                    if cancel is not None and cancel.is_set():
+                        return PrefixIndex(apps), "cancelled"
+                    return self._publish(apps), "scanned"
+                finally:
+                    lock.release()
+            if latest is not None:
+                return latest, "stale"
+            if cancel is not None and cancel.is_set():
+                return None, "cancelled"
+            if time.monotonic() >= deadline:
+                print("Warning: Timed out waiting for another session's machine scan; scanning it here")
+                return PrefixIndex(scan()), "private"
+            time.sleep(POLL_SECONDS)
+
+    def _publish(self, apps):
+        try:
+            path = catalog_file.save_catalog(apps, self.directory)
+            return catalog_file.MappedCatalog(path, verify=False)
+        except (OSError, catalog_file.CatalogFileError) as e:
+            print(f"Warning: Could not save the shared catalog: {e}")
+            return PrefixIndex(apps)
+
+
+# --- Overlay ---
+
+def _records(base):
+    """Return base's records in catalog order (PrefixIndex or MappedCatalog)."""
+    return base.apps if isinstance(base, PrefixIndex) else base
+
+
+def _paths(base):
+    if isinstance(base, catalog_file.MappedCatalog):
+        # Straight from the mapped strings, without building a dict per record
+        return (path.decode("utf-8", "replace") for path in base.paths)
+    return (record['path'] for record in _records(base))
+
+
+def user_only(base, apps, fs):
+    """Return the apps not already in base.
+
+    Only base paths with the same executable name as a user record are
+    compared by target identity, so base is scanned without touching disk.
+    """
+    by_exe = {}
+    for path in _paths(base):
+        by_exe.setdefault(fs.path.basename(path).lower(), []).append(path)
+    kept = []
+    for app in apps:
+        candidates = by_exe.get(fs.path.basename(app['path']).lower())
+        if candidates:
+            identity = dedup.target_identity(app['path'], fs)
+            if any(dedup.target_identity(path, fs) == identity for path in candidates):
+                continue
+        kept.append(app)
+    return kept
+
+
+def _lowered_name(app):
+    return app['name'].lower()
+
+
+class OverlayCatalog:
+    """A shared base catalog with one session's records layered over it.
+
+    Behaves as the catalog sorted by lowered name with base records first
+    among equal names, and search() ranks exactly like search_apps() over
+    that catalog: each source's results are split into the exact, prefix,
+    substring and other-field buckets, which are merged in name order (the
+    other-field bucket by score first).
+    """
+    def __init__(self, base, apps):
+        self.base = base
+        self.overlay = PrefixIndex(sorted(apps, key=_lowered_name))
+        self._merged = None
+
+    def __len__(self):
+        return len(self.base) + len(self.overlay)
+
+    def __iter__(self):
+        return heapq.merge(_records(self.base), self.overlay.apps, key=_lowered_name)
+
+    def __getitem__(self, index):
+        if self._merged is None:
+            self._merged = list(self)
+        return self._merged[index]
+
+    def search(self, query):
+        if not query:
+            return list(islice(self, SAMPLE_SIZE))
+        query_terms = query.split()
+        first_term = query_terms[0]
+
+        def buckets(results):
+            split = ([], [], [], [])
+            for app in results:
+                name = app['name'].lower()
+                if not all(term in name for term in query_terms):
+                    split[3].append(app)
+                else:
+                    split[0 if name == query else 1 if name.startswith(first_term) else 2].append(app)
+            return split
+
+        def by_score(app):
+            return -field_score(app, query_terms), app['name'].lower()
+
+        merged = []
+        for bucket, (base_bucket, overlay_bucket) in enumerate(zip(buckets(self.base.search(query)),
+                                                                   buckets(self.overlay.search(query)))):
+            if overlay_bucket:
+                key = by_score if bucket == 3 else _lowered_name
+                merged.extend(heapq.merge(base_bucket, overlay_bucket, key=key))
+            else:
+                merged.extend(base_bucket)
+        return merged
@@ -0,0 +1,29 @@
+"""Shared fixtures for the tests.
+
+The tests run on any platform, like the benchmarks: they import the
+launcher modules from src/ and build their inputs with the seeded
+generators and fakes of benchmarks/.
+"""
+import os
+import sys
+
+ROOT_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path[:0] = [os.path.join(ROOT_DIR, "src"), os.path.join(ROOT_DIR, "benchmarks")]
+
+import pytest
+
+import synthetic
+
+CATALOG_SIZE = 1000
+TRACES = 60
+
+
+@pytest.fixture(scope="session")
+def catalog():
+    return synthetic.make_catalog(CATALOG_SIZE)
+
+
+@pytest.fixture(scope="session")
+def keystrokes(catalog):
+    """Every query typed in the typing traces, one per keystroke."""
+    return [text for trace in synthetic.make_typing_traces(catalog, TRACES) for text in trace]
@@ -0,0 +1,38 @@
+"""Searching CatalogStore generations while a writer publishes new ones (src/catalog.py)."""
+import synthetic
+from bench_catalog import hammer
+
+from catalog import CatalogStore
+from search import search_apps
+
+VERIFY_EVERY = 25  # Check every Nth query against search_apps
+
+
+def test_search_during_refresh(catalog, keystrokes):
+    """Generation ids never go back, and results belong to (and match) the generation searched."""
+    other = synthetic.make_catalog(len(catalog), 1)
+    errors = []
+
+    def reader(store, keystrokes):
+        last_id = -1
+        members = {}
+        for n, query in enumerate(keystrokes):
+            generation = store.current()
+            if generation.id < last_id:
+                errors.append(f"generation went back from {last_id} to {generation.id}")
+                return
+            last_id = generation.id
+            results = generation.search(query)
+            ids = members.get(generation.id)
+            if ids is None:
+                ids = members[generation.id] = {id(app) for app in generation.apps}
+            if any(id(app) not in ids for app in results):
+                errors.append(f"'{query}' returned records from another generation")
+                return
+            if n % VERIFY_EVERY == 0 and list(results) != list(search_apps(generation.apps, query)):
+                errors.append(f"'{query}' differs from search_apps on generation {generation.id}")
+                return
+
+    generations, _ = hammer(CatalogStore(catalog), (catalog, other), keystrokes, reader)
+    assert not errors, errors[0]
+    assert generations > 0
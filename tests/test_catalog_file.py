@@ -0,0 +1,30 @@
+"""The memory-mapped catalog file (src/catalog_file.py)."""
+import random
+
+import pytest
+
+from bench_catalog_file import corruptions
+
+import catalog_file
+from search import PrefixIndex
+
+
+def test_mapped_search_matches_prefix_index(catalog, keystrokes, tmp_path):
+    mapped = catalog_file.MappedCatalog(catalog_file.write_catalog(str(tmp_path / "catalog.olc"), catalog))
+    index = PrefixIndex(catalog)
+    for query in keystrokes:
+        expected = [app['path'] for app in index.search(query)]
+        assert [app['path'] for app in mapped.search(query)] == expected, query
+
+
+def test_damaged_files_are_rejected(catalog, tmp_path):
+    data = catalog_file.encode_catalog(catalog[:300])
+    path = str(tmp_path / "damaged.olc")
+    for description, damaged in corruptions(data, random.Random(0)):
+        with open(path, "wb") as f:
+            f.write(damaged)
+        try:
+            catalog_file.MappedCatalog(path)
+        except catalog_file.CatalogFileError:
+            continue
+        pytest.fail(f"damaged catalog file accepted ({description})")
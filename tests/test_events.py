@@ -0,0 +1,60 @@
+"""EventBridge delivery from producer threads to the Tk thread (src/events.py)."""
+from bench_events import storm, EVENTS_PER_PRODUCER, PRODUCERS
+
+from events import EventBridge, WAKE_EVENT
+
+MAX_LATENCY_MS = 100.0
+
+
+def test_storm_delivers_in_order_and_coalesces_only_queued_toggles():
+    bridge, ui, received, toggles = storm()
+    assert bridge.dispatched + bridge.coalesced == bridge.posted, "events were lost in the bridge"
+    for producer in range(PRODUCERS):
+        assert received.get(producer) == list(range(EVENTS_PER_PRODUCER)), producer
+    toggles_posted = PRODUCERS * ((EVENTS_PER_PRODUCER + 3) // 4)
+    assert toggles and toggles + bridge.coalesced == toggles_posted
+    assert toggles <= ui.wakeups, "more than one toggle was dispatched per wakeup"
+    assert ui.max_latency * 1000.0 <= MAX_LATENCY_MS
+
+
+def test_failed_wake_does_not_stop_later_wakes():
+    """A wake that fails (Tk not in mainloop yet) leaves the events queued and later posts wake again."""
+    delivered = []
+    wakes = []
+
+    def wake():
+        wakes.append(len(wakes))
+        if len(wakes) == 1:
+            raise RuntimeError("main thread is not in main loop")
+
+    bridge = EventBridge({"seq": delivered.append}, wake=wake)
+    bridge.post("seq", 1)
+    bridge.post("seq", 2)
+    assert len(wakes) == 2
+    assert bridge.pump() == 2
+    assert delivered == [1, 2]
+
+
+def test_attach_pumps_events_posted_before_mainloop():
+    class Root:
+        def __init__(self):
+            self.idle = []
+
+        def bind(self, sequence, fn):
+            self.bound = sequence
+
+        def event_generate(self, sequence, when):
+            raise RuntimeError("main thread is not in main loop")
+
+        def after_idle(self, fn):
+            self.idle.append(fn)
+
+    delivered = []
+    root = Root()
+    bridge = EventBridge({"seq": delivered.append})
+    bridge.attach(root)
+    bridge.post("seq", 1)
+    for fn in root.idle:  # What mainloop() runs first
+        fn()
+    assert root.bound == WAKE_EVENT
+    assert delivered == [1]
@@ -0,0 +1,43 @@
+"""Network probes with a timeout and a circuit breaker (src/guarded_fs.py)."""
+import threading
+import time
+
+import pytest
+
+from guarded_fs import NetworkGuard, ProbePool, Unreachable
+
+TIMEOUT = 0.05
+
+
+def test_stuck_probes_do_not_starve_live_hosts():
+    released = threading.Event()
+    guard = NetworkGuard(timeout=TIMEOUT, pool=ProbePool(max_workers=2),
+                         is_remote_drive=lambda drive: False)
+    try:
+        for host in ("\\\\dead1", "\\\\dead2", "\\\\dead3"):
+            with pytest.raises(Unreachable):
+                guard.call(host + "\\share\\app.exe", released.wait)
+        # Every worker the pool may count is stuck; the live host must still be probed
+        assert guard.call("\\\\live\\share\\app.exe", lambda: True) is True
+        assert guard.hosts_down() == ["\\\\dead1", "\\\\dead2", "\\\\dead3"]
+        assert guard.counters == {'probes': 4, 'timeouts': 3, 'skipped': 0}
+    finally:
+        released.set()
+
+
+def test_queued_probes_are_not_held_against_their_host():
+    timeout = 0.2
+    guard = NetworkGuard(timeout=timeout, pool=ProbePool(max_workers=1),
+                         is_remote_drive=lambda drive: False)
+    # Two probes that answer within the timeout, one after the other on the only worker
+    slow = [threading.Thread(target=guard.call,
+                             args=("\\\\slow\\share\\app.exe", time.sleep, timeout * 0.7))
+            for _ in range(2)]
+    for thread in slow:
+        thread.start()
+    time.sleep(timeout * 0.1)
+    # Queued for longer than the timeout, then answered at once
+    assert guard.call("\\\\live\\share\\app.exe", lambda: True) is True
+    for thread in slow:
+        thread.join()
+    assert guard.hosts_down() == []
@@ -0,0 +1,35 @@
+"""PrefixIndex against the linear search it replaces (src/search.py)."""
+import random
+
+import synthetic
+from search import PrefixIndex, search_apps
+
+LARGE_CATALOG_SIZE = 100000
+
+
+def check_index(index, catalog, queries):
+    """Check the index against the linear bucket logic in search_apps."""
+    for query in queries:
+        query = query.lower().strip()
+        assert index.search(query) == search_apps(catalog, query), query
+        if query:
+            first = query.split()[0]
+            linear = [app for app in catalog if app['name'].lower().startswith(first)]
+            assert index.starts_with(first) == linear, first
+            linear = [app for app in catalog
+                      if any(w.startswith(first) for w in app['name'].lower().split())]
+            assert index.word_starts_with(first) == linear, first
+
+
+def test_matches_search_apps_for_every_keystroke(catalog, keystrokes):
+    check_index(PrefixIndex(catalog), catalog, keystrokes)
+
+
+def test_large_catalog_prefixes():
+    catalog = synthetic.make_catalog(LARGE_CATALOG_SIZE)
+    rng = random.Random(0)
+    queries = []
+    for _ in range(20):
+        word = rng.choice(catalog)['name'].lower().split()[0]
+        queries.append(word[:rng.randint(1, min(4, len(word)))])
+    check_index(PrefixIndex(catalog), catalog, queries)
@@ -0,0 +1,28 @@
+"""The single-instance IPC endpoint (src/ipc.py)."""
+import socket
+import time
+
+import pytest
+
+import ipc
+
+AUTHKEY = b"test-key"
+
+
+@pytest.fixture
+def server(tmp_path):
+    if not hasattr(socket, "AF_UNIX"):
+        pytest.skip("needs Unix domain sockets")
+    server = ipc.IPCServer({"slow": lambda seconds: time.sleep(seconds) or "slow"},
+                           address=str(tmp_path / "launcher.sock"), authkey=AUTHKEY)
+    server.start()
+    yield server
+    server.close()
+
+
+def test_late_reply_is_not_read_by_the_next_call(server):
+    with ipc.IPCClient(server.address, AUTHKEY, timeout=0.1) as client:
+        with pytest.raises(TimeoutError):
+            client.call("slow", 0.3)
+        time.sleep(0.3)  # The late reply has been sent by now
+        assert client.call("ping") == "pong"
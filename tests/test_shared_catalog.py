@@ -0,0 +1,112 @@
+"""The machine-scope catalog shared between sessions (src/shared_catalog.py)."""
+import os
+import threading
+
+import pytest
+
+import synthetic
+from bench_shared import run_sessions, shared_session
+
+import catalog_file
+import scanner
+from search import search_apps
+from shared_catalog import SharedCatalog
+
+MACHINE_SIZE = 300
+CHECKED_QUERIES = 300
+
+
+class DeniedLock:
+    """The lock file of a directory another user created without sharing it."""
+    def acquire(self):
+        raise PermissionError(13, "Permission denied", "scan.lock")
+
+
+class LockedOutCatalog(SharedCatalog):
+    def lock(self):
+        return DeniedLock()
+
+
+@pytest.fixture(scope="module")
+def providers():
+    return synthetic.make_machine(MACHINE_SIZE)
+
+
+@pytest.fixture(scope="module")
+def machine(providers):
+    return scanner.scan_installed_apps(providers, scope=scanner.MACHINE)
+
+
+def held_lock(directory):
+    """Take directory's scan lock the way another session would."""
+    lock = SharedCatalog(directory).lock()
+    assert lock.acquire()
+    return lock
+
+
+def test_sessions_share_one_machine_scan(providers, keystrokes, tmp_path):
+    machine_scans = []
+    results = run_sessions(lambda i: shared_session(providers, str(tmp_path), machine_scans))
+    assert len(machine_scans) == 1
+    overlay, _ = results[0]
+    full = scanner.scan_installed_apps(providers)
+    assert len(overlay) == len(full)
+    assert ({providers.fs.path.normcase(app['path']) for app in overlay}
+            == {providers.fs.path.normcase(app['path']) for app in full})
+    merged = scanner.build_catalog(list(overlay))
+    for query in keystrokes[:CHECKED_QUERIES]:
+        query = query.lower()
+        assert overlay.search(query) == search_apps(merged, query), query
+
+
+@pytest.mark.skipif(os.name == "nt", reason="checks POSIX modes")
+def test_shared_files_are_open_to_all_users(tmp_path):
+    created = str(tmp_path / "created")
+    SharedCatalog(created).lock().acquire()
+    for path, mode in ((created, 0o777), (os.path.join(created, "scan.lock"), 0o666)):
+        assert os.stat(path).st_mode & 0o777 == mode, path
+
+
+def test_current_takes_a_stale_file_without_scanning(machine, tmp_path):
+    assert SharedCatalog(str(tmp_path)).current() == (None, "missing")
+    catalog_file.save_catalog(machine, str(tmp_path))
+    base, how = SharedCatalog(str(tmp_path), max_age=0).current()
+    assert how == "stale" and len(base) == len(machine)
+    assert SharedCatalog(str(tmp_path)).current()[1] == "shared"
+
+
+def test_rescan_keeps_a_stale_file_while_another_session_rescans(machine, tmp_path):
+    catalog_file.save_catalog(machine, str(tmp_path))
+    lock = held_lock(str(tmp_path))
+    try:
+        base, how = SharedCatalog(str(tmp_path), max_age=0).rescan(
+            lambda: pytest.fail("scanned while another session held the lock"))
+    finally:
+        lock.release()
+    assert how == "stale" and len(base) == len(machine)
+
+
+def test_rescan_scans_privately_when_the_other_session_takes_too_long(machine, tmp_path):
+    lock = held_lock(str(tmp_path))
+    try:
+        base, how = SharedCatalog(str(tmp_path)).rescan(lambda: machine, wait=0.1)
+    finally:
+        lock.release()
+    assert how == "private" and len(base) == len(machine)
+    assert SharedCatalog(str(tmp_path)).latest() is None
+
+
+def test_locked_out_session_scans_privately_or_keeps_the_stale_file(machine, tmp_path):
+    base, how = LockedOutCatalog(str(tmp_path / "missing")).rescan(lambda: machine)
+    assert how == "private" and len(base) == len(machine)
+    catalog_file.save_catalog(machine, str(tmp_path))
+    base, how = LockedOutCatalog(str(tmp_path), max_age=0).rescan(lambda: machine)
+    assert how == "stale"
+
+
+def test_cancelled_rescan_is_not_shared(machine, tmp_path):
+    cancel = threading.Event()
+    cancel.set()
+    base, how = SharedCatalog(str(tmp_path)).rescan(lambda: machine[:10], cancel=cancel)
+    assert how == "cancelled" and len(base) == 10
+    assert SharedCatalog(str(tmp_path)).latest() is None